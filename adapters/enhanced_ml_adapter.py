@@ -117,7 +117,34 @@ class EnhancedMLPredictorAdapter(IBreakoutPredictor):
         except Exception as e:
             print(f"❌ 高精度予測エラー: {e}")
             return self._create_fallback_prediction(level, current_data)
-    
+
+    def predict_breakouts_batch(self, current_data: pd.DataFrame,
+                                levels: List[SupportResistanceLevel]) -> List[BreakoutPrediction]:
+        """
+        複数レベルの一括ブレイクアウト予測（各要素は predict_breakout と同じ）
+        """
+        try:
+            if not self.is_trained:
+                print("⚠️ 高精度モデルが訓練されていません。デフォルト予測を使用します。")
+                return [self._create_fallback_prediction(level, current_data) for level in levels]
+
+            # 高精度予測器で一括予測
+            predictions = self.predictor.predict_breakouts_batch(current_data, levels)
+
+        except Exception as e:
+            print(f"❌ 高精度予測エラー: {e}")
+            return [self._create_fallback_prediction(level, current_data) for level in levels]
+
+        # 予測結果の検証
+        results = []
+        for level, prediction in zip(levels, predictions):
+            if self._validate_prediction(prediction):
+                results.append(prediction)
+            else:
+                print("⚠️ 予測結果が異常です。フォールバック予測を使用します。")
+                results.append(self._create_fallback_prediction(level, current_data))
+        return results
+
     def get_model_accuracy(self) -> Dict[str, float]:
         """
         モデル精度情報を取得
@@ -20,6 +20,7 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from real_time_system.utils.colored_log import get_colored_logger
 from scalable_analysis_system import ScalableAnalysisSystem
 from execution_log_database import ExecutionLogDatabase, ExecutionType, ExecutionStatus
+from sqlite_access import db_connection
 from engines.leverage_decision_engine import InsufficientMarketDataError, InsufficientConfigurationError, LeverageAnalysisError
 # Stage 9フィルタリングシステム削除済み (2025年6月29日)
 # from engines.filtering_framework import FilteringFramework, FilteringStatistics
@@ -702,14 +703,13 @@ class AutoSymbolTrainer:
     def _create_no_signal_record(self, symbol: str, config: Dict, execution_id: str, error_message: str = None):
         """シグナルなしの分析レコードを作成"""
         try:
-            import sqlite3
             from pathlib import Path
             from datetime import datetime, timezone
             import json
             
             analysis_db_path = Path(__file__).parent / "large_scale_analysis" / "analysis.db"
             
-            with sqlite3.connect(analysis_db_path) as conn:
+            with db_connection(analysis_db_path) as conn:
                 # バックテスト詳細情報（シグナルなし）
                 backtest_details = {
                     "status": "no_signal",
@@ -955,7 +955,6 @@ class AutoSymbolTrainer:
     def _verify_analysis_results(self, symbol: str, execution_id: str) -> bool:
         """分析結果の存在確認（より柔軟な検証）"""
         try:
-            import sqlite3
             from pathlib import Path
             
             analysis_db_path = Path(__file__).parent / "large_scale_analysis" / "analysis.db"
@@ -963,7 +962,7 @@ class AutoSymbolTrainer:
                 self.logger.warning(f"Analysis database not found: {analysis_db_path}")
                 return False
                 
-            with sqlite3.connect(analysis_db_path) as conn:
+            with db_connection(analysis_db_path) as conn:
                 # 1. 該当execution_idの分析結果を確認
                 cursor = conn.execute('''
                     SELECT COUNT(*) FROM analyses 
@@ -1024,7 +1023,6 @@ class AutoSymbolTrainer:
         """分析結果の詳細確認（Early Exit結果を含む）"""
         try:
             from engines.analysis_result import AnalysisResult
-            import sqlite3
             from pathlib import Path
             
             # 結果サマリー初期化
@@ -1043,7 +1041,7 @@ class AutoSymbolTrainer:
                 self.logger.warning(f"Analysis database not found: {analysis_db_path}")
                 return summary
                 
-            with sqlite3.connect(analysis_db_path) as conn:
+            with db_connection(analysis_db_path) as conn:
                 # 1. 該当execution_idの分析結果を確認
                 cursor = conn.execute('''
                     SELECT COUNT(*), SUM(total_trades), COUNT(CASE WHEN total_trades > 0 THEN 1 END) as signal_count
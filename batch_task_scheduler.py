@@ -0,0 +1,387 @@
+"""
+バッチ分析のコスト考慮スケジューラー
+
+generate_batch_analysis の静的チャンク分割（len(configs)//max_workers ずつ）では、1m足のような重いタスクと
+1h足の軽いタスクが同じチャンクに入るとチャンク全体が遅れ、1チャンクの失敗でその中の設定がすべて失われる。
+
+- TaskCostModel: 足数 × 時間足・戦略ごとの実績（1足あたりの秒数、指数移動平均）から実行時間を推定
+- CostAwareTaskScheduler: 設定ごとにタスクを投入（推定時間の長い順 = LPT）。空いたワーカーが次のタスクを取り、
+  タスク単位のリトライをプロセスプールを作り直さずに行う（タイムアウト時のみプールを作り直して止まったワーカーを終了）
+- group_shared_stage_configs: 戦略だけが異なる設定を1タスクにまとめ、戦略に依存しないステージを共有させる
+- simulate_makespan: 静的チャンク分割とLPTのメイクスパン比較（ベンチマーク用）
+"""
+
+import json
+import logging
+import os
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence
+
+from ohlcv_candle_store import TIMEFRAME_MS
+
+logger = logging.getLogger(__name__)
+
+# 実績がない場合の1足あたりの推定秒数
+DEFAULT_SECONDS_PER_BAR = 0.05
+
+# 実績の指数移動平均の重み
+COST_EWMA_ALPHA = 0.3
+
+# タスクごとのタイムアウト（秒）とリトライ回数のデフォルト
+DEFAULT_TASK_TIMEOUT = 1800
+DEFAULT_MAX_RETRIES = 1
+
+
+def estimate_bar_count(timeframe: str, window_seconds: float) -> int:
+    """期間（秒）に含まれる足数"""
+    bar_ms = TIMEFRAME_MS.get(timeframe, TIMEFRAME_MS['1h'])
+    return max(1, int(window_seconds * 1000 // bar_ms))
+
+
+class TaskCostModel:
+    """
+    タスクの実行時間推定モデル
+
+    推定時間 = 足数 × 1足あたりの秒数。1足あたりの秒数は (時間足, 戦略) → 時間足 → デフォルト の順に
+    実績の指数移動平均を使う。history_path を指定すると実績をJSONで保存・再利用する。
+    """
+
+    def __init__(self, history_path: Optional[str] = None):
+        self.history_path = history_path
+        self.seconds_per_bar: Dict[str, float] = {}
+        self.samples: Dict[str, int] = {}
+        self._load()
+
+    @staticmethod
+    def _keys(timeframe: str, strategy: Optional[str]) -> List[str]:
+        keys = [timeframe]
+        if strategy:
+            keys.insert(0, f"{timeframe}|{strategy}")
+        return keys
+
+    def _load(self):
+        if not self.history_path or not os.path.exists(self.history_path):
+            return
+        try:
+            with open(self.history_path, 'r', encoding='utf-8') as f:
+                history = json.load(f)
+            self.seconds_per_bar = {k: float(v) for k, v in history.get('seconds_per_bar', {}).items()}
+            self.samples = {k: int(v) for k, v in history.get('samples', {}).items()}
+        except Exception as e:
+            logger.warning(f"⚠️ タスクコスト履歴の読み込みエラー: {e}")
+
+    def estimate(self, timeframe: str, strategy: Optional[str], bars: int) -> float:
+        """推定実行時間（秒）"""
+        for key in self._keys(timeframe, strategy):
+            if key in self.seconds_per_bar:
+                return bars * self.seconds_per_bar[key]
+        return bars * DEFAULT_SECONDS_PER_BAR
+
+    def record(self, timeframe: str, strategy: Optional[str], bars: int, seconds: float):
+        """実績を反映"""
+        if bars <= 0 or seconds <= 0:
+            return
+        observed = seconds / bars
+        for key in self._keys(timeframe, strategy):
+            previous = self.seconds_per_bar.get(key)
+            if previous is None:
+                self.seconds_per_bar[key] = observed
+            else:
+                self.seconds_per_bar[key] = (1 - COST_EWMA_ALPHA) * previous + COST_EWMA_ALPHA * observed
+            self.samples[key] = self.samples.get(key, 0) + 1
+
+    def estimate_group(self, timeframe: str, strategies: Sequence[str], bars: int) -> float:
+        """グループタスク（複数戦略）の推定実行時間 = 各戦略の推定時間の合計"""
+        if not strategies:
+            return self.estimate(timeframe, None, bars)
+        return sum(self.estimate(timeframe, strategy, bars) for strategy in strategies)
+
+    def record_group(self, timeframe: str, strategies: Sequence[str], bars: int, seconds: float):
+        """グループタスクの実績を戦略ごとに等分して反映"""
+        if not strategies:
+            self.record(timeframe, None, bars, seconds)
+            return
+        for strategy in strategies:
+            self.record(timeframe, strategy, bars, seconds / len(strategies))
+
+    def save(self):
+        """実績をJSONに保存（一時ファイル経由で置き換え）"""
+        if not self.history_path:
+            return
+        try:
+            directory = os.path.dirname(os.path.abspath(self.history_path))
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({'seconds_per_bar': self.seconds_per_bar, 'samples': self.samples}, f, indent=2)
+            os.replace(tmp_path, self.history_path)
+        except Exception as e:
+            logger.warning(f"⚠️ タスクコスト履歴の保存エラー: {e}")
+
+
+@dataclass
+class BatchTask:
+    """スケジューラーが扱う1設定分のタスク"""
+    task_id: int
+    config: Dict
+    bars: int
+    estimated_seconds: float
+    attempts: int = 0
+    started_at: Optional[float] = None
+    result: Optional[Dict] = None
+    error: Optional[str] = None
+
+    @property
+    def label(self) -> str:
+        if not isinstance(self.config, dict):
+            return str(self.config)
+        strategy = self.config.get('strategy') or self.config.get('config')
+        return f"{self.config.get('symbol')} {self.config.get('timeframe')} {strategy}"
+
+
+@dataclass
+class ScheduleSummary:
+    """スケジュール実行結果"""
+    processed: int = 0
+    completed: int = 0
+    failed: int = 0
+    timed_out: int = 0
+    retried: int = 0
+    cancelled: int = 0
+    pool_resets: int = 0
+    pool_broken: bool = False
+    makespan_seconds: float = 0.0
+    failed_tasks: List[str] = field(default_factory=list)
+
+
+def order_longest_first(tasks: Sequence[BatchTask]) -> List[BatchTask]:
+    """推定時間の長い順（同じ推定時間は元の順序）"""
+    return sorted(tasks, key=lambda task: -task.estimated_seconds)
+
+
+def config_strategies(config) -> List[str]:
+    """設定の戦略名のリスト（グループ設定は 'strategies'、通常の設定は 'strategy' / 'config' の1件）"""
+    if not isinstance(config, dict):
+        return []
+    if config.get('strategies'):
+        return list(config['strategies'])
+    strategy = config.get('strategy') or config.get('config')
+    return [strategy] if strategy else []
+
+
+def group_shared_stage_configs(batch_configs: Sequence[Dict]) -> List[Dict]:
+    """
+    戦略だけが異なる設定（同じ銘柄・時間足・期間などの共通キー）を1つのグループ設定にまとめる
+
+    グループ設定は共通キーに 'strategies'（戦略名のリスト、元の順序）と 'strategy'（'A+B' 形式のラベル。
+    タスク名に使う）を加えたもの。コストは戦略ごとの推定・実績で扱う（TaskCostModel.estimate_group）。戦略が1つだけの設定・辞書でない設定・銘柄/時間足/戦略の
+    ない設定・同じグループ内で重複する戦略の設定はそのまま残す。グループは最初の設定の位置に置く。
+    """
+    planned: List = []
+    groups: Dict[tuple, Dict] = {}
+    for config in batch_configs:
+        strategy = (config.get('strategy') or config.get('config')) if isinstance(config, dict) else None
+        if not strategy or 'symbol' not in config or 'timeframe' not in config:
+            planned.append(config)
+            continue
+
+        shared = {k: v for k, v in config.items() if k not in ('strategy', 'config')}
+        key = tuple(sorted((k, repr(v)) for k, v in shared.items()))
+        group = groups.get(key)
+        if group is None:
+            groups[key] = group = {'shared': shared, 'strategies': [], 'index': len(planned)}
+            planned.append(config)
+        elif strategy in group['strategies']:
+            planned.append(config)
+            continue
+        group['strategies'].append(strategy)
+
+    for group in groups.values():
+        if len(group['strategies']) > 1:
+            planned[group['index']] = dict(group['shared'], strategy='+'.join(group['strategies']),
+                                           strategies=group['strategies'])
+    return planned
+
+
+class CostAwareTaskScheduler:
+    """
+    タスク単位でプロセスプールに投入するスケジューラー
+
+    submit_fn(task) は Future を返す関数（executor.submit のラッパー）。Futureの結果は
+    {'processed': int, 'seconds': float, 'pid': int} を想定する。結果に 'error' がある場合は例外と同じく
+    失敗として扱い（'processed' は成功した分として集計）、'retry_config' があれば再実行はその設定で行う。
+
+    実行中のワーカーはFutureのキャンセルでは止まらないため、タイムアウト時は reset_pool() で
+    プールを作り直す（未完了のタスクは試行回数を増やさずに投入し直す）。reset_pool を指定しない場合、
+    タイムアウトしたタスクは結果を破棄するだけで、そのワーカーは処理が終わるまで使えない。
+    """
+
+    def __init__(self, task_timeout: float = DEFAULT_TASK_TIMEOUT, max_retries: int = DEFAULT_MAX_RETRIES,
+                 poll_interval: float = 5.0):
+        self.task_timeout = task_timeout
+        self.max_retries = max_retries
+        self.poll_interval = poll_interval
+
+    def run(self, tasks: Sequence[BatchTask], submit_fn: Callable[[BatchTask], object],
+            should_cancel: Optional[Callable[[], bool]] = None,
+            on_complete: Optional[Callable[[BatchTask], None]] = None,
+            reset_pool: Optional[Callable[[], None]] = None) -> ScheduleSummary:
+        """タスクを推定時間の長い順に投入し、完了・タイムアウト・失敗を処理する"""
+        summary = ScheduleSummary()
+        started = time.time()
+        queue = order_longest_first(tasks)
+        in_flight: Dict[object, BatchTask] = {}
+
+        def submit_next():
+            # プールの待ち行列に順番に積み、空いたワーカーが先頭から取る
+            while queue:
+                task = queue.pop(0)
+                task.attempts += 1
+                task.started_at = None
+                in_flight[submit_fn(task)] = task
+
+        submit_next()
+        while in_flight:
+            done, _ = wait(list(in_flight), timeout=self.poll_interval, return_when=FIRST_COMPLETED)
+            now = time.time()
+
+            for future in done:
+                task = in_flight.pop(future)
+                try:
+                    task.result = future.result()
+                except BrokenProcessPool as e:
+                    summary.pool_broken = True
+                    self._fail(summary, task, f"プロセスプール破損: {e}")
+                except Exception as e:
+                    self._retry_or_fail(summary, queue, task, str(e))
+                else:
+                    summary.processed += int(task.result.get('processed', 0))
+                    if task.result.get('error'):
+                        if task.result.get('retry_config'):
+                            task.config = task.result['retry_config']
+                        self._retry_or_fail(summary, queue, task, task.result['error'])
+                        continue
+                    summary.completed += 1
+                    if on_complete:
+                        try:
+                            on_complete(task)
+                        except Exception as e:
+                            logger.warning(f"⚠️ タスク完了処理エラー {task.label}: {e}")
+
+            # 実行中になった時刻からタイムアウトを判定
+            timed_out = False
+            for future, task in list(in_flight.items()):
+                if task.started_at is None and future.running():
+                    task.started_at = now
+                if task.started_at is not None and now - task.started_at > self.task_timeout:
+                    in_flight.pop(future)
+                    timed_out = True
+                    summary.timed_out += 1
+                    self._fail(summary, task, f"タイムアウト ({self.task_timeout:.0f}秒)")
+
+            if timed_out and reset_pool is not None:
+                # 実行中のワーカーはキャンセルできないため、プールごと作り直して止まったワーカーを終了する
+                for future, task in list(in_flight.items()):
+                    if not future.done():
+                        in_flight.pop(future)
+                        future.cancel()
+                        task.attempts -= 1
+                        queue.insert(0, task)
+                logger.warning(f"⚠️ タイムアウトしたワーカーを終了するためプロセスプールを再作成 "
+                               f"(未完了{len(queue)}タスクを再投入)")
+                reset_pool()
+                summary.pool_resets += 1
+                queue[:] = order_longest_first(queue)
+            elif timed_out:
+                logger.warning("⚠️ タイムアウトしたタスクのワーカーは処理が終わるまで使用できません")
+
+            if summary.pool_broken:
+                logger.error("プロセスプール破損検出 - 残りのタスクをスキップ")
+                for future, task in in_flight.items():
+                    future.cancel()
+                    self._fail(summary, task, "プロセスプール破損によりスキップ")
+                summary.cancelled += len(queue)
+                queue.clear()
+                break
+
+            if should_cancel is not None and (queue or in_flight) and should_cancel():
+                logger.info("キャンセル要求を検出 - 未開始のタスクを取り消し")
+                for future, task in list(in_flight.items()):
+                    if future.cancel():
+                        in_flight.pop(future)
+                        summary.cancelled += 1
+                summary.cancelled += len(queue)
+                queue.clear()
+                should_cancel = None
+
+            submit_next()
+
+        summary.makespan_seconds = time.time() - started
+        return summary
+
+    def _retry_or_fail(self, summary: ScheduleSummary, queue: List[BatchTask], task: BatchTask, reason: str):
+        """再実行回数の上限までは待ち行列の先頭に戻し、超えたら失敗として記録"""
+        if task.attempts <= self.max_retries:
+            logger.warning(f"⚠️ タスク再実行 {task.label} ({task.attempts}回目失敗): {reason}")
+            summary.retried += 1
+            queue.insert(0, task)
+        else:
+            self._fail(summary, task, reason)
+
+    @staticmethod
+    def _fail(summary: ScheduleSummary, task: BatchTask, reason: str):
+        task.error = reason
+        summary.failed += 1
+        summary.failed_tasks.append(task.label)
+        logger.error(f"タスク失敗 {task.label}: {reason}")
+
+
+def simulate_makespan(durations: Sequence[float], workers: int, mode: str = 'lpt') -> float:
+    """
+    メイクスパン（全タスク完了までの時間）のシミュレーション
+
+    mode='chunked': 従来の静的チャンク分割（max(1, n//workers)件ずつ、チャンク単位で空いたワーカーに割当）
+    mode='lpt': タスク単位で推定時間の長い順に空いたワーカーに割当
+    """
+    if not durations:
+        return 0.0
+    workers = max(1, workers)
+    if mode == 'chunked':
+        chunk_size = max(1, len(durations) // workers)
+        units = [sum(durations[i:i + chunk_size]) for i in range(0, len(durations), chunk_size)]
+    elif mode == 'lpt':
+        units = sorted(durations, reverse=True)
+    else:
+        raise ValueError(f"未対応のモード: {mode}")
+
+    free_at = [0.0] * workers
+    for duration in units:
+        index = min(range(workers), key=free_at.__getitem__)
+        free_at[index] += duration
+    return max(free_at)
+
+
+def _benchmark_mixed_batch(workers: int = 4):
+    """1m/5m/15m/1h 混在バッチのメイクスパン比較（推定コストによるシミュレーション）"""
+    model = TaskCostModel()
+    window_seconds = 90 * 86400
+    timeframes = ['1m', '5m', '15m', '1h']
+    strategies = ['Conservative_ML', 'Aggressive_ML', 'Balanced']
+    # 従来のauto_symbol_trainingと同じく時間足ごと・戦略ごとに並べる
+    durations = [model.estimate(tf, strategy, estimate_bar_count(tf, window_seconds))
+                 for tf in timeframes for strategy in strategies]
+
+    chunked = simulate_makespan(durations, workers, 'chunked')
+    lpt = simulate_makespan(durations, workers, 'lpt')
+    print(f"📊 混在バッチ ({len(durations)}タスク, {workers}並列)")
+    print(f"   静的チャンク分割: {chunked:.1f}秒")
+    print(f"   コスト考慮(LPT):  {lpt:.1f}秒 ({chunked / lpt:.2f}倍高速)")
+    return chunked, lpt
+
+
+if __name__ == "__main__":
+    _benchmark_mixed_batch()
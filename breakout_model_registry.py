@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+"""
+訓練済みブレイクアウト予測モデルのレジストリ
+
+(銘柄, 時間足, データウィンドウのハッシュ, 特徴量セットのバージョン, ハイパーパラメータ) を
+キーとして、予測器の save_model が書き出すモデル一式（学習済みモデル・スケーラー・
+特徴量カラム・アンサンブル重み）をディスク上にコンテンツアドレスで保存し、
+全ての分析プロセスで共有する。
+
+- 同じデータ・同じ設定の訓練は1回だけ行い、他のワーカー・戦略は load_model で再利用
+- 同じ系列の過去ウィンドウで訓練したモデルは、新しい足が少なく十分に新しい場合に再利用
+  （古さの判定: 訓練後に追加された足の本数・訓練からの経過時間）
+- ヒット・ミス・再訓練の件数を get_stats() で取得可能
+- 書き込みは fcntl によるファイルロックで排他制御
+
+ディレクトリ構成:
+    {base_dir}/models/{digest[:2]}/{digest}/model.pkl   (save_model の出力)
+    {base_dir}/series/{series_digest}.json             (系列ごとのエントリ一覧)
+    {base_dir}/series/{series_digest}.lock
+
+Usage:
+    registry = get_breakout_model_registry()
+    key = registry.ensure_trained(predictor, 'SOL', '1h', data, levels)
+    print(registry.get_stats())
+"""
+
+import os
+import json
+import fcntl
+import time
+import shutil
+import hashlib
+import logging
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+REGISTRY_VERSION = 1
+
+DEFAULT_REGISTRY_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache', 'breakout_models')
+DEFAULT_MAX_NEW_BARS = 24
+DEFAULT_MAX_AGE_HOURS = 24 * 7
+MAX_ENTRIES_PER_SERIES = 16
+# プロセス内で保持するデータウィンドウのハッシュの件数
+WINDOW_HASH_CACHE_SIZE = 256
+
+MODEL_FILENAME = 'model.pkl'
+HASH_COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+
+
+def _timestamps_ns(data: pd.DataFrame) -> np.ndarray:
+    """timestampカラム（無ければインデックス）をUTCナノ秒の配列に変換"""
+    raw = data['timestamp'] if 'timestamp' in data.columns else pd.Series(data.index)
+    if pd.api.types.is_numeric_dtype(raw):
+        return raw.to_numpy(dtype=np.int64)
+    return pd.DatetimeIndex(pd.to_datetime(raw, utc=True)).as_unit('ns').asi8
+
+
+def data_window_hash(data: pd.DataFrame) -> str:
+    """OHLCVウィンドウの内容ハッシュ（時刻と価格・出来高が同じなら同じ値）"""
+    digest = hashlib.sha256()
+    digest.update(str(len(data)).encode())
+    digest.update(np.ascontiguousarray(_timestamps_ns(data)).tobytes())
+    for column in HASH_COLUMNS:
+        if column in data.columns:
+            digest.update(column.encode())
+            digest.update(np.ascontiguousarray(data[column].to_numpy(dtype=np.float64)).tobytes())
+    return digest.hexdigest()
+
+
+def predictor_signature(predictor) -> Dict[str, Any]:
+    """
+    予測器の種類・特徴量セットのバージョン・ハイパーパラメータ
+
+    アダプターの場合は内部の予測器（.predictor）の設定を使う
+    """
+    inner = getattr(predictor, 'predictor', None) or predictor
+    return {
+        'predictor': type(predictor).__name__,
+        'model': type(inner).__name__,
+        'feature_set_version': getattr(inner, 'FEATURE_SET_VERSION', getattr(predictor, 'FEATURE_SET_VERSION', 0)),
+        'hyperparameters': getattr(inner, 'model_params', None),
+    }
+
+
+def _digest(payload: Dict) -> str:
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class BreakoutModelRegistry:
+    """ディスク上のコンテンツアドレス型モデルキャッシュ"""
+
+    def __init__(self, base_dir: str = None, max_new_bars: int = DEFAULT_MAX_NEW_BARS,
+                 max_age_seconds: float = DEFAULT_MAX_AGE_HOURS * 3600):
+        """
+        Args:
+            base_dir: 保存先ディレクトリ
+            max_new_bars: 訓練ウィンドウより後に追加された足がこの本数以下なら再利用
+            max_age_seconds: 訓練からこの秒数を超えたモデルは再訓練
+        """
+        self.base_dir = Path(base_dir or os.environ.get('BREAKOUT_MODEL_REGISTRY_DIR', DEFAULT_REGISTRY_DIR))
+        self.max_new_bars = max_new_bars
+        self.max_age_seconds = max_age_seconds
+        self.stats = {'lookups': 0, 'hits': 0, 'warm_hits': 0, 'misses': 0, 'stale': 0,
+                      'trains': 0, 'train_failures': 0, 'stores': 0, 'load_errors': 0}
+        self._window_hashes: OrderedDict = OrderedDict()
+
+    # === キー・パス ===
+
+    @staticmethod
+    def series_key(symbol: str, timeframe: str, signature: Dict) -> str:
+        """データウィンドウ以外のキー要素（同じ系列・同じ設定）のダイジェスト"""
+        return _digest({'version': REGISTRY_VERSION, 'symbol': symbol, 'timeframe': timeframe, **signature})
+
+    @staticmethod
+    def model_key(series_key: str, window_hash: str) -> str:
+        """モデル本体のコンテンツアドレス"""
+        return _digest({'series': series_key, 'window': window_hash})
+
+    def _model_dir(self, model_key: str) -> Path:
+        return self.base_dir / 'models' / model_key[:2] / model_key
+
+    def _series_path(self, series_key: str) -> Path:
+        return self.base_dir / 'series' / f'{series_key}.json'
+
+    @contextmanager
+    def _lock(self, series_key: str, exclusive: bool):
+        lock_path = self.base_dir / 'series' / f'{series_key}.lock'
+        lock_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(lock_path, 'a+') as lock_file:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _read_entries(self, series_key: str) -> List[Dict]:
+        path = self._series_path(series_key)
+        if not path.exists():
+            return []
+        try:
+            with open(path, 'r') as f:
+                return json.load(f).get('entries', [])
+        except (OSError, ValueError) as e:
+            logger.warning(f"モデルレジストリの索引を読み込めません: {path}: {e}")
+            return []
+
+    def _write_entries(self, series_key: str, entries: List[Dict]):
+        path = self._series_path(series_key)
+        tmp_path = path.with_suffix('.json.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump({'version': REGISTRY_VERSION, 'entries': entries, 'updated_at': time.time()}, f)
+        os.replace(tmp_path, path)
+
+    # === 検索 ===
+
+    def _window_hash(self, data: pd.DataFrame, timestamps: np.ndarray = None) -> str:
+        """
+        data_window_hash のプロセス内キャッシュ
+
+        キーは (先頭・末尾の時刻, 行数, 価格・出来高の位置重み付きチェックサム)。チェックサムは
+        SHA-256 より大幅に軽く、形成中の足の更新や過去の足の書き換えでキーが変わる。
+        """
+        if timestamps is None:
+            timestamps = _timestamps_ns(data)
+        if len(timestamps) == 0:
+            return data_window_hash(data)
+        columns = [column for column in HASH_COLUMNS if column in data.columns]
+        values = data[columns].to_numpy(dtype=np.float64)
+        checksum = float(np.arange(1, len(values) + 1, dtype=np.float64) @ values.sum(axis=1)) if columns else 0.0
+        key = (int(timestamps[0]), int(timestamps[-1]), len(timestamps), checksum)
+        window_hash = self._window_hashes.get(key)
+        if window_hash is None:
+            window_hash = data_window_hash(data)
+            self._window_hashes[key] = window_hash
+            if len(self._window_hashes) > WINDOW_HASH_CACHE_SIZE:
+                self._window_hashes.popitem(last=False)
+        else:
+            self._window_hashes.move_to_end(key)
+        return window_hash
+
+    def _is_fresh(self, entry: Dict, now: float) -> bool:
+        return self.max_age_seconds is None or now - entry['created_at'] <= self.max_age_seconds
+
+    def find(self, series_key: str, data: pd.DataFrame, window_hash: str = None) -> Tuple[Optional[Dict], str]:
+        """
+        再利用できるエントリを探す
+
+        ハッシュは期間・行数が一致する候補がある場合だけ計算する（キャッシュ済みなら再計算しない）
+
+        Returns:
+            (エントリ, 判定) 判定は 'hit'（同じウィンドウ）/ 'warm'（過去ウィンドウ）/ 'stale' / 'miss'
+        """
+        now = time.time()
+        with self._lock(series_key, exclusive=False):
+            entries = self._read_entries(series_key)
+        if not entries:
+            return None, 'miss'
+
+        timestamps = _timestamps_ns(data)
+        start_ts = int(timestamps[0]) if len(timestamps) else 0
+        end_ts = int(timestamps[-1]) if len(timestamps) else 0
+
+        status = 'miss'
+        exact = None
+        candidates = [e for e in entries
+                      if e['start_ts'] == start_ts and e['end_ts'] == end_ts and e['rows'] == len(data)]
+        if candidates:
+            window_hash = window_hash or self._window_hash(data, timestamps)
+            exact = next((e for e in candidates if e['window_hash'] == window_hash), None)
+        if exact is not None:
+            if self._is_fresh(exact, now) and self._model_dir(exact['model_key']).exists():
+                return exact, 'hit'
+            status = 'stale'
+
+        if self.max_new_bars <= 0 or len(timestamps) == 0:
+            return None, status
+
+        # 新しい順に、現在のデータの先頭部分と一致する過去ウィンドウを探す
+        for entry in sorted(entries, key=lambda e: e['end_ts'], reverse=True):
+            if entry is exact or entry['start_ts'] != timestamps[0] or entry['end_ts'] > timestamps[-1]:
+                continue
+            rows = int(np.searchsorted(timestamps, entry['end_ts'], side='right'))
+            if rows != entry['rows']:
+                continue
+            if self._window_hash(data.iloc[:rows], timestamps[:rows]) != entry['window_hash']:
+                continue
+            if len(timestamps) - rows > self.max_new_bars or not self._is_fresh(entry, now):
+                status = 'stale'
+                continue
+            if self._model_dir(entry['model_key']).exists():
+                return entry, 'warm'
+        return None, status
+
+    def load(self, predictor, entry: Dict) -> bool:
+        """エントリのモデルを予測器に読み込む"""
+        model_dir = self._model_dir(entry['model_key'])
+        try:
+            with self._lock(entry['series_key'], exclusive=False):
+                loaded = bool(predictor.load_model(str(model_dir / MODEL_FILENAME)))
+        except Exception as e:
+            logger.warning(f"モデル読み込みエラー: {model_dir}: {e}")
+            loaded = False
+        if not loaded or not getattr(predictor, 'is_trained', True):
+            self.stats['load_errors'] += 1
+            return False
+        return True
+
+    # === 保存 ===
+
+    def store(self, predictor, series_key: str, data: pd.DataFrame, window_hash: str = None,
+              metadata: Dict = None) -> Optional[Dict]:
+        """訓練済み予測器を save_model で保存し、系列の索引に登録"""
+        window_hash = window_hash or self._window_hash(data)
+        model_key = self.model_key(series_key, window_hash)
+        model_dir = self._model_dir(model_key)
+        timestamps = _timestamps_ns(data)
+        entry = {
+            'model_key': model_key,
+            'series_key': series_key,
+            'window_hash': window_hash,
+            'start_ts': int(timestamps[0]) if len(timestamps) else 0,
+            'end_ts': int(timestamps[-1]) if len(timestamps) else 0,
+            'rows': int(len(data)),
+            'created_at': time.time(),
+            'metadata': metadata or {},
+        }
+
+        # 一時ディレクトリに書き出してからリネーム（読み込み側は完成したディレクトリのみ参照）
+        model_dir.parent.mkdir(parents=True, exist_ok=True)
+        tmp_dir = model_dir.parent / f'.{model_key}.{os.getpid()}.tmp'
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        tmp_dir.mkdir()
+        try:
+            if not predictor.save_model(str(tmp_dir / MODEL_FILENAME)):
+                return None
+            with self._lock(series_key, exclusive=True):
+                shutil.rmtree(model_dir, ignore_errors=True)
+                os.replace(tmp_dir, model_dir)
+
+                entries = [e for e in self._read_entries(series_key) if e['model_key'] != model_key]
+                entries.append(entry)
+                entries.sort(key=lambda e: e['created_at'])
+                for old in entries[:-MAX_ENTRIES_PER_SERIES]:
+                    shutil.rmtree(self._model_dir(old['model_key']), ignore_errors=True)
+                self._write_entries(series_key, entries[-MAX_ENTRIES_PER_SERIES:])
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+        self.stats['stores'] += 1
+        return entry
+
+    # === 訓練 ===
+
+    def ensure_trained(self, predictor, symbol: str, timeframe: str, data: pd.DataFrame,
+                       levels: list, loaded_entry: Dict = None) -> Optional[Dict]:
+        """
+        キャッシュ済みモデルを読み込み、無い・古い場合のみ訓練して保存する
+
+        Args:
+            loaded_entry: 予測器に読み込み済みのエントリ（同じモデルなら読み込みを省略）
+
+        Returns:
+            予測器に読み込んだ（または新たに訓練した）エントリ。訓練に失敗した場合はNone
+        """
+        self.stats['lookups'] += 1
+        series_key = self.series_key(symbol, timeframe, predictor_signature(predictor))
+
+        try:
+            entry, status = self.find(series_key, data)
+        except OSError as e:
+            logger.warning(f"モデルレジストリを参照できません（訓練して継続）: {e}")
+            entry, status = None, 'miss'
+
+        if entry is not None:
+            already_loaded = (loaded_entry is not None and getattr(predictor, 'is_trained', False)
+                              and loaded_entry.get('model_key') == entry['model_key'])
+            if already_loaded or self.load(predictor, entry):
+                self.stats['hits' if status == 'hit' else 'warm_hits'] += 1
+                if not already_loaded:
+                    new_bars = len(data) - entry['rows']
+                    window = '同一ウィンドウ' if status == 'hit' else f'{new_bars}本前までのウィンドウ'
+                    print(f"♻️ 訓練済みモデルを再利用: {symbol} {timeframe} ({window})")
+                return entry
+
+        self.stats['stale' if status == 'stale' else 'misses'] += 1
+        self.stats['trains'] += 1
+        predictor.train_model(data, levels)
+        if not getattr(predictor, 'is_trained', False):
+            self.stats['train_failures'] += 1
+            return None
+
+        window_hash = self._window_hash(data)
+        try:
+            stored = self.store(predictor, series_key, data, window_hash,
+                                metadata={'symbol': symbol, 'timeframe': timeframe, 'levels': len(levels)})
+        except Exception as e:
+            logger.warning(f"モデル保存エラー（キャッシュせずに継続）: {e}")
+            stored = None
+        return stored or {'model_key': None, 'series_key': series_key, 'window_hash': window_hash,
+                          'rows': int(len(data))}
+
+    def get_stats(self) -> Dict[str, Any]:
+        """ヒット・ミス統計を取得"""
+        stats = dict(self.stats)
+        reused = stats['hits'] + stats['warm_hits']
+        stats['hit_rate'] = reused / stats['lookups'] if stats['lookups'] else 0.0
+        return stats
+
+
+_model_registry = None
+
+
+def get_breakout_model_registry() -> Optional[BreakoutModelRegistry]:
+    """
+    プロセス共通のモデルレジストリを取得
+
+    BREAKOUT_MODEL_REGISTRY_ENABLED=false の場合はNone（毎回訓練する従来動作）
+    """
+    global _model_registry
+    if os.environ.get('BREAKOUT_MODEL_REGISTRY_ENABLED', 'true').lower() in ('false', '0', 'no'):
+        return None
+    base_dir = os.environ.get('BREAKOUT_MODEL_REGISTRY_DIR', DEFAULT_REGISTRY_DIR)
+    max_new_bars = int(os.environ.get('BREAKOUT_MODEL_MAX_NEW_BARS', DEFAULT_MAX_NEW_BARS))
+    max_age_seconds = float(os.environ.get('BREAKOUT_MODEL_MAX_AGE_HOURS', DEFAULT_MAX_AGE_HOURS)) * 3600
+    if (_model_registry is None or str(_model_registry.base_dir) != str(Path(base_dir))
+            or _model_registry.max_new_bars != max_new_bars
+            or _model_registry.max_age_seconds != max_age_seconds):
+        _model_registry = BreakoutModelRegistry(base_dir, max_new_bars, max_age_seconds)
+    return _model_registry
@@ -111,83 +111,106 @@ class BTCAltcoinBacktester:
             print("BTCデータ取得に失敗")
             return []
         
-        events = []
+        filtered_events = self._detect_drop_events(btc_data)
+        
+        print(f"検出された急落イベント: {len(filtered_events)}件")
+        
+        # イベント分析
+        self._analyze_drop_events(filtered_events)
+        
+        return filtered_events
+    
+    def _detect_drop_events(self, btc_data: pd.DataFrame) -> List[BTCDropEvent]:
+        """
+        1分足のBTCデータから急落イベントを検出（重複除去済み）
+        
+        ローリング指標を全足分まとめて計算し、真偽値マスクで候補足を選ぶ。
+        持続時間は下落の連続本数、事前トレンドは240本の回帰直線の傾きを
+        それぞれ配列演算で求めるため、足ごとのループは行わない。
+        
+        Args:
+            btc_data: 時刻昇順のBTC 1分足（close, volume）
+            
+        Returns:
+            急落イベントのリスト
+        """
+        n = len(btc_data)
+        close = btc_data['close'].to_numpy(dtype=float)
+        volume = btc_data['volume'].to_numpy(dtype=float)
         returns = btc_data['close'].pct_change()
         
         # 15分間のローリング下落率を計算
-        rolling_returns = returns.rolling(15).sum() * 100
+        rolling_returns = (returns.rolling(15).sum() * 100).to_numpy()
         
         # ボラティリティベースの閾値調整
         volatility = returns.rolling(1440).std()  # 24時間ボラティリティ
         median_vol = volatility.median()
+        current_vol = volatility.fillna(median_vol).to_numpy()
         
-        # 急落イベント検出
-        for i in range(len(rolling_returns)):
-            if pd.isna(rolling_returns.iloc[i]):
-                continue
-                
-            drop_pct = rolling_returns.iloc[i]
-            current_vol = volatility.iloc[i] if not pd.isna(volatility.iloc[i]) else median_vol
-            
-            # ボラティリティ調整閾値
+        # 急落イベント候補（ボラティリティ調整閾値以下の足）
+        with np.errstate(divide='ignore', invalid='ignore'):
             adjusted_threshold = self.btc_drop_threshold * (current_vol / median_vol)
-            
-            if drop_pct <= adjusted_threshold:
-                timestamp = btc_data.index[i]
-                
-                # 急落の詳細情報を計算
-                start_idx = max(0, i - 15)
-                end_idx = min(len(btc_data), i + 60)  # 1時間後まで
-                
-                # 出来高スパイク
-                volume_ma = btc_data['volume'].rolling(60).mean().iloc[i]
-                current_volume = btc_data['volume'].iloc[i]
-                volume_spike = current_volume / volume_ma if volume_ma > 0 else 1.0
-                
-                # 事前トレンド
-                if i >= 240:  # 4時間前のデータがある場合
-                    trend_data = btc_data['close'].iloc[i-240:i]
-                    trend_slope = np.polyfit(range(len(trend_data)), trend_data.values, 1)[0]
-                    if trend_slope > 0.1:
-                        prior_trend = 'up'
-                    elif trend_slope < -0.1:
-                        prior_trend = 'down'
-                    else:
-                        prior_trend = 'sideways'
-                else:
-                    prior_trend = 'unknown'
-                
-                # 急落の持続時間
-                duration = 15  # 最低15分
-                for j in range(i + 1, min(len(returns), i + 120)):  # 最大2時間
-                    if returns.iloc[j] >= 0:  # プラス転換で終了
-                        break
-                    duration += 1
-                
-                event = BTCDropEvent(
-                    timestamp=timestamp,
-                    drop_pct=drop_pct,
-                    duration_minutes=duration,
-                    volume_spike=volume_spike,
-                    prior_trend=prior_trend,
-                    market_hour=timestamp.hour,
-                    is_weekend=timestamp.weekday() >= 5
-                )
-                
-                events.append(event)
-        
-        # 重複除去（30分以内の連続イベント）
-        filtered_events = []
-        for event in events:
-            if not filtered_events or (event.timestamp - filtered_events[-1].timestamp).total_seconds() > 1800:
-                filtered_events.append(event)
-        
-        print(f"検出された急落イベント: {len(filtered_events)}件")
+            is_drop = ~np.isnan(rolling_returns) & (rolling_returns <= adjusted_threshold)
+        candidates = np.flatnonzero(is_drop)
+        if len(candidates) == 0:
+            return []
         
-        # イベント分析
-        self._analyze_drop_events(filtered_events)
+        # 重複除去（30分以内の連続イベント）: 採用したイベントから30分を超えた最初の候補へ進む
+        # インデックスの単位（pandas 3 では us 等もある）に依存しないようナノ秒に揃える
+        times = btc_data.index.values.astype('datetime64[ns]').view('i8')[candidates]
+        next_candidate = np.searchsorted(times, times + 1800 * 10**9, side='right')
+        kept = []
+        k = 0
+        while k < len(candidates):
+            kept.append(candidates[k])
+            k = next_candidate[k]
+        kept = np.asarray(kept)
+        
+        # 出来高スパイク
+        volume_ma = btc_data['volume'].rolling(60).mean().to_numpy()[kept]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            volume_spike = np.where(volume_ma > 0, volume[kept] / volume_ma, 1.0)
+        
+        # 事前トレンド: 直前240本の最小二乗の傾き（x を中心化した閉形式）
+        trend_window = 240
+        x_centered = np.arange(trend_window) - (trend_window - 1) / 2
+        trend_slope = np.full(n, np.nan)
+        if n > trend_window:
+            trend_slope[trend_window:] = np.convolve(
+                close, x_centered[::-1] / np.dot(x_centered, x_centered), mode='valid'
+            )[:n - trend_window]
+        
+        # 急落の持続時間: 次の足から続く下落の本数（プラス転換で終了）、最大2時間
+        turns = np.flatnonzero((returns >= 0).to_numpy())
+        next_turn = np.append(turns, n)[np.searchsorted(turns, kept + 1)]
+        durations = 15 + np.minimum(np.minimum(next_turn, kept + 120), n) - (kept + 1)  # 最低15分
         
-        return filtered_events
+        events = []
+        for pos, i in enumerate(kept):
+            timestamp = btc_data.index[i]
+            
+            if i >= trend_window:  # 4時間前のデータがある場合
+                slope = trend_slope[i]
+                if slope > 0.1:
+                    prior_trend = 'up'
+                elif slope < -0.1:
+                    prior_trend = 'down'
+                else:
+                    prior_trend = 'sideways'
+            else:
+                prior_trend = 'unknown'
+            
+            events.append(BTCDropEvent(
+                timestamp=timestamp,
+                drop_pct=rolling_returns[i],
+                duration_minutes=int(durations[pos]),
+                volume_spike=volume_spike[pos],
+                prior_trend=prior_trend,
+                market_hour=timestamp.hour,
+                is_weekend=timestamp.weekday() >= 5
+            ))
+        
+        return events
     
     def _analyze_drop_events(self, events: List[BTCDropEvent]):
         """急落イベントの統計分析"""
@@ -9,6 +9,7 @@ BTCが急落した際のアルトコインの連れ安幅を機械学習で予
 1. BTC-アルトコイン価格相関の分析
 2. 機械学習による連れ安幅の予測
 3. 複数時間軸での予測（5分〜4時間）
+4. 複数銘柄の一括訓練（BTC特徴量は btc_feature_store で1回だけ計算して共有）
 
 【使用方法】
 python btc_altcoin_correlation_predictor.py --btc-drop -5.0 --symbol ETH --leverage 10
@@ -21,18 +22,18 @@ import warnings
 from datetime import datetime, timedelta
 from typing import Dict, List, Tuple, Optional
 import time
+import os
+from concurrent.futures import ThreadPoolExecutor
 
-# 機械学習ライブラリ
-from sklearn.model_selection import TimeSeriesSplit
-from sklearn.preprocessing import StandardScaler
-from sklearn.metrics import mean_absolute_error
-import lightgbm as lgb
-import joblib
+# 機械学習ライブラリ（sklearn / lightgbm / joblib）は訓練・保存・読み込みのメソッドの中で読み込む
 
 # Hyperliquid API
 from hyperliquid.info import Info
 from hyperliquid.utils import constants
 
+from ohlcv_candle_store import get_candle_store, TIMEFRAME_MS
+from btc_feature_store import get_btc_feature_store, BTC_FEATURE_COLUMNS
+
 warnings.filterwarnings('ignore')
 
 class BTCAltcoinCorrelationPredictor:
@@ -51,53 +52,24 @@ class BTCAltcoinCorrelationPredictor:
         self.scalers = {}
     
     def fetch_historical_data(self, symbol: str, timeframe: str = "1m", days: int = 30) -> pd.DataFrame:
-        """過去データの取得"""
+        """過去データの取得（ローカルキャンドルストアに保存済みの期間はAPIを呼ばない）"""
         print(f"{symbol}の過去データを取得中 ({days}日間)")
         
         try:
             end_time = int(time.time() * 1000)
             start_time = end_time - (days * 24 * 60 * 60 * 1000)
             
-            all_data = []
-            
-            # 1日ずつデータを取得（429エラー対策付き）
-            for i in range(days):
-                day_start = start_time + (i * 24 * 60 * 60 * 1000)
-                day_end = day_start + (24 * 60 * 60 * 1000)
-                
-                # リトライ機構付きAPI呼び出し
-                retry_count = 0
-                max_retries = 3
-                while retry_count < max_retries:
-                    try:
-                        candles = self.info.candles_snapshot(symbol, timeframe, day_start, day_end)
-                        break
-                    except Exception as e:
-                        if "429" in str(e) or "rate limit" in str(e).lower():
-                            retry_count += 1
-                            wait_time = 2.0 ** retry_count  # 指数バックオフ: 2秒、4秒、8秒
-                            print(f"BTC相関分析でRate Limit発生 (リトライ {retry_count}/{max_retries}), {wait_time}秒待機...")
-                            time.sleep(wait_time)
-                        else:
-                            print(f"BTC相関分析でAPI呼び出しエラー: {e}")
-                            candles = []
-                            break
-                else:
-                    print(f"BTC相関分析: 最大リトライ数に到達、day {i+1}をスキップ")
-                    candles = []
-                
-                for candle in candles:
-                    all_data.append({
-                        'timestamp': pd.to_datetime(candle['t'], unit='ms'),
-                        'open': float(candle['o']),
-                        'high': float(candle['h']),
-                        'low': float(candle['l']),
-                        'close': float(candle['c']),
-                        'volume': float(candle['v'])
-                    })
-                
-                # レート制限対策（BTC相関分析用に延長）
-                time.sleep(0.5)
+            candle_store = get_candle_store()
+            if candle_store is not None and timeframe in TIMEFRAME_MS:
+                all_data = self._fetch_with_candle_store(candle_store, symbol, timeframe, start_time, end_time)
+            else:
+                all_data = []
+                # 1日ずつデータを取得（429エラー対策付き）
+                for i in range(days):
+                    day_start = start_time + (i * 24 * 60 * 60 * 1000)
+                    day_end = day_start + (24 * 60 * 60 * 1000)
+                    candles = self._fetch_day_candles(symbol, timeframe, day_start, day_end, i)
+                    all_data.extend(self._candles_to_rows(candles))
             
             df = pd.DataFrame(all_data)
             df.set_index('timestamp', inplace=True)
@@ -110,8 +82,101 @@ class BTCAltcoinCorrelationPredictor:
             print(f"{symbol}のデータ取得エラー: {e}")
             return pd.DataFrame()
     
-    def calculate_features(self, btc_data: pd.DataFrame, alt_data: pd.DataFrame) -> pd.DataFrame:
-        """BTC-アルトコイン相関分析用の特徴量を計算（改善版）"""
+    def _fetch_day_candles(self, symbol: str, timeframe: str, day_start: int, day_end: int, day_index: int) -> list:
+        """1日分のローソク足を取得（リトライ・レート制限対策付き）"""
+        # リトライ機構付きAPI呼び出し
+        retry_count = 0
+        max_retries = 3
+        while retry_count < max_retries:
+            try:
+                candles = self.info.candles_snapshot(symbol, timeframe, day_start, day_end)
+                break
+            except Exception as e:
+                if "429" in str(e) or "rate limit" in str(e).lower():
+                    retry_count += 1
+                    wait_time = 2.0 ** retry_count  # 指数バックオフ: 2秒、4秒、8秒
+                    print(f"BTC相関分析でRate Limit発生 (リトライ {retry_count}/{max_retries}), {wait_time}秒待機...")
+                    time.sleep(wait_time)
+                else:
+                    print(f"BTC相関分析でAPI呼び出しエラー: {e}")
+                    candles = []
+                    break
+        else:
+            print(f"BTC相関分析: 最大リトライ数に到達、day {day_index+1}をスキップ")
+            candles = []
+        
+        # レート制限対策（BTC相関分析用に延長）
+        time.sleep(0.5)
+        return candles
+    
+    @staticmethod
+    def _candles_to_rows(candles: list) -> list:
+        return [{
+            'timestamp': pd.to_datetime(candle['t'], unit='ms'),
+            'open': float(candle['o']),
+            'high': float(candle['h']),
+            'low': float(candle['l']),
+            'close': float(candle['c']),
+            'volume': float(candle['v'])
+        } for candle in candles]
+    
+    def _fetch_with_candle_store(self, candle_store, symbol: str, timeframe: str,
+                                 start_time: int, end_time: int) -> list:
+        """
+        キャンドルストアの未取得期間のみ1日ずつ取得して保存し、期間全体の行を返す
+        
+        形成中の足はストアに保存されないため、今回の取得結果から補う
+        """
+        one_day_ms = 24 * 60 * 60 * 1000
+        fetched_rows = []
+        
+        missing = candle_store.missing_ranges('hyperliquid', symbol, timeframe, start_time, end_time - 1)
+        day_index = 0
+        for gap_start, gap_end in missing:
+            day_start = gap_start
+            while day_start < gap_end:
+                day_end = min(day_start + one_day_ms, gap_end)
+                candles = self._fetch_day_candles(symbol, timeframe, day_start, day_end, day_index)
+                day_index += 1
+                
+                rows = self._candles_to_rows(candles)
+                if rows:
+                    frame = pd.DataFrame(rows)
+                    frame['trades'] = [int(candle.get('n', 0)) for candle in candles]
+                    candle_store.append('hyperliquid', symbol, timeframe, frame,
+                                        covered_ranges=[(day_start, day_end)])
+                    fetched_rows.extend(rows)
+                day_start = day_end
+        
+        arrays = candle_store.read_arrays('hyperliquid', symbol, timeframe, start_time, end_time - 1)
+        stored_timestamps = pd.to_datetime(np.asarray(arrays['timestamp']), unit='ms')
+        all_data = [{
+            'timestamp': ts,
+            'open': float(o),
+            'high': float(h),
+            'low': float(l),
+            'close': float(c),
+            'volume': float(v)
+        } for ts, o, h, l, c, v in zip(stored_timestamps, arrays['open'], arrays['high'],
+                                       arrays['low'], arrays['close'], arrays['volume'])]
+        
+        stored = set(stored_timestamps)
+        all_data.extend(row for row in fetched_rows if row['timestamp'] not in stored)
+        return all_data
+    
+    def calculate_features(self, btc_data: pd.DataFrame, alt_data: pd.DataFrame,
+                           btc_features: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+        """
+        BTC-アルトコイン相関分析用の特徴量を計算（改善版）
+        
+        Args:
+            btc_data: BTCのローソク足
+            alt_data: アルトコインのローソク足
+            btc_features: BTC特徴量ストアの特徴量（指定時はBTC側の特徴量を再計算しない）
+        """
+        if btc_features is not None:
+            return self._calculate_features_with_btc_store(btc_features, alt_data)
+        
         # 価格変化率を計算
         btc_returns = btc_data['close'].pct_change().fillna(0)
         alt_returns = alt_data['close'].pct_change().fillna(0)
@@ -169,6 +234,31 @@ class BTCAltcoinCorrelationPredictor:
         features['btc_support_distance'] = self._calculate_support_distance(btc_data_aligned['close'])
         features['btc_resistance_distance'] = self._calculate_resistance_distance(btc_data_aligned['close'])
         
+        return self._add_altcoin_features(features, btc_returns, alt_returns, alt_data_aligned)
+    
+    def _calculate_features_with_btc_store(self, btc_features: pd.DataFrame, alt_data: pd.DataFrame) -> pd.DataFrame:
+        """
+        BTC特徴量ストアの特徴量にアルトコインを揃えて特徴量を計算
+        
+        BTC側の列は連続したBTCの足で計算済みなので、アルトコインの足が欠けていても
+        ローリング窓はBTCの本数どおりになる（列順は calculate_features と同じ）
+        """
+        alt_returns = alt_data['close'].pct_change().fillna(0)
+        common_index = btc_features.index.intersection(alt_returns.index)
+        features = btc_features.loc[common_index, list(BTC_FEATURE_COLUMNS)].copy()
+        btc_returns = features['btc_return_1m']
+        alt_returns = alt_returns.loc[common_index]
+        
+        # === 相関特徴量 ===（MACDとサポレジ距離の間）
+        corr_position = features.columns.get_loc('btc_support_distance')
+        features.insert(corr_position, 'btc_alt_corr_60m', btc_returns.rolling(60).corr(alt_returns))
+        features.insert(corr_position + 1, 'btc_alt_corr_240m', btc_returns.rolling(240).corr(alt_returns))
+        
+        return self._add_altcoin_features(features, btc_returns, alt_returns, alt_data.loc[common_index])
+    
+    def _add_altcoin_features(self, features: pd.DataFrame, btc_returns: pd.Series,
+                              alt_returns: pd.Series, alt_data_aligned: pd.DataFrame) -> pd.DataFrame:
+        """時間・アルトコイン補助・相対強度の特徴量とターゲットを追加"""
         # === 時間特徴量 ===
         features['hour'] = features.index.hour
         features['day_of_week'] = features.index.dayofweek
@@ -223,22 +313,40 @@ class BTCAltcoinCorrelationPredictor:
         rolling_max = prices.rolling(window).max()
         return (rolling_max - prices) / prices
     
-    def train_prediction_model(self, symbol: str) -> bool:
-        """指定銘柄の予測モデルを訓練"""
-        print(f"\n{symbol}の予測モデルを訓練中...")
+    def load_btc_features(self, btc_data: pd.DataFrame) -> Optional[pd.DataFrame]:
+        """
+        BTC特徴量ストアを今回のBTCデータで更新し、同じ期間の特徴量を返す
         
-        # データ取得
-        btc_data = self.fetch_historical_data('BTC', '1m', 30)
-        alt_data = self.fetch_historical_data(symbol, '1m', 30)
+        Returns:
+            BTC特徴量（ストアが無効・エラーの場合はNone = 銘柄ごとに計算）
+        """
+        feature_store = get_btc_feature_store()
+        if feature_store is None or btc_data.empty:
+            return None
+        try:
+            added = feature_store.refresh(btc_data)
+            if added:
+                print(f"BTC特徴量ストアを更新: {added}件追加")
+            btc_features = feature_store.read_features(btc_data.index[0], btc_data.index[-1])
+            return btc_features if not btc_features.empty else None
+        except Exception as e:
+            print(f"BTC特徴量ストアエラー（銘柄ごとに計算します）: {e}")
+            return None
+    
+    def train_prediction_model(self, symbol: str, btc_data: pd.DataFrame = None,
+                               btc_features: pd.DataFrame = None) -> bool:
+        """
+        指定銘柄の予測モデルを訓練
         
-        if btc_data.empty or alt_data.empty:
-            print(f"データ取得に失敗: {symbol}")
-            return False
+        Args:
+            symbol: アルトコインシンボル
+            btc_data: 取得済みのBTCデータ（省略時は取得）
+            btc_features: BTC特徴量（省略時はBTC特徴量ストアから取得）
+        """
+        print(f"\n{symbol}の予測モデルを訓練中...")
         
-        # 特徴量計算
-        features = self.calculate_features(btc_data, alt_data)
-        if len(features) < 1000:
-            print(f"データ不足: {symbol} ({len(features)}件)")
+        features = self._prepare_training_features(symbol, btc_data, btc_features)
+        if features is None:
             return False
         
         # 各予測時間幅でモデルを訓練
@@ -246,62 +354,171 @@ class BTCAltcoinCorrelationPredictor:
         self.scalers[symbol] = {}
         
         for horizon in self.prediction_horizons:
-            target_col = f'alt_return_{horizon}m'
-            if target_col not in features.columns:
-                continue
-            
-            # 特徴量とターゲットを分離
-            feature_cols = [col for col in features.columns if not col.startswith('alt_return')]
-            X = features[feature_cols].dropna()
-            y = features[target_col].loc[X.index].dropna()
-            
-            # データが十分にある場合のみ訓練
-            common_idx = X.index.intersection(y.index)
-            if len(common_idx) < 500:
-                print(f"{symbol}-{horizon}m: データ不足")
+            trained = self._train_horizon_model(symbol, horizon, features)
+            if trained is None:
                 continue
-            
-            X = X.loc[common_idx]
-            y = y.loc[common_idx]
-            
-            # 時系列分割でクロスバリデーション
-            tscv = TimeSeriesSplit(n_splits=5)
-            
-            # スケーリング
-            scaler = StandardScaler()
-            X_scaled = scaler.fit_transform(X)
-            
-            # LightGBMモデル
-            model = lgb.LGBMRegressor(
-                n_estimators=100,
-                max_depth=6,
-                learning_rate=0.1,
-                random_state=42,
-                verbosity=-1
-            )
-            
-            # クロスバリデーション
-            cv_scores = []
-            for train_idx, val_idx in tscv.split(X_scaled):
-                X_train, X_val = X_scaled[train_idx], X_scaled[val_idx]
-                y_train, y_val = y.iloc[train_idx], y.iloc[val_idx]
-                
-                model.fit(X_train, y_train)
-                y_pred = model.predict(X_val)
-                mae = mean_absolute_error(y_val, y_pred)
-                cv_scores.append(mae)
-            
-            # 全データで再訓練
-            model.fit(X_scaled, y)
+            model, scaler, mae = trained
             
             # モデル保存
             self.models[symbol][horizon] = model
             self.scalers[symbol][horizon] = scaler
             
-            print(f"  {horizon}分予測: MAE={np.mean(cv_scores):.4f}")
+            print(f"  {horizon}分予測: MAE={mae:.4f}")
         
         return True
     
+    def train_prediction_models(self, symbols: List[str], max_workers: int = None) -> Dict[str, bool]:
+        """
+        複数銘柄の予測モデルを一括訓練
+        
+        BTCデータの取得と特徴量計算は1回だけ行い、全銘柄を同じBTC特徴量に揃えてから
+        (銘柄, 予測時間幅) の全モデルをスレッドで並列に訓練する。
+        
+        Args:
+            symbols: アルトコインシンボルのリスト
+            max_workers: 並列訓練数（省略時はCPU数と訓練数の小さい方）
+            
+        Returns:
+            {シンボル: 訓練成功} の辞書
+        """
+        print(f"\n{len(symbols)}銘柄の予測モデルを一括訓練中...")
+        results = {symbol: False for symbol in symbols}
+        
+        btc_data = self.fetch_historical_data('BTC', '1m', 30)
+        if btc_data.empty:
+            print("BTCデータ取得に失敗")
+            return results
+        btc_features = self.load_btc_features(btc_data)
+        
+        # 全銘柄の特徴量を先に揃える（APIのレート制限があるため取得は逐次）
+        feature_sets = {}
+        for symbol in symbols:
+            features = self._prepare_training_features(symbol, btc_data, btc_features)
+            if features is not None:
+                feature_sets[symbol] = features
+        
+        tasks = [(symbol, horizon) for symbol in feature_sets for horizon in self.prediction_horizons]
+        if not tasks:
+            return results
+        
+        cpu_count = os.cpu_count() or 1
+        max_workers = max(1, min(max_workers or cpu_count, len(tasks)))
+        # LightGBMのスレッド数を並列数で分け合う
+        n_jobs = max(1, cpu_count // max_workers)
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                (symbol, horizon): executor.submit(self._train_horizon_model, symbol, horizon,
+                                                   feature_sets[symbol], n_jobs)
+                for symbol, horizon in tasks
+            }
+        
+        for symbol in feature_sets:
+            self.models[symbol] = {}
+            self.scalers[symbol] = {}
+            for horizon in self.prediction_horizons:
+                try:
+                    trained = futures[(symbol, horizon)].result()
+                except Exception as e:
+                    print(f"{symbol}-{horizon}m: 訓練エラー: {e}")
+                    continue
+                if trained is None:
+                    continue
+                model, scaler, mae = trained
+                self.models[symbol][horizon] = model
+                self.scalers[symbol][horizon] = scaler
+                print(f"  {symbol} {horizon}分予測: MAE={mae:.4f}")
+            results[symbol] = True
+        
+        return results
+    
+    def _prepare_training_features(self, symbol: str, btc_data: pd.DataFrame = None,
+                                   btc_features: pd.DataFrame = None) -> Optional[pd.DataFrame]:
+        """訓練用の特徴量を計算（データ取得失敗・データ不足の場合はNone）"""
+        # データ取得
+        if btc_data is None:
+            btc_data = self.fetch_historical_data('BTC', '1m', 30)
+            if btc_features is None:
+                btc_features = self.load_btc_features(btc_data)
+        alt_data = self.fetch_historical_data(symbol, '1m', 30)
+        
+        if btc_data.empty or alt_data.empty:
+            print(f"データ取得に失敗: {symbol}")
+            return None
+        
+        # 特徴量計算
+        features = self.calculate_features(btc_data, alt_data, btc_features=btc_features)
+        if len(features) < 1000:
+            print(f"データ不足: {symbol} ({len(features)}件)")
+            return None
+        return features
+    
+    def _train_horizon_model(self, symbol: str, horizon: int, features: pd.DataFrame,
+                             n_jobs: int = None) -> Optional[Tuple]:
+        """
+        1つの予測時間幅のモデルを訓練
+        
+        Returns:
+            (model, scaler, 交差検証MAE)。ターゲットがない・データ不足の場合はNone
+        """
+        target_col = f'alt_return_{horizon}m'
+        if target_col not in features.columns:
+            return None
+        
+        # 特徴量とターゲットを分離
+        feature_cols = [col for col in features.columns if not col.startswith('alt_return')]
+        X = features[feature_cols].dropna()
+        y = features[target_col].loc[X.index].dropna()
+        
+        # データが十分にある場合のみ訓練
+        common_idx = X.index.intersection(y.index)
+        if len(common_idx) < 500:
+            print(f"{symbol}-{horizon}m: データ不足")
+            return None
+        
+        X = X.loc[common_idx]
+        y = y.loc[common_idx]
+        
+        from sklearn.model_selection import TimeSeriesSplit
+        from sklearn.preprocessing import StandardScaler
+        from sklearn.metrics import mean_absolute_error
+        import lightgbm as lgb
+
+        # 時系列分割でクロスバリデーション
+        tscv = TimeSeriesSplit(n_splits=5)
+        
+        # スケーリング
+        scaler = StandardScaler()
+        X_scaled = scaler.fit_transform(X)
+        
+        # LightGBMモデル
+        model_params = dict(
+            n_estimators=100,
+            max_depth=6,
+            learning_rate=0.1,
+            random_state=42,
+            verbosity=-1
+        )
+        if n_jobs is not None:
+            model_params['n_jobs'] = n_jobs
+        model = lgb.LGBMRegressor(**model_params)
+        
+        # クロスバリデーション
+        cv_scores = []
+        for train_idx, val_idx in tscv.split(X_scaled):
+            X_train, X_val = X_scaled[train_idx], X_scaled[val_idx]
+            y_train, y_val = y.iloc[train_idx], y.iloc[val_idx]
+            
+            model.fit(X_train, y_train)
+            y_pred = model.predict(X_val)
+            mae = mean_absolute_error(y_val, y_pred)
+            cv_scores.append(mae)
+        
+        # 全データで再訓練
+        model.fit(X_scaled, y)
+        
+        return model, scaler, float(np.mean(cv_scores))
+    
     def predict_altcoin_drop(self, symbol: str, btc_drop_pct: float) -> Dict[int, float]:
         """
         アルトコインの下落幅を予測
@@ -487,6 +704,7 @@ class BTCAltcoinCorrelationPredictor:
                 'symbol': symbol,
                 'prediction_horizons': self.prediction_horizons
             }
+            import joblib
             joblib.dump(model_data, filepath)
             print(f"モデルを保存: {filepath}")
     
@@ -496,6 +714,7 @@ class BTCAltcoinCorrelationPredictor:
             filepath = f"{symbol.lower()}_correlation_model.pkl"
         
         try:
+            import joblib
             model_data = joblib.load(filepath)
             self.models[symbol] = model_data['models']
             self.scalers[symbol] = model_data['scalers']
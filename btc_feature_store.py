@@ -0,0 +1,420 @@
+#!/usr/bin/env python3
+"""
+BTC特徴量ストア
+
+BTC-アルトコイン相関予測（BTCAltcoinCorrelationPredictor.calculate_features）の特徴量のうち、
+BTCのローソク足だけで決まる列（リターン・ボラティリティ・出来高・RSI・MACD・サポレジ距離）を
+1回だけ計算してディスクに保存し、全ての銘柄・プロセスで共有する。
+
+- カラム別の固定長バイナリ（timestamp.bin / features.bin）を np.memmap で読み込むため、
+  各プロセスはコピーなしで参照できる
+- 追記専用: 保存済みの末尾より新しい足のみ、直近 WARMUP_ROWS 本とEMAの状態を引き継いで計算して追記する
+  （全ての特徴量は過去方向のみを参照するので、保存済みの行は確定値）
+- 形成中の足（終了時刻が現在より後の足）は保存しない（確定前の終値・出来高を確定値として残さない）
+- 過去方向の補完・列構成の変更時、または保存済みの末尾から WARMUP_ROWS 本以上空いた場合のみ全体を再計算
+- 書き込みは fcntl によるファイルロックで排他制御（OHLCVCandleStore と同じ構成）
+
+Usage:
+    store = get_btc_feature_store()
+    store.refresh(btc_data)                      # 新しい足だけ追記
+    btc_features = store.read_features(start, end)
+    features = predictor.calculate_features(btc_data, alt_data, btc_features=btc_features)
+"""
+
+import os
+import json
+import fcntl
+import time
+import logging
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from ohlcv_candle_store import timeframe_to_ms
+
+logger = logging.getLogger(__name__)
+
+# BTCのみから計算する特徴量（calculate_features の列順）
+BTC_FEATURE_COLUMNS = (
+    'btc_return_1m', 'btc_return_5m', 'btc_return_15m', 'btc_return_60m', 'btc_return_240m',
+    'btc_price', 'btc_price_norm',
+    'btc_volatility_15m', 'btc_volatility_60m', 'btc_volatility_ratio',
+    'btc_volume', 'btc_volume_ma_15m', 'btc_volume_ma_60m', 'btc_volume_ratio_15m', 'btc_volume_ratio_60m',
+    'btc_rsi_14', 'btc_rsi_30',
+    'btc_macd', 'btc_macd_signal', 'btc_macd_histogram',
+    'btc_support_distance', 'btc_resistance_distance',
+)
+
+# MACDのEMA期間（calculate_features と同じ fast=12, slow=26, signal=9）
+EMA_SPANS = {'fast': 12, 'slow': 26, 'signal': 9}
+
+# 追記時に引き継ぐ直近の足の数（最長のローリング窓 = 24時間正規化の1440本）
+WARMUP_ROWS = 1440
+
+STORE_VERSION = 1
+
+DEFAULT_STORE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache', 'btc_features')
+
+
+def _ema_with_state(values: np.ndarray, span: int, state: Optional[List[float]] = None):
+    """
+    pandas の ewm(span=span, adjust=True).mean() と同じEMAを、前回までの状態を引き継いで計算
+
+    adjust=True のEMAは 分子 N_t = x_t + β N_{t-1}, 分母 D_t = 1 + β D_{t-1} の比（β = 1 - α）
+
+    Returns:
+        (EMA配列, 最終行の状態 [N, D])
+    """
+    beta = 1.0 - 2.0 / (span + 1.0)
+    numerator_prev, denominator_prev = state if state else (0.0, 0.0)
+    from scipy.signal import lfilter
+
+    numerator = lfilter([1.0], [1.0, -beta], values, zi=[beta * numerator_prev])[0]
+    denominator = lfilter([1.0], [1.0, -beta], np.ones_like(values), zi=[beta * denominator_prev])[0]
+    new_state = [float(numerator[-1]), float(denominator[-1])] if len(values) else [numerator_prev, denominator_prev]
+    return numerator / denominator, new_state
+
+
+def _rsi(prices: pd.Series, window: int) -> pd.Series:
+    """RSI計算（BTCAltcoinCorrelationPredictor._calculate_rsi と同じ）"""
+    delta = prices.diff()
+    gain = (delta.where(delta > 0, 0)).rolling(window=window).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(window=window).mean()
+    rs = gain / loss
+    return 100 - (100 / (1 + rs))
+
+
+def compute_btc_features(close: np.ndarray, volume: np.ndarray, warmup_close: np.ndarray = None,
+                         warmup_volume: np.ndarray = None, ema_state: Dict[str, List[float]] = None):
+    """
+    BTCの終値・出来高から BTC_FEATURE_COLUMNS を計算
+
+    Args:
+        close, volume: 計算対象の足
+        warmup_close, warmup_volume: 直前の保存済みの足（ローリング窓の引き継ぎ用）
+        ema_state: 直前の足までのEMAの状態（{'fast'|'slow'|'signal': [N, D]}）
+
+    Returns:
+        (特徴量の2次元配列 [足数 x 列数], 最終行のEMAの状態)
+    """
+    close = np.asarray(close, dtype=float)
+    volume = np.asarray(volume, dtype=float)
+    warmup = 0 if warmup_close is None else len(warmup_close)
+    if warmup:
+        close_series = pd.Series(np.concatenate([np.asarray(warmup_close, dtype=float), close]))
+        volume_series = pd.Series(np.concatenate([np.asarray(warmup_volume, dtype=float), volume]))
+    else:
+        close_series = pd.Series(close)
+        volume_series = pd.Series(volume)
+    ema_state = ema_state or {}
+
+    returns = close_series.pct_change().fillna(0)
+    columns = {
+        'btc_return_1m': returns,
+        'btc_return_5m': returns.rolling(5).sum(),
+        'btc_return_15m': returns.rolling(15).sum(),
+        'btc_return_60m': returns.rolling(60).sum(),
+        'btc_return_240m': returns.rolling(240).sum(),
+        'btc_price': close_series,
+        'btc_price_norm': close_series / close_series.rolling(1440).mean(),
+        'btc_volatility_15m': returns.rolling(15).std(),
+        'btc_volatility_60m': returns.rolling(60).std(),
+        'btc_volume': volume_series,
+        'btc_volume_ma_15m': volume_series.rolling(15).mean(),
+        'btc_volume_ma_60m': volume_series.rolling(60).mean(),
+        'btc_rsi_14': _rsi(close_series, 14),
+        'btc_rsi_30': _rsi(close_series, 30),
+        'btc_support_distance': (close_series - close_series.rolling(240).min()) / close_series,
+        'btc_resistance_distance': (close_series.rolling(240).max() - close_series) / close_series,
+    }
+    columns['btc_volatility_ratio'] = columns['btc_volatility_15m'] / columns['btc_volatility_60m']
+    columns['btc_volume_ratio_15m'] = volume_series / columns['btc_volume_ma_15m']
+    columns['btc_volume_ratio_60m'] = volume_series / columns['btc_volume_ma_60m']
+
+    # EMAはウォームアップ部分を状態として引き継ぐ（全期間の再計算と同じ値）
+    ema_fast, fast_state = _ema_with_state(close, EMA_SPANS['fast'], ema_state.get('fast'))
+    ema_slow, slow_state = _ema_with_state(close, EMA_SPANS['slow'], ema_state.get('slow'))
+    macd = ema_fast - ema_slow
+    macd_signal, signal_state = _ema_with_state(macd, EMA_SPANS['signal'], ema_state.get('signal'))
+
+    features = np.empty((len(close), len(BTC_FEATURE_COLUMNS)), dtype=np.float64)
+    for i, name in enumerate(BTC_FEATURE_COLUMNS):
+        if name == 'btc_macd':
+            features[:, i] = macd
+        elif name == 'btc_macd_signal':
+            features[:, i] = macd_signal
+        elif name == 'btc_macd_histogram':
+            features[:, i] = macd - macd_signal
+        else:
+            features[:, i] = columns[name].to_numpy(dtype=float)[warmup:]
+    return features, {'fast': fast_state, 'slow': slow_state, 'signal': signal_state}
+
+
+class BTCFeatureStore:
+    """
+    ディスク上のBTC特徴量ストア
+
+    1キーあたりのディレクトリ構成:
+        {base_dir}/{exchange}/{symbol}/{timeframe}/
+            timestamp.bin   (UTCミリ秒, int64)
+            features.bin    (float64, 行優先 [行数 x 列数])
+            meta.json       (確定行数・列名・最終行のEMAの状態)
+            .lock           (書き込みロック)
+    """
+
+    def __init__(self, base_dir: str = None):
+        self.base_dir = Path(base_dir or os.environ.get('BTC_FEATURE_STORE_DIR', DEFAULT_STORE_DIR))
+        self.stats = {'reads': 0, 'appends': 0, 'rebuilds': 0, 'rows_written': 0}
+
+    # === パス・ロック ===
+
+    @staticmethod
+    def _safe_name(name: str) -> str:
+        return str(name).replace('/', '_').replace(':', '_').replace(os.sep, '_')
+
+    def _key_dir(self, exchange: str, symbol: str, timeframe: str) -> Path:
+        return self.base_dir / self._safe_name(exchange) / self._safe_name(symbol) / self._safe_name(timeframe)
+
+    @contextmanager
+    def _lock(self, key_dir: Path, exclusive: bool):
+        key_dir.mkdir(parents=True, exist_ok=True)
+        with open(key_dir / '.lock', 'a+') as lock_file:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _read_meta(self, key_dir: Path) -> Dict:
+        meta_path = key_dir / 'meta.json'
+        if not meta_path.exists():
+            return {'version': STORE_VERSION, 'rows': 0, 'columns': list(BTC_FEATURE_COLUMNS), 'ema_state': {}}
+        with open(meta_path, 'r') as f:
+            return json.load(f)
+
+    def _write_meta(self, key_dir: Path, rows: int, ema_state: Dict[str, List[float]]):
+        tmp_path = key_dir / 'meta.json.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({
+                'version': STORE_VERSION,
+                'rows': int(rows),
+                'columns': list(BTC_FEATURE_COLUMNS),
+                'ema_state': ema_state,
+                'updated_at': time.time()
+            }, f)
+        os.replace(tmp_path, key_dir / 'meta.json')
+
+    def _map_arrays(self, key_dir: Path, rows: int):
+        """確定行数分の時刻と特徴量をmemmapで読み込み（ゼロコピー）"""
+        if rows == 0:
+            return np.empty(0, dtype=np.int64), np.empty((0, len(BTC_FEATURE_COLUMNS)), dtype=np.float64)
+        timestamps = np.memmap(key_dir / 'timestamp.bin', dtype=np.int64, mode='r', shape=(rows,))
+        features = np.memmap(key_dir / 'features.bin', dtype=np.float64, mode='r',
+                             shape=(rows, len(BTC_FEATURE_COLUMNS)))
+        return timestamps, features
+
+    @staticmethod
+    def _is_current(meta: Dict) -> bool:
+        return meta.get('version') == STORE_VERSION and list(meta.get('columns', [])) == list(BTC_FEATURE_COLUMNS)
+
+    # === 読み込み ===
+
+    def last_timestamp(self, symbol: str = 'BTC', timeframe: str = '1m',
+                       exchange: str = 'hyperliquid') -> Optional[int]:
+        """保存済みの最終足の時刻（UTCミリ秒）"""
+        key_dir = self._key_dir(exchange, symbol, timeframe)
+        if not (key_dir / 'meta.json').exists():
+            return None
+        with self._lock(key_dir, exclusive=False):
+            meta = self._read_meta(key_dir)
+            if not self._is_current(meta) or meta['rows'] == 0:
+                return None
+            timestamps, _ = self._map_arrays(key_dir, meta['rows'])
+            return int(timestamps[-1])
+
+    def read_features(self, start=None, end=None, symbol: str = 'BTC', timeframe: str = '1m',
+                      exchange: str = 'hyperliquid') -> pd.DataFrame:
+        """
+        期間内（start <= 時刻 <= end）の特徴量を返す
+
+        Args:
+            start, end: datetime / pd.Timestamp（タイムゾーンなしはUTCとみなす）またはUTCミリ秒
+
+        Returns:
+            pd.DataFrame: BTC_FEATURE_COLUMNS の列、タイムゾーンなしのUTC時刻インデックス
+            （fetch_historical_data と同じ形式）
+        """
+        key_dir = self._key_dir(exchange, symbol, timeframe)
+        if not (key_dir / 'meta.json').exists():
+            return pd.DataFrame(columns=list(BTC_FEATURE_COLUMNS), index=pd.DatetimeIndex([]))
+
+        with self._lock(key_dir, exclusive=False):
+            meta = self._read_meta(key_dir)
+            rows = meta['rows'] if self._is_current(meta) else 0
+            timestamps, features = self._map_arrays(key_dir, rows)
+
+        self.stats['reads'] += 1
+        lo = 0 if start is None else int(np.searchsorted(timestamps, _to_ms(start), side='left'))
+        hi = len(timestamps) if end is None else int(np.searchsorted(timestamps, _to_ms(end), side='right'))
+        index = pd.DatetimeIndex(pd.to_datetime(np.asarray(timestamps[lo:hi]), unit='ms'), name='timestamp')
+        return pd.DataFrame(np.asarray(features[lo:hi]), index=index, columns=list(BTC_FEATURE_COLUMNS))
+
+    # === 書き込み ===
+
+    def refresh(self, btc_data: pd.DataFrame, symbol: str = 'BTC', timeframe: str = '1m',
+                exchange: str = 'hyperliquid', now=None) -> int:
+        """
+        BTCのローソク足から特徴量を更新
+
+        保存済みの末尾より新しい足だけを計算して追記する。保存済みの期間より前の足を含む場合、
+        ストアの列構成が変わった場合、保存済みの末尾から WARMUP_ROWS 本以上空いている場合は全体を再計算する。
+        形成中の足は保存せず、確定後の refresh で追記する。
+
+        Args:
+            btc_data: close/volume を含み、時刻インデックス（または timestamp 列）を持つDataFrame
+            now: 現在時刻（datetime / pd.Timestamp / UTCミリ秒、省略時は現在のUTC時刻）
+
+        Returns:
+            int: 新規に保存した行数
+        """
+        timestamps, close, volume = _candle_arrays(btc_data)
+        now_ms = _to_ms(now) if now is not None else int(time.time() * 1000)
+        closed = timestamps + timeframe_to_ms(timeframe) <= now_ms
+        timestamps, close, volume = timestamps[closed], close[closed], volume[closed]
+        if len(timestamps) == 0:
+            return 0
+
+        key_dir = self._key_dir(exchange, symbol, timeframe)
+        with self._lock(key_dir, exclusive=True):
+            meta = self._read_meta(key_dir)
+            rows = meta['rows'] if self._is_current(meta) else 0
+            stored_ts, stored_features = self._map_arrays(key_dir, rows)
+
+            if rows and timestamps[0] <= stored_ts[-1] and not _covers_prefix(stored_ts, timestamps):
+                # 過去方向の補完や時刻の食い違い: 保存済みの足と今回の足をまとめて再計算
+                merged_close, merged_volume, merged_ts = _merge_candles(
+                    stored_ts, stored_features, timestamps, close, volume)
+                features, ema_state = compute_btc_features(merged_close, merged_volume)
+                self._rewrite(key_dir, merged_ts, features)
+                self._write_meta(key_dir, len(merged_ts), ema_state)
+                self.stats['rebuilds'] += 1
+                added = len(merged_ts) - rows
+                self.stats['rows_written'] += len(merged_ts)
+                return max(added, 0)
+
+            fresh = timestamps > stored_ts[-1] if rows else np.ones(len(timestamps), dtype=bool)
+            if not fresh.any():
+                return 0
+            new_ts, new_close, new_volume = timestamps[fresh], close[fresh], volume[fresh]
+
+            if rows and new_ts[0] - stored_ts[-1] > WARMUP_ROWS * timeframe_to_ms(timeframe):
+                # 長期間更新されていなかった場合は古い足を引き継がず、今回の足から作り直す
+                rows = 0
+
+            if rows:
+                warmup = stored_features[-WARMUP_ROWS:]
+                features, ema_state = compute_btc_features(
+                    new_close, new_volume,
+                    warmup_close=warmup[:, BTC_FEATURE_COLUMNS.index('btc_price')],
+                    warmup_volume=warmup[:, BTC_FEATURE_COLUMNS.index('btc_volume')],
+                    ema_state=meta.get('ema_state'))
+                self._append(key_dir, rows, new_ts, features)
+                self.stats['appends'] += 1
+            else:
+                features, ema_state = compute_btc_features(new_close, new_volume)
+                self._rewrite(key_dir, new_ts, features)
+                self.stats['rebuilds'] += 1
+            self._write_meta(key_dir, rows + len(new_ts), ema_state)
+            self.stats['rows_written'] += len(new_ts)
+            return len(new_ts)
+
+    def _append(self, key_dir: Path, rows: int, timestamps: np.ndarray, features: np.ndarray):
+        """確定行の末尾に追記（中断された書き込みの残骸は切り詰める）"""
+        for name, array, row_bytes in (('timestamp.bin', timestamps, 8),
+                                       ('features.bin', features, 8 * len(BTC_FEATURE_COLUMNS))):
+            with open(key_dir / name, 'ab') as f:
+                f.truncate(rows * row_bytes)
+                f.write(np.ascontiguousarray(array).tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+
+    def _rewrite(self, key_dir: Path, timestamps: np.ndarray, features: np.ndarray):
+        """全体を書き直してファイルを置き換え（既存のmemmapは旧ファイルを参照し続ける）"""
+        for name, array in (('timestamp.bin', timestamps), ('features.bin', features)):
+            tmp_path = key_dir / f'{name}.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(np.ascontiguousarray(array).tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, key_dir / name)
+
+    def get_stats(self) -> Dict[str, int]:
+        """読み書き統計を取得"""
+        return dict(self.stats)
+
+
+def _to_ms(value) -> int:
+    """datetime / pd.Timestamp / ミリ秒をUTCミリ秒に変換（タイムゾーンなしはUTCとみなす）"""
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    ts = pd.Timestamp(value)
+    if ts.tzinfo is not None:
+        ts = ts.tz_convert('UTC').tz_localize(None)
+    return int(ts.value // 1_000_000)
+
+
+def _candle_arrays(btc_data: pd.DataFrame):
+    """DataFrameから時刻昇順・重複なしの (UTCミリ秒, close, volume) 配列を取り出す"""
+    if btc_data is None or btc_data.empty:
+        empty = np.empty(0)
+        return empty.astype(np.int64), empty, empty
+    raw_ts = btc_data['timestamp'] if 'timestamp' in btc_data.columns else pd.Series(btc_data.index)
+    index = pd.DatetimeIndex(pd.to_datetime(raw_ts))
+    if index.tz is not None:
+        index = index.tz_convert('UTC').tz_localize(None)
+    timestamps = index.as_unit('ms').asi8
+    close = btc_data['close'].to_numpy(dtype=float)
+    volume = btc_data['volume'].to_numpy(dtype=float)
+    _, unique_idx = np.unique(timestamps, return_index=True)
+    return timestamps[unique_idx], close[unique_idx], volume[unique_idx]
+
+
+def _covers_prefix(stored_ts: np.ndarray, timestamps: np.ndarray) -> bool:
+    """今回の足のうち保存済み期間内のものが、全て保存済みの足と一致するか（末尾への追記で済むか）"""
+    if timestamps[0] < stored_ts[0]:
+        return False
+    overlap = timestamps[timestamps <= stored_ts[-1]]
+    return bool(np.isin(overlap, stored_ts).all())
+
+
+def _merge_candles(stored_ts, stored_features, timestamps, close, volume):
+    """保存済みの足（btc_price/btc_volume 列）と今回の足を時刻順にまとめる（今回の足を優先）"""
+    price_col = BTC_FEATURE_COLUMNS.index('btc_price')
+    volume_col = BTC_FEATURE_COLUMNS.index('btc_volume')
+    keep = ~np.isin(stored_ts, timestamps)
+    merged_ts = np.concatenate([np.asarray(stored_ts)[keep], timestamps])
+    merged_close = np.concatenate([np.asarray(stored_features[:, price_col])[keep], close])
+    merged_volume = np.concatenate([np.asarray(stored_features[:, volume_col])[keep], volume])
+    order = np.argsort(merged_ts, kind='stable')
+    return merged_close[order], merged_volume[order], merged_ts[order]
+
+
+_feature_store = None
+
+
+def get_btc_feature_store() -> Optional[BTCFeatureStore]:
+    """
+    プロセス共通のBTC特徴量ストアを取得
+
+    BTC_FEATURE_STORE_ENABLED=false の場合はNone（銘柄ごとに特徴量を計算する）
+    """
+    global _feature_store
+    if os.environ.get('BTC_FEATURE_STORE_ENABLED', 'true').lower() in ('false', '0', 'no'):
+        return None
+    base_dir = os.environ.get('BTC_FEATURE_STORE_DIR', DEFAULT_STORE_DIR)
+    if _feature_store is None or str(_feature_store.base_dir) != str(Path(base_dir)):
+        _feature_store = BTCFeatureStore(base_dir)
+    return _feature_store
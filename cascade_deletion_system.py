@@ -13,6 +13,8 @@ from datetime import datetime
 import json
 from typing import Dict, List, Optional, Tuple
 
+from sqlite_access import checkpoint
+
 class CascadeDeletionSystem:
     """カスケード削除システムクラス"""
     
@@ -111,7 +113,7 @@ class CascadeDeletionSystem:
                         compressed_path = Path(record['compressed_path'])
                         if compressed_path.exists():
                             impact_analysis['file_artifacts']['compressed_files'].append(str(compressed_path))
-                            impact_analysis['file_artifacts']['total_size'] += compressed_path.stat().st_size
+                            impact_analysis['file_artifacts']['total_size'] += self._artifact_size(compressed_path)
         
         # 結果表示
         print(f"📋 実行ログ: {impact_analysis['execution_logs']['total_found']}件が削除対象")
@@ -153,12 +155,14 @@ class CascadeDeletionSystem:
         
         # execution_logs.db バックアップ
         exec_backup = backup_dir / "execution_logs_backup.db"
+        checkpoint(self.execution_db_path)
         shutil.copy2(self.execution_db_path, exec_backup)
         backups['execution'] = str(exec_backup)
         print(f"✅ execution_logs.db バックアップ: {exec_backup}")
         
         # analysis.db バックアップ
         analysis_backup = backup_dir / "analysis_backup.db"
+        checkpoint(self.analysis_db_path)
         shutil.copy2(self.analysis_db_path, analysis_backup)
         backups['analysis'] = str(analysis_backup)
         print(f"✅ analysis.db バックアップ: {analysis_backup}")
@@ -234,8 +238,12 @@ class CascadeDeletionSystem:
                         try:
                             path = Path(file_path)
                             if path.exists():
-                                file_size = path.stat().st_size
-                                path.unlink()
+                                file_size = self._artifact_size(path)
+                                # トレードアーカイブのパーティションはディレクトリ
+                                if path.is_dir():
+                                    shutil.rmtree(path)
+                                else:
+                                    path.unlink()
                                 deleted_files += 1
                                 deleted_size += file_size
                         except Exception as e:
@@ -326,7 +334,14 @@ class CascadeDeletionSystem:
         except Exception as e:
             print(f"❌ カスケード削除エラー: {e}")
             return False
-    
+
+    @staticmethod
+    def _artifact_size(path: Path) -> int:
+        """ファイルまたはディレクトリ（トレードアーカイブのパーティション）のサイズ"""
+        if path.is_dir():
+            return sum(p.stat().st_size for p in path.rglob('*') if p.is_file())
+        return path.stat().st_size
+
     def _generate_deletion_report(self, impact_analysis, deletion_summary, backup_info, dry_run):
         """削除レポートを生成"""
         print(f"\n📋 カスケード削除レポート")
@@ -218,6 +218,8 @@ python tests/test_data_quality_validation.py
             if self.config['auto_cleanup']['backup_before_cleanup']:
                 backup_path = f"large_scale_analysis/auto_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.db"
                 import shutil
+                from sqlite_access import checkpoint
+                checkpoint(self.system.db_path)
                 shutil.copy2(self.system.db_path, backup_path)
                 print(f"💾 バックアップ作成: {backup_path}")
             
@@ -10,11 +10,14 @@ from .high_leverage_bot_orchestrator import (
     analyze_leverage_for_symbol, 
     quick_leverage_check
 )
+from .incremental_backtest_engine import IncrementalBacktestEngine, IncrementalBacktestParityError
 
 __all__ = [
     'CoreLeverageDecisionEngine',
     'SimpleMarketContextAnalyzer',
     'HighLeverageBotOrchestrator',
     'analyze_leverage_for_symbol',
-    'quick_leverage_check'
+    'quick_leverage_check',
+    'IncrementalBacktestEngine',
+    'IncrementalBacktestParityError'
 ]
\ No newline at end of file
@@ -10,6 +10,8 @@ from datetime import datetime
 from typing import Optional, Dict, Any, List
 from enum import Enum
 
+from stage_profiler import record_stage_result
+
 class AnalysisStage(Enum):
     """分析ステージの定義"""
     DATA_FETCH = "data_fetch"
@@ -41,6 +43,7 @@ class StageResult:
     items_found: Optional[int] = None
     error_message: Optional[str] = None
     additional_info: Optional[Dict[str, Any]] = None
+    bytes_processed: Optional[int] = None
     
     def to_dict(self) -> Dict[str, Any]:
         return asdict(self)
@@ -84,8 +87,9 @@ class AnalysisResult:
             self.started_at = datetime.now()
     
     def add_stage_result(self, stage_result: StageResult):
-        """ステージ結果を追加"""
+        """ステージ結果を追加（処理時間はステージプロファイラーにも集計）"""
         self.stage_results.append(stage_result)
+        record_stage_result(stage_result, self.execution_id)
     
     def mark_early_exit(self, stage: AnalysisStage, reason: ExitReason, error_message: str = None):
         """Early Exitをマーク"""
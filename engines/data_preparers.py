@@ -5,29 +5,155 @@
 実際のOHLCVデータを使用したPreparedDataクラスの実装
 """
 
+import threading
+from collections import OrderedDict
+
 import pandas as pd
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 from datetime import datetime, timedelta, timezone
-from typing import List, Dict, Optional, Union
+from typing import List, Dict, Optional, Tuple, Union
 import logging
 
 logger = logging.getLogger(__name__)
 
+# 指標配列の計算時に一度に展開するウィンドウ数（一時メモリの上限）
+_WINDOW_CHUNK_ROWS = 16384
+
+
+def _rolling_reduce(values: np.ndarray, window: int, reducer) -> np.ndarray:
+    """
+    各位置 i で values[max(0, i-window+1) : i+1] に reducer を適用した配列
+
+    先頭の不完全なウィンドウも同じ reducer で計算するため、
+    同じ区間のリストに対して reducer を呼んだ場合と同じ値になる
+    """
+    n = len(values)
+    result = np.empty(n, dtype=np.float64)
+    for i in range(min(window - 1, n)):
+        result[i] = reducer(values[:i + 1])
+    if n >= window:
+        windows = sliding_window_view(values, window)
+        for start in range(0, len(windows), _WINDOW_CHUNK_ROWS):
+            chunk = windows[start:start + _WINDOW_CHUNK_ROWS]
+            result[window - 1 + start:window - 1 + start + len(chunk)] = reducer(chunk, axis=1)
+    return result
+
+
+def _rolling_sequential_sum(values: np.ndarray, window: int) -> np.ndarray:
+    """各ウィンドウを先頭から順に加算した合計（Pythonのループ加算と同じ丸め）"""
+    n = len(values)
+    result = np.zeros(n, dtype=np.float64)
+    positions = np.arange(n)
+    starts = np.maximum(positions - window + 1, 0)
+    for offset in range(min(window, n)):
+        idx = starts + offset
+        valid = idx <= positions
+        result[valid] += values[idx[valid]]
+    return result
+
+
+def _atr_array(columns: Dict[str, np.ndarray], period: int) -> Tuple[np.ndarray, None]:
+    """get_atr_at と同じATR（直近period本のTrue Rangeの単純平均）"""
+    high, low, close = columns['high'], columns['low'], columns['close']
+    prev_close = close[:-1]
+    candidates = (high[1:] - low[1:], np.abs(high[1:] - prev_close), np.abs(low[1:] - prev_close))
+    # 組み込みmaxと同じ比較順（NaNの扱いも同じ）
+    true_range = candidates[0]
+    for candidate in candidates[1:]:
+        true_range = np.where(candidate > true_range, candidate, true_range)
+
+    values = np.full(len(close), 100.0)  # 2本未満はデフォルト値
+    if len(true_range):
+        values[1:] = _rolling_reduce(true_range, period, np.mean)
+    return values, None
+
+
+def _rsi_array(columns: Dict[str, np.ndarray], period: int) -> Tuple[np.ndarray, None]:
+    """get_rsi と同じRSI（直近period本の単純平均利得・損失）"""
+    close = columns['close']
+    values = np.full(len(close), 50.0)  # period+1本未満はデフォルト値
+    if len(close) <= period:
+        return values, None
+
+    deltas = np.diff(close)
+    gains = np.where(deltas > 0, deltas, 0)
+    losses = np.where(deltas < 0, -deltas, 0)
+    avg_gain = np.mean(sliding_window_view(gains, period), axis=1)
+    avg_loss = np.mean(sliding_window_view(losses, period), axis=1)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi = 100 - (100 / (1 + avg_gain / avg_loss))
+    values[period:] = np.where(avg_loss == 0, 100.0, rsi)
+    return values, None
+
+
+def _sma_array(columns: Dict[str, np.ndarray], period: int) -> Tuple[np.ndarray, None]:
+    """get_moving_average と同じ終値の単純移動平均"""
+    return _rolling_reduce(columns['close'], period, np.mean), None
+
+
+def _vwap_array(columns: Dict[str, np.ndarray], period: int) -> Tuple[np.ndarray, np.ndarray]:
+    """get_vwap と同じVWAP（出来高合計が0の位置は始値へのフォールバックを示すマスク付き）"""
+    typical_price = (columns['high'] + columns['low'] + columns['close']) / 3
+    pv_sum = _rolling_sequential_sum(typical_price * columns['volume'], period)
+    volume_sum = _rolling_sequential_sum(columns['volume'], period)
+    zero_volume = volume_sum == 0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        values = pv_sum / volume_sum
+    return values, zero_volume
+
+
+def _volatility_array(columns: Dict[str, np.ndarray], period: int) -> Tuple[np.ndarray, None]:
+    """get_volatility_at と同じボラティリティ（対数リターンの標準偏差 × √252）"""
+    close = columns['close']
+    values = np.full(len(close), 0.01)  # 2本未満はデフォルト値
+    if period < 2 or len(close) < 2:
+        return values, None
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns = np.diff(np.log(close))
+    values[1:] = _rolling_reduce(returns, period - 1, np.std) * np.sqrt(252)
+    return values, None
+
 
 class RealPreparedData:
     """
     実際のOHLCVデータを使用したPreparedDataクラス
     
     FilteringFrameworkで使用するため、必要なメソッドを実装
+    
+    ATR・RSI・移動平均・VWAP・ボラティリティは (指標, 期間) ごとに全期間の配列を
+    一度だけ計算し、各時点の値は searchsorted による位置検索と配列参照で返す。
+    保持する配列数は max_indicator_arrays で上限を設け、古いものから破棄する。
     """
     
-    def __init__(self, ohlcv_data: pd.DataFrame):
+    # 指標名 → 全期間配列の計算関数（値の配列, 始値へのフォールバックマスク）
+    INDICATOR_REGISTRY = {
+        'atr': _atr_array,
+        'rsi': _rsi_array,
+        'sma': _sma_array,
+        'vwap': _vwap_array,
+        'volatility': _volatility_array,
+    }
+    
+    # precompute=True の場合に初期化時に計算する (指標, 期間)
+    DEFAULT_PRECOMPUTE = {'atr': [14], 'rsi': [14], 'sma': [20], 'vwap': [20], 'volatility': [20]}
+    
+    DEFAULT_MAX_INDICATOR_ARRAYS = 32
+    
+    def __init__(self, ohlcv_data: pd.DataFrame, use_indicator_arrays: bool = True,
+                 precompute: Union[bool, Dict[str, List[int]]] = False,
+                 max_indicator_arrays: int = DEFAULT_MAX_INDICATOR_ARRAYS):
         """
         初期化
         
         Args:
             ohlcv_data: OHLCVデータのDataFrame
                        必須カラム: timestamp, open, high, low, close, volume
+            use_indicator_arrays: 指標を全期間配列から参照する（Falseで従来の都度計算）
+            precompute: 初期化時に計算する指標（True で DEFAULT_PRECOMPUTE、辞書で指標ごとの期間を指定）
+                        未指定の指標・期間は最初の参照時に計算
+            max_indicator_arrays: 保持する指標配列の上限数
         """
         # データ検証
         self._validate_data(ohlcv_data)
@@ -44,6 +170,19 @@ class RealPreparedData:
         
         # キャッシュ（計算済み指標を保存）
         self._cache = {}
+        
+        # 指標配列（(指標, 期間) → 値の配列, フォールバックマスク）
+        self.use_indicator_arrays = use_indicator_arrays
+        self.max_indicator_arrays = max(1, int(max_indicator_arrays))
+        self._indicator_arrays: "OrderedDict[Tuple[str, int], Tuple[np.ndarray, Optional[np.ndarray]]]" = OrderedDict()
+        self._indicator_lock = threading.Lock()
+        self._columns = None
+        
+        if use_indicator_arrays and precompute:
+            specs = self.DEFAULT_PRECOMPUTE if precompute is True else precompute
+            for name, periods in specs.items():
+                for period in periods:
+                    self._get_indicator_array(name, period)
     
     def _validate_data(self, ohlcv_data: pd.DataFrame):
         """データ検証"""
@@ -60,6 +199,61 @@ class RealPreparedData:
         """高速アクセス用のタイムスタンプインデックス作成"""
         self.timestamp_index = pd.DatetimeIndex(self.ohlcv_data['timestamp'])
     
+    def _position_until(self, eval_time: datetime) -> int:
+        """評価時点以前（timestamp <= eval_time）の行数"""
+        return int(self.timestamp_index.searchsorted(eval_time, side='right'))
+    
+    # === 指標配列 ===
+    
+    def _get_indicator_array(self, name: str, period: int) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """(指標, 期間) の全期間配列を取得（未計算なら計算して登録）"""
+        key = (name, period)
+        with self._indicator_lock:
+            entry = self._indicator_arrays.get(key)
+            if entry is not None:
+                self._indicator_arrays.move_to_end(key)
+                return entry
+        
+            if self._columns is None:
+                self._columns = {
+                    column: self.ohlcv_data[column].to_numpy(dtype=np.float64)
+                    for column in ('open', 'high', 'low', 'close', 'volume')
+                }
+            entry = self.INDICATOR_REGISTRY[name](self._columns, period)
+            
+            self._indicator_arrays[key] = entry
+            while len(self._indicator_arrays) > self.max_indicator_arrays:
+                self._indicator_arrays.popitem(last=False)
+            return entry
+    
+    def _indicator_at(self, name: str, eval_time: datetime, period: int) -> Optional[float]:
+        """
+        指標配列から評価時点の値を取得
+        
+        評価時点がデータより前・期間が不正・フォールバック対象の位置ではNone（従来の計算に委ねる）
+        """
+        if not self.use_indicator_arrays or not isinstance(period, (int, np.integer)) or period < 1:
+            return None
+        index = self._position_until(eval_time) - 1
+        if index < 0:
+            return None
+        values, fallback = self._get_indicator_array(name, int(period))
+        if fallback is not None and fallback[index]:
+            return None
+        return float(values[index])
+    
+    def get_indicator_stats(self) -> Dict[str, object]:
+        """保持している指標配列の情報"""
+        with self._indicator_lock:
+            keys = list(self._indicator_arrays.keys())
+        return {
+            'arrays': keys,
+            'count': len(keys),
+            'max_arrays': self.max_indicator_arrays,
+            'bytes': sum(values.nbytes + (mask.nbytes if mask is not None else 0)
+                         for values, mask in list(self._indicator_arrays.values()))
+        }
+    
     def get_price_at(self, eval_time: datetime) -> float:
         """
         指定時点の価格（開始価格）を取得
@@ -144,8 +338,8 @@ class RealPreparedData:
         Returns:
             OHLCV辞書のリスト
         """
-        # 評価時点以前のデータをフィルター
-        past_data = self.ohlcv_data[self.ohlcv_data['timestamp'] <= eval_time]
+        # 評価時点以前のデータ（ソート済みのため先頭からの連続区間）
+        past_data = self.ohlcv_data.iloc[:self._position_until(eval_time)]
         
         # 最新lookback_periods個を取得
         recent_data = past_data.tail(lookback_periods)
@@ -237,6 +431,10 @@ class RealPreparedData:
         Returns:
             ボラティリティ（標準偏差）
         """
+        value = self._indicator_at('volatility', eval_time, period)
+        if value is not None:
+            return value
+        
         # キャッシュチェック
         cache_key = f"volatility_{eval_time}_{period}"
         if cache_key in self._cache:
@@ -271,6 +469,10 @@ class RealPreparedData:
         Returns:
             ATR値
         """
+        value = self._indicator_at('atr', eval_time, period)
+        if value is not None:
+            return value
+        
         # 過去N期間のデータ取得
         historical_data = self.get_ohlcv_until(eval_time, period + 1)
         
@@ -307,6 +509,10 @@ class RealPreparedData:
         Returns:
             移動平均値
         """
+        value = self._indicator_at('sma', eval_time, period)
+        if value is not None:
+            return value
+        
         historical_data = self.get_ohlcv_until(eval_time, period)
         
         if not historical_data:
@@ -326,6 +532,10 @@ class RealPreparedData:
         Returns:
             RSI値（0-100）
         """
+        value = self._indicator_at('rsi', eval_time, period)
+        if value is not None:
+            return value
+        
         historical_data = self.get_ohlcv_until(eval_time, period + 1)
         
         if len(historical_data) < period + 1:
@@ -363,6 +573,10 @@ class RealPreparedData:
         Returns:
             VWAP値
         """
+        value = self._indicator_at('vwap', eval_time, period)
+        if value is not None:
+            return value
+        
         historical_data = self.get_ohlcv_until(eval_time, period)
         
         if not historical_data:
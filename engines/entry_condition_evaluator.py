@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+コンパイル済みエントリー条件評価器
+
+従来の ScalableAnalysisSystem._evaluate_entry_conditions は足ごとに
+UnifiedConfigManager を生成し、FILTER_PARAMS 環境変数を再パースして、
+f文字列で整形した logger.error を十数行出力していた。
+
+この評価器は:
+- 戦略・時間足の条件（FILTER_PARAMS のオーバーライド込み）をタスクごとに1回だけ解決し、
+  不変の CompiledEntryConditions にまとめる
+- 候補足の leverage / confidence / risk_reward / price 配列を一括評価し、
+  通過マスクと条件別の不合格件数を返すベクトル化モードを持つ
+- 不合格理由は EntryConditionDiagnostics に件数として集計し、タスク終了時に1回だけログ出力する
+"""
+
+import json
+import logging
+import os
+from collections import Counter
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# 評価する条件（この順で判定・集計する）
+CONDITION_LEVERAGE = 'leverage'
+CONDITION_CONFIDENCE = 'confidence'
+CONDITION_RISK_REWARD = 'risk_reward'
+CONDITION_PRICE = 'price'
+CONDITION_NAMES = (CONDITION_LEVERAGE, CONDITION_CONFIDENCE, CONDITION_RISK_REWARD, CONDITION_PRICE)
+
+# 値が欠損（None / NaN）していた足の集計キー
+INVALID_INPUT = 'invalid_input'
+
+# FILTER_PARAMS.entry_conditions でオーバーライドできる閾値
+OVERRIDABLE_KEYS = ('min_leverage', 'min_confidence', 'min_risk_reward')
+
+# 分析結果のキー（confidence はパーセント表記）
+RESULT_KEYS = {
+    CONDITION_LEVERAGE: 'leverage',
+    CONDITION_CONFIDENCE: 'confidence',
+    CONDITION_RISK_REWARD: 'risk_reward_ratio',
+    CONDITION_PRICE: 'current_price',
+}
+
+
+class EntryConditionDiagnostics:
+    """
+    エントリー条件評価の診断情報コレクター
+
+    足ごとに文字列を整形せず、評価数・通過数・条件別の不合格件数だけを数える。
+    不合格時の生の値は先頭 max_samples 件だけ保持する。
+    """
+
+    def __init__(self, max_samples: int = 5):
+        self.max_samples = max_samples
+        self.evaluated = 0
+        self.passed = 0
+        self.failures = Counter()
+        self.samples = []
+
+    def record(self, passed: bool, failed: Sequence[str] = (), values: Optional[Tuple] = None):
+        """1足分の評価結果を記録"""
+        self.evaluated += 1
+        if passed:
+            self.passed += 1
+            return
+        self.failures.update(failed)
+        if values is not None and len(self.samples) < self.max_samples:
+            self.samples.append((tuple(failed), values))
+
+    def record_batch(self, passed: int, evaluated: int, failure_counts: Mapping[str, int]):
+        """ベクトル化評価の結果を記録"""
+        self.evaluated += evaluated
+        self.passed += passed
+        self.failures.update({name: count for name, count in failure_counts.items() if count})
+
+    def summary(self) -> Dict[str, Any]:
+        """集計結果"""
+        return {
+            'evaluated': self.evaluated,
+            'passed': self.passed,
+            'rejected': self.evaluated - self.passed,
+            'failures': dict(self.failures),
+            'samples': list(self.samples),
+        }
+
+    def log_summary(self, target_logger: logging.Logger = None, label: str = ''):
+        """集計結果を1回だけログ出力"""
+        target_logger = target_logger or logger
+        if not self.evaluated:
+            return
+        target_logger.info("🎯 エントリー条件評価 %s: %d件中 %d件通過, 不合格理由 %s",
+                           label, self.evaluated, self.passed, dict(self.failures.most_common()))
+        for failed, values in self.samples:
+            target_logger.debug("   不合格例 %s: leverage=%s, confidence=%s, risk_reward=%s, price=%s",
+                                failed, *values)
+
+
+@dataclass(frozen=True)
+class CompiledEntryConditions:
+    """
+    解決済みのエントリー条件（不変）
+
+    Example:
+        evaluator = compile_entry_conditions('1h', 'Balanced')
+        passed = evaluator.evaluate(analysis_result, diagnostics)
+        mask, failure_counts = evaluator.evaluate_batch(leverages, confidences, risk_rewards, prices)
+    """
+
+    timeframe: str
+    strategy: str
+    min_leverage: float
+    min_confidence: float
+    min_risk_reward: float
+    overridden: Tuple[str, ...] = ()
+    conditions: Mapping[str, Any] = field(default_factory=lambda: MappingProxyType({}), compare=False)
+
+    def evaluate(self, analysis_result: Mapping[str, Any],
+                 diagnostics: Optional[EntryConditionDiagnostics] = None) -> bool:
+        """
+        1件の分析結果を評価
+
+        Args:
+            analysis_result: ハイレバボットの分析結果（confidence はパーセント）
+            diagnostics: 不合格理由の集計先
+
+        Returns:
+            bool: 全条件を満たすかどうか
+
+        Raises:
+            ValueError: 値が None、または比較できない型の場合
+        """
+        leverage = analysis_result.get('leverage', 0)
+        confidence_pct = analysis_result.get('confidence', 0)
+        risk_reward = analysis_result.get('risk_reward_ratio', 0)
+        current_price = analysis_result.get('current_price', 0)
+        values = (leverage, confidence_pct, risk_reward, current_price)
+
+        missing = [RESULT_KEYS[name] for name, value in zip(CONDITION_NAMES, values) if value is None]
+        if missing:
+            if diagnostics is not None:
+                diagnostics.record(False, (INVALID_INPUT,), values)
+            raise ValueError(f"分析結果にNone値が含まれています: {', '.join(missing)}")
+
+        try:
+            checks = (
+                leverage >= self.min_leverage,
+                confidence_pct / 100.0 >= self.min_confidence,
+                risk_reward >= self.min_risk_reward,
+                current_price > 0,
+            )
+        except TypeError as e:
+            if diagnostics is not None:
+                diagnostics.record(False, (INVALID_INPUT,), values)
+            raise ValueError(f"エントリー条件評価エラー: {e}") from e
+
+        passed = all(checks)
+        if diagnostics is not None:
+            failed = () if passed else tuple(name for name, ok in zip(CONDITION_NAMES, checks) if not ok)
+            diagnostics.record(passed, failed, values)
+        return passed
+
+    def evaluate_batch(self, leverage, confidence, risk_reward, price,
+                       diagnostics: Optional[EntryConditionDiagnostics] = None
+                       ) -> Tuple[np.ndarray, Dict[str, int]]:
+        """
+        候補足をまとめて評価（ベクトル化モード）
+
+        Args:
+            leverage: レバレッジの配列
+            confidence: 信頼度の配列（分析結果と同じくパーセント）
+            risk_reward: リスクリワード比の配列
+            price: 現在価格の配列
+            diagnostics: 不合格理由の集計先
+
+        Returns:
+            (通過マスク, 条件別の不合格件数)。NaN を含む足は不合格とし invalid_input に数える
+            （条件別の件数は足ごとに該当する条件すべてを数えるため合計は不合格足数以上になる）
+        """
+        columns = [np.asarray(values, dtype=float) for values in (leverage, confidence, risk_reward, price)]
+        sizes = {column.shape for column in columns}
+        if len(sizes) != 1:
+            raise ValueError(f"配列の長さが一致しません: {[column.shape for column in columns]}")
+        leverage, confidence, risk_reward, price = columns
+
+        invalid = np.isnan(leverage) | np.isnan(confidence) | np.isnan(risk_reward) | np.isnan(price)
+        # NaNとの比較はFalseなので invalid の足は各条件の判定でも不合格になる
+        checks = {
+            CONDITION_LEVERAGE: leverage >= self.min_leverage,
+            CONDITION_CONFIDENCE: confidence / 100.0 >= self.min_confidence,
+            CONDITION_RISK_REWARD: risk_reward >= self.min_risk_reward,
+            CONDITION_PRICE: price > 0,
+        }
+        mask = ~invalid
+        for ok in checks.values():
+            mask &= ok
+
+        valid = ~invalid
+        failure_counts = {name: int(np.count_nonzero(valid & ~ok)) for name, ok in checks.items()}
+        failure_counts[INVALID_INPUT] = int(np.count_nonzero(invalid))
+
+        if diagnostics is not None:
+            diagnostics.record_batch(int(np.count_nonzero(mask)), int(mask.size), failure_counts)
+        return mask, failure_counts
+
+
+def load_filter_entry_conditions(filter_params_env: Optional[str] = None) -> Dict[str, Any]:
+    """
+    FILTER_PARAMS 環境変数（WebUIからのパラメータ）の entry_conditions を取得
+
+    解析できない場合は警告を出して空の辞書を返す（従来と同じくオーバーライドしない）
+    """
+    if filter_params_env is None:
+        filter_params_env = os.getenv('FILTER_PARAMS')
+    if not filter_params_env:
+        return {}
+    try:
+        entry_conditions = json.loads(filter_params_env).get('entry_conditions', {}) or {}
+        return {key: entry_conditions[key] for key in OVERRIDABLE_KEYS if key in entry_conditions}
+    except Exception as e:
+        logger.warning(f"⚠️ フィルターパラメータのエントリー条件解析エラー: {e}")
+        return {}
+
+
+def compile_entry_conditions(timeframe: str, strategy: str = 'Balanced',
+                             overrides: Optional[Mapping[str, Any]] = None) -> CompiledEntryConditions:
+    """
+    統合設定から戦略・時間足のエントリー条件を解決してコンパイル
+
+    Args:
+        timeframe: 時間足
+        strategy: 戦略名
+        overrides: 閾値のオーバーライド（省略時は FILTER_PARAMS 環境変数から取得）
+
+    Raises:
+        InsufficientConfigurationError: 統合設定から条件を取得できない場合
+    """
+    from engines.leverage_decision_engine import InsufficientConfigurationError
+
+    try:
+        from config.unified_config_manager import UnifiedConfigManager
+        conditions = dict(UnifiedConfigManager().get_entry_conditions(timeframe, strategy))
+        if overrides is None:
+            overrides = load_filter_entry_conditions()
+        overridden = tuple(key for key in OVERRIDABLE_KEYS if key in overrides)
+        if overridden:
+            original = {key: conditions.get(key) for key in overridden}
+            conditions.update({key: overrides[key] for key in overridden})
+            logger.info(f"🔧 エントリー条件をWebUIパラメータでオーバーライド ({timeframe} {strategy}): "
+                        + ", ".join(f"{key}: {original[key]} → {conditions[key]}" for key in overridden))
+
+        return CompiledEntryConditions(
+            timeframe=timeframe,
+            strategy=strategy,
+            min_leverage=conditions['min_leverage'],
+            min_confidence=conditions['min_confidence'],
+            min_risk_reward=conditions['min_risk_reward'],
+            overridden=overridden,
+            conditions=MappingProxyType(conditions),
+        )
+    except Exception as e:
+        # 設定読み込み失敗時は銘柄追加を停止
+        error_msg = f"エントリー条件設定が読み込めませんでした: {e}"
+        print(f"❌ 設定エラー: {error_msg}")
+        raise InsufficientConfigurationError(
+            message=error_msg,
+            error_type="entry_conditions_config_failed",
+            missing_config="unified_entry_conditions"
+        )
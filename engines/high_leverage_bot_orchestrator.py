@@ -26,9 +26,11 @@ from interfaces import (
 from adapters import (
     ExistingSupportResistanceAdapter, ExistingMLPredictorAdapter, ExistingBTCCorrelationAdapter
 )
+from breakout_model_registry import get_breakout_model_registry
 
 from .leverage_decision_engine import CoreLeverageDecisionEngine, SimpleMarketContextAnalyzer
 from .analysis_result import AnalysisResult, AnalysisStage, ExitReason, StageResult
+from stage_profiler import profile_stage_call
 
 warnings.filterwarnings('ignore')
 
@@ -68,6 +70,9 @@ class HighLeverageBotOrchestrator(IHighLeverageBotOrchestrator):
         self.market_context_analyzer: Optional[IMarketContextAnalyzer] = None
         self.leverage_decision_engine: Optional[ILeverageDecisionEngine] = None
         
+        # ブレイクアウト予測器に読み込み済みのモデル（レジストリのエントリ）
+        self._breakout_model_entry = None
+        
         # デフォルトプラグインの設定
         if use_default_plugins:
             self._initialize_default_plugins()
@@ -122,323 +127,444 @@ class HighLeverageBotOrchestrator(IHighLeverageBotOrchestrator):
             AnalysisResult: 分析結果の詳細情報（成功時はrecommendationを含む）
         """
         # 分析結果オブジェクトを初期化
-        from .analysis_result import AnalysisResult, AnalysisStage, ExitReason, StageResult
-        import time
+        analysis_result = self._create_analysis_result(symbol, timeframe, execution_id)
+        execution_id = analysis_result.execution_id
         
-        # execution_idが渡されていない場合は環境変数から取得
+        try:
+            prepared = self._run_bar_invariant_stages(
+                analysis_result, symbol, timeframe, custom_period_settings, execution_id
+            )
+            if prepared is None:
+                return analysis_result
+            
+            return self._run_bar_dependent_stages(
+                analysis_result, symbol, timeframe, prepared, is_backtest, target_timestamp
+            )
+            
+        except Exception as e:
+            print(f"❌ 分析エラー: {e}")
+            raise Exception(f"分析中にエラーが発生: {str(e)} - フォールバックは使用しません")
+    
+    def _create_analysis_result(self, symbol: str, timeframe: str, execution_id: str = None) -> AnalysisResult:
+        """分析結果オブジェクトを初期化（execution_id未指定時は環境変数から取得）"""
         if not execution_id:
-            import os
             env_execution_id = os.environ.get('CURRENT_EXECUTION_ID')
             if env_execution_id:
                 execution_id = env_execution_id
                 print(f"📝 環境変数からexecution_id取得: {execution_id}")
         
-        analysis_result = AnalysisResult(
+        return AnalysisResult(
             symbol=symbol,
             timeframe=timeframe,
             strategy="momentum",  # TODO: 戦略を引数から取得
             execution_id=execution_id
         )
+    
+    def _run_bar_invariant_stages(self, analysis_result: AnalysisResult, symbol: str, timeframe: str,
+                                  custom_period_settings: dict = None, execution_id: str = None) -> Optional[Dict]:
+        """
+        STEP 1-4: 評価時刻に依存しないステージ（データ取得・サポレジ・ML予測・BTC相関）を実行
+        
+        バックテストではキャッシュ済みの全期間データに対して計算されるため、
+        全ての足で同じ結果になる。IncrementalBacktestEngineはこの結果を使い回す。
+        
+        Returns:
+            Dict: 後続ステージに渡す中間結果（Early Exit時はNone）
+        """
+        print(f"\n🎯 ハイレバレッジ機会分析開始: {symbol} ({timeframe})")
+        if execution_id:
+            print(f"🆔 Execution ID: {execution_id}")
+        print("=" * 60)
         
+        # 銘柄カテゴリの判定
+        symbol_category = self._determine_symbol_category(symbol)
+        print(f"📊 銘柄カテゴリ: {symbol_category}")
+        
+        # レバレッジエンジンを時間足・銘柄カテゴリに応じて再初期化
         try:
-            print(f"\n🎯 ハイレバレッジ機会分析開始: {symbol} ({timeframe})")
-            if execution_id:
-                print(f"🆔 Execution ID: {execution_id}")
-            print("=" * 60)
-            
-            # 銘柄カテゴリの判定
-            symbol_category = self._determine_symbol_category(symbol)
-            print(f"📊 銘柄カテゴリ: {symbol_category}")
-            
-            # レバレッジエンジンを時間足・銘柄カテゴリに応じて再初期化
-            try:
-                self.leverage_decision_engine = CoreLeverageDecisionEngine(
-                    timeframe=timeframe, 
-                    symbol_category=symbol_category
-                )
-                print(f"🔧 レバレッジエンジンを調整済み設定で初期化")
-            except Exception as e:
-                print(f"⚠️ レバレッジエンジン再初期化エラー: {e}, デフォルト設定を継続使用")
-            
-            # 短期間足の場合は時間軸に応じた最適化を適用
-            is_short_timeframe = timeframe in ['1m', '3m', '5m']
-            if is_short_timeframe:
-                print(f"⚡ 短期取引モード: {timeframe}足の最適化を適用")
-            
-            # === STEP 1: データ取得 ===
-            step1_start = time.time()
-            market_data = self._fetch_market_data(symbol, timeframe, custom_period_settings)
-            step1_time = (time.time() - step1_start) * 1000
-            
-            if market_data.empty:
-                analysis_result.mark_early_exit(
-                    AnalysisStage.DATA_FETCH,
-                    ExitReason.INSUFFICIENT_DATA,
-                    f"{symbol}の市場データ取得に失敗 - 実データが必要です"
-                )
-                print(analysis_result.get_detailed_log_message())
-                return analysis_result
-            
-            analysis_result.total_data_points = len(market_data)
+            self.leverage_decision_engine = CoreLeverageDecisionEngine(
+                timeframe=timeframe, 
+                symbol_category=symbol_category
+            )
+            print(f"🔧 レバレッジエンジンを調整済み設定で初期化")
+        except Exception as e:
+            print(f"⚠️ レバレッジエンジン再初期化エラー: {e}, デフォルト設定を継続使用")
+        
+        # 短期間足の場合は時間軸に応じた最適化を適用
+        is_short_timeframe = timeframe in ['1m', '3m', '5m']
+        if is_short_timeframe:
+            print(f"⚡ 短期取引モード: {timeframe}足の最適化を適用")
+        
+        # === STEP 1: データ取得 ===
+        step1_start = time.time()
+        market_data = profile_stage_call(AnalysisStage.DATA_FETCH, execution_id,
+                                         self._fetch_market_data, symbol, timeframe, custom_period_settings)
+        step1_time = (time.time() - step1_start) * 1000
+        
+        if market_data.empty:
+            analysis_result.mark_early_exit(
+                AnalysisStage.DATA_FETCH,
+                ExitReason.INSUFFICIENT_DATA,
+                f"{symbol}の市場データ取得に失敗 - 実データが必要です"
+            )
+            print(analysis_result.get_detailed_log_message())
+            return None
+        
+        analysis_result.total_data_points = len(market_data)
+        market_data_bytes = int(market_data.memory_usage(index=True).sum())
+        analysis_result.add_stage_result(StageResult(
+            stage=AnalysisStage.DATA_FETCH,
+            success=True,
+            execution_time_ms=step1_time,
+            data_processed=len(market_data),
+            bytes_processed=market_data_bytes
+        ))
+        
+        print(f"📊 データ取得完了: {len(market_data)}件")
+        
+        # === STEP 2: サポート・レジスタンス分析 ===
+        print("\n🔍 サポート・レジスタンス分析中...")
+        step2_start = time.time()
+        support_levels, resistance_levels = profile_stage_call(
+            AnalysisStage.SUPPORT_RESISTANCE, execution_id,
+            self._analyze_support_resistance,
+            market_data, 
+            is_short_timeframe=is_short_timeframe,
+            execution_id=execution_id
+        )
+        step2_time = (time.time() - step2_start) * 1000
+        
+        total_levels = len(support_levels) + len(resistance_levels)
+        print(f"📍 検出レベル: サポート{len(support_levels)}件, レジスタンス{len(resistance_levels)}件")
+        
+        # Early Exit: サポレジが検出されない場合は即座にスキップ
+        if not support_levels and not resistance_levels:
+            analysis_result.mark_early_exit(
+                AnalysisStage.SUPPORT_RESISTANCE,
+                ExitReason.NO_SUPPORT_RESISTANCE,
+                f"サポート・レジスタンスレベルが検出されませんでした (データ{len(market_data)}件処理済み)"
+            )
             analysis_result.add_stage_result(StageResult(
-                stage=AnalysisStage.DATA_FETCH,
-                success=True,
-                execution_time_ms=step1_time,
-                data_processed=len(market_data)
+                stage=AnalysisStage.SUPPORT_RESISTANCE,
+                success=False,
+                execution_time_ms=step2_time,
+                data_processed=len(market_data),
+                bytes_processed=market_data_bytes,
+                items_found=0,
+                error_message="No support/resistance levels detected"
             ))
-            
-            print(f"📊 データ取得完了: {len(market_data)}件")
-            
-            # === STEP 2: サポート・レジスタンス分析 ===
-            print("\n🔍 サポート・レジスタンス分析中...")
-            step2_start = time.time()
-            support_levels, resistance_levels = self._analyze_support_resistance(
-                market_data, 
-                is_short_timeframe=is_short_timeframe,
-                execution_id=execution_id
+            print(analysis_result.get_detailed_log_message())
+            return None
+        
+        analysis_result.add_stage_result(StageResult(
+            stage=AnalysisStage.SUPPORT_RESISTANCE,
+            success=True,
+            execution_time_ms=step2_time,
+            data_processed=len(market_data),
+            bytes_processed=market_data_bytes,
+            items_found=total_levels
+        ))
+        
+        # === STEP 3: ML予測 ===
+        print("\n🤖 ML予測分析中...")
+        step3_start = time.time()
+        try:
+            breakout_predictions = profile_stage_call(
+                AnalysisStage.ML_PREDICTION, execution_id,
+                self._predict_breakouts, market_data, support_levels + resistance_levels,
+                symbol=symbol, timeframe=timeframe
             )
-            step2_time = (time.time() - step2_start) * 1000
+            step3_time = (time.time() - step3_start) * 1000
+            print(f"🎯 予測完了: {len(breakout_predictions)}件")
             
-            total_levels = len(support_levels) + len(resistance_levels)
-            print(f"📍 検出レベル: サポート{len(support_levels)}件, レジスタンス{len(resistance_levels)}件")
-            
-            # Early Exit: サポレジが検出されない場合は即座にスキップ
-            if not support_levels and not resistance_levels:
+            analysis_result.add_stage_result(StageResult(
+                stage=AnalysisStage.ML_PREDICTION,
+                success=True,
+                execution_time_ms=step3_time,
+                data_processed=len(market_data),
+                bytes_processed=market_data_bytes,
+                items_found=len(breakout_predictions)
+            ))
+        except Exception as e:
+            step3_time = (time.time() - step3_start) * 1000
+            if "ML予測でエラーが発生" in str(e) or "MLモデル訓練に失敗" in str(e):
                 analysis_result.mark_early_exit(
-                    AnalysisStage.SUPPORT_RESISTANCE,
-                    ExitReason.NO_SUPPORT_RESISTANCE,
-                    f"サポート・レジスタンスレベルが検出されませんでした (データ{len(market_data)}件処理済み)"
+                    AnalysisStage.ML_PREDICTION,
+                    ExitReason.ML_PREDICTION_FAILED,
+                    f"ML予測システムでエラーが発生しました: {str(e)[:100]}"
                 )
                 analysis_result.add_stage_result(StageResult(
-                    stage=AnalysisStage.SUPPORT_RESISTANCE,
+                    stage=AnalysisStage.ML_PREDICTION,
                     success=False,
-                    execution_time_ms=step2_time,
+                    execution_time_ms=step3_time,
                     data_processed=len(market_data),
-                    items_found=0,
-                    error_message="No support/resistance levels detected"
+                    bytes_processed=market_data_bytes,
+                    error_message=str(e)[:200]
                 ))
                 print(analysis_result.get_detailed_log_message())
-                return analysis_result
+                return None
+            else:
+                raise  # 予期しないエラーは再発生
+        
+        # === STEP 4: BTC相関分析 ===
+        print("\n₿ BTC相関リスク分析中...")
+        step4_start = time.time()
+        try:
+            btc_correlation_risk = profile_stage_call(AnalysisStage.BTC_CORRELATION, execution_id,
+                                                      self._analyze_btc_correlation, symbol)
+            step4_time = (time.time() - step4_start) * 1000
+            if btc_correlation_risk:
+                print(f"⚠️ BTC相関リスク: {btc_correlation_risk.risk_level}")
             
             analysis_result.add_stage_result(StageResult(
-                stage=AnalysisStage.SUPPORT_RESISTANCE,
+                stage=AnalysisStage.BTC_CORRELATION,
                 success=True,
-                execution_time_ms=step2_time,
+                execution_time_ms=step4_time,
                 data_processed=len(market_data),
-                items_found=total_levels
+                bytes_processed=market_data_bytes
             ))
-            
-            # === STEP 3: ML予測 ===
-            print("\n🤖 ML予測分析中...")
-            step3_start = time.time()
-            try:
-                breakout_predictions = self._predict_breakouts(market_data, support_levels + resistance_levels)
-                step3_time = (time.time() - step3_start) * 1000
-                print(f"🎯 予測完了: {len(breakout_predictions)}件")
-                
-                analysis_result.add_stage_result(StageResult(
-                    stage=AnalysisStage.ML_PREDICTION,
-                    success=True,
-                    execution_time_ms=step3_time,
-                    data_processed=len(market_data),
-                    items_found=len(breakout_predictions)
-                ))
-            except Exception as e:
-                step3_time = (time.time() - step3_start) * 1000
-                if "ML予測でエラーが発生" in str(e) or "MLモデル訓練に失敗" in str(e):
-                    analysis_result.mark_early_exit(
-                        AnalysisStage.ML_PREDICTION,
-                        ExitReason.ML_PREDICTION_FAILED,
-                        f"ML予測システムでエラーが発生しました: {str(e)[:100]}"
-                    )
-                    analysis_result.add_stage_result(StageResult(
-                        stage=AnalysisStage.ML_PREDICTION,
-                        success=False,
-                        execution_time_ms=step3_time,
-                        data_processed=len(market_data),
-                        error_message=str(e)[:200]
-                    ))
-                    print(analysis_result.get_detailed_log_message())
-                    return analysis_result
-                else:
-                    raise  # 予期しないエラーは再発生
-            
-            # === STEP 4: BTC相関分析 ===
-            print("\n₿ BTC相関リスク分析中...")
-            step4_start = time.time()
-            try:
-                btc_correlation_risk = self._analyze_btc_correlation(symbol)
-                step4_time = (time.time() - step4_start) * 1000
-                if btc_correlation_risk:
-                    print(f"⚠️ BTC相関リスク: {btc_correlation_risk.risk_level}")
-                    
-                analysis_result.add_stage_result(StageResult(
-                    stage=AnalysisStage.BTC_CORRELATION,
-                    success=True,
-                    execution_time_ms=step4_time,
-                    data_processed=len(market_data)
-                ))
-            except Exception as e:
-                step4_time = (time.time() - step4_start) * 1000
-                if "データ不足エラー" in str(e):
-                    analysis_result.mark_early_exit(
-                        AnalysisStage.BTC_CORRELATION,
-                        ExitReason.BTC_DATA_INSUFFICIENT,
-                        f"BTC相関分析用のデータが不足しています: {str(e)[:100]}"
-                    )
-                    analysis_result.add_stage_result(StageResult(
-                        stage=AnalysisStage.BTC_CORRELATION,
-                        success=False,
-                        execution_time_ms=step4_time,
-                        data_processed=len(market_data),
-                        error_message=str(e)[:200]
-                    ))
-                    print(analysis_result.get_detailed_log_message())
-                    return analysis_result
-                else:
-                    raise  # 予期しないエラーは再発生
-            
-            # === STEP 5: 市場コンテキスト分析 ===
-            print("\n📈 市場コンテキスト分析中...")
-            step5_start = time.time()
-            try:
-                # バックテスト時は各時点の価格、リアルタイム時は現在価格を使用
-                market_context = self._analyze_market_context(
-                    market_data, 
-                    is_realtime=not is_backtest,
-                    target_timestamp=target_timestamp
-                )
-                step5_time = (time.time() - step5_start) * 1000
-                print(f"🎪 市場状況: {market_context.trend_direction} / {market_context.market_phase}")
-                
-                analysis_result.add_stage_result(StageResult(
-                    stage=AnalysisStage.MARKET_CONTEXT,
-                    success=True,
-                    execution_time_ms=step5_time,
-                    data_processed=len(market_data)
-                ))
-            except Exception as e:
-                step5_time = (time.time() - step5_start) * 1000
+        except Exception as e:
+            step4_time = (time.time() - step4_start) * 1000
+            if "データ不足エラー" in str(e):
                 analysis_result.mark_early_exit(
-                    AnalysisStage.MARKET_CONTEXT,
-                    ExitReason.MARKET_CONTEXT_FAILED,
-                    f"市場コンテキスト分析でエラーが発生しました: {str(e)[:100]}"
+                    AnalysisStage.BTC_CORRELATION,
+                    ExitReason.BTC_DATA_INSUFFICIENT,
+                    f"BTC相関分析用のデータが不足しています: {str(e)[:100]}"
                 )
                 analysis_result.add_stage_result(StageResult(
-                    stage=AnalysisStage.MARKET_CONTEXT,
+                    stage=AnalysisStage.BTC_CORRELATION,
                     success=False,
-                    execution_time_ms=step5_time,
+                    execution_time_ms=step4_time,
                     data_processed=len(market_data),
+                    bytes_processed=market_data_bytes,
                     error_message=str(e)[:200]
                 ))
                 print(analysis_result.get_detailed_log_message())
-                return analysis_result
+                return None
+            else:
+                raise  # 予期しないエラーは再発生
+        
+        return {
+            'market_data': market_data,
+            'support_levels': support_levels,
+            'resistance_levels': resistance_levels,
+            'breakout_predictions': breakout_predictions,
+            'btc_correlation_risk': btc_correlation_risk
+        }
+    
+    def _run_bar_dependent_stages(self, analysis_result: AnalysisResult, symbol: str, timeframe: str,
+                                  prepared: Dict, is_backtest: bool, target_timestamp: datetime = None,
+                                  analyze_market_context_fn=None) -> AnalysisResult:
+        """
+        STEP 5-6: 評価時刻に依存するステージ（市場コンテキスト・レバレッジ判定）を実行
+        
+        Args:
+            prepared: _run_bar_invariant_stagesの中間結果
+            analyze_market_context_fn: 市場コンテキスト算出関数（省略時は_analyze_market_context）
+        """
+        market_data = prepared['market_data']
+        support_levels = prepared['support_levels']
+        resistance_levels = prepared['resistance_levels']
+        breakout_predictions = prepared['breakout_predictions']
+        btc_correlation_risk = prepared['btc_correlation_risk']
+        
+        # === STEP 5: 市場コンテキスト分析 ===
+        market_context = self._run_market_context_stage(
+            analysis_result, market_data, is_backtest, target_timestamp, analyze_fn=analyze_market_context_fn
+        )
+        if market_context is None:
+            return analysis_result
+        
+        # === STEP 6: 統合レバレッジ判定 ===
+        leverage_recommendation = self._run_leverage_decision_stage(
+            analysis_result,
+            symbol=symbol,
+            support_levels=support_levels,
+            resistance_levels=resistance_levels,
+            breakout_predictions=breakout_predictions,
+            btc_correlation_risk=btc_correlation_risk,
+            market_context=market_context,
+            data_points=len(market_data)
+        )
+        if leverage_recommendation is None:
+            return analysis_result
+        
+        # === 分析成功 ===
+        analysis_result.mark_completed(
+            self._build_recommendation_dict(symbol, timeframe, leverage_recommendation)
+        )
+        
+        # === 結果サマリー表示 ===
+        self._display_analysis_summary(leverage_recommendation)
+        print(analysis_result.get_user_friendly_message())
+        
+        return analysis_result
+    
+    
+    def _run_market_context_stage(self, analysis_result: AnalysisResult, market_data: pd.DataFrame,
+                                  is_backtest: bool, target_timestamp: datetime = None,
+                                  analyze_fn=None) -> Optional[MarketContext]:
+        """
+        STEP 5: 市場コンテキスト分析を実行してステージ結果を記録
+        
+        Args:
+            analysis_result: 記録先の分析結果
+            market_data: OHLCVデータ
+            is_backtest: バックテストかどうか
+            target_timestamp: 分析対象の時刻（バックテストの場合）
+            analyze_fn: 市場コンテキスト算出関数（省略時は_analyze_market_context）
             
-            # === STEP 6: 統合レバレッジ判定 ===
-            print("\n⚖️ レバレッジ判定実行中...")
-            step6_start = time.time()
+        Returns:
+            MarketContext: 失敗時はEarly ExitをマークしてNoneを返す
+        """
+        print("\n📈 市場コンテキスト分析中...")
+        analyze_fn = analyze_fn or self._analyze_market_context
+        step5_start = time.time()
+        try:
+            # バックテスト時は各時点の価格、リアルタイム時は現在価格を使用
+            market_context = profile_stage_call(
+                AnalysisStage.MARKET_CONTEXT, analysis_result.execution_id,
+                analyze_fn,
+                market_data, 
+                is_realtime=not is_backtest,
+                target_timestamp=target_timestamp
+            )
+            step5_time = (time.time() - step5_start) * 1000
+            print(f"🎪 市場状況: {market_context.trend_direction} / {market_context.market_phase}")
             
-            if not self.leverage_decision_engine:
-                raise Exception("レバレッジ判定エンジンが初期化されていません - 銘柄追加を中止")
+            analysis_result.add_stage_result(StageResult(
+                stage=AnalysisStage.MARKET_CONTEXT,
+                success=True,
+                execution_time_ms=step5_time,
+                data_processed=len(market_data)
+            ))
+            return market_context
+        except Exception as e:
+            step5_time = (time.time() - step5_start) * 1000
+            analysis_result.mark_early_exit(
+                AnalysisStage.MARKET_CONTEXT,
+                ExitReason.MARKET_CONTEXT_FAILED,
+                f"市場コンテキスト分析でエラーが発生しました: {str(e)[:100]}"
+            )
+            analysis_result.add_stage_result(StageResult(
+                stage=AnalysisStage.MARKET_CONTEXT,
+                success=False,
+                execution_time_ms=step5_time,
+                data_processed=len(market_data),
+                error_message=str(e)[:200]
+            ))
+            print(analysis_result.get_detailed_log_message())
+            return None
+    
+    def _run_leverage_decision_stage(self, analysis_result: AnalysisResult, symbol: str,
+                                     support_levels: list, resistance_levels: list,
+                                     breakout_predictions: list, btc_correlation_risk,
+                                     market_context: MarketContext,
+                                     data_points: int) -> Optional[LeverageRecommendation]:
+        """
+        STEP 6: 統合レバレッジ判定を実行してステージ結果を記録
+        
+        Returns:
+            LeverageRecommendation: 閾値未満・エラー時はEarly ExitをマークしてNoneを返す
+        """
+        print("\n⚖️ レバレッジ判定実行中...")
+        step6_start = time.time()
+        
+        if not self.leverage_decision_engine:
+            raise Exception("レバレッジ判定エンジンが初期化されていません - 銘柄追加を中止")
+        
+        try:
+            leverage_recommendation = profile_stage_call(
+                AnalysisStage.LEVERAGE_DECISION, analysis_result.execution_id,
+                self.leverage_decision_engine.calculate_safe_leverage,
+                symbol=symbol,
+                support_levels=support_levels,
+                resistance_levels=resistance_levels,
+                breakout_predictions=breakout_predictions,
+                btc_correlation_risk=btc_correlation_risk,
+                market_context=market_context
+            )
+            step6_time = (time.time() - step6_start) * 1000
             
-            try:
-                leverage_recommendation = self.leverage_decision_engine.calculate_safe_leverage(
-                    symbol=symbol,
-                    support_levels=support_levels,
-                    resistance_levels=resistance_levels,
-                    breakout_predictions=breakout_predictions,
-                    btc_correlation_risk=btc_correlation_risk,
-                    market_context=market_context
+            # Early Exit: レバレッジが閾値未満の場合スキップ
+            min_leverage_threshold = 2.0  # 最小レバレッジ閾値
+            if leverage_recommendation.recommended_leverage < min_leverage_threshold:
+                analysis_result.mark_early_exit(
+                    AnalysisStage.LEVERAGE_DECISION,
+                    ExitReason.LEVERAGE_CONDITIONS_NOT_MET,
+                    f"レバレッジ閾値未満 ({leverage_recommendation.recommended_leverage:.1f}x < {min_leverage_threshold}x)"
                 )
-                step6_time = (time.time() - step6_start) * 1000
-                
-                # Early Exit: レバレッジが閾値未満の場合スキップ
-                min_leverage_threshold = 2.0  # 最小レバレッジ閾値
-                if leverage_recommendation.recommended_leverage < min_leverage_threshold:
-                    analysis_result.mark_early_exit(
-                        AnalysisStage.LEVERAGE_DECISION,
-                        ExitReason.LEVERAGE_CONDITIONS_NOT_MET,
-                        f"レバレッジ閾値未満 ({leverage_recommendation.recommended_leverage:.1f}x < {min_leverage_threshold}x)"
-                    )
-                    analysis_result.add_stage_result(StageResult(
-                        stage=AnalysisStage.LEVERAGE_DECISION,
-                        success=False,
-                        execution_time_ms=step6_time,
-                        data_processed=len(market_data),
-                        error_message=f"Leverage below threshold: {leverage_recommendation.recommended_leverage:.1f}x"
-                    ))
-                    print(analysis_result.get_detailed_log_message())
-                    return analysis_result
-                
-                # Early Exit: 信頼度が低い場合スキップ
-                min_confidence_threshold = 0.3  # 最小信頼度閾値（30%）
-                if leverage_recommendation.confidence_score < min_confidence_threshold:
-                    analysis_result.mark_early_exit(
-                        AnalysisStage.LEVERAGE_DECISION,
-                        ExitReason.LEVERAGE_CONDITIONS_NOT_MET,
-                        f"信頼度閾値未満 ({leverage_recommendation.confidence_score:.1%} < {min_confidence_threshold:.1%})"
-                    )
-                    analysis_result.add_stage_result(StageResult(
-                        stage=AnalysisStage.LEVERAGE_DECISION,
-                        success=False,
-                        execution_time_ms=step6_time,
-                        data_processed=len(market_data),
-                        error_message=f"Confidence below threshold: {leverage_recommendation.confidence_score:.1%}"
-                    ))
-                    print(analysis_result.get_detailed_log_message())
-                    return analysis_result
-                
                 analysis_result.add_stage_result(StageResult(
                     stage=AnalysisStage.LEVERAGE_DECISION,
-                    success=True,
+                    success=False,
                     execution_time_ms=step6_time,
-                    data_processed=len(market_data)
+                    data_processed=data_points,
+                    error_message=f"Leverage below threshold: {leverage_recommendation.recommended_leverage:.1f}x"
                 ))
-                    
-            except Exception as e:
-                step6_time = (time.time() - step6_start) * 1000
+                print(analysis_result.get_detailed_log_message())
+                return None
+            
+            # Early Exit: 信頼度が低い場合スキップ
+            min_confidence_threshold = 0.3  # 最小信頼度閾値（30%）
+            if leverage_recommendation.confidence_level < min_confidence_threshold:
                 analysis_result.mark_early_exit(
                     AnalysisStage.LEVERAGE_DECISION,
-                    ExitReason.EXECUTION_ERROR,
-                    f"レバレッジ判定エラー: {str(e)[:100]}"
+                    ExitReason.LEVERAGE_CONDITIONS_NOT_MET,
+                    f"信頼度閾値未満 ({leverage_recommendation.confidence_level:.1%} < {min_confidence_threshold:.1%})"
                 )
                 analysis_result.add_stage_result(StageResult(
                     stage=AnalysisStage.LEVERAGE_DECISION,
                     success=False,
                     execution_time_ms=step6_time,
-                    data_processed=len(market_data),
-                    error_message=str(e)[:200]
+                    data_processed=data_points,
+                    error_message=f"Confidence below threshold: {leverage_recommendation.confidence_level:.1%}"
                 ))
                 print(analysis_result.get_detailed_log_message())
-                return analysis_result
-            
-            # === 分析成功 ===
-            recommendation_dict = {
-                'symbol': symbol,
-                'timeframe': timeframe,
-                'leverage': leverage_recommendation.recommended_leverage,
-                'confidence': leverage_recommendation.confidence_score,
-                'current_price': leverage_recommendation.market_conditions.current_price if leverage_recommendation.market_conditions else None,
-                'entry_price': leverage_recommendation.market_conditions.current_price if leverage_recommendation.market_conditions else None,
-                'target_price': leverage_recommendation.take_profit_price,
-                'stop_loss': leverage_recommendation.stop_loss_price,
-                'risk_reward_ratio': leverage_recommendation.risk_reward_ratio,
-                'timestamp': datetime.now(timezone.utc),
-                'position_size': 100.0,
-                'risk_level': max(0, 100 - leverage_recommendation.confidence_score * 100)
-            }
-            
-            analysis_result.mark_completed(recommendation_dict)
-            
-            # === 結果サマリー表示 ===
-            self._display_analysis_summary(leverage_recommendation)
-            print(analysis_result.get_user_friendly_message())
-            
-            return analysis_result
+                return None
             
+            analysis_result.add_stage_result(StageResult(
+                stage=AnalysisStage.LEVERAGE_DECISION,
+                success=True,
+                execution_time_ms=step6_time,
+                data_processed=data_points
+            ))
+            return leverage_recommendation
+                
         except Exception as e:
-            print(f"❌ 分析エラー: {e}")
-            raise Exception(f"分析中にエラーが発生: {str(e)} - フォールバックは使用しません")
+            step6_time = (time.time() - step6_start) * 1000
+            analysis_result.mark_early_exit(
+                AnalysisStage.LEVERAGE_DECISION,
+                ExitReason.EXECUTION_ERROR,
+                f"レバレッジ判定エラー: {str(e)[:100]}"
+            )
+            analysis_result.add_stage_result(StageResult(
+                stage=AnalysisStage.LEVERAGE_DECISION,
+                success=False,
+                execution_time_ms=step6_time,
+                data_processed=data_points,
+                error_message=str(e)[:200]
+            ))
+            print(analysis_result.get_detailed_log_message())
+            return None
+    
+    def _build_recommendation_dict(self, symbol: str, timeframe: str,
+                                   leverage_recommendation: LeverageRecommendation) -> Dict:
+        """レバレッジ推奨結果をAnalysisResult.recommendation用の辞書に変換"""
+        return {
+            'symbol': symbol,
+            'timeframe': timeframe,
+            'leverage': leverage_recommendation.recommended_leverage,
+            # 利用側（エントリー条件評価・リアルタイム監視）は信頼度をパーセントで扱う
+            'confidence': leverage_recommendation.confidence_level * 100,
+            'current_price': leverage_recommendation.market_conditions.current_price if leverage_recommendation.market_conditions else None,
+            'entry_price': leverage_recommendation.market_conditions.current_price if leverage_recommendation.market_conditions else None,
+            'target_price': leverage_recommendation.take_profit_price,
+            'stop_loss': leverage_recommendation.stop_loss_price,
+            'risk_reward_ratio': leverage_recommendation.risk_reward_ratio,
+            'timestamp': datetime.now(timezone.utc),
+            'position_size': 100.0,
+            'risk_level': max(0, 100 - leverage_recommendation.confidence_level * 100)
+        }
     
     def _fetch_market_data(self, symbol: str, timeframe: str, custom_period_settings: dict = None) -> pd.DataFrame:
         """市場データを取得（RealPreparedData統合版）"""
@@ -502,15 +628,21 @@ class HighLeverageBotOrchestrator(IHighLeverageBotOrchestrator):
                 start_time = end_time - timedelta(days=90)
                 print(f"📅 デフォルト期間使用: 90日間")
             
-            # 非同期でデータを取得
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            try:
-                raw_data = loop.run_until_complete(
-                    api_client.get_ohlcv_data(symbol, timeframe, start_time, end_time)
-                )
-            finally:
-                loop.close()
+            # バッチ分析の親プロセスが共有メモリに公開済みならそれを使用
+            from shared_market_data import get_shared_ohlcv
+            raw_data = get_shared_ohlcv(getattr(self, 'exchange', None), symbol, timeframe, start_time, end_time)
+            if raw_data is not None:
+                print(f"📦 共有メモリの市場データを使用: {len(raw_data)}本")
+            else:
+                # 非同期でデータを取得
+                loop = asyncio.new_event_loop()
+                asyncio.set_event_loop(loop)
+                try:
+                    raw_data = loop.run_until_complete(
+                        api_client.get_ohlcv_data(symbol, timeframe, start_time, end_time)
+                    )
+                finally:
+                    loop.close()
             
             if raw_data is not None and not raw_data.empty:
                 # RealPreparedDataを作成（高速アクセス・キャッシュ機能付き）
@@ -822,7 +954,7 @@ class HighLeverageBotOrchestrator(IHighLeverageBotOrchestrator):
             
             raise Exception(f"サポート・レジスタンス分析に失敗: {e} - 不完全なデータでの分析は危険です")
     
-    def _predict_breakouts(self, data: pd.DataFrame, levels: list) -> list:
+    def _predict_breakouts(self, data: pd.DataFrame, levels: list, symbol: str = None, timeframe: str = None) -> list:
         """ブレイクアウト予測"""
         
         predictions = []
@@ -831,18 +963,41 @@ class HighLeverageBotOrchestrator(IHighLeverageBotOrchestrator):
         try:
             if self.breakout_predictor and levels:
                 
+                # 訓練済みモデルをレジストリから読み込み、無い・古い場合のみ訓練
+                registry = get_breakout_model_registry() if symbol and timeframe else None
+                is_trained = hasattr(self.breakout_predictor, 'is_trained') and self.breakout_predictor.is_trained
+                if registry is not None and (not is_trained or self._breakout_model_entry is not None):
+                    try:
+                        self._breakout_model_entry = registry.ensure_trained(
+                            self.breakout_predictor, symbol, timeframe, data, levels,
+                            loaded_entry=self._breakout_model_entry
+                        )
+                    except Exception as train_error:
+                        raise Exception(f"MLモデル訓練に失敗: {str(train_error)} - 予測システムが利用できません")
+                
                 # モデルが訓練されていない場合は訓練を試行
-                if not hasattr(self.breakout_predictor, 'is_trained') or not self.breakout_predictor.is_trained:
+                elif not is_trained:
                     print("🏋️ MLモデル訓練中...")
                     try:
                         self.breakout_predictor.train_model(data, levels)
                     except Exception as train_error:
                         raise Exception(f"MLモデル訓練に失敗: {str(train_error)} - 予測システムが利用できません")
                 
+                # 一括予測に対応した予測器は全レベルをまとめて予測（共通の市場特徴量は1回だけ計算）
+                batch_predictions = None
+                if hasattr(type(self.breakout_predictor), 'predict_breakouts_batch'):
+                    try:
+                        batch_predictions = self.breakout_predictor.predict_breakouts_batch(data, levels)
+                    except Exception as e:
+                        print(f"⚠️ 一括予測エラー - レベルごとの予測に切り替えます: {e}")
+                
                 # 各レベルに対して予測実行
-                for level in levels:
+                for index, level in enumerate(levels):
                     try:
-                        prediction = self.breakout_predictor.predict_breakout(data, level)
+                        if batch_predictions is not None:
+                            prediction = batch_predictions[index]
+                        else:
+                            prediction = self.breakout_predictor.predict_breakout(data, level)
                         # Noneの場合はシグナルスキップとして処理
                         if prediction is not None:
                             predictions.append(prediction)
@@ -1018,6 +1173,10 @@ class HighLeverageBotOrchestrator(IHighLeverageBotOrchestrator):
         """
         
         analysis_result = self.analyze_leverage_opportunity(symbol, timeframe, is_backtest, target_timestamp, custom_period_settings, execution_id)
+        return self._finalize_symbol_result(analysis_result, symbol, timeframe, strategy)
+    
+    def _finalize_symbol_result(self, analysis_result: AnalysisResult, symbol: str, timeframe: str, strategy: str):
+        """AnalysisResultをanalyze_symbolの戻り値形式（成功時は辞書、それ以外はAnalysisResult）に変換"""
         
         # Early Exitまたはエラーの場合
         if analysis_result.early_exit or not analysis_result.completed:
@@ -1047,8 +1206,6 @@ class HighLeverageBotOrchestrator(IHighLeverageBotOrchestrator):
             validation_errors.append("risk_reward_ratio is None")
         if recommendation.get('current_price') is None:
             validation_errors.append("current_price is None")
-        elif recommendation.market_conditions.current_price is None:
-            validation_errors.append("market_conditions.current_price is None")
         
         if validation_errors:
             error_details = f"RecommendationにNone値が含まれています: {', '.join(validation_errors)}"
@@ -1132,6 +1289,7 @@ class HighLeverageBotOrchestrator(IHighLeverageBotOrchestrator):
     def set_breakout_predictor(self, predictor: IBreakoutPredictor):
         """ブレイクアウト予測器を設定"""
         self.breakout_predictor = predictor
+        self._breakout_model_entry = None
         print("✅ ブレイクアウト予測器を更新しました")
     
     def set_btc_correlation_analyzer(self, analyzer: IBTCCorrelationAnalyzer):
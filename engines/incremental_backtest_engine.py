@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+インクリメンタル・バックテストエンジン
+
+ScalableAnalysisSystem._generate_real_analysis の足ごとのループでは、
+従来は全ての足で HighLeverageBotOrchestrator.analyze_symbol を呼び出し、
+データ取得・サポレジ検出・ML予測・BTC相関・市場コンテキスト・レバレッジ判定を
+全期間データに対して毎回ゼロから再計算していた。
+
+しかしバックテスト時のSTEP 1-4は同じキャッシュ済み全期間データに対して計算されるため、
+評価時刻（target_timestamp）に依存しない。評価時刻に依存するのは
+市場コンテキストの「最も近い足のopen価格」と、それを使うレバレッジ判定のみである。
+
+このエンジンは:
+- STEP 1-4 を最初の1回だけ実行して結果（Early Exitを含む）を保持
+- 市場コンテキストは SimpleMarketContextAnalyzer.compute_context_series() で事前計算し、
+  評価時刻の最近傍足を索引参照
+- STEP 6 のみ足ごとに実行
+することで、従来経路と同一の結果を返す。
+
+parity_check=True の場合は従来経路も並行実行し、結果の一致を検証する。
+"""
+
+import copy
+import logging
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+import pandas as pd
+
+from interfaces import MarketContext
+from .analysis_result import AnalysisResult
+from .leverage_decision_engine import SimpleMarketContextAnalyzer, MarketContextSeries
+
+logger = logging.getLogger(__name__)
+
+ENGINE_MODE_INCREMENTAL = 'incremental'
+ENGINE_MODE_LEGACY = 'legacy'
+ENGINE_MODE_PARITY = 'parity'
+ENGINE_MODES = (ENGINE_MODE_INCREMENTAL, ENGINE_MODE_LEGACY, ENGINE_MODE_PARITY)
+
+
+class IncrementalBacktestParityError(Exception):
+    """インクリメンタル経路と従来経路の結果が一致しない場合の例外"""
+    pass
+
+
+class IncrementalBacktestEngine:
+    """
+    足ごとのバックテスト評価をインクリメンタルに行うエンジン
+
+    analyze_symbol(..., is_backtest=True, target_timestamp=t) と同じ戻り値
+    （成功時は辞書、Early Exit時はAnalysisResult、エラー時は例外）を返す。
+    """
+
+    def __init__(self, bot, symbol: str, timeframe: str, strategy: str = "Conservative_ML",
+                 custom_period_settings: dict = None, execution_id: str = None,
+                 parity_check: bool = False, strict_parity: bool = False):
+        """
+        Args:
+            bot: HighLeverageBotOrchestrator インスタンス
+            symbol: 分析対象シンボル
+            timeframe: 時間足
+            strategy: 戦略名
+            custom_period_settings: カスタム期間設定
+            execution_id: 実行ID
+            parity_check: 従来経路との一致検証を行うか
+            strict_parity: 不一致時に IncrementalBacktestParityError を送出するか
+        """
+        self.bot = bot
+        self.symbol = symbol
+        self.timeframe = timeframe
+        self.strategy = strategy
+        self.custom_period_settings = custom_period_settings
+        self.execution_id = execution_id
+        self.parity_check = parity_check
+        self.strict_parity = strict_parity
+
+        # STEP 1-4 の結果
+        self._primed = False
+        self._template_result: Optional[AnalysisResult] = None
+        self._prepared: Optional[Dict] = None
+
+        # 市場コンテキストの事前計算結果
+        self._context_series: Optional[MarketContextSeries] = None
+
+        # 統計
+        self.stats = {
+            'evaluations': 0,
+            'prime_count': 0,
+            'fast_context_hits': 0,
+            'fallback_context_calls': 0,
+            'parity_checks': 0,
+            'parity_mismatches': 0
+        }
+        self.parity_mismatch_details = []
+
+    # === 初期化（STEP 1-4） ===
+
+    def prime(self):
+        """
+        評価時刻に依存しないステージを1回だけ実行して保持
+
+        例外時はキャッシュせず、次回の評価で再試行する（従来経路と同じく毎回例外を送出）。
+        """
+        bot = self.bot
+        analysis_result = bot._create_analysis_result(self.symbol, self.timeframe, self.execution_id)
+        try:
+            prepared = bot._run_bar_invariant_stages(
+                analysis_result, self.symbol, self.timeframe,
+                self.custom_period_settings, analysis_result.execution_id
+            )
+        except Exception as e:
+            print(f"❌ 分析エラー: {e}")
+            raise Exception(f"分析中にエラーが発生: {str(e)} - フォールバックは使用しません")
+
+        self._template_result = analysis_result
+        self._prepared = prepared
+        self._primed = True
+        self.stats['prime_count'] += 1
+
+        if prepared is not None:
+            self._prepare_market_context_state(prepared['market_data'])
+
+    def _prepare_market_context_state(self, market_data: pd.DataFrame):
+        """
+        SimpleMarketContextAnalyzer の足ごとの系列を事前計算
+
+        同一性を保証できない場合（独自アナライザー・非単調時刻など）は
+        足ごとに従来のアナライザーを呼び出す。
+        """
+        self._context_series = None
+
+        if type(self.bot.market_context_analyzer) is not SimpleMarketContextAnalyzer:
+            return
+        if market_data.empty or not market_data.index.is_unique:
+            return
+
+        try:
+            series = self.bot.market_context_analyzer.compute_context_series(market_data)
+        except Exception as e:
+            logger.debug(f"市場コンテキスト事前計算をスキップ: {e}")
+            return
+        if series.timestamps_ns is not None:
+            self._context_series = series
+
+    # === 市場コンテキスト（STEP 5） ===
+
+    def _analyze_market_context(self, data: pd.DataFrame, target_timestamp: datetime = None,
+                                is_realtime: bool = True) -> MarketContext:
+        """事前計算済みの系列から市場コンテキストを取得（_analyze_market_contextと同じ結果）"""
+        context = None
+        if not is_realtime and self._context_series is not None:
+            context = self._context_series.context_for_target(target_timestamp)
+        if context is None:
+            self.stats['fallback_context_calls'] += 1
+            return self.bot._analyze_market_context(
+                data, target_timestamp=target_timestamp, is_realtime=is_realtime
+            )
+
+        self.stats['fast_context_hits'] += 1
+        return context
+
+    # === 評価 ===
+
+    def evaluate(self, target_timestamp: datetime):
+        """
+        指定時刻の分析結果を返す（analyze_symbolと同じ戻り値）
+
+        Args:
+            target_timestamp: 評価対象の時刻
+        """
+        self.stats['evaluations'] += 1
+
+        if not self.parity_check:
+            return self._evaluate_incremental(target_timestamp)
+
+        legacy_result, legacy_error = self._capture(self._evaluate_legacy, target_timestamp)
+        incremental_result, incremental_error = self._capture(self._evaluate_incremental, target_timestamp)
+        self._check_parity(target_timestamp, legacy_result, legacy_error,
+                           incremental_result, incremental_error)
+
+        # 検証モードでは従来経路の結果を採用
+        if legacy_error is not None:
+            raise legacy_error
+        return legacy_result
+
+    def _evaluate_incremental(self, target_timestamp: datetime):
+        if not self._primed:
+            self.prime()
+
+        analysis_result = copy.deepcopy(self._template_result)
+        analysis_result.started_at = datetime.now()
+
+        if self._prepared is not None:
+            try:
+                self.bot._run_bar_dependent_stages(
+                    analysis_result, self.symbol, self.timeframe, self._prepared,
+                    is_backtest=True, target_timestamp=target_timestamp,
+                    analyze_market_context_fn=self._analyze_market_context
+                )
+            except Exception as e:
+                print(f"❌ 分析エラー: {e}")
+                raise Exception(f"分析中にエラーが発生: {str(e)} - フォールバックは使用しません")
+
+        return self.bot._finalize_symbol_result(analysis_result, self.symbol, self.timeframe, self.strategy)
+
+    def _evaluate_legacy(self, target_timestamp: datetime):
+        return self.bot.analyze_symbol(
+            self.symbol, self.timeframe, self.strategy,
+            is_backtest=True,
+            target_timestamp=target_timestamp,
+            custom_period_settings=self.custom_period_settings,
+            execution_id=self.execution_id
+        )
+
+    @staticmethod
+    def _capture(func, target_timestamp):
+        try:
+            return func(target_timestamp), None
+        except Exception as e:
+            return None, e
+
+    # === 一致検証 ===
+
+    def _check_parity(self, target_timestamp, legacy_result, legacy_error,
+                      incremental_result, incremental_error):
+        self.stats['parity_checks'] += 1
+
+        if legacy_error is not None or incremental_error is not None:
+            expected = str(legacy_error) if legacy_error is not None else None
+            actual = str(incremental_error) if incremental_error is not None else None
+            differences = [] if expected == actual else [f"error: {expected!r} != {actual!r}"]
+        else:
+            differences = compare_analysis_results(legacy_result, incremental_result)
+
+        if not differences:
+            return
+
+        self.stats['parity_mismatches'] += 1
+        detail = {'target_timestamp': str(target_timestamp), 'differences': differences}
+        self.parity_mismatch_details.append(detail)
+        logger.warning(f"⚠️ インクリメンタル評価の不一致 ({self.symbol} {self.timeframe} @ {target_timestamp}): "
+                       f"{'; '.join(differences[:5])}")
+
+        if self.strict_parity:
+            raise IncrementalBacktestParityError(
+                f"インクリメンタル評価が従来経路と一致しません: {self.symbol} {self.timeframe} "
+                f"@ {target_timestamp}: {'; '.join(differences)}"
+            )
+
+    def get_stats(self) -> Dict[str, Any]:
+        """評価統計を取得"""
+        return dict(self.stats)
+
+
+def _normalize_for_parity(value) -> Any:
+    """比較用に非決定的な要素（生成時刻・処理時間）を除外"""
+    if isinstance(value, AnalysisResult):
+        return {
+            'completed': value.completed,
+            'early_exit': value.early_exit,
+            'exit_stage': value.exit_stage,
+            'exit_reason': value.exit_reason,
+            'error_details': value.error_details,
+            'total_data_points': value.total_data_points,
+            'recommendation': _normalize_for_parity(value.recommendation),
+            'stage_results': [
+                (s.stage, s.success, s.data_processed, s.items_found, s.error_message)
+                for s in value.stage_results
+            ]
+        }
+    if isinstance(value, dict):
+        return {k: v for k, v in value.items() if k != 'timestamp'}
+    return value
+
+
+def compare_analysis_results(expected, actual) -> list:
+    """
+    analyze_symbolの戻り値同士を比較して差分の一覧を返す
+
+    Returns:
+        list: 差分の説明（一致する場合は空リスト）
+    """
+    if type(expected) is not type(actual):
+        return [f"type: {type(expected).__name__} != {type(actual).__name__}"]
+
+    expected_norm = _normalize_for_parity(expected)
+    actual_norm = _normalize_for_parity(actual)
+    if not isinstance(expected_norm, dict):
+        return [] if expected_norm == actual_norm else [f"value: {expected_norm!r} != {actual_norm!r}"]
+
+    differences = []
+    for key in sorted(set(expected_norm) | set(actual_norm)):
+        if expected_norm.get(key) != actual_norm.get(key):
+            differences.append(f"{key}: {expected_norm.get(key)!r} != {actual_norm.get(key)!r}")
+    return differences
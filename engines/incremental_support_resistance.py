@@ -0,0 +1,567 @@
+#!/usr/bin/env python3
+"""
+スライディングウィンドウ型の支持線・抵抗線検出器
+
+support_resistance_visualizer.find_all_levels は呼び出しのたびに全期間に対して
+argrelextrema → cluster_price_levels → calculate_level_details を実行し、
+calculate_level_details はタッチごとに df[df['timestamp'] == timestamp] の全件走査と
+20本ローリング出来高平均の全期間再計算を行っていた。
+
+この検出器は状態を保持し:
+- 新しい足が届くたびに、確定した（左右 order 本がそろった）フラクタルだけを追加
+- 価格順に並んだクラスター構造に二分探索で挿入し、cluster_price_levels の貪欲法と
+  同じクラスター分割を局所的な再計算だけで維持
+- タッチごとの統計（反発幅・出来高・出来高スパイク）は確定時に1回だけ計算し、
+  クラスターごとの集計はクラスターが変化した時だけ再計算
+することで、find_all_levels と同じレベル一覧を返す。
+
+末尾 order 本以内の足は argrelextrema の端点処理（clip）により仮のフラクタルになるため、
+毎回その範囲だけ再評価する。1本あたりの処理量は履歴の長さに依存しない
+（処理済みの足との全体の一致確認は、前回と異なるデータが渡された場合のみ行う）。
+
+Usage:
+    detector = IncrementalSupportResistanceDetector()
+    detector.update(df)           # 前回からの追加分だけ処理
+    levels = detector.get_levels(min_touches=2)
+
+    # ベンチマーク
+    python -m engines.incremental_support_resistance --sizes 2000 20000 100000
+"""
+
+import bisect
+import logging
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy.signal import argrelextrema
+
+logger = logging.getLogger(__name__)
+
+LEVEL_RESISTANCE = 'resistance'
+LEVEL_SUPPORT = 'support'
+
+# calculate_level_details と同じ強度の重み
+TOUCH_WEIGHT = 3
+BOUNCE_WEIGHT = 50
+TIME_WEIGHT = 0.05
+RECENCY_WEIGHT = 0.02
+VOLUME_WEIGHT = 10
+
+# 処理済みの足との一致確認に使う列
+_PREFIX_COLUMNS = ('timestamp', 'high', 'low', 'volume')
+
+
+class _LevelCluster:
+    """クラスター（(価格, 足インデックス) のキーを価格順に保持）"""
+
+    __slots__ = ('keys', 'details')
+
+    def __init__(self, keys: List[Tuple[float, int]]):
+        self.keys = keys
+        self.details = None  # タッチ統計の集計キャッシュ（クラスターが変化すると作り直される）
+
+
+class SortedLevelClusters:
+    """
+    価格順のクラスター構造
+
+    cluster_price_levels は価格順に並べたレベルを先頭から走査し、
+    現在のクラスター平均との乖離が tolerance_pct 以内なら同じクラスターに加える。
+    この貪欲法はクラスターの先頭要素から後ろだけに依存するため、
+    挿入・削除の影響は変化点を含むクラスターから始まり、
+    変化点より後ろで旧クラスターの先頭と同じ位置で新クラスターが始まった時点で止まる。
+    """
+
+    def __init__(self, tolerance_pct: float = 0.01):
+        self.tolerance_pct = tolerance_pct
+        self.clusters: List[_LevelCluster] = []
+        self._firsts: List[Tuple[float, int]] = []
+        self.rebuilt_clusters = 0  # 再計算したクラスター数（ベンチマーク・テスト用）
+
+    def __len__(self) -> int:
+        return sum(len(cluster.keys) for cluster in self.clusters)
+
+    def _joins(self, current: List[Tuple[float, int]], price: float) -> bool:
+        """cluster_price_levels と同じ判定（平均は np.mean で計算）"""
+        cluster_avg = np.mean([key[0] for key in current])
+        return abs(price - cluster_avg) / cluster_avg <= self.tolerance_pct
+
+    def _greedy(self, keys: List[Tuple[float, int]]) -> List[_LevelCluster]:
+        clusters = []
+        current = None
+        for key in keys:
+            if current is not None and self._joins(current, key[0]):
+                current.append(key)
+            else:
+                if current is not None:
+                    clusters.append(_LevelCluster(current))
+                current = [key]
+        if current is not None:
+            clusters.append(_LevelCluster(current))
+        return clusters
+
+    def bulk_load(self, keys: List[Tuple[float, int]]):
+        """空の構造に一括投入"""
+        merged = sorted(keys + [key for cluster in self.clusters for key in cluster.keys])
+        self.clusters = self._greedy(merged)
+        self._firsts = [cluster.keys[0] for cluster in self.clusters]
+        self.rebuilt_clusters += len(self.clusters)
+
+    def insert(self, key: Tuple[float, int]):
+        start = max(bisect.bisect_right(self._firsts, key) - 1, 0)
+        self._rebuild(start, key, insert_key=key)
+
+    def remove(self, key: Tuple[float, int]):
+        index = bisect.bisect_right(self._firsts, key) - 1
+        if index < 0 or key not in self.clusters[index].keys:
+            raise KeyError(key)
+        # 先頭要素を削除すると直前のクラスターの終端が変わる
+        start = max(index - 1, 0) if self.clusters[index].keys[0] == key else index
+        self._rebuild(start, key, remove_key=key)
+
+    def _rebuild(self, start: int, changed_key: Tuple[float, int],
+                 insert_key: Tuple[float, int] = None, remove_key: Tuple[float, int] = None):
+        new_clusters = []
+        current = None
+        pending = insert_key
+        stop = len(self.clusters)
+
+        def feed(key):
+            nonlocal current
+            if current is not None and self._joins(current, key[0]):
+                current.append(key)
+                return
+            if current is not None:
+                new_clusters.append(_LevelCluster(current))
+            current = [key]
+
+        for index in range(start, len(self.clusters)):
+            old_keys = self.clusters[index].keys
+            if index > start and old_keys[0] > changed_key and pending is None and current is not None \
+                    and not self._joins(current, old_keys[0][0]):
+                # 変化点より後ろで旧クラスターと同じ位置から始まる → 以降は変化しない
+                stop = index
+                break
+            for key in old_keys:
+                if pending is not None and pending < key:
+                    feed(pending)
+                    pending = None
+                if key == remove_key:
+                    continue
+                feed(key)
+        if pending is not None:
+            feed(pending)
+        if current is not None:
+            new_clusters.append(_LevelCluster(current))
+
+        self.clusters[start:stop] = new_clusters
+        self._firsts[start:stop] = [cluster.keys[0] for cluster in new_clusters]
+        self.rebuilt_clusters += len(new_clusters)
+
+    def as_lists(self) -> List[List[Tuple[float, int]]]:
+        return [list(cluster.keys) for cluster in self.clusters]
+
+
+class _GrowableArray:
+    """償却O(1)で追記できるnumpy配列"""
+
+    def __init__(self, dtype, capacity: int = 1024):
+        self._data = np.empty(capacity, dtype=dtype)
+        self.size = 0
+
+    def extend(self, values: np.ndarray):
+        needed = self.size + len(values)
+        if needed > len(self._data):
+            capacity = max(needed, len(self._data) * 2)
+            grown = np.empty(capacity, dtype=self._data.dtype)
+            grown[:self.size] = self._data[:self.size]
+            self._data = grown
+        self._data[self.size:needed] = values
+        self.size = needed
+
+    @property
+    def values(self) -> np.ndarray:
+        return self._data[:self.size]
+
+
+class IncrementalSupportResistanceDetector:
+    """
+    1系列分の状態を保持する支持線・抵抗線検出器
+
+    出力は find_all_levels(df, min_touches) と同じ形式・同じ内容
+    （出来高平均の浮動小数点誤差を除く）。
+    """
+
+    def __init__(self, order: int = 5, tolerance_pct: float = 0.01,
+                 touch_window: int = 10, volume_window: int = 20):
+        """
+        Args:
+            order: フラクタル判定の左右の本数（detect_fractal_levels の window）
+            tolerance_pct: クラスタリングの許容範囲（cluster_price_levels の tolerance_pct）
+            touch_window: 反発幅を測る足数（calculate_level_details の window）
+            volume_window: 出来高スパイクの平均本数
+        """
+        self.order = order
+        self.tolerance_pct = tolerance_pct
+        self.touch_window = touch_window
+        self.volume_window = volume_window
+        # フラクタル判定と反発幅の両方が確定するまでの足数
+        self.confirm_lag = max(order, touch_window // 2)
+
+        self._timestamps: List[pd.Timestamp] = []
+        self._timestamps_ns = _GrowableArray(np.int64)
+        self._highs = _GrowableArray(np.float64)
+        self._lows = _GrowableArray(np.float64)
+        self._volumes = _GrowableArray(np.float64)
+
+        self._clusters = {
+            LEVEL_RESISTANCE: SortedLevelClusters(tolerance_pct),
+            LEVEL_SUPPORT: SortedLevelClusters(tolerance_pct),
+        }
+        self._touch_stats: Dict[int, dict] = {}
+        self._provisional = {LEVEL_RESISTANCE: [], LEVEL_SUPPORT: []}
+        self._next_confirm = 0  # 次に確定判定する足のインデックス
+        # 処理済みの足と一致を確認済みのデータ（列のバッファの先頭アドレスと、アドレスの再利用を防ぐ参照）
+        self._verified_buffers = None
+
+        self.stats = {'bars_processed': 0, 'pivot_checks': 0, 'resets': 0, 'full_prefix_checks': 0}
+
+    @property
+    def size(self) -> int:
+        return len(self._timestamps)
+
+    # ------------------------------------------------------------------
+    # データ更新
+    # ------------------------------------------------------------------
+
+    def matches_prefix(self, df: pd.DataFrame, buffers: Tuple[np.ndarray, ...] = None) -> bool:
+        """
+        dfが処理済みの足を先頭に含む（追記のみ）かどうか
+
+        先頭と処理済みの最終足を確認し、前回と同じデータ（同じ列バッファのスライス）ならそれで一致とみなす。
+        異なるデータの場合のみ、処理済みの全ての足の時刻・高値・安値・出来高を比較する
+        （再取得したデータで途中の足が書き換わった場合も検出）。
+        """
+        n = self.size
+        if n == 0:
+            return True
+        if len(df) < n:
+            return False
+        buffers = buffers if buffers is not None else _column_buffers(df)
+        if not self._matches_row(buffers, 0) or not self._matches_row(buffers, n - 1):
+            return False
+        addresses = _buffer_addresses(buffers)
+        if self._verified_buffers is not None and addresses == self._verified_buffers[0]:
+            return True
+
+        self.stats['full_prefix_checks'] += 1
+        prefix = df.iloc[:n]
+        timestamps_ns = pd.DatetimeIndex(pd.to_datetime(prefix['timestamp'])).as_unit('ns').asi8
+        if not np.array_equal(timestamps_ns, self._timestamps_ns.values):
+            return False
+        for column, stored in (('high', self._highs), ('low', self._lows), ('volume', self._volumes)):
+            if not np.array_equal(prefix[column].to_numpy(dtype=np.float64), stored.values, equal_nan=True):
+                return False
+        self._verified_buffers = (addresses, buffers)
+        return True
+
+    def _matches_row(self, buffers: Tuple[np.ndarray, ...], i: int) -> bool:
+        """i番目の足が処理済みの足と一致するか"""
+        timestamps = buffers[0]
+        if timestamps.dtype.kind == 'M':
+            if timestamps[i:i + 1].astype('datetime64[ns]').view(np.int64)[0] != self._timestamps_ns.values[i]:
+                return False
+        elif pd.Timestamp(timestamps[i]) != self._timestamps[i]:
+            return False
+        for buffer, stored in zip(buffers[1:], (self._highs, self._lows, self._volumes)):
+            value = float(buffer[i])
+            if not (value == stored.values[i] or (np.isnan(value) and np.isnan(stored.values[i]))):
+                return False
+        return True
+
+    def reset(self):
+        """状態を破棄"""
+        stats = self.stats
+        self.__init__(self.order, self.tolerance_pct, self.touch_window, self.volume_window)
+        self.stats = stats
+        self.stats['resets'] += 1
+
+    def update(self, df: pd.DataFrame) -> int:
+        """
+        dfのうち未処理の足を取り込む（処理済み部分と食い違う場合は作り直す）
+
+        Returns:
+            int: 取り込んだ足数
+        """
+        buffers = _column_buffers(df)
+        if not self.matches_prefix(df, buffers):
+            self.reset()
+        new_rows = df.iloc[self.size:]
+        if new_rows.empty:
+            return 0
+
+        timestamps = pd.DatetimeIndex(pd.to_datetime(new_rows['timestamp']))
+        timestamps_ns = timestamps.as_unit('ns').asi8
+        if (len(timestamps_ns) > 1 and np.any(np.diff(timestamps_ns) <= 0)) or \
+                (self.size and timestamps_ns[0] <= self._timestamps_ns.values[-1]):
+            raise ValueError("タイムスタンプが単調増加ではありません")
+
+        self._timestamps.extend(pd.Timestamp(ts) for ts in new_rows['timestamp'])
+        self._timestamps_ns.extend(timestamps_ns)
+        self._highs.extend(new_rows['high'].to_numpy(dtype=np.float64))
+        self._lows.extend(new_rows['low'].to_numpy(dtype=np.float64))
+        self._volumes.extend(new_rows['volume'].to_numpy(dtype=np.float64))
+        self.stats['bars_processed'] += len(new_rows)
+        # 取り込んだ足はこのデータの値なので、同じデータの続きは全体の確認を省略できる
+        self._verified_buffers = (_buffer_addresses(buffers), buffers)
+
+        self._advance()
+        return len(new_rows)
+
+    def _advance(self):
+        n = self.size
+
+        # 前回の仮フラクタルを取り除く
+        for level_type, keys in self._provisional.items():
+            for key in keys:
+                self._clusters[level_type].remove(key)
+                self._touch_stats.pop(key[1], None)
+            self._provisional[level_type] = []
+
+        # 確定したフラクタルを追加
+        confirm_end = n - 1 - self.confirm_lag  # この足まで確定
+        if confirm_end >= self._next_confirm:
+            start = self._next_confirm
+            self._add_pivots(self._find_pivots(start, confirm_end, n), provisional=False)
+            self._next_confirm = confirm_end + 1
+
+        # 末尾の仮フラクタル（argrelextremaの端点処理で現時点だけ成立するもの）
+        tail_start = max(self._next_confirm, 1)
+        if tail_start <= n - 2:
+            self._add_pivots(self._find_pivots(tail_start, n - 2, n), provisional=True)
+
+    def _find_pivots(self, start: int, end: int, n: int) -> Dict[str, np.ndarray]:
+        """[start, end] の足のうち、長さnのデータに対して argrelextrema が検出するフラクタル"""
+        segment_start = max(0, start - self.order)
+        segment_end = min(n, end + self.order + 1)
+        self.stats['pivot_checks'] += end - start + 1
+        pivots = {}
+        for level_type, values, comparator in ((LEVEL_RESISTANCE, self._highs.values, np.greater),
+                                               (LEVEL_SUPPORT, self._lows.values, np.less)):
+            segment = values[segment_start:segment_end]
+            indices = argrelextrema(segment, comparator, order=self.order)[0] + segment_start
+            pivots[level_type] = indices[(indices >= start) & (indices <= end)]
+        return pivots
+
+    def _add_pivots(self, pivots: Dict[str, np.ndarray], provisional: bool):
+        for level_type, indices in pivots.items():
+            values = self._highs.values if level_type == LEVEL_RESISTANCE else self._lows.values
+            keys = [(values[i], int(i)) for i in indices]
+            for _, index in keys:
+                self._touch_stats[index] = self._touch_stat(index)
+
+            clusters = self._clusters[level_type]
+            if not clusters.clusters and len(keys) > 1:
+                clusters.bulk_load(keys)
+            else:
+                for key in keys:
+                    clusters.insert(key)
+            if provisional:
+                self._provisional[level_type].extend(keys)
+
+    def _touch_stat(self, index: int) -> dict:
+        """calculate_level_details のタッチごとの計算（反発幅・出来高・出来高スパイク）"""
+        n = self.size
+        half = self.touch_window // 2
+        start, end = max(0, index - half), min(n, index + half + 1)
+        high_range = _nan_range(self._highs.values[start:end])
+        low_range = _nan_range(self._lows.values[start:end])
+
+        volumes = self._volumes.values
+        touch_volume = volumes[index]
+        if index >= self.volume_window - 1:
+            avg_volume = np.mean(volumes[index - self.volume_window + 1:index + 1])
+        else:
+            avg_volume = np.nan
+        volume_spike = touch_volume / avg_volume if avg_volume > 0 else 1
+
+        return {
+            'price_range': max(high_range, low_range),
+            'volume': touch_volume,
+            'volume_spike': volume_spike,
+        }
+
+    # ------------------------------------------------------------------
+    # レベル出力
+    # ------------------------------------------------------------------
+
+    def _cluster_details(self, cluster: _LevelCluster) -> dict:
+        if cluster.details is not None:
+            return cluster.details
+
+        level_price = np.mean([key[0] for key in cluster.keys])
+        timestamps = [self._timestamps[key[1]] for key in cluster.keys]
+        bounce_details = []
+        bounce_strengths = []
+        volume_at_touches = []
+        volume_spikes = []
+        for key, timestamp in zip(cluster.keys, timestamps):
+            stat = self._touch_stats[key[1]]
+            bounce_strength = stat['price_range'] / level_price if level_price > 0 else 0
+            bounce_strengths.append(bounce_strength)
+            volume_at_touches.append(stat['volume'])
+            volume_spikes.append(stat['volume_spike'])
+            bounce_details.append({
+                'timestamp': timestamp,
+                'strength': bounce_strength,
+                'price_range': stat['price_range'],
+                'volume': stat['volume'],
+                'volume_spike': stat['volume_spike']
+            })
+
+        last_touch = pd.to_datetime(max(timestamps))
+        cluster.details = {
+            'price': level_price,
+            'touch_count': len(cluster.keys),
+            'avg_bounce': np.mean(bounce_strengths) if bounce_strengths else 0,
+            'max_bounce': max(bounce_strengths) if bounce_strengths else 0,
+            'avg_volume': np.mean(volume_at_touches) if volume_at_touches else 0,
+            'avg_volume_spike': np.mean(volume_spikes) if volume_spikes else 1,
+            'max_volume_spike': max(volume_spikes) if volume_spikes else 1,
+            'time_span': (last_touch - pd.to_datetime(min(timestamps))).total_seconds() / 3600
+            if len(timestamps) > 1 else 0,
+            'last_touch': last_touch,
+            'timestamps': timestamps,
+            'bounce_details': bounce_details,
+        }
+        return cluster.details
+
+    def get_levels(self, min_touches: int = 2) -> List[dict]:
+        """find_all_levels と同じ形式のレベル一覧（強度の降順）"""
+        if self.size < 10:
+            return []
+
+        latest = self._timestamps[-1]
+        all_levels = []
+        for level_type in (LEVEL_RESISTANCE, LEVEL_SUPPORT):
+            for cluster in self._clusters[level_type].clusters:
+                if len(cluster.keys) < min_touches:
+                    continue
+                details = self._cluster_details(cluster)
+                if details['touch_count'] > 1:
+                    recency = (latest - details['last_touch']).total_seconds() / 3600
+                else:
+                    recency = float('inf')
+
+                raw_strength = (details['touch_count'] * TOUCH_WEIGHT +
+                                details['avg_bounce'] * BOUNCE_WEIGHT +
+                                details['time_span'] * TIME_WEIGHT -
+                                recency * RECENCY_WEIGHT +
+                                details['avg_volume_spike'] * VOLUME_WEIGHT)
+                level = {key: value for key, value in details.items() if key != 'last_touch'}
+                level.update({
+                    'strength': min(max(raw_strength / 200.0, 0.0), 1.0),
+                    'recency': recency,
+                    'timestamps': list(details['timestamps']),
+                    'bounce_details': [dict(detail) for detail in details['bounce_details']],
+                    'type': level_type,
+                })
+                all_levels.append(level)
+
+        all_levels.sort(key=lambda x: x['strength'], reverse=True)
+        return all_levels
+
+    def get_clusters(self, level_type: str) -> List[List[Tuple[float, int]]]:
+        """クラスター分割（(価格, 足インデックス) のリスト）"""
+        return self._clusters[level_type].as_lists()
+
+
+def _nan_range(values: np.ndarray) -> float:
+    """NaNを除いた max - min（pandasの skipna と同じ）"""
+    valid = values[~np.isnan(values)]
+    if len(valid) == 0:
+        return np.nan
+    return valid.max() - valid.min()
+
+
+def _column_buffers(df: pd.DataFrame) -> Tuple[np.ndarray, ...]:
+    """一致確認に使う列の配列（コピーなし）"""
+    return tuple(np.asarray(df[column].values) for column in _PREFIX_COLUMNS)
+
+
+def _buffer_addresses(buffers: Tuple[np.ndarray, ...]) -> Tuple[int, ...]:
+    """列の配列の先頭アドレス（同じDataFrameの先頭からのスライスは同じ値）"""
+    return tuple(buffer.__array_interface__['data'][0] for buffer in buffers)
+
+
+def run_benchmark(sizes=(2000, 20000, 100000), new_bars: int = 200, seed: int = 42) -> List[dict]:
+    """
+    履歴の長さごとに、1本追加あたりの処理時間を find_all_levels と比較
+
+    Returns:
+        List[dict]: 履歴長ごとの計測結果
+    """
+    import contextlib
+    import io
+    import time
+    from support_resistance_visualizer import find_all_levels
+
+    results = []
+    for size in sizes:
+        rng = np.random.default_rng(seed)
+        total = size + new_bars
+        closes = 100 * np.exp(np.cumsum(rng.normal(0, 0.004, total)))
+        df = pd.DataFrame({
+            'timestamp': pd.date_range('2020-01-01', periods=total, freq='15min', tz='UTC'),
+            'open': closes,
+            'high': closes * (1 + np.abs(rng.normal(0, 0.002, total))),
+            'low': closes * (1 - np.abs(rng.normal(0, 0.002, total))),
+            'close': closes,
+            'volume': rng.uniform(1000, 5000, total),
+        })
+
+        detector = IncrementalSupportResistanceDetector()
+        detector.update(df.iloc[:size])
+
+        started = time.perf_counter()
+        for end in range(size + 1, total + 1):
+            detector.update(df.iloc[:end])
+        update_seconds = (time.perf_counter() - started) / new_bars
+
+        started = time.perf_counter()
+        for _ in range(10):
+            detector.get_levels()
+        query_seconds = (time.perf_counter() - started) / 10
+
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            find_all_levels(df, min_touches=2)
+        batch_seconds = time.perf_counter() - started
+
+        results.append({
+            'history': size,
+            'update_us_per_bar': update_seconds * 1e6,
+            'query_ms': query_seconds * 1e3,
+            'batch_ms': batch_seconds * 1e3,
+        })
+    return results
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='スライディングウィンドウ支持線・抵抗線検出のベンチマーク')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[2000, 20000, 100000], help='履歴の長さ')
+    parser.add_argument('--new-bars', type=int, default=200, help='追加する足数')
+    args = parser.parse_args()
+
+    print("📊 1本追加あたりの処理時間")
+    print(f"{'履歴':>10} {'追加(µs/本)':>14} {'レベル出力(ms)':>16} {'find_all_levels(ms)':>22}")
+    for result in run_benchmark(args.sizes, args.new_bars):
+        print(f"{result['history']:>10} {result['update_us_per_bar']:>14.1f} "
+              f"{result['query_ms']:>16.2f} {result['batch_ms']:>22.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -12,6 +12,7 @@ import numpy as np
 from typing import List, Dict, Optional
 from datetime import datetime
 import warnings
+import weakref
 
 # プロジェクトルートをパスに追加
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -652,17 +653,205 @@ class CoreLeverageDecisionEngine(ILeverageDecisionEngine):
         """損切り・利確計算器を設定"""
         self.sl_tp_calculator = calculator
 
+def _classify_trend(current_price, sma_20):
+    """簡易トレンド判定（SMA20の±2%）。SMA20がない（NaN）場合はSIDEWAYS"""
+    if current_price > sma_20 * 1.02:
+        return 'BULLISH'
+    if current_price < sma_20 * 0.98:
+        return 'BEARISH'
+    return 'SIDEWAYS'
+
+
+def _classify_phase(volatility, trend):
+    """簡易フェーズ判定"""
+    if volatility < 0.01:
+        return 'ACCUMULATION'
+    if volatility < 0.03:
+        return 'MARKUP' if trend == 'BULLISH' else 'MARKDOWN'
+    return 'DISTRIBUTION'
+
+
+class MarketContextSeries:
+    """
+    足ごとの市場コンテキスト（SimpleMarketContextAnalyzer.compute_context_series の結果）
+
+    配列のi番目は、i番目の足までのデータだけを渡して analyze_market_phase(..., target=i番目の足の時刻,
+    is_realtime=False) を呼んだ場合と同じ値（現在価格はその足のopen、24本出来高・ボラティリティ・
+    SMA20はその足までのデータで計算）なので、i番目の足の時点で未来のデータは参照しない。
+
+    全期間のデータを渡して任意の時刻を評価する従来の呼び出しは context_for_target() で
+    索引参照に置き換わる（現在価格は最近傍足のopen、集約値は渡されたデータの最終足の時点）。
+    """
+
+    def __init__(self, timestamps: pd.Series, opens: np.ndarray, closes: np.ndarray, volumes: np.ndarray):
+        close_series = pd.Series(closes)
+        volume_series = pd.Series(volumes)
+        returns = close_series.pct_change()
+
+        self.size = len(opens)
+        self.current_price = opens.astype(float)
+        # 24本未満の足では全件の合計（従来の tail(24).sum() / sum() と同じ）
+        self.volume_24h = volume_series.rolling(24, min_periods=1).sum().to_numpy(dtype=float)
+        # リターンが2件以上ない足は0.02（従来と同じ）
+        self.volatility = returns.expanding(min_periods=2).std().fillna(0.02).to_numpy(dtype=float)
+        self.sma_20 = close_series.rolling(20).mean().to_numpy(dtype=float)
+        self.trend = np.where(self.current_price > self.sma_20 * 1.02, 'BULLISH',
+                              np.where(self.current_price < self.sma_20 * 0.98, 'BEARISH', 'SIDEWAYS'))
+        self.phase = np.where(self.volatility < 0.01, 'ACCUMULATION',
+                              np.where(self.volatility < 0.03,
+                                       np.where(self.trend == 'BULLISH', 'MARKUP', 'MARKDOWN'),
+                                       'DISTRIBUTION'))
+
+        # 最終足の時点の集約値は従来と同じ計算方法で求める（全期間データでの評価結果を変えない）
+        clean_returns = returns.dropna()
+        self.last_volume_24h = (float(volume_series.tail(24).sum()) if self.size >= 24
+                                else float(volume_series.sum()))
+        self.last_volatility = float(clean_returns.std()) if len(clean_returns) > 1 else 0.02
+        self.last_sma_20 = self.sma_20[-1] if self.size >= 20 else None
+
+        # 最近傍足の索引参照は時刻が単調増加・重複なしの場合のみ
+        ts_index = pd.DatetimeIndex(timestamps)
+        self.tz_aware = ts_index.tz is not None
+        self.timestamps_ns = None
+        if not ts_index.hasnans and ts_index.is_monotonic_increasing and ts_index.is_unique:
+            self.timestamps_ns = ts_index.as_unit('ns').asi8
+
+    def __len__(self):
+        return self.size
+
+    def context_at(self, position: int) -> MarketContext:
+        """position番目の足の時点の市場コンテキスト"""
+        return MarketContext(
+            current_price=float(self.current_price[position]),
+            volume_24h=float(self.volume_24h[position]),
+            volatility=float(self.volatility[position]),
+            trend_direction=str(self.trend[position]),
+            market_phase=str(self.phase[position]),
+            timestamp=datetime.now()
+        )
+
+    def nearest_position(self, target_timestamp) -> Optional[int]:
+        """
+        target_timestamp に最も近い足の位置（同距離の場合は前の足 = idxminと同じ）
+
+        索引参照できない場合（非単調・重複・NaTの時刻、タイムゾーン有無の不一致）はNone
+        """
+        if self.timestamps_ns is None or target_timestamp is None:
+            return None
+        target = pd.Timestamp(target_timestamp)
+        if target is pd.NaT or (target.tzinfo is not None) != self.tz_aware:
+            return None
+        target_ns = target.as_unit('ns').value
+        ts = self.timestamps_ns
+        right = int(np.searchsorted(ts, target_ns, side='left'))
+        if right == 0:
+            return 0
+        if right >= self.size:
+            return self.size - 1
+        return right - 1 if target_ns - int(ts[right - 1]) <= int(ts[right]) - target_ns else right
+
+    def context_for_target(self, target_timestamp) -> Optional[MarketContext]:
+        """
+        全期間データに対する従来の analyze_market_phase(data, target, is_realtime=False) と同じ結果
+
+        Returns:
+            MarketContext（索引参照できない場合はNone）
+        """
+        position = self.nearest_position(target_timestamp)
+        if position is None:
+            return None
+        current_price = float(self.current_price[position])
+        trend = _classify_trend(current_price, self.last_sma_20) if self.last_sma_20 is not None else 'SIDEWAYS'
+        return MarketContext(
+            current_price=current_price,
+            volume_24h=self.last_volume_24h,
+            volatility=self.last_volatility,
+            trend_direction=trend,
+            market_phase=_classify_phase(self.last_volatility, trend),
+            timestamp=datetime.now()
+        )
+
+
 class SimpleMarketContextAnalyzer(IMarketContextAnalyzer):
     """シンプルな市場コンテキスト分析器"""
     
+    def __init__(self):
+        # 直近に事前計算したデータフレームと足ごとの系列（バックテストでは同じデータで全ての足を評価する）
+        self._series_cache = None
+    
+    def compute_context_series(self, data: pd.DataFrame) -> MarketContextSeries:
+        """
+        全ての足の市場コンテキスト（現在価格・24本出来高・ボラティリティ・トレンド・フェーズ）を一括計算
+        
+        Args:
+            data: OHLCVデータ（timestamp列、または日時インデックス）
+            
+        Returns:
+            MarketContextSeries: 足と同じ並びの配列
+        """
+        if data.empty:
+            raise InsufficientMarketDataError(
+                message="市場データが取得できませんでした。OHLCVデータが空です。",
+                error_type="market_data_empty",
+                missing_data="ohlcv_data"
+            )
+        if 'timestamp' in data.columns:
+            timestamps = pd.to_datetime(data['timestamp'])
+        elif pd.api.types.is_datetime64_any_dtype(data.index):
+            timestamps = pd.Series(data.index)
+        else:
+            raise ValueError("バックテスト分析ではデータにtimestampカラムが必要です。")
+        return MarketContextSeries(
+            timestamps,
+            data['open'].to_numpy(),
+            data['close'].to_numpy(dtype=float),
+            data['volume'].to_numpy(dtype=float)
+        )
+    
+    @staticmethod
+    def _data_fingerprint(data: pd.DataFrame):
+        """同じデータフレームが変更されていないかの簡易確認（件数・先頭/末尾の時刻・末尾の価格と出来高）"""
+        timestamps = data['timestamp'] if 'timestamp' in data.columns else data.index.to_series()
+        return (len(data), timestamps.iloc[0], timestamps.iloc[-1],
+                data['open'].iloc[-1], data['close'].iloc[-1], data['volume'].iloc[-1])
+    
+    def _cached_series(self, data: pd.DataFrame) -> Optional[MarketContextSeries]:
+        """同じデータフレームなら事前計算済みの系列を返し、新しいデータなら計算する"""
+        try:
+            fingerprint = self._data_fingerprint(data)
+            cache = self._series_cache
+            if cache is not None and cache[0]() is data and cache[1] == fingerprint:
+                return cache[2]
+            if not data.index.is_unique:
+                return None
+            series = self.compute_context_series(data)
+        except (ValueError, KeyError, TypeError):
+            return None
+        self._series_cache = (weakref.ref(data), fingerprint, series)
+        return series
+    
     def analyze_market_phase(self, data: pd.DataFrame, target_timestamp: datetime = None, is_realtime: bool = True) -> MarketContext:
         """市場フェーズを分析
         
+        バックテスト（is_realtime=False）では足ごとの系列を事前計算し、評価時刻の最近傍足を索引参照する。
+        索引参照できないデータは従来の計算（_analyze_market_phase_reference）を使う。
+        
         Args:
             data: OHLCVデータ
             target_timestamp: 分析対象の時刻（バックテストの場合必須）
             is_realtime: リアルタイム分析かどうかのフラグ
         """
+        if not is_realtime and target_timestamp is not None and not data.empty:
+            series = self._cached_series(data)
+            if series is not None:
+                context = series.context_for_target(target_timestamp)
+                if context is not None:
+                    return context
+        return self._analyze_market_phase_reference(data, target_timestamp, is_realtime)
+    
+    def _analyze_market_phase_reference(self, data: pd.DataFrame, target_timestamp: datetime = None,
+                                        is_realtime: bool = True) -> MarketContext:
+        """市場フェーズを1回分だけ計算する従来の実装（索引参照できないデータ・リアルタイム分析用）"""
         try:
             if data.empty:
                 error_msg = f"市場データが取得できませんでした。OHLCVデータが空です。"
@@ -717,22 +906,12 @@ class SimpleMarketContextAnalyzer(IMarketContextAnalyzer):
             # 簡易トレンド判定
             if len(data) >= 20:
                 sma_20 = data['close'].rolling(20).mean().iloc[-1]
-                if current_price > sma_20 * 1.02:
-                    trend = 'BULLISH'
-                elif current_price < sma_20 * 0.98:
-                    trend = 'BEARISH'
-                else:
-                    trend = 'SIDEWAYS'
+                trend = _classify_trend(current_price, sma_20)
             else:
                 trend = 'SIDEWAYS'
             
             # 簡易フェーズ判定
-            if volatility < 0.01:
-                phase = 'ACCUMULATION'
-            elif volatility < 0.03:
-                phase = 'MARKUP' if trend == 'BULLISH' else 'MARKDOWN'
-            else:
-                phase = 'DISTRIBUTION'
+            phase = _classify_phase(volatility, trend)
             
             return MarketContext(
                 current_price=current_price,
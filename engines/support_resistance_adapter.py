@@ -10,6 +10,8 @@ from typing import List, Dict, Any, Optional, Tuple
 import sys
 import os
 import importlib
+import threading
+from collections import OrderedDict
 from pathlib import Path
 
 # プロジェクトルートをパスに追加
@@ -89,6 +91,82 @@ class SupportResistanceVisualizerAdapter(ISupportResistanceProvider):
         return "1.0.0"
 
 
+class IncrementalSupportResistanceAdapter(ISupportResistanceProvider):
+    """
+    スライディングウィンドウ型検出器のアダプター
+    
+    同じ系列に足を追記しながら繰り返し呼ばれる場合（バックテスト・リアルタイム監視）に、
+    前回からの追加分だけを処理する。検出器の状態はプロセス内で共有され、
+    FlexibleSupportResistanceDetectorを毎回作り直しても引き継がれる。
+    出力は find_all_levels と同じ形式。
+    """
+    
+    MAX_SERIES = 16  # 保持する系列数の上限（古いものから破棄）
+    
+    _detectors: 'OrderedDict[tuple, Any]' = OrderedDict()
+    _lock = threading.Lock()
+    
+    def __init__(self, tolerance_pct: float = 0.01, order: int = 5):
+        from engines.incremental_support_resistance import IncrementalSupportResistanceDetector
+        self._detector_class = IncrementalSupportResistanceDetector
+        self.tolerance_pct = tolerance_pct
+        self.order = order
+    
+    @staticmethod
+    def _supports_incremental(df: pd.DataFrame) -> bool:
+        """find_all_levelsと同じ結果を保証できる入力か（既定のRangeIndex・時刻列あり）"""
+        index = df.index
+        return ('timestamp' in df.columns and isinstance(index, pd.RangeIndex)
+                and index.start == 0 and index.step == 1)
+    
+    def _series_key(self, df: pd.DataFrame) -> tuple:
+        first = df.iloc[0]
+        return (pd.Timestamp(first['timestamp']), float(first['high']), float(first['low']),
+                float(first['volume']), self.tolerance_pct, self.order)
+    
+    def detect_basic_levels(self, df: pd.DataFrame, min_touches: int = 2) -> List[Dict[str, Any]]:
+        """基本的な支持線・抵抗線検出"""
+        if len(df) < 10:
+            return []
+        
+        try:
+            if not self._supports_incremental(df):
+                import support_resistance_visualizer as srv
+                return srv.find_all_levels(df, min_touches=min_touches)
+            
+            key = self._series_key(df)
+            with self._lock:
+                detector = self._detectors.pop(key, None)
+                if detector is None:
+                    detector = self._detector_class(order=self.order, tolerance_pct=self.tolerance_pct)
+                self._detectors[key] = detector
+                while len(self._detectors) > self.MAX_SERIES:
+                    self._detectors.popitem(last=False)
+                
+                try:
+                    detector.update(df)
+                except ValueError:
+                    # 時刻が単調増加でないデータは従来の全期間検出
+                    self._detectors.pop(key, None)
+                    import support_resistance_visualizer as srv
+                    return srv.find_all_levels(df, min_touches=min_touches)
+                return detector.get_levels(min_touches)
+        except Exception as e:
+            raise RuntimeError(f"レベル検出に失敗: {e}")
+    
+    @classmethod
+    def clear_cache(cls):
+        """保持している検出器の状態を破棄"""
+        with cls._lock:
+            cls._detectors.clear()
+    
+    def get_provider_name(self) -> str:
+        return "IncrementalSupportResistance"
+    
+    def get_provider_version(self) -> str:
+        return "1.0.0"
+
+
 class SupportResistanceMLAdapter(IMLEnhancementProvider):
     """support_resistance_ml.pyのアダプター"""
     
@@ -166,9 +244,13 @@ class FlexibleSupportResistanceDetector:
                        ml_provider: Optional[IMLEnhancementProvider]):
         """プロバイダーを初期化"""
         # 基本プロバイダーの設定
+        # SR_DETECTOR_MODE=batch で従来の全期間検出（find_all_levels）を使用
         if base_provider is None:
             try:
-                self.base_provider = SupportResistanceVisualizerAdapter()
+                if os.getenv('SR_DETECTOR_MODE', 'incremental').lower() == 'batch':
+                    self.base_provider = SupportResistanceVisualizerAdapter()
+                else:
+                    self.base_provider = IncrementalSupportResistanceAdapter()
             except ImportError as e:
                 print(f"Warning: デフォルト基本プロバイダーの初期化に失敗: {e}")
                 self.base_provider = None
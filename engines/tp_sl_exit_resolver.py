@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+TP/SL到達判定のバッチリゾルバー
+
+従来の ScalableAnalysisSystem._find_tp_sl_exit はトレードごとに
+キャッシュデータ全体のタイムスタンプを正規化し、エントリー後のスライスをコピーして
+iterrows() で1本ずつ走査していた。
+
+このリゾルバーは:
+- タイムスタンプをint64（UTCナノ秒）で1回だけ事前計算し、searchsortedでエントリー位置を特定
+- high/low の区間最大・最小をスパーステーブル（2^k区間）で事前計算し、
+  全トレードの「最初に到達した足」を二分リフティングでまとめて求める（O(log N) / トレード）
+- 同一足でTP/SLの両方に到達した場合の扱いをポリシーで選択
+- ショートポジションに対応
+"""
+
+import logging
+from typing import Dict, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+SIDE_LONG = 'long'
+SIDE_SHORT = 'short'
+
+# 同一足でTP/SL両方に到達した場合のポリシー
+AMBIGUITY_TP_FIRST = 'tp_first'       # 利確を優先（従来の_find_tp_sl_exitと同じ）
+AMBIGUITY_SL_FIRST = 'sl_first'       # 損切りを優先（保守的）
+AMBIGUITY_UNRESOLVED = 'unresolved'   # 判定不能として扱う（到達なしと同じ）
+AMBIGUITY_POLICIES = (AMBIGUITY_TP_FIRST, AMBIGUITY_SL_FIRST, AMBIGUITY_UNRESOLVED)
+
+NO_EXIT = -1
+
+
+class TPSLExitResolver:
+    """
+    OHLCVデータに対するTP/SL到達判定
+
+    Example:
+        resolver = TPSLExitResolver(ohlcv_df)
+        result = resolver.resolve_batch(entry_indices, tp_prices, sl_prices, sides)
+        exit_time, exit_price, is_success = resolver.resolve(entry_time, tp, sl)
+    """
+
+    def __init__(self, market_data: pd.DataFrame, ambiguity_policy: str = AMBIGUITY_TP_FIRST):
+        """
+        Args:
+            market_data: OHLCVデータ（timestamp / high / low が必要）
+            ambiguity_policy: 同一足でTP/SL両方に到達した場合のポリシー
+        """
+        if ambiguity_policy not in AMBIGUITY_POLICIES:
+            raise ValueError(f"不明なambiguity_policy: {ambiguity_policy} (有効値: {AMBIGUITY_POLICIES})")
+        self.ambiguity_policy = ambiguity_policy
+
+        market_data = self._normalize_timestamp_column(market_data)
+        timestamps = pd.to_datetime(market_data['timestamp'], utc=True)
+
+        order = None
+        if not timestamps.is_monotonic_increasing:
+            order = np.argsort(timestamps.to_numpy(), kind='stable')
+
+        self.timestamps = pd.DatetimeIndex(timestamps).as_unit('ns')
+        highs = market_data['high'].to_numpy(dtype=float)
+        lows = market_data['low'].to_numpy(dtype=float)
+        if order is not None:
+            self.timestamps = self.timestamps[order]
+            highs = highs[order]
+            lows = lows[order]
+
+        self.timestamps_ns = self.timestamps.asi8
+        # NaNの足は到達なしとして扱う（従来の float(nan) >= tp が False になる挙動と同じ）
+        self.highs = np.where(np.isnan(highs), -np.inf, highs)
+        self.lows = np.where(np.isnan(lows), np.inf, lows)
+        self.size = len(self.timestamps_ns)
+
+        self._high_max_table = self._build_sparse_table(self.highs, np.maximum)
+        self._low_min_table = self._build_sparse_table(self.lows, np.minimum)
+
+    @staticmethod
+    def _normalize_timestamp_column(market_data: pd.DataFrame) -> pd.DataFrame:
+        """timestampカラムを用意（インデックスにある場合は列に変換）"""
+        if 'timestamp' in market_data.columns:
+            return market_data
+        if market_data.index.name == 'timestamp' or pd.api.types.is_datetime64_any_dtype(market_data.index):
+            market_data = market_data.reset_index()
+            if 'index' in market_data.columns:
+                market_data = market_data.rename(columns={'index': 'timestamp'})
+            return market_data
+        market_data = market_data.copy()
+        market_data['timestamp'] = pd.to_datetime(market_data.index, utc=True)
+        return market_data
+
+    @staticmethod
+    def _build_sparse_table(values: np.ndarray, combine) -> list:
+        """table[k][i] = combine(values[i : i + 2^k])"""
+        table = [values]
+        width = 1
+        while width * 2 <= len(values):
+            prev = table[-1]
+            table.append(combine(prev[:-width], prev[width:]))
+            width *= 2
+        return table
+
+    def _first_touch(self, starts: np.ndarray, thresholds: np.ndarray, use_high: bool) -> np.ndarray:
+        """
+        各startsから見て最初に到達する足のインデックスを返す（到達なしはNO_EXIT）
+
+        use_high=True: high >= threshold、False: low <= threshold
+        """
+        table = self._high_max_table if use_high else self._low_min_table
+        positions = starts.copy()
+
+        # 「区間内で未到達」の2^kブロックを大きい順に読み飛ばす
+        for k in range(len(table) - 1, -1, -1):
+            level = table[k]
+            width = 1 << k
+            valid = positions + width <= self.size
+            if not valid.any():
+                continue
+            idx = np.where(valid, positions, 0)
+            block = level[np.minimum(idx, len(level) - 1)]
+            untouched = (block < thresholds) if use_high else (block > thresholds)
+            positions = np.where(valid & untouched, positions + width, positions)
+
+        in_range = positions < self.size
+        safe = np.where(in_range, positions, 0)
+        if use_high:
+            hit = in_range & (self.highs[safe] >= thresholds)
+        else:
+            hit = in_range & (self.lows[safe] <= thresholds)
+        return np.where(hit, positions, NO_EXIT)
+
+    def entry_indices_for(self, entry_times: Sequence) -> np.ndarray:
+        """
+        エントリー時刻をエントリー足のインデックスに変換
+
+        エントリー時刻以前で最も新しい足のインデックス（全ての足より前なら-1）を返す。
+        判定はエントリー足の次の足（エントリー時刻より後の足）から行う。
+        """
+        entry_ns = np.array([self._to_utc_ns(t) for t in entry_times], dtype=np.int64)
+        return np.searchsorted(self.timestamps_ns, entry_ns, side='right') - 1
+
+    @staticmethod
+    def _to_utc_ns(entry_time) -> int:
+        entry = pd.Timestamp(entry_time)
+        if entry.tzinfo is None:
+            entry = entry.tz_localize('UTC')
+        return entry.tz_convert('UTC').value
+
+    def resolve_batch(self, entry_indices: Sequence[int], tp_prices: Sequence[float],
+                      sl_prices: Sequence[float],
+                      sides: Union[str, Sequence[str]] = SIDE_LONG,
+                      ambiguity_policy: str = None) -> Dict[str, np.ndarray]:
+        """
+        全トレードのTP/SL到達をまとめて判定
+
+        Args:
+            entry_indices: エントリー足のインデックス（判定は次の足から）
+            tp_prices: 利確価格
+            sl_prices: 損切り価格
+            sides: 'long' / 'short'（単一値または配列）
+            ambiguity_policy: 同一足でTP/SL両方に到達した場合のポリシー（省略時はインスタンス設定）
+
+        Returns:
+            Dict: exit_index（到達なしは-1）, exit_price（到達なしはNaN）,
+                  is_success（TP到達でTrue）, ambiguous（同一足で両方到達）
+        """
+        policy = ambiguity_policy or self.ambiguity_policy
+        if policy not in AMBIGUITY_POLICIES:
+            raise ValueError(f"不明なambiguity_policy: {policy} (有効値: {AMBIGUITY_POLICIES})")
+
+        starts = np.maximum(np.asarray(entry_indices, dtype=np.int64) + 1, 0)
+        tp = np.asarray(tp_prices, dtype=float)
+        sl = np.asarray(sl_prices, dtype=float)
+        if isinstance(sides, str):
+            is_short = np.full(len(starts), sides == SIDE_SHORT)
+        else:
+            is_short = np.asarray([side == SIDE_SHORT for side in sides], dtype=bool)
+
+        if self.size == 0 or len(starts) == 0:
+            count = len(starts)
+            return {
+                'exit_index': np.full(count, NO_EXIT, dtype=np.int64),
+                'exit_price': np.full(count, np.nan),
+                'is_success': np.zeros(count, dtype=bool),
+                'ambiguous': np.zeros(count, dtype=bool)
+            }
+
+        # ロング: TPはhigh、SLはlow / ショート: TPはlow、SLはhigh
+        tp_long = self._first_touch(starts, tp, use_high=True)
+        sl_long = self._first_touch(starts, sl, use_high=False)
+        tp_short = self._first_touch(starts, tp, use_high=False)
+        sl_short = self._first_touch(starts, sl, use_high=True)
+        tp_idx = np.where(is_short, tp_short, tp_long)
+        sl_idx = np.where(is_short, sl_short, sl_long)
+
+        big = np.iinfo(np.int64).max
+        tp_key = np.where(tp_idx == NO_EXIT, big, tp_idx)
+        sl_key = np.where(sl_idx == NO_EXIT, big, sl_idx)
+
+        ambiguous = (tp_key == sl_key) & (tp_key != big)
+        if policy == AMBIGUITY_SL_FIRST:
+            tp_wins = tp_key < sl_key
+        else:
+            tp_wins = tp_key <= sl_key
+
+        exit_index = np.where(tp_wins, tp_key, sl_key)
+        exit_index = np.where(exit_index == big, NO_EXIT, exit_index)
+        if policy == AMBIGUITY_UNRESOLVED:
+            exit_index = np.where(ambiguous, NO_EXIT, exit_index)
+
+        hit = exit_index != NO_EXIT
+        is_success = hit & tp_wins
+        exit_price = np.where(hit, np.where(tp_wins, tp, sl), np.nan)
+
+        return {
+            'exit_index': exit_index.astype(np.int64),
+            'exit_price': exit_price,
+            'is_success': is_success,
+            'ambiguous': ambiguous
+        }
+
+    def resolve(self, entry_time, tp_price: float, sl_price: float, side: str = SIDE_LONG,
+                ambiguity_policy: str = None) -> Tuple[Optional[pd.Timestamp], Optional[float], Optional[bool]]:
+        """
+        単一トレードのTP/SL到達判定（従来の_find_tp_sl_exitと同じ戻り値）
+
+        Returns:
+            tuple: (exit_time, exit_price, is_success)。到達しない場合は (None, None, None)
+        """
+        entry_indices = self.entry_indices_for([entry_time])
+        result = self.resolve_batch(entry_indices, [tp_price], [sl_price], side, ambiguity_policy)
+        exit_index = int(result['exit_index'][0])
+        if exit_index == NO_EXIT:
+            return None, None, None
+        return self.timestamps[exit_index], float(result['exit_price'][0]), bool(result['is_success'][0])
@@ -14,20 +14,13 @@ import numpy as np
 import warnings
 from typing import List, Dict, Optional, Tuple
 from datetime import datetime, timedelta
-from sklearn.model_selection import TimeSeriesSplit
-from sklearn.preprocessing import StandardScaler
-from sklearn.metrics import roc_auc_score, classification_report
-from sklearn.ensemble import RandomForestClassifier
-import lightgbm as lgb
+import importlib.util
 
-try:
-    import xgboost as xgb
-    HAS_XGBOOST = True
-except ImportError:
-    HAS_XGBOOST = False
+# sklearn / lightgbm / xgboost / joblib は使うメソッドの中で読み込む（予測器を使わないワーカーの起動を軽くする）
+HAS_XGBOOST = importlib.util.find_spec('xgboost') is not None
+if not HAS_XGBOOST:
     print("⚠️ XGBoostが利用できません。LightGBMとRandomForestを使用します。")
 
-import joblib
 import sys
 import os
 
@@ -50,7 +43,12 @@ class EnhancedMLPredictor(IBreakoutPredictor):
     - アンサンブル手法
     """
     
+    # 特徴量エンジニアリングを変更した場合は更新（訓練済みモデルのキャッシュを無効化）
+    FEATURE_SET_VERSION = 1
+    
     def __init__(self):
+        from sklearn.preprocessing import StandardScaler
+
         self.models = {}
         self.scaler = StandardScaler()
         self.is_trained = False
@@ -95,6 +93,13 @@ class EnhancedMLPredictor(IBreakoutPredictor):
             }
         }
     
+    # レベル特異的特徴量（create_enhanced_features では volume_trend の直後に並ぶ）
+    LEVEL_FEATURE_COLUMNS = [
+        'support_distance', 'support_strength', 'support_touches',
+        'resistance_distance', 'resistance_strength', 'resistance_touches',
+        'level_position'
+    ]
+    
     def create_enhanced_features(self, data: pd.DataFrame, levels: List[SupportResistanceLevel]) -> pd.DataFrame:
         """
         改善された特徴量エンジニアリング
@@ -105,13 +110,37 @@ class EnhancedMLPredictor(IBreakoutPredictor):
         3. 相互作用特徴量の追加
         """
         
-        features = data.copy()
-        
         # === 1. 基本特徴量の復活（過度に削除されていた重要特徴量） ===
-        if 'close' not in features.columns:
+        if 'close' not in data.columns:
             print("⚠️ 基本価格情報が不足しています")
             return pd.DataFrame()
         
+        features = self._create_market_features(data)
+        
+        # === 4. レベル特異的特徴量 ===
+        if not levels:
+            # レベルが空の場合はシグナルスキップ
+            print("⚠️ サポート・レジスタンスレベルが提供されていません - シグナル検知をスキップ")
+            return None  # シグナル検知スキップ
+        
+        level_features = self._level_features(data['close'].iloc[-1], levels)
+        # レベル特徴量の追加に失敗した場合はシグナルスキップ
+        if level_features is None:
+            return None  # シグナル検知スキップ
+        
+        # レベル特徴量は全行で定数のため、市場特徴量の列順を保ったまま挿入
+        insert_at = features.columns.get_loc('volume_trend') + 1
+        for offset, column in enumerate(self.LEVEL_FEATURE_COLUMNS):
+            features.insert(insert_at + offset, column, level_features[column])
+        
+        print(f"✅ 拡張特徴量生成完了: {len(features.columns)}個の特徴量")
+        return features
+    
+    def _create_market_features(self, data: pd.DataFrame) -> pd.DataFrame:
+        """レベルに依存しない市場特徴量（全レベル共通、NaN補完済み）"""
+        
+        features = data.copy()
+        
         # 基本価格特徴量
         features['price_return'] = features['close'].pct_change()
         features['log_return'] = np.log(features['close'] / features['close'].shift(1))
@@ -162,18 +191,6 @@ class EnhancedMLPredictor(IBreakoutPredictor):
         features['volume_sma_ratio'] = features['volume'] / features['volume'].rolling(20).mean()
         features['volume_trend'] = features['volume'].rolling(5).apply(lambda x: np.polyfit(range(5), x, 1)[0] if len(x) == 5 else 0)
         
-        # === 4. レベル特異的特徴量 ===
-        if levels:
-            level_features = self._add_level_features(features, levels)
-            # レベル特徴量の追加に失敗した場合はシグナルスキップ
-            if level_features is None:
-                return None  # シグナル検知スキップ
-            features = level_features
-        else:
-            # レベルが空の場合はシグナルスキップ
-            print("⚠️ サポート・レジスタンスレベルが提供されていません - シグナル検知をスキップ")
-            return None  # シグナル検知スキップ
-        
         # === 5. 基本的な価格レンジ特徴量（必要な特徴量を先に作成） ===
         features['high_low_ratio'] = (features['high'] - features['low']) / features['close']
         features['close_location'] = (features['close'] - features['low']) / (features['high'] - features['low'])
@@ -197,48 +214,47 @@ class EnhancedMLPredictor(IBreakoutPredictor):
             features[f'rsi_lag_{lag}'] = features['rsi_14'].shift(lag)
         
         # NaN値の処理
-        features = features.fillna(method='ffill').fillna(method='bfill')
+        features = features.ffill().bfill()
         
-        print(f"✅ 拡張特徴量生成完了: {len(features.columns)}個の特徴量")
         return features
     
     def _add_level_features(self, features: pd.DataFrame, levels: List[SupportResistanceLevel]) -> pd.DataFrame:
         """レベル特異的特徴量を追加"""
         
-        current_price = features['close'].iloc[-1]
+        level_features = self._level_features(features['close'].iloc[-1], levels)
+        if level_features is None:
+            return None  # シグナル検知スキップ
+        
+        for column in self.LEVEL_FEATURE_COLUMNS:
+            features[column] = level_features[column]
+        return features
+    
+    def _level_features(self, current_price: float, levels: List[SupportResistanceLevel]) -> Optional[Dict[str, float]]:
+        """現在価格に対する最寄りのサポート・レジスタンスの特徴量（不足時はNone）"""
         
         # 最も近いサポート・レジスタンス
         supports = [l for l in levels if l.level_type == 'support' and l.price < current_price]
         resistances = [l for l in levels if l.level_type == 'resistance' and l.price > current_price]
         
-        if supports:
-            nearest_support = min(supports, key=lambda x: abs(x.price - current_price))
-            features['support_distance'] = (current_price - nearest_support.price) / current_price
-            features['support_strength'] = nearest_support.strength
-            features['support_touches'] = nearest_support.touch_count
-        else:
-            # 実データが利用できない場合はNoneを返してシグナルスキップを促す
+        # 実データが利用できない場合はNoneを返してシグナルスキップを促す
+        if not supports or not resistances:
             return None  # シグナル検知スキップ
         
-        if resistances:
-            nearest_resistance = min(resistances, key=lambda x: abs(x.price - current_price))
-            features['resistance_distance'] = (nearest_resistance.price - current_price) / current_price
-            features['resistance_strength'] = nearest_resistance.strength
-            features['resistance_touches'] = nearest_resistance.touch_count
-        else:
-            # 実データが利用できない場合はNoneを返してシグナルスキップを促す
-            return None  # シグナル検知スキップ
+        nearest_support = min(supports, key=lambda x: abs(x.price - current_price))
+        nearest_resistance = min(resistances, key=lambda x: abs(x.price - current_price))
         
         # レベル間ポジション
-        if supports and resistances:
-            total_range = resistances[0].price - supports[0].price
-            current_position = (current_price - supports[0].price) / total_range
-            features['level_position'] = current_position
-        else:
-            # サポートまたはレジスタンスが検出できない場合はシグナルスキップ
-            return None  # シグナル検知スキップ
+        total_range = resistances[0].price - supports[0].price
         
-        return features
+        return {
+            'support_distance': (current_price - nearest_support.price) / current_price,
+            'support_strength': nearest_support.strength,
+            'support_touches': nearest_support.touch_count,
+            'resistance_distance': (nearest_resistance.price - current_price) / current_price,
+            'resistance_strength': nearest_resistance.strength,
+            'resistance_touches': nearest_resistance.touch_count,
+            'level_position': (current_price - supports[0].price) / total_range
+        }
     
     def train_model(self, data: pd.DataFrame, levels: List[SupportResistanceLevel]) -> bool:
         """
@@ -278,8 +294,13 @@ class EnhancedMLPredictor(IBreakoutPredictor):
             self.models = {}
             cv_scores = {}
             
+            from sklearn.ensemble import RandomForestClassifier
+            import lightgbm as lgb
+
             # XGBoost
             if HAS_XGBOOST:
+                import xgboost as xgb
+
                 print("  🚀 XGBoost訓練中...")
                 self.models['xgb'] = xgb.XGBClassifier(**self.model_params['xgb'])
                 self.models['xgb'].fit(X_scaled, y)
@@ -349,47 +370,133 @@ class EnhancedMLPredictor(IBreakoutPredictor):
             X_scaled = self.scaler.transform(X)
             
             # アンサンブル予測
-            predictions = {}
-            for model_name, model in self.models.items():
-                if hasattr(model, 'predict_proba'):
-                    pred = model.predict_proba(X_scaled)[0, 1]
-                else:
-                    pred = model.predict(X_scaled)[0]
-                predictions[model_name] = pred
-            
-            # 重み付きアンサンブル
-            breakout_prob = np.average(
-                list(predictions.values()), 
-                weights=[self.ensemble_weights[name] for name in predictions.keys()]
-            )
-            
-            bounce_prob = 1.0 - breakout_prob
-            
-            # 信頼度計算（予測の一致度に基づく）
-            prediction_std = np.std(list(predictions.values()))
-            confidence = max(0.1, 1.0 - prediction_std * 2)
-            
-            # 価格ターゲット計算
-            current_price = current_data['close'].iloc[-1]
-            if level.level_type == 'resistance':
-                target_price = level.price * 1.015  # 1.5%上
-            else:
-                target_price = level.price * 0.985  # 1.5%下
-            
-            return BreakoutPrediction(
-                level=level,
-                breakout_probability=float(breakout_prob),
-                bounce_probability=float(bounce_prob),
-                prediction_confidence=float(confidence),
-                predicted_price_target=float(target_price),
-                time_horizon_minutes=30,  # 30分予測
-                model_name=f"EnhancedEnsemble_AUC{self.accuracy_metrics.get('ensemble_auc', 0.5):.2f}"
-            )
+            breakout_probs, confidences = self._ensemble_predict(X_scaled)
+            return self._build_prediction(level, breakout_probs[0], confidences[0])
             
         except Exception as e:
             print(f"❌ 予測エラー: {e}")
             return self._create_default_prediction(level)
     
+    def predict_breakouts_batch(self, current_data: pd.DataFrame,
+                                levels: List[SupportResistanceLevel]) -> List[Optional[BreakoutPrediction]]:
+        """
+        複数レベルの一括ブレイクアウト予測
+        
+        市場特徴量（移動平均・RSI・MACD・ボリンジャー・トレンド強度等）は1回だけ計算し、
+        レベル特異的特徴量を行ごとに積み上げた行列に対して各モデルの predict_proba を1回ずつ呼び出す。
+        
+        Returns:
+            levels と同じ順序の予測リスト（各要素は predict_breakout(current_data, level) と同じ）
+        """
+        return self._predict_level_sets(current_data, [[level] for level in levels], levels)
+    
+    def _predict_level_sets(self, current_data: pd.DataFrame, level_sets: List[List[SupportResistanceLevel]],
+                            targets: List[SupportResistanceLevel]) -> List[Optional[BreakoutPrediction]]:
+        """
+        レベル集合ごとの一括予測
+        
+        targets[i] の予測には create_enhanced_features(current_data, level_sets[i]) の最新行を使う
+        """
+        if not targets:
+            return []
+        
+        try:
+            if not self.is_trained:
+                print("⚠️ モデルが訓練されていません")
+                return [self._create_default_prediction(level) for level in targets]
+            
+            if 'close' not in current_data.columns:
+                print("⚠️ 基本価格情報が不足しています")
+                print("⚠️ 十分な特徴量データがありません - シグナル検知をスキップ")
+                return [None] * len(targets)
+            
+            # レベルごとの特徴量（実データが利用できないレベルはシグナルスキップ）
+            current_price = current_data['close'].iloc[-1]
+            level_rows = [self._level_features(current_price, level_set) if level_set else None
+                          for level_set in level_sets]
+            valid = [i for i, row in enumerate(level_rows) if row is not None]
+            predictions = [None] * len(targets)
+            
+            if len(valid) < len(targets):
+                print(f"⚠️ サポート・レジスタンスの実データが不足 - {len(targets) - len(valid)}件のシグナル検知をスキップ")
+            if not valid:
+                return predictions
+            
+            # 全レベル共通の市場特徴量（1回だけ計算）
+            market_features = self._create_market_features(current_data)
+            if len(market_features) < 10:
+                print("⚠️ 十分な特徴量データがありません - シグナル検知をスキップ")
+                return predictions
+        
+        except Exception as e:
+            print(f"❌ 予測エラー: {e}")
+            return [self._create_default_prediction(level) for level in targets]
+        
+        try:
+            # 最新データポイントの市場特徴量 × レベル特徴量の行列
+            latest = market_features.iloc[-1]
+            X = pd.DataFrame({
+                column: [level_rows[i][column] for i in valid] if column in self.LEVEL_FEATURE_COLUMNS
+                else np.repeat(latest[column], len(valid))
+                for column in self.feature_columns
+            }, columns=self.feature_columns).fillna(0)
+            X_scaled = self.scaler.transform(X)
+            
+            # アンサンブル予測（各モデル1回）
+            breakout_probs, confidences = self._ensemble_predict(X_scaled)
+            for row, i in enumerate(valid):
+                predictions[i] = self._build_prediction(targets[i], breakout_probs[row], confidences[row])
+        
+        except Exception as e:
+            print(f"❌ 予測エラー: {e}")
+            for i in valid:
+                predictions[i] = self._create_default_prediction(targets[i])
+        
+        return predictions
+    
+    def _ensemble_predict(self, X_scaled: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """重み付きアンサンブルのブレイクアウト確率と信頼度（行ごと）"""
+        predictions = {}
+        for model_name, model in self.models.items():
+            if hasattr(model, 'predict_proba'):
+                predictions[model_name] = model.predict_proba(X_scaled)[:, 1]
+            else:
+                predictions[model_name] = model.predict(X_scaled)
+        
+        stacked = np.vstack(list(predictions.values()))
+        
+        # 重み付きアンサンブル
+        breakout_probs = np.average(
+            stacked, axis=0,
+            weights=[self.ensemble_weights[name] for name in predictions.keys()]
+        )
+        
+        # 信頼度計算（予測の一致度に基づく）
+        prediction_std = np.std(stacked, axis=0)
+        confidences = np.maximum(0.1, 1.0 - prediction_std * 2)
+        return breakout_probs, confidences
+    
+    def _build_prediction(self, level: SupportResistanceLevel, breakout_prob: float,
+                          confidence: float) -> BreakoutPrediction:
+        """アンサンブル予測結果からBreakoutPredictionを作成"""
+        bounce_prob = 1.0 - breakout_prob
+        
+        # 価格ターゲット計算
+        if level.level_type == 'resistance':
+            target_price = level.price * 1.015  # 1.5%上
+        else:
+            target_price = level.price * 0.985  # 1.5%下
+        
+        return BreakoutPrediction(
+            level=level,
+            breakout_probability=float(breakout_prob),
+            bounce_probability=float(bounce_prob),
+            prediction_confidence=float(confidence),
+            predicted_price_target=float(target_price),
+            time_horizon_minutes=30,  # 30分予測
+            model_name=f"EnhancedEnsemble_AUC{self.accuracy_metrics.get('ensemble_auc', 0.5):.2f}"
+        )
+    
     def _create_training_data(self, features: pd.DataFrame, levels: List[SupportResistanceLevel]) -> Tuple[pd.DataFrame, pd.Series]:
         """
         改善されたラベル作成ロジック
@@ -497,6 +604,9 @@ class EnhancedMLPredictor(IBreakoutPredictor):
     
     def _cross_validate(self, model, X, y, n_splits=5):
         """時系列クロスバリデーション"""
+        from sklearn.model_selection import TimeSeriesSplit
+        from sklearn.metrics import roc_auc_score
+
         tscv = TimeSeriesSplit(n_splits=n_splits)
         scores = []
         
@@ -594,6 +704,7 @@ class EnhancedMLPredictor(IBreakoutPredictor):
                 'accuracy_metrics': self.accuracy_metrics,
                 'is_trained': self.is_trained
             }
+            import joblib
             joblib.dump(model_data, filepath)
             print(f"✅ モデル保存完了: {filepath}")
             return True
@@ -604,6 +715,7 @@ class EnhancedMLPredictor(IBreakoutPredictor):
     def load_model(self, filepath: str) -> bool:
         """モデル読み込み"""
         try:
+            import joblib
             model_data = joblib.load(filepath)
             self.models = model_data['models']
             self.scaler = model_data['scaler']
@@ -14,6 +14,7 @@ from dataclasses import dataclass, asdict
 from enum import Enum
 
 from real_time_system.utils.colored_log import get_colored_logger
+from sqlite_access import db_connection, enqueue_write
 
 
 class ExecutionStatus(Enum):
@@ -99,7 +100,7 @@ class ExecutionLogDatabase:
     def _init_database(self):
         """データベース初期化"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with db_connection(self.db_path) as conn:
                 # 実行記録テーブル
                 conn.execute("""
                     CREATE TABLE IF NOT EXISTS execution_logs (
@@ -180,7 +181,7 @@ class ExecutionLogDatabase:
         execution_id = f"{execution_type.value.lower()}_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
         
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with db_connection(self.db_path) as conn:
                 conn.execute("""
                     INSERT INTO execution_logs (
                         execution_id, execution_type, symbol, symbols,
@@ -219,7 +220,7 @@ class ExecutionLogDatabase:
                                 estimated_patterns: Optional[int] = None) -> str:
         """事前定義されたIDで実行記録を作成"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with db_connection(self.db_path) as conn:
                 conn.execute("""
                     INSERT INTO execution_logs (
                         execution_id, execution_type, symbol, symbols,
@@ -290,7 +291,7 @@ class ExecutionLogDatabase:
             
             values.append(execution_id)  # WHERE条件用
             
-            with sqlite3.connect(self.db_path) as conn:
+            with db_connection(self.db_path) as conn:
                 conn.execute(f"""
                     UPDATE execution_logs 
                     SET {', '.join(updates)}
@@ -309,59 +310,67 @@ class ExecutionLogDatabase:
                           error_message: Optional[str] = None,
                           error_traceback: Optional[str] = None,
                           duration_seconds: Optional[float] = None):
-        """実行ステップを追加"""
-        try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.execute("""
-                    INSERT INTO execution_steps (
-                        execution_id, step_name, status, timestamp_start,
-                        timestamp_end, duration_seconds, result_data,
-                        error_message, error_traceback
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    execution_id,
-                    step_name,
-                    status,
-                    datetime.now().isoformat(),
-                    datetime.now().isoformat() if status in ['SUCCESS', 'FAILED'] else None,
-                    duration_seconds,
-                    json.dumps(result_data) if result_data else None,
-                    error_message,
-                    error_traceback
-                ))
-                conn.commit()
+        """
+        実行ステップを追加（遅延書き込みキュー経由で他の更新とまとめて書き込む）
+        
+        書き込み時のエラーは呼び出し元には返らず、遅延書き込みスレッドのログにのみ出力される。
+        即時に書き込んでエラーを受け取る場合は SQLITE_WRITE_BEHIND_ENABLED=false にする。
+        """
+        now = datetime.now().isoformat()
+        values = (
+            execution_id,
+            step_name,
+            status,
+            now,
+            now if status in ['SUCCESS', 'FAILED'] else None,
+            duration_seconds,
+            json.dumps(result_data) if result_data else None,
+            error_message,
+            error_traceback
+        )
+        
+        def write_step(conn):
+            conn.execute("""
+                INSERT INTO execution_steps (
+                    execution_id, step_name, status, timestamp_start,
+                    timestamp_end, duration_seconds, result_data,
+                    error_message, error_traceback
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, values)
             
-            # 完了タスクリストを更新
+            # 完了タスクリストを同じトランザクションで更新
             if status == 'SUCCESS':
-                self._update_completed_tasks(execution_id, step_name)
-            
+                self._update_completed_tasks(conn, execution_id, step_name)
+        
+        try:
+            enqueue_write(self.db_path, write_step)
             self.logger.debug(f"Added step {step_name} to {execution_id}: {status}")
             
         except Exception as e:
             self.logger.error(f"Failed to add execution step: {e}")
             raise
     
-    def _update_completed_tasks(self, execution_id: str, step_name: str):
-        """完了タスクリストを更新"""
-        try:
-            execution = self.get_execution(execution_id)
-            if execution:
-                completed_tasks = json.loads(execution.get('completed_tasks', '[]'))
-                if step_name not in completed_tasks:
-                    completed_tasks.append(step_name)
-                    
-                    total_tasks = execution.get('total_tasks', 0)
-                    progress = (len(completed_tasks) / total_tasks * 100) if total_tasks > 0 else 0
-                    
-                    with sqlite3.connect(self.db_path) as conn:
-                        conn.execute("""
-                            UPDATE execution_logs 
-                            SET completed_tasks = ?, progress_percentage = ?
-                            WHERE execution_id = ?
-                        """, (json.dumps(completed_tasks), progress, execution_id))
-                        conn.commit()
-        except Exception as e:
-            self.logger.error(f"Failed to update completed tasks: {e}")
+    @staticmethod
+    def _update_completed_tasks(conn, execution_id: str, step_name: str):
+        """完了タスクリストを更新（呼び出し側のトランザクション内）"""
+        row = conn.execute("""
+            SELECT completed_tasks, total_tasks FROM execution_logs WHERE execution_id = ?
+        """, (execution_id,)).fetchone()
+        if not row:
+            return
+        
+        completed_tasks = json.loads(row[0] or '[]')
+        if step_name not in completed_tasks:
+            completed_tasks.append(step_name)
+            
+            total_tasks = row[1] or 0
+            progress = (len(completed_tasks) / total_tasks * 100) if total_tasks > 0 else 0
+            
+            conn.execute("""
+                UPDATE execution_logs 
+                SET completed_tasks = ?, progress_percentage = ?
+                WHERE execution_id = ?
+            """, (json.dumps(completed_tasks), progress, execution_id))
     
     def add_execution_error(self, execution_id: str, error_info: Dict):
         """実行エラーを追加"""
@@ -372,7 +381,7 @@ class ExecutionLogDatabase:
                 error_info['timestamp'] = datetime.now().isoformat()
                 errors.append(error_info)
                 
-                with sqlite3.connect(self.db_path) as conn:
+                with db_connection(self.db_path) as conn:
                     conn.execute("""
                         UPDATE execution_logs 
                         SET errors = ?
@@ -387,7 +396,7 @@ class ExecutionLogDatabase:
     def get_execution(self, execution_id: str) -> Optional[Dict]:
         """実行記録を取得"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with db_connection(self.db_path) as conn:
                 conn.row_factory = sqlite3.Row
                 cursor = conn.execute("""
                     SELECT * FROM execution_logs WHERE execution_id = ?
@@ -419,7 +428,7 @@ class ExecutionLogDatabase:
                        days: Optional[int] = None) -> List[Dict]:
         """実行記録一覧を取得"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with db_connection(self.db_path) as conn:
                 conn.row_factory = sqlite3.Row
                 
                 where_conditions = []
@@ -473,7 +482,7 @@ class ExecutionLogDatabase:
         try:
             cutoff_date = (datetime.now() - timedelta(days=days)).isoformat()
             
-            with sqlite3.connect(self.db_path) as conn:
+            with db_connection(self.db_path) as conn:
                 conn.row_factory = sqlite3.Row
                 
                 # 基本統計
@@ -530,7 +539,7 @@ class ExecutionLogDatabase:
         try:
             cutoff_date = (datetime.now() - timedelta(days=days)).isoformat()
             
-            with sqlite3.connect(self.db_path) as conn:
+            with db_connection(self.db_path) as conn:
                 # 古いステップを削除
                 cursor = conn.execute("""
                     DELETE FROM execution_steps 
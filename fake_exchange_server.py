@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+ローカル疑似取引所サーバー（テスト・ベンチマーク用）
+
+決定的なOHLCVデータを返すHTTPサーバーをバックグラウンドスレッドで起動する。
+- Hyperliquid互換: POST /info（meta / spotMeta / candleSnapshot）
+  hyperliquid-python-sdk の Info(server.url, skip_ws=True) からそのまま利用可能
+- Gate.io互換: GET /api/v4/futures/usdt/candlesticks
+- 応答遅延・1リクエストの上限本数・決定的な429応答・サーバー側のレート制限を設定可能
+
+Usage:
+    with FakeExchangeServer(latency=0.05, rate_limit_every=5) as server:
+        info = Info(server.url, skip_ws=True)
+        candles = info.candles_snapshot('SOL', '1h', start_ms, end_ms)
+        print(server.stats)
+"""
+
+import asyncio
+import threading
+import time
+import zlib
+from typing import Dict, List, Optional
+
+from aiohttp import web
+
+from ohlcv_candle_store import timeframe_to_ms
+
+DEFAULT_SYMBOLS = ('BTC', 'ETH', 'SOL', 'HYPE', 'DOGE')
+
+
+def fake_meta(symbols=DEFAULT_SYMBOLS) -> dict:
+    """Hyperliquidのmeta応答（Info の meta 引数にも渡せる）"""
+    return {'universe': [{'name': symbol, 'szDecimals': 2} for symbol in symbols]}
+
+
+def fake_candle(symbol: str, interval: str, open_ms: int, interval_ms: int) -> Dict[str, float]:
+    """シンボル・時間足・時刻から決定的に生成した1本のOHLCV"""
+    seed = zlib.crc32(f"{symbol}:{interval}:{open_ms}".encode())
+    base = 50.0 + (zlib.crc32(symbol.encode()) % 1000)
+    drift = ((open_ms // interval_ms) % 500) / 500.0
+    open_price = base * (1 + 0.1 * drift) + (seed % 1000) / 1000.0
+    close_price = open_price + ((seed >> 10) % 200 - 100) / 100.0
+    high_price = max(open_price, close_price) + ((seed >> 18) % 50) / 100.0
+    low_price = min(open_price, close_price) - ((seed >> 24) % 50) / 100.0
+    return {
+        'open': round(open_price, 4),
+        'high': round(high_price, 4),
+        'low': round(low_price, 4),
+        'close': round(close_price, 4),
+        'volume': float(100 + seed % 10000),
+        'trades': int(1 + seed % 500),
+    }
+
+
+class FakeExchangeServer:
+    """決定的なOHLCVを返す疑似取引所HTTPサーバー"""
+
+    def __init__(self, latency: float = 0.0, max_candles_per_request: int = 5000,
+                 rate_limit_every: int = 0, max_requests_per_second: float = None,
+                 symbols=DEFAULT_SYMBOLS, host: str = '127.0.0.1', port: int = 0):
+        """
+        Args:
+            latency: キャンドル取得リクエストごとの応答遅延（秒）
+            max_candles_per_request: 1リクエストで返す最大本数
+            rate_limit_every: N回に1回キャンドル取得に429を返す（0で無効）
+            max_requests_per_second: 超過したリクエストに429を返す（Noneで無効）
+            symbols: metaで公開するシンボル
+        """
+        self.latency = latency
+        self.max_candles_per_request = max_candles_per_request
+        self.rate_limit_every = rate_limit_every
+        self.max_requests_per_second = max_requests_per_second
+        self.symbols = tuple(symbols)
+        self.host = host
+        self.port = port
+        self.stats = {'requests': 0, 'candle_requests': 0, 'rate_limited': 0, 'in_flight': 0, 'max_in_flight': 0}
+        self._request_times: List[float] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._runner: Optional[web.AppRunner] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    # ------------------------------------------------------------------
+    # データ生成
+    # ------------------------------------------------------------------
+
+    def candles(self, symbol: str, interval: str, start_ms: int, end_ms: int) -> List[Dict]:
+        """[start_ms, end_ms] に始値時刻を持つ足（上限本数まで）"""
+        interval_ms = timeframe_to_ms(interval)
+        first = -(-int(start_ms) // interval_ms) * interval_ms
+        now_ms = int(time.time() * 1000)
+        last = min(int(end_ms), now_ms)
+        result = []
+        for open_ms in range(first, last + 1, interval_ms):
+            if len(result) >= self.max_candles_per_request:
+                break
+            candle = fake_candle(symbol, interval, open_ms, interval_ms)
+            candle['t'] = open_ms
+            result.append(candle)
+        return result
+
+    # ------------------------------------------------------------------
+    # リクエスト処理
+    # ------------------------------------------------------------------
+
+    def _should_rate_limit(self) -> bool:
+        if self.rate_limit_every and self.stats['candle_requests'] % self.rate_limit_every == 0:
+            return True
+        if self.max_requests_per_second:
+            now = time.monotonic()
+            self._request_times = [t for t in self._request_times if now - t < 1.0]
+            if len(self._request_times) >= self.max_requests_per_second:
+                return True
+            self._request_times.append(now)
+        return False
+
+    async def _serve_candles(self, build_response):
+        self.stats['candle_requests'] += 1
+        if self._should_rate_limit():
+            self.stats['rate_limited'] += 1
+            return web.json_response({'code': 429, 'msg': 'Too many requests'}, status=429)
+
+        self.stats['in_flight'] += 1
+        self.stats['max_in_flight'] = max(self.stats['max_in_flight'], self.stats['in_flight'])
+        try:
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            return web.json_response(build_response())
+        finally:
+            self.stats['in_flight'] -= 1
+
+    async def _handle_info(self, request: web.Request) -> web.Response:
+        self.stats['requests'] += 1
+        payload = await request.json()
+        request_type = payload.get('type')
+
+        if request_type == 'meta':
+            return web.json_response(fake_meta(self.symbols))
+        if request_type == 'spotMeta':
+            return web.json_response({'tokens': [], 'universe': []})
+        if request_type == 'candleSnapshot':
+            req = payload.get('req', {})
+            coin, interval = req.get('coin'), req.get('interval')
+
+            def build():
+                return [
+                    {
+                        't': c['t'], 'T': c['t'] + timeframe_to_ms(interval) - 1, 's': coin, 'i': interval,
+                        'o': str(c['open']), 'h': str(c['high']), 'l': str(c['low']), 'c': str(c['close']),
+                        'v': str(c['volume']), 'n': c['trades'],
+                    }
+                    for c in self.candles(coin, interval, req.get('startTime', 0), req.get('endTime', 0))
+                ]
+            return await self._serve_candles(build)
+
+        return web.json_response({'code': 400, 'msg': f'Unknown type: {request_type}'}, status=400)
+
+    async def _handle_gateio_candlesticks(self, request: web.Request) -> web.Response:
+        self.stats['requests'] += 1
+        query = request.query
+        contract, interval = query.get('contract', 'BTC_USDT'), query.get('interval', '1h')
+        interval_ms = timeframe_to_ms(interval)
+        start_ms = int(query.get('from', 0)) * 1000
+        limit = min(int(query.get('limit', self.max_candles_per_request)), self.max_candles_per_request)
+        end_ms = int(query['to']) * 1000 if 'to' in query else start_ms + (limit - 1) * interval_ms
+
+        def build():
+            candles = self.candles(contract.split('_')[0], interval, start_ms, end_ms)[:limit]
+            return [
+                {'t': c['t'] // 1000, 'o': str(c['open']), 'h': str(c['high']), 'l': str(c['low']),
+                 'c': str(c['close']), 'v': int(c['volume'])}
+                for c in candles
+            ]
+        return await self._serve_candles(build)
+
+    # ------------------------------------------------------------------
+    # 起動・停止
+    # ------------------------------------------------------------------
+
+    def start(self) -> 'FakeExchangeServer':
+        """バックグラウンドスレッドでサーバーを起動"""
+        ready = threading.Event()
+        errors = []
+
+        async def setup():
+            app = web.Application()
+            app.router.add_post('/info', self._handle_info)
+            app.router.add_get('/api/v4/futures/usdt/candlesticks', self._handle_gateio_candlesticks)
+            self._runner = web.AppRunner(app)
+            await self._runner.setup()
+            site = web.TCPSite(self._runner, self.host, self.port)
+            await site.start()
+            self.port = self._runner.addresses[0][1]
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self._loop)
+            try:
+                self._loop.run_until_complete(setup())
+            except Exception as e:
+                errors.append(e)
+                ready.set()
+                return
+            ready.set()
+            self._loop.run_forever()
+            self._loop.close()
+
+        self._thread = threading.Thread(target=run, name='FakeExchangeServer', daemon=True)
+        self._thread.start()
+        ready.wait()
+        if errors:
+            raise errors[0]
+        return self
+
+    def stop(self):
+        """サーバーを停止"""
+        if self._loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop = None
+
+    def __enter__(self) -> 'FakeExchangeServer':
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
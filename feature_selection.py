@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+特徴量選択エンジン（ohlcv_by_claude.py の冗長削減ステップ1・2）と特徴量テーブルの保存形式
+
+- 相関による削減: 相関行列の上三角マスクで高相関ペアを一括抽出し、列順に
+  「まだ残っている列と高相関の、後に出現する列」を削除（従来の二重ループと同じ結果）
+- VIFによる削減: 標準化データの相関行列の逆行列の対角成分が全列のVIF
+  （VIF_i = [R^-1]_ii）。列の削除は逆行列のランク1ダウンデートで更新するため、
+  列ごとのOLSの再学習も逆行列の再計算も行わない
+- 特徴量テーブル: 列ごとの型付きバイナリ（np.memmap で列単位に読める）と meta.json。
+  複数の大きなCSVの代わりに {CSVパスから .csv を除いたもの}.features/ に保存する
+
+特徴量テーブルの構成:
+    {name}.features/
+        col_{番号}.bin   (列ごとの固定長配列。時刻はUTCのint64ナノ秒、文字列は固定長Unicode)
+        meta.json        (行数・列名・型)
+
+Usage:
+    remaining, removed, n_pairs = prune_correlated_features(df_numeric, threshold=0.95)
+    remaining, removed = eliminate_by_vif(df_numeric[remaining], threshold=10)
+    write_feature_table('hype_1h_90days_with_indicators.csv', df)
+    df = load_feature_table('hype_1h_90days_with_indicators.csv', columns=['timestamp', 'close'])
+"""
+
+import os
+import json
+import shutil
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+FEATURE_TABLE_VERSION = 1
+FEATURE_TABLE_SUFFIX = '.features'
+
+# 相関行列の条件数・VIFがこれを超える場合は完全な共線性として扱う
+SINGULAR_VIF = 1e10
+
+
+# === 相関による削減 ===
+
+def prune_correlated_features(data: pd.DataFrame, threshold: float = 0.95) -> Tuple[List[str], List[str], int]:
+    """
+    高相関ペアのうち後に出現する列を削除
+
+    Args:
+        data: 数値特徴量
+        threshold: 相関係数の絶対値の閾値（これを超えるペアが対象）
+
+    Returns:
+        (残った列, 削除した列, 高相関ペア数)
+    """
+    columns = list(data.columns)
+    with np.errstate(invalid='ignore'):
+        high_corr = np.abs(data.corr().to_numpy()) > threshold
+    high_corr = np.triu(high_corr, k=1)
+
+    # 前の列から順に、削除されていない列と高相関の列を削除
+    removed = np.zeros(len(columns), dtype=bool)
+    for i in np.flatnonzero(high_corr.any(axis=1)):
+        if not removed[i]:
+            removed |= high_corr[i]
+
+    remaining = [col for col, drop in zip(columns, removed) if not drop]
+    dropped = [col for col, drop in zip(columns, removed) if drop]
+    return remaining, dropped, int(high_corr.sum())
+
+
+# === VIFによる削減 ===
+
+class IncrementalVIF:
+    """
+    相関行列の逆行列から全列のVIFを求め、列の削除をランク1ダウンデートで反映する
+
+    VIFは各列を他の列で（定数項なしで）回帰したときの 1 / (1 - R^2)。標準化データでは
+    相関行列の逆行列の対角成分に一致する。定数列・非有限値を含む列はVIFを計算できないためNaN
+    （statsmodels の variance_inflation_factor と同様に、最大値の選択では無視される）。
+
+    完全な共線性がある（相関行列の条件数が大きい）間は逆行列を使わず、列ごとに他の列への
+    回帰から求め直す。他の列の線形結合になっている列のVIFは inf。
+    """
+
+    def __init__(self, data: pd.DataFrame):
+        values = data.to_numpy(dtype=float)
+        with np.errstate(invalid='ignore'):
+            std = values.std(axis=0)
+            usable = np.isfinite(values).all(axis=0) & (std > 0)
+
+        self.columns = list(data.columns)
+        self._active = [col for col, ok in zip(self.columns, usable) if ok]
+
+        standardized = (values[:, usable] - values[:, usable].mean(axis=0)) / std[usable]
+        self._corr = standardized.T @ standardized / max(len(values), 1)
+        self._invert()
+
+    def _invert(self):
+        """相関行列の逆行列を計算（条件数が大きい場合は None にして列ごとに求め直す）"""
+        self._inverse = None
+        if len(self._corr) and np.linalg.cond(self._corr) < SINGULAR_VIF:
+            self._inverse = np.linalg.inv(self._corr)
+
+    def _refit_vifs(self) -> np.ndarray:
+        """各列を他の列に回帰した 1 / (1 - R^2)（残差分散が 1 / SINGULAR_VIF 以下なら inf）"""
+        corr = self._corr
+        result = np.empty(len(corr))
+        for k in range(len(corr)):
+            others = np.arange(len(corr)) != k
+            coef, *_ = np.linalg.lstsq(corr[np.ix_(others, others)], corr[others, k], rcond=None)
+            residual = corr[k, k] - corr[k, others] @ coef
+            result[k] = 1.0 / residual if residual > 1.0 / SINGULAR_VIF else np.inf
+        return result
+
+    def vifs(self) -> pd.Series:
+        """残っている列のVIF（列順）"""
+        result = pd.Series(np.nan, index=self.columns, dtype=float)
+        result[self._active] = np.diag(self._inverse) if self._inverse is not None else self._refit_vifs()
+        return result
+
+    def remove(self, column: str):
+        """列を削除し、残りの列の逆行列をダウンデート"""
+        self.columns.remove(column)
+        if column not in self._active:
+            return
+        k = self._active.index(column)
+        del self._active[k]
+        keep = np.arange(len(self._corr)) != k
+        self._corr = self._corr[np.ix_(keep, keep)]
+
+        if self._inverse is None:
+            # 共線性が解消されていれば逆行列に切り替える
+            self._invert()
+            return
+
+        # 行列の k 行・k 列を削除したときの逆行列: P' = P_-k,-k - P_-k,k P_k,-k / P_kk
+        inverse = self._inverse
+        pivot = inverse[keep, k]
+        self._inverse = inverse[np.ix_(keep, keep)] - np.outer(pivot, pivot) / inverse[k, k]
+
+
+def eliminate_by_vif(data: pd.DataFrame, threshold: float = 10.0,
+                     max_iterations: int = 10) -> Tuple[List[str], List[str]]:
+    """
+    VIFが閾値を超える列を、最大の列から1つずつ削除
+
+    Args:
+        data: 数値特徴量
+        threshold: VIF閾値（最大VIFがこれ以下になれば終了）
+        max_iterations: 最大削除数
+
+    Returns:
+        (残った列, 削除した列（削除順）)
+    """
+    vif = IncrementalVIF(data)
+    removed = []
+    for _ in range(max_iterations):
+        if len(vif.columns) <= 1:
+            break
+        values = vif.vifs()
+        if not values.max() > threshold:
+            break
+        column = values.idxmax()
+        vif.remove(column)
+        removed.append(column)
+    return list(vif.columns), removed
+
+
+# === 特徴量テーブル ===
+
+def feature_table_path(csv_path) -> Path:
+    """CSVパスに対応する特徴量テーブルのディレクトリ"""
+    path = Path(csv_path)
+    stem = path.name[:-len('.csv')] if path.name.endswith('.csv') else path.name
+    return path.with_name(stem + FEATURE_TABLE_SUFFIX)
+
+
+def _encode_column(series: pd.Series) -> Tuple[Dict, np.ndarray]:
+    """列を保存用の配列と型情報に変換"""
+    if pd.api.types.is_datetime64_any_dtype(series):
+        tz = str(series.dt.tz) if series.dt.tz is not None else None
+        unit = series.dt.unit
+        naive = series.dt.tz_convert('UTC').dt.tz_localize(None) if tz else series
+        return ({'kind': 'datetime', 'dtype': '<i8', 'tz': tz, 'unit': unit},
+                naive.to_numpy(dtype=f'datetime64[{unit}]').view('<i8'))
+    if pd.api.types.is_bool_dtype(series) or pd.api.types.is_numeric_dtype(series):
+        values = series.to_numpy()
+        return {'kind': 'numeric', 'dtype': values.dtype.str}, values
+    # 文字列などは固定長Unicode（欠損は空文字列にし、位置を meta.json に記録）
+    missing = series.isna().to_numpy()
+    values = np.asarray(series.where(~missing, '').astype(str).to_numpy(), dtype=str)
+    return {'kind': 'string', 'dtype': values.dtype.str, 'missing': missing.nonzero()[0].tolist(),
+            'series_dtype': str(series.dtype)}, values
+
+
+def _decode_column(entry: Dict, values: np.ndarray) -> pd.Series:
+    values = np.array(values)
+    if entry['kind'] == 'datetime':
+        series = pd.Series(values.view(f"datetime64[{entry.get('unit', 'ns')}]"))
+        return series.dt.tz_localize('UTC').dt.tz_convert(entry['tz']) if entry['tz'] else series
+    series = pd.Series(values)
+    if entry['kind'] == 'string':
+        series = series.astype(object)
+        series.iloc[entry['missing']] = None
+        # pandas 3 の既定の文字列型などは元の型に戻す（旧テーブルは object のまま）
+        if entry.get('series_dtype', 'object') != 'object':
+            series = series.astype(entry['series_dtype'])
+    return series
+
+
+def write_feature_table(csv_path, data: pd.DataFrame) -> str:
+    """
+    DataFrameを特徴量テーブルとして保存（既存のテーブルは置き換え）
+
+    Args:
+        csv_path: 従来のCSVパス（テーブルは対応する .features ディレクトリに保存）
+        data: 保存するデータ
+
+    Returns:
+        テーブルのパス
+    """
+    table = feature_table_path(csv_path)
+    tmp_table = table.with_name(table.name + '.tmp')
+    shutil.rmtree(tmp_table, ignore_errors=True)
+    tmp_table.mkdir(parents=True)
+
+    schema = []
+    for position, name in enumerate(data.columns):
+        entry, values = _encode_column(data[name])
+        entry.update({'name': str(name), 'file': f'col_{position:04d}.bin'})
+        with open(tmp_table / entry['file'], 'wb') as f:
+            f.write(np.ascontiguousarray(values).tobytes())
+        schema.append(entry)
+
+    with open(tmp_table / 'meta.json', 'w') as f:
+        json.dump({'version': FEATURE_TABLE_VERSION, 'rows': len(data), 'schema': schema}, f)
+
+    shutil.rmtree(table, ignore_errors=True)
+    os.replace(tmp_table, table)
+    return str(table)
+
+
+def read_feature_table(table, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """特徴量テーブルを読み込み（columns 指定時はその列のファイルだけを読む）"""
+    table = Path(table)
+    with open(table / 'meta.json', 'r') as f:
+        meta = json.load(f)
+
+    entries = {entry['name']: entry for entry in meta['schema']}
+    names = [entry['name'] for entry in meta['schema']] if columns is None else list(columns)
+    missing = [name for name in names if name not in entries]
+    if missing:
+        raise KeyError(f"特徴量テーブルに列がありません: {missing}")
+
+    rows = meta['rows']
+    data = {}
+    for name in names:
+        entry = entries[name]
+        if rows == 0:
+            values = np.empty(0, dtype=entry['dtype'])
+        else:
+            values = np.memmap(table / entry['file'], dtype=entry['dtype'], mode='r', shape=(rows,))
+        data[name] = _decode_column(entry, values)
+    return pd.DataFrame(data, columns=names)
+
+
+def feature_table_exists(csv_path) -> bool:
+    """特徴量テーブルまたは従来のCSVがあるか"""
+    return (feature_table_path(csv_path) / 'meta.json').exists() or os.path.exists(csv_path)
+
+
+def load_feature_table(csv_path, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """
+    特徴量データを読み込み（特徴量テーブルがあれば優先し、なければ従来のCSV）
+
+    Raises:
+        FileNotFoundError: どちらも存在しない場合
+    """
+    table = feature_table_path(csv_path)
+    if (table / 'meta.json').exists():
+        return read_feature_table(table, columns)
+    return pd.read_csv(csv_path, usecols=columns)
@@ -34,6 +34,8 @@ except ImportError:
     print("⚠️ CCXT library not available. Install with: pip install ccxt")
 
 from real_time_system.utils.colored_log import get_colored_logger
+from ohlcv_candle_store import get_candle_store, subtract_ranges, TIMEFRAME_MS
+from ohlcv_range_fetcher import OHLCVRangeFetcher
 
 
 class ExchangeType(Enum):
@@ -137,7 +139,12 @@ class MultiExchangeAPIClient:
             raise ImportError("Hyperliquid library not available. Please install hyperliquid-python-sdk")
         
         try:
-            self.hyperliquid_client = Info(constants.MAINNET_API_URL)
+            api_url = os.getenv('HYPERLIQUID_API_URL')
+            if api_url:
+                # 接続先の上書き（ローカルの疑似取引所サーバーなど）
+                self.hyperliquid_client = Info(api_url, skip_ws=True)
+            else:
+                self.hyperliquid_client = Info(constants.MAINNET_API_URL)
             
             # websocketのエラーログを抑制
             logging.getLogger('websocket').setLevel(logging.WARNING)
@@ -396,24 +403,100 @@ class MultiExchangeAPIClient:
         """
         統合OHLCVデータ取得メソッド
         現在の取引所設定に応じて適切なAPIを使用
+        
+        ローカルキャンドルストアが有効な場合は、保存済みの期間はストアから読み込み、
+        未取得の期間（ギャップ）のみをAPIから取得する
         """
         try:
-            if self.exchange_type == ExchangeType.HYPERLIQUID:
-                return await self._get_hyperliquid_ohlcv(symbol, timeframe, start_time, end_time)
-            elif self.exchange_type == ExchangeType.GATEIO:
-                return await self._get_gateio_ohlcv(symbol, timeframe, start_time, end_time)
-            else:
-                raise ValueError(f"Unsupported exchange type: {self.exchange_type}")
+            candle_store = get_candle_store()
+            if candle_store is not None and timeframe in TIMEFRAME_MS:
+                return await self._get_ohlcv_with_store(candle_store, symbol, timeframe, start_time, end_time)
+            
+            return await self._fetch_exchange_ohlcv(symbol, timeframe, start_time, end_time)
                 
         except Exception as e:
             self.logger.error(f"❌ Failed to fetch OHLCV data for {symbol} from {self.exchange_type.value}: {e}")
             raise
     
+    async def _fetch_exchange_ohlcv(self, symbol: str, timeframe: str, start_time: datetime,
+                                    end_time: datetime, failed_ranges: list = None) -> pd.DataFrame:
+        """現在の取引所APIからOHLCVデータを取得"""
+        if self.exchange_type == ExchangeType.HYPERLIQUID:
+            return await self._get_hyperliquid_ohlcv(symbol, timeframe, start_time, end_time, failed_ranges)
+        elif self.exchange_type == ExchangeType.GATEIO:
+            return await self._get_gateio_ohlcv(symbol, timeframe, start_time, end_time)
+        else:
+            raise ValueError(f"Unsupported exchange type: {self.exchange_type}")
+    
+    async def _get_ohlcv_with_store(self, candle_store, symbol: str, timeframe: str,
+                                    start_time: datetime, end_time: datetime) -> pd.DataFrame:
+        """
+        ローカルキャンドルストア経由でOHLCVデータを取得
+        
+        未取得の期間のみAPIから取得してストアに追記し、期間全体をストアから読み込む。
+        形成中の足はストアに保存されないため、今回の取得結果から補う。
+        """
+        exchange = self.exchange_type.value
+        store_symbol = self._get_exchange_symbol(symbol)
+        start_ms = int(start_time.timestamp() * 1000)
+        end_ms = int(end_time.timestamp() * 1000)
+        tf_ms = TIMEFRAME_MS[timeframe]
+        
+        missing = candle_store.missing_ranges(exchange, store_symbol, timeframe, start_ms, end_ms)
+        if missing:
+            missing_ms = sum(end - start for start, end in missing)
+            self.logger.info(f"🗄️ Candle store: {store_symbol} {timeframe} - {len(missing)} gap(s), "
+                             f"{missing_ms / 86400000:.1f} days to fetch")
+        else:
+            self.logger.info(f"🗄️ Candle store hit: {store_symbol} {timeframe} (no API call)")
+        
+        fetched_frames = []
+        for gap_start, gap_end in missing:
+            failed_ranges = []
+            try:
+                fetched = await self._fetch_exchange_ohlcv(
+                    symbol, timeframe,
+                    datetime.fromtimestamp(gap_start / 1000, tz=timezone.utc),
+                    datetime.fromtimestamp((gap_end - 1) / 1000, tz=timezone.utc),
+                    failed_ranges=failed_ranges
+                )
+            except Exception as e:
+                # 直近の足だけのギャップは新しい確定足がないだけの可能性があるため、保存済みデータで継続
+                if gap_end - gap_start <= 2 * tf_ms and candle_store.coverage(exchange, store_symbol, timeframe):
+                    self.logger.warning(f"⚠️ Candle store gap fetch skipped for {symbol}: {e}")
+                    continue
+                raise
+            
+            covered = subtract_ranges(gap_start, gap_end, failed_ranges)
+            candle_store.append(exchange, store_symbol, timeframe, fetched, covered_ranges=covered)
+            fetched_frames.append(fetched)
+        
+        df = candle_store.read_dataframe(exchange, store_symbol, timeframe, start_ms, end_ms)
+        
+        if fetched_frames:
+            fetched = pd.concat(fetched_frames, ignore_index=True)
+            fetched_ms = pd.DatetimeIndex(pd.to_datetime(fetched['timestamp'], utc=True)).as_unit('ms').asi8
+            fetched = fetched[(fetched_ms >= start_ms) & (fetched_ms <= end_ms)]
+            fetched = fetched[~pd.to_datetime(fetched['timestamp'], utc=True).isin(df['timestamp'])]
+            if not fetched.empty:
+                df = pd.concat([df, fetched[df.columns]], ignore_index=True)
+                df = df.sort_values('timestamp').reset_index(drop=True)
+        
+        if df.empty:
+            raise ValueError(f"No data retrieved for {symbol}")
+        
+        return df
+    
     async def _get_hyperliquid_ohlcv(self, symbol: str, timeframe: str, 
-                                   start_time: datetime, end_time: datetime) -> pd.DataFrame:
+                                   start_time: datetime, end_time: datetime,
+                                   failed_ranges: list = None) -> pd.DataFrame:
         """
         Hyperliquid APIからOHLCVデータを取得
         ohlcv_by_claude.pyの実装を参考にした正確なデータ取得
+        
+        期間を1リクエスト上限本数のウィンドウに分割し、レート制限付きで並行取得する。
+        failed_rangesが渡された場合、取得に失敗したウィンドウの期間 [start_ms, end_ms) を追加する
+        （データが返らなかったウィンドウは取引所にデータがない期間として取得済み扱い）
         """
         # シンボルマッピングを適用
         hyperliquid_symbol = self._get_exchange_symbol(symbol)
@@ -429,71 +512,61 @@ class MultiExchangeAPIClient:
         start_ms = int(start_time.timestamp() * 1000)
         end_ms = int(end_time.timestamp() * 1000)
         
-        csv_data = []
+        # 1リクエスト上限本数（5000本）単位のウィンドウに分割して並行取得
+        # 未知の時間足は従来通り1日単位のウィンドウ
+        fetcher = OHLCVRangeFetcher('hyperliquid')
         one_day_ms = 24 * 60 * 60 * 1000
-        
-        # 日毎にデータを取得（ohlcv_by_claude.pyと同じ方式）
-        current_ms = start_ms
-        day_count = 0
-        
-        failed_days = 0
+        window_ms = fetcher.window_ms_for(TIMEFRAME_MS[timeframe]) if timeframe in TIMEFRAME_MS else one_day_ms
+        
+        def fetch_window(window_start: int, window_end: int) -> list:
+            # Hyperliquid APIからキャンドルデータを取得（マッピング後のシンボル使用）
+            candles = self.hyperliquid_client.candles_snapshot(hyperliquid_symbol, timeframe, window_start, window_end)
+            return [
+                {
+                    "timestamp": candle["t"],
+                    "open": float(candle["o"]),
+                    "high": float(candle["h"]),
+                    "low": float(candle["l"]),
+                    "close": float(candle["c"]),
+                    "volume": float(candle["v"]),
+                    "trades": int(candle["n"]) if "n" in candle else 0,
+                }
+                for candle in (candles or [])
+            ]
+        
+        result = await fetcher.fetch(fetch_window, start_ms, end_ms, window_ms)
+        
+        for window_start, window_end in result.empty_windows:
+            self.logger.warning(f"⚠️ No data returned for window {datetime.fromtimestamp(window_start/1000, tz=timezone.utc)}: '{hyperliquid_symbol}'")
+        if failed_ranges is not None:
+            failed_ranges.extend((window_start, window_end + 1) for window_start, window_end in result.failed_windows)
+        
+        # 失敗の許容は従来通り日単位: データが1本もない日（取得失敗・空の応答）を失敗日として数える
+        total_windows = result.windows
+        day_count = -(-(end_ms - start_ms) // one_day_ms) if end_ms > start_ms else 0
         total_days = int((end_ms - start_ms) / one_day_ms) + 1
         max_allowed_failures = max(1, int(total_days * 0.3))  # 30%まで失敗を許容、最低1日
-        
-        while current_ms < end_ms:
-            day_start = current_ms
-            day_end = min(current_ms + one_day_ms, end_ms)
-            
-            try:
-                self.logger.debug(f"   Fetching day {day_count + 1}: {datetime.fromtimestamp(day_start/1000, tz=timezone.utc)}")
-                
-                # Hyperliquid APIからキャンドルデータを取得（マッピング後のシンボル使用）
-                candles = self.hyperliquid_client.candles_snapshot(hyperliquid_symbol, timeframe, day_start, day_end)
-                
-                if not candles:
-                    self.logger.warning(f"⚠️ No data returned for day {day_count + 1}: '{hyperliquid_symbol}'")
-                    failed_days += 1
-                else:
-                    for candle in candles:
-                        row = {
-                            "timestamp": datetime.fromtimestamp(candle["t"] / 1000, tz=timezone.utc),
-                            "open": float(candle["o"]),
-                            "high": float(candle["h"]),
-                            "low": float(candle["l"]),
-                            "close": float(candle["c"]),
-                            "volume": float(candle["v"]),
-                            "trades": int(candle["n"]) if "n" in candle else 0,
-                        }
-                        csv_data.append(row)
-            
-            except Exception as e:
-                self.logger.warning(f"⚠️ Failed to fetch data for day {day_count + 1}: '{hyperliquid_symbol}' - {str(e)}")
-                failed_days += 1
-            
-            current_ms += one_day_ms
-            day_count += 1
-            
-            # API制限を考慮した待機（適度な間隔）
-            await asyncio.sleep(0.5)  # Gate.io比較で少し控えめ
+        days_with_data = {(row['timestamp'] - start_ms) // one_day_ms for row in result.rows}
+        failed_days = day_count - sum(1 for day in days_with_data if 0 <= day < day_count)
         
         # 失敗日数が多すぎる場合はエラー
         if failed_days > max_allowed_failures:
             raise ValueError(f"Too many failed requests for {symbol} (mapped to {hyperliquid_symbol}): {failed_days}/{day_count} days failed (max allowed: {max_allowed_failures})")
         
         if failed_days > 0:
-            self.logger.warning(f"⚠️ Hyperliquid data fetch completed with {failed_days} failed days out of {day_count} for {symbol}")
+            self.logger.warning(f"⚠️ Hyperliquid data fetch completed with {failed_days} failed days out of {day_count} for {symbol} ({len(result.failed_windows)}/{total_windows} windows failed)")
+        if result.rate_limited:
+            self.logger.info(f"   ⏳ Rate limited {result.rate_limited} times (retried with backoff)")
         
+        csv_data = result.rows
         if not csv_data:
             raise ValueError(f"No data retrieved for {symbol} (mapped to {hyperliquid_symbol})")
         
-        # DataFrameに変換
+        # DataFrameに変換（時刻順・重複排除済み）
         df = pd.DataFrame(csv_data)
-        df = df.sort_values('timestamp').reset_index(drop=True)
+        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms', utc=True)
         
-        # 重複削除
-        df = df.drop_duplicates(subset=['timestamp']).reset_index(drop=True)
-        
-        self.logger.success(f"✅ 🔥 HYPERLIQUID OHLCV COMPLETE 🔥 Symbol: {symbol} | Timeframe: {timeframe} | Points: {len(df)} | Success Rate: {((total_days-failed_days)/total_days*100):.1f}%")
+        self.logger.success(f"✅ 🔥 HYPERLIQUID OHLCV COMPLETE 🔥 Symbol: {symbol} | Timeframe: {timeframe} | Points: {len(df)} | Windows: {total_windows} | Success Rate: {((total_days-failed_days)/total_days*100):.1f}% | {result.elapsed_seconds:.1f}s")
         
         return df
     
@@ -517,45 +590,36 @@ class MultiExchangeAPIClient:
         try:
             # CCXTを使ってOHLCVデータを取得
             since = int(start_time.timestamp() * 1000)
-            
-            all_ohlcv = []
-            current_since = since
             end_timestamp = int(end_time.timestamp() * 1000)
             
-            # 1回のリクエストで1000本取得、必要に応じて複数回リクエスト
-            while current_since < end_timestamp:
-                self.logger.debug(f"   Fetching OHLCV from {datetime.fromtimestamp(current_since/1000, tz=timezone.utc)}")
-                
-                # 非同期でOHLCVデータを取得
-                ohlcv = await asyncio.get_event_loop().run_in_executor(
-                    None,
-                    lambda: self.gateio_client.fetch_ohlcv(
-                        gateio_symbol, 
-                        normalized_timeframe, 
-                        since=current_since,
-                        limit=1000
-                    )
+            # 1回のリクエストで1000本取得できるウィンドウに分割して並行取得
+            fetcher = OHLCVRangeFetcher('gateio')
+            tf_ms = TIMEFRAME_MS.get(normalized_timeframe) or TIMEFRAME_MS.get(timeframe, 60 * 60 * 1000)
+            
+            def fetch_window(window_start: int, window_end: int) -> list:
+                ohlcv = self.gateio_client.fetch_ohlcv(
+                    gateio_symbol,
+                    normalized_timeframe,
+                    since=window_start,
+                    limit=fetcher.profile.max_candles_per_request
                 )
-                
-                if not ohlcv:
-                    # 最新データが存在しない場合は警告を出すが継続（取引所の最新データがまだ生成されていない可能性）
-                    if current_since >= end_timestamp - (1000 * 60 * 60):  # 最後の1時間以内
-                        self.logger.debug(f"No data for {gateio_symbol} at {datetime.fromtimestamp(current_since/1000, tz=timezone.utc)} (might be too recent)")
-                    else:
-                        self.logger.warning(f"⚠️ No data returned for {gateio_symbol} from {datetime.fromtimestamp(current_since/1000, tz=timezone.utc)}")
-                    break
-                
-                all_ohlcv.extend(ohlcv)
-                
-                # 最後のタイムスタンプを更新
-                last_timestamp = ohlcv[-1][0]
-                if last_timestamp <= current_since:
-                    # タイムスタンプが進まない場合は終了
-                    break
-                current_since = last_timestamp + 1
-                
-                # レート制限を考慮
-                await asyncio.sleep(0.1)  # Gate.ioのレート制限に配慮
+                return [
+                    {'timestamp': candle[0], 'candle': candle}
+                    for candle in (ohlcv or []) if window_start <= candle[0] <= window_end
+                ]
+            
+            result = await fetcher.fetch(fetch_window, since, end_timestamp, fetcher.window_ms_for(tf_ms))
+            
+            if result.errors:
+                raise result.errors[0]
+            for window_start, _ in result.empty_windows:
+                # 最新データが存在しない場合は警告を出すが継続（取引所の最新データがまだ生成されていない可能性）
+                if window_start >= end_timestamp - (1000 * 60 * 60):  # 最後の1時間以内
+                    self.logger.debug(f"No data for {gateio_symbol} at {datetime.fromtimestamp(window_start/1000, tz=timezone.utc)} (might be too recent)")
+                else:
+                    self.logger.warning(f"⚠️ No data returned for {gateio_symbol} from {datetime.fromtimestamp(window_start/1000, tz=timezone.utc)}")
+            
+            all_ohlcv = [row['candle'] for row in result.rows]
             
             if not all_ohlcv:
                 raise ValueError(f"No data retrieved for {symbol} (mapped to {gateio_symbol})")
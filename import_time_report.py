@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+モジュール読み込み時間のレポート
+
+`python -X importtime -c "import <module>"` を別プロセスで実行し、読み込んだモジュールごとの
+自身の時間・累積時間と、トップレベルのパッケージごとの合計を集計する。ワーカーの起動を重くする
+ML系・可視化系・HTTP系ライブラリ（HEAVY_PACKAGES）が読み込まれているかも確認できる。
+
+使い方:
+    python import_time_report.py                       # 主要モジュールをまとめて計測
+    python import_time_report.py scalable_analysis_system --top 30
+    python import_time_report.py enhanced_ml_predictor --json
+"""
+
+import os
+import re
+import sys
+import json
+import subprocess
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+PROJECT_ROOT = Path(__file__).parent
+
+# デフォルトで計測するモジュール（ワーカーが読み込む経路）
+DEFAULT_MODULES = [
+    'scalable_analysis_system',
+    'engines.high_leverage_bot_orchestrator',
+    'enhanced_ml_predictor',
+    'support_resistance_ml',
+    'btc_altcoin_correlation_predictor',
+]
+
+# 使う処理の中でだけ読み込むべき重いパッケージ
+HEAVY_PACKAGES = ('sklearn', 'lightgbm', 'xgboost', 'matplotlib', 'seaborn', 'scipy', 'aiohttp', 'cProfile')
+
+_IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$')
+
+
+def parse_importtime(output: str) -> List[Dict[str, Any]]:
+    """
+    -X importtime の出力をモジュールごとの辞書に変換
+
+    Returns:
+        [{'module', 'self_us', 'cumulative_us', 'depth'}, ...]（出力順 = 読み込み完了順）
+    """
+    entries = []
+    for line in output.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, module = match.groups()
+        entries.append({
+            'module': module,
+            'self_us': int(self_us),
+            'cumulative_us': int(cumulative_us),
+            # インデントは「1文字 + 階層ごとに2文字」
+            'depth': max(0, (len(indent) - 1) // 2),
+        })
+    return entries
+
+
+def summarize_packages(entries: List[Dict[str, Any]]) -> Dict[str, float]:
+    """トップレベルのパッケージごとに自身の時間を合計（ミリ秒、降順）"""
+    totals: Dict[str, int] = {}
+    for entry in entries:
+        package = entry['module'].split('.')[0]
+        totals[package] = totals.get(package, 0) + entry['self_us']
+    return {package: us / 1000 for package, us in sorted(totals.items(), key=lambda item: -item[1])}
+
+
+def measure_import(module: str, python: Optional[str] = None, cwd: Optional[str] = None) -> Dict[str, Any]:
+    """
+    新しいインタプリタで module を読み込み、読み込み時間を集計
+
+    Raises:
+        RuntimeError: モジュールの読み込みに失敗した場合
+    """
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE='1')
+    env.pop('PYTHONIMPORTTIME', None)
+    completed = subprocess.run(
+        [python or sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=cwd or str(PROJECT_ROOT), env=env, capture_output=True, text=True,
+    )
+    if completed.returncode != 0:
+        last_line = completed.stderr.strip().splitlines()[-1:] or ['']
+        raise RuntimeError(f"{module} の読み込みに失敗しました: {last_line[0]}")
+
+    entries = parse_importtime(completed.stderr)
+    target = next((entry for entry in reversed(entries) if entry['module'] == module), None)
+    loaded_packages = {entry['module'].split('.')[0] for entry in entries}
+    return {
+        'module': module,
+        'total_ms': (target['cumulative_us'] if target else sum(e['self_us'] for e in entries)) / 1000,
+        'module_count': len(entries),
+        'packages': summarize_packages(entries),
+        'heavy_packages': [package for package in HEAVY_PACKAGES if package in loaded_packages],
+        'entries': entries,
+    }
+
+
+def format_report(report: Dict[str, Any], top: int = 15) -> str:
+    lines = [f"📦 {report['module']}: {report['total_ms']:.1f}ms（{report['module_count']}モジュール）"]
+    if report['heavy_packages']:
+        lines.append(f"  ⚠️ 重いパッケージを読み込み: {', '.join(report['heavy_packages'])}")
+    lines.append("  パッケージ別（自身の時間の合計）:")
+    for package, ms in list(report['packages'].items())[:top]:
+        lines.append(f"    {package:<40} {ms:>9.1f}ms")
+    lines.append("  モジュール別（累積時間）:")
+    slowest = sorted(report['entries'], key=lambda entry: -entry['cumulative_us'])[:top]
+    for entry in slowest:
+        lines.append(f"    {entry['module']:<60} {entry['cumulative_us'] / 1000:>9.1f}ms "
+                     f"(自身 {entry['self_us'] / 1000:.1f}ms)")
+    return '\n'.join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description='モジュール読み込み時間のレポート')
+    parser.add_argument('modules', nargs='*', help=f"計測するモジュール（デフォルト: {', '.join(DEFAULT_MODULES)}）")
+    parser.add_argument('--top', type=int, default=15, help='表示する件数')
+    parser.add_argument('--json', action='store_true', help='JSONで出力')
+    args = parser.parse_args(argv)
+
+    reports = []
+    for module in args.modules or DEFAULT_MODULES:
+        try:
+            reports.append(measure_import(module))
+        except RuntimeError as e:
+            print(f"❌ {e}", file=sys.stderr)
+            return 1
+
+    if args.json:
+        print(json.dumps([{key: value for key, value in report.items() if key != 'entries'}
+                          for report in reports], ensure_ascii=False, indent=2))
+    else:
+        print('\n\n'.join(format_report(report, args.top) for report in reports))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -16,6 +16,8 @@ from typing import List, Dict, Optional, Tuple
 import shutil
 import logging
 
+from sqlite_access import checkpoint
+
 # ログ設定
 logging.basicConfig(
     level=logging.INFO,
@@ -229,6 +231,8 @@ class MigrationManager:
         for db_name, db_path in self.databases.items():
             if db_path.exists():
                 backup_path = backup_dir / f"{db_name}.db"
+                # WALに残っている更新もバックアップに含める
+                checkpoint(db_path)
                 shutil.copy2(str(db_path), str(backup_path))
                 backup_info[db_name] = str(backup_path)
                 logger.info(f"💾 Backup created: {db_name} -> {backup_path}")
@@ -2,7 +2,6 @@
 Multi-Symbol Real Market Analysis System
 複数銘柄でのシステム堅牢性とML性能を評価
 """
-import pandas as pd
 import numpy as np
 import os
 import json
@@ -13,6 +12,8 @@ import subprocess
 import sys
 from pathlib import Path
 
+from feature_selection import feature_table_exists, load_feature_table
+
 # ログ設定
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -40,7 +41,7 @@ class MultiSymbolAnalysisSystem:
         
         for symbol in symbols_to_check:
             reduced_features_file = f"{symbol.lower()}_1h_90days_reduced_features.csv"
-            if os.path.exists(reduced_features_file):
+            if feature_table_exists(reduced_features_file):
                 available.append(symbol)
                 logger.info(f"利用可能な銘柄: {symbol}")
             else:
@@ -74,11 +75,11 @@ class MultiSymbolAnalysisSystem:
         """既存データの分析"""
         reduced_features_file = f"{symbol.lower()}_{timeframe}_90days_reduced_features.csv"
         
-        if not os.path.exists(reduced_features_file):
+        if not feature_table_exists(reduced_features_file):
             return None
         
         try:
-            df = pd.read_csv(reduced_features_file)
+            df = load_feature_table(reduced_features_file)
             quality_score = 1.0 - (df.isnull().sum().sum() / (len(df) * len(df.columns)))
             
             return {
@@ -22,19 +22,20 @@
 3. 特徴量エンジニアリング（4段階の冗長削減）
    - ステップ1: 相関行列による高相関特徴量の削除（閾値: 0.95）
    - ステップ2: VIF（分散インフレ係数）による多重共線性チェック（閾値: 10）
+     ※ステップ1・2は feature_selection.py（上三角マスク・逆相関行列のVIFとランク1ダウンデート）
    - ステップ3: 時系列クロスバリデーションによる重要度評価（下位20%削除）
    - ステップ4: SHAP値による特徴量重要度の最終評価（下位10%削除）
 
 【出力ファイル】
-1. {symbol}_1h_90days.csv                    - 生のOHLCVデータ
-2. {symbol}_1h_90days_with_indicators.csv    - 全技術的指標を含むデータ
-3. {symbol}_1h_90days_reduced_features.csv   - 特徴量選択後の最終データ
-4. {symbol}_removed_features.json            - 各段階で削除された特徴量のリスト
+1. {symbol}_1h_90days.csv                       - 生のOHLCVデータ
+2. {symbol}_1h_90days_with_indicators.features/  - 全技術的指標を含むデータ（列ごとの型付きバイナリ）
+3. {symbol}_1h_90days_reduced_features.features/ - 特徴量選択後の最終データ（列ごとの型付きバイナリ）
+4. {symbol}_removed_features.json               - 各段階で削除された特徴量のリスト
+※2・3は feature_selection.load_feature_table() で読み込む。--csv 指定時は従来のCSVも出力
 
 【必要なライブラリ】
 - hyperliquid: Hyperliquid APIクライアント
 - pandas, numpy: データ処理
-- statsmodels: VIF計算
 - scikit-learn: 機械学習ユーティリティ
 - lightgbm: SHAP値計算用モデル
 - shap: 特徴量重要度評価
@@ -46,7 +47,7 @@
 【注意事項】
 - インターネット接続が必要です
 - 初回実行時は全ライブラリのインストールが必要です:
-  pip install hyperliquid pandas numpy statsmodels scikit-learn lightgbm shap
+  pip install hyperliquid pandas numpy scikit-learn lightgbm shap
 """
 
 import csv
@@ -59,6 +60,7 @@ import logging
 from datetime import datetime, timedelta
 from hyperliquid.info import Info
 from hyperliquid.utils import constants
+from feature_selection import prune_correlated_features, eliminate_by_vif, write_feature_table
 
 # websocketのエラーログを抑制
 logging.getLogger('websocket').setLevel(logging.WARNING)
@@ -73,6 +75,7 @@ parser.add_argument('--symbol', type=str, default='HYPE', help='取得する通
 parser.add_argument('--timeframe', type=str, default='1h', 
                    choices=['1m', '3m', '5m', '15m', '30m', '1h'],
                    help='時間足 (1m, 3m, 5m, 15m, 30m, 1h)')
+parser.add_argument('--csv', action='store_true', help='特徴量テーブルに加えて従来のCSVも出力')
 args = parser.parse_args()
 
 COIN_SYMBOL = args.symbol.upper()
@@ -606,8 +609,10 @@ if csv_data:
     
     # 拡張データを保存
     extended_file_path = f"{COIN_SYMBOL.lower()}_{TIMEFRAME}_{DAYS_TO_FETCH}days_with_indicators.csv"
-    df.to_csv(extended_file_path, index=False)
-    print(f"\n技術的指標を含むファイルを保存: {extended_file_path}")
+    extended_table_path = write_feature_table(extended_file_path, df)
+    if args.csv:
+        df.to_csv(extended_file_path, index=False)
+    print(f"\n技術的指標を含むファイルを保存: {extended_table_path}")
     print(f"カラム数: {len(df.columns)}個")
     print(f"\n含まれる指標:")
     print("【トレンド系】")
@@ -651,84 +656,33 @@ if csv_data:
     # 1. 相関行列による冗長削減
     print("\n【1/4】相関行列による冗長削減")
     
-    # 相関行列を計算
-    corr_matrix = df_numeric.corr()
-    
-    # 高相関ペアを特定（閾値: 0.95）
+    # 高相関ペア（閾値: 0.95）のうち後に出現する方を削除
     corr_threshold = 0.95
-    high_corr_pairs = []
-    
-    for i in range(len(corr_matrix.columns)):
-        for j in range(i+1, len(corr_matrix.columns)):
-            if abs(corr_matrix.iloc[i, j]) > corr_threshold:
-                col1 = corr_matrix.columns[i]
-                col2 = corr_matrix.columns[j]
-                high_corr_pairs.append((col1, col2, corr_matrix.iloc[i, j]))
-    
-    # 削除する特徴量を決定（高相関ペアのうち、後に出現する方を削除）
-    cols_to_remove_corr = set()
-    for col1, col2, corr_val in high_corr_pairs:
-        if col1 not in cols_to_remove_corr:
-            cols_to_remove_corr.add(col2)
-    
-    print(f"- 高相関ペア数: {len(high_corr_pairs)}")
+    remaining_cols_after_corr, cols_to_remove_corr, n_high_corr_pairs = prune_correlated_features(
+        df_numeric, corr_threshold
+    )
+    
+    print(f"- 高相関ペア数: {n_high_corr_pairs}")
     print(f"- 削除対象特徴量数: {len(cols_to_remove_corr)}")
     
     # 相関による削減後の特徴量
-    remaining_cols_after_corr = [col for col in numeric_cols if col not in cols_to_remove_corr]
     df_after_corr = df_numeric[remaining_cols_after_corr].copy()
     
     # ##############################################################################################################
     # 2. VIF（分散インフレ係数）による多重共線性チェック
     print("\n【2/4】VIFによる多重共線性チェック")
     
-    from statsmodels.stats.outliers_influence import variance_inflation_factor
-    
-    def calculate_vif(df):
-        vif_data = pd.DataFrame()
-        vif_data["Feature"] = df.columns
-        vif_data["VIF"] = [variance_inflation_factor(df.values, i) for i in range(df.shape[1])]
-        return vif_data
-    
-    # VIF計算（エラー回避のため、標準化を行う）
-    from sklearn.preprocessing import StandardScaler
-    scaler = StandardScaler()
-    df_scaled = pd.DataFrame(
-        scaler.fit_transform(df_after_corr),
-        columns=df_after_corr.columns,
-        index=df_after_corr.index
-    )
-    
     # VIF閾値（10以上は多重共線性が高い）
+    # 全列のVIFを逆相関行列から一度に求め、最もVIFが高い特徴量を反復的に削除
     vif_threshold = 10
-    cols_to_remove_vif = set()
-    
-    # 反復的にVIFが高い特徴量を削除
     max_iterations = 10
-    for iteration in range(max_iterations):
-        if len(df_scaled.columns) <= 1:
-            break
-            
-        try:
-            vif_df = calculate_vif(df_scaled)
-            max_vif = vif_df['VIF'].max()
-            
-            if max_vif <= vif_threshold:
-                break
-                
-            # 最もVIFが高い特徴量を削除
-            max_vif_feature = vif_df.loc[vif_df['VIF'].idxmax(), 'Feature']
-            cols_to_remove_vif.add(max_vif_feature)
-            df_scaled = df_scaled.drop(columns=[max_vif_feature])
-            
-        except Exception as e:
-            print(f"  VIF計算エラー: {e}")
-            break
+    remaining_cols_after_vif, cols_to_remove_vif = eliminate_by_vif(
+        df_after_corr, vif_threshold, max_iterations
+    )
     
     print(f"- VIFによる削除対象特徴量数: {len(cols_to_remove_vif)}")
     
     # VIF削減後の特徴量
-    remaining_cols_after_vif = [col for col in remaining_cols_after_corr if col not in cols_to_remove_vif]
     df_after_vif = df_after_corr[remaining_cols_after_vif].copy()
     
     # ##############################################################################################################
@@ -856,13 +810,15 @@ if csv_data:
     
     # 削減後のデータを保存
     reduced_file_path = f"{COIN_SYMBOL.lower()}_{TIMEFRAME}_{DAYS_TO_FETCH}days_reduced_features.csv"
-    df_final.to_csv(reduced_file_path, index=False)
-    print(f"\n特徴量削減後のファイルを保存: {reduced_file_path}")
+    reduced_table_path = write_feature_table(reduced_file_path, df_final)
+    if args.csv:
+        df_final.to_csv(reduced_file_path, index=False)
+    print(f"\n特徴量削減後のファイルを保存: {reduced_table_path}")
     
     # 削除された特徴量のリストを保存
     removed_features = {
-        'correlation': list(cols_to_remove_corr),
-        'vif': list(cols_to_remove_vif),
+        'correlation': cols_to_remove_corr,
+        'vif': cols_to_remove_vif,
         'cv_importance': low_importance_features,
         'shap_importance': low_shap_features if 'low_shap_features' in locals() else []
     }
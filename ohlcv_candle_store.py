@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+"""
+OHLCVローカルキャンドルストア
+
+(取引所, 銘柄, 時間足) ごとにローソク足をディスク上のカラム別バイナリファイルに保存し、
+全ての分析プロセスで共有する。
+
+- カラム別の固定長バイナリ（timestamp/open/high/low/close/volume/trades）を
+  np.memmap で読み込むため、ProcessPoolExecutorの各ワーカーはコピーなしで参照できる
+- 追記専用: 末尾より新しい足は既存ファイルに追記し、過去方向の補完時のみ再構築
+- 取得済み期間（coverage）を記録し、未取得の期間（ギャップ）のみをAPIから取得
+- 確定済みの足のみ保存（形成中の足は保存せず、毎回APIから取得）
+- 書き込みは fcntl によるファイルロックで排他制御
+
+Usage:
+    store = get_candle_store()
+    missing = store.missing_ranges('hyperliquid', 'SOL', '1h', start_ms, end_ms)
+    store.append('hyperliquid', 'SOL', '1h', df, covered_ranges=[(start_ms, end_ms)])
+    df = store.read_dataframe('hyperliquid', 'SOL', '1h', start_ms, end_ms)
+"""
+
+import os
+import json
+import fcntl
+import shutil
+import time
+import logging
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# カラム定義（timestampはUTCミリ秒）
+CANDLE_COLUMNS = (
+    ('timestamp', np.dtype('<i8')),
+    ('open', np.dtype('<f8')),
+    ('high', np.dtype('<f8')),
+    ('low', np.dtype('<f8')),
+    ('close', np.dtype('<f8')),
+    ('volume', np.dtype('<f8')),
+    ('trades', np.dtype('<i8')),
+)
+
+STORE_VERSION = 1
+
+TIMEFRAME_MS = {
+    '1m': 60_000, '3m': 180_000, '5m': 300_000, '15m': 900_000, '30m': 1_800_000,
+    '1h': 3_600_000, '2h': 7_200_000, '4h': 14_400_000, '6h': 21_600_000,
+    '8h': 28_800_000, '12h': 43_200_000, '1d': 86_400_000,
+}
+
+DEFAULT_STORE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache', 'ohlcv_store')
+
+
+def timeframe_to_ms(timeframe: str) -> int:
+    """時間足をミリ秒に変換"""
+    if timeframe not in TIMEFRAME_MS:
+        raise ValueError(f"未対応の時間足: {timeframe}")
+    return TIMEFRAME_MS[timeframe]
+
+
+def merge_ranges(ranges: Sequence[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """半開区間 [start, end) のリストを結合"""
+    merged = []
+    for start, end in sorted((int(s), int(e)) for s, e in ranges if e > s):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def subtract_ranges(start: int, end: int, covered: Sequence[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """[start, end) から取得済み区間を除いた未取得区間を返す"""
+    missing = []
+    cursor = start
+    for cov_start, cov_end in merge_ranges(covered):
+        if cov_end <= cursor:
+            continue
+        if cov_start >= end:
+            break
+        if cov_start > cursor:
+            missing.append((cursor, min(cov_start, end)))
+        cursor = max(cursor, cov_end)
+        if cursor >= end:
+            break
+    if cursor < end:
+        missing.append((cursor, end))
+    return missing
+
+
+class OHLCVCandleStore:
+    """
+    ディスク上のカラム型キャンドルストア
+
+    1キーあたりのディレクトリ構成:
+        {base_dir}/{exchange}/{symbol}/{timeframe}/
+            timestamp.bin, open.bin, ... trades.bin  (カラム別の固定長配列)
+            meta.json                                (確定行数・取得済み期間)
+        {base_dir}/{exchange}/{symbol}/.{timeframe}.lock  (書き込みロック。過去方向の補完ではキーの
+                                                            ディレクトリごと置き換えるため外に置く)
+    """
+
+    def __init__(self, base_dir: str = None):
+        self.base_dir = Path(base_dir or os.environ.get('OHLCV_STORE_DIR', DEFAULT_STORE_DIR))
+        self.stats = {'reads': 0, 'appends': 0, 'rewrites': 0, 'rows_written': 0}
+
+    # === パス・ロック ===
+
+    @staticmethod
+    def _safe_name(name: str) -> str:
+        return str(name).replace('/', '_').replace(':', '_').replace(os.sep, '_')
+
+    def _key_dir(self, exchange: str, symbol: str, timeframe: str) -> Path:
+        return self.base_dir / self._safe_name(exchange) / self._safe_name(symbol) / self._safe_name(timeframe)
+
+    @contextmanager
+    def _lock(self, key_dir: Path, exclusive: bool):
+        key_dir.parent.mkdir(parents=True, exist_ok=True)
+        with open(key_dir.parent / f'.{key_dir.name}.lock', 'a+') as lock_file:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _read_meta(self, key_dir: Path) -> Dict:
+        meta_path = key_dir / 'meta.json'
+        if not meta_path.exists():
+            return {'version': STORE_VERSION, 'rows': 0, 'coverage': []}
+        with open(meta_path, 'r') as f:
+            meta = json.load(f)
+        meta['coverage'] = [tuple(r) for r in meta.get('coverage', [])]
+        return meta
+
+    def _write_meta(self, key_dir: Path, meta: Dict):
+        tmp_path = key_dir / 'meta.json.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({
+                'version': STORE_VERSION,
+                'rows': int(meta['rows']),
+                'coverage': [list(r) for r in meta['coverage']],
+                'updated_at': time.time()
+            }, f)
+        os.replace(tmp_path, key_dir / 'meta.json')
+
+    def _map_columns(self, key_dir: Path, rows: int) -> Dict[str, np.ndarray]:
+        """確定行数分のカラムをmemmapで読み込み（ゼロコピー）"""
+        columns = {}
+        for name, dtype in CANDLE_COLUMNS:
+            if rows == 0:
+                columns[name] = np.empty(0, dtype=dtype)
+            else:
+                columns[name] = np.memmap(key_dir / f'{name}.bin', dtype=dtype, mode='r', shape=(rows,))
+        return columns
+
+    # === 読み込み ===
+
+    def coverage(self, exchange: str, symbol: str, timeframe: str) -> List[Tuple[int, int]]:
+        """取得済み期間 [start_ms, end_ms) のリスト"""
+        key_dir = self._key_dir(exchange, symbol, timeframe)
+        if not key_dir.exists():
+            return []
+        with self._lock(key_dir, exclusive=False):
+            return self._read_meta(key_dir)['coverage']
+
+    def missing_ranges(self, exchange: str, symbol: str, timeframe: str,
+                       start_ms: int, end_ms: int) -> List[Tuple[int, int]]:
+        """
+        [start_ms, end_ms] のうち未取得の期間を返す（ギャップ検出）
+
+        Returns:
+            List[Tuple[int, int]]: 未取得の半開区間 [start, end) のリスト
+        """
+        return subtract_ranges(int(start_ms), int(end_ms) + 1,
+                               self.coverage(exchange, symbol, timeframe))
+
+    def read_arrays(self, exchange: str, symbol: str, timeframe: str,
+                    start_ms: int = None, end_ms: int = None) -> Dict[str, np.ndarray]:
+        """
+        期間内（start_ms <= timestamp <= end_ms）のカラム配列を返す
+
+        戻り値はmemmapのスライス（読み取り専用ビュー）で、データはコピーされない。
+        """
+        key_dir = self._key_dir(exchange, symbol, timeframe)
+        if not key_dir.exists():
+            return {name: np.empty(0, dtype=dtype) for name, dtype in CANDLE_COLUMNS}
+
+        with self._lock(key_dir, exclusive=False):
+            meta = self._read_meta(key_dir)
+            columns = self._map_columns(key_dir, meta['rows'])
+
+        self.stats['reads'] += 1
+        timestamps = columns['timestamp']
+        lo = 0 if start_ms is None else int(np.searchsorted(timestamps, int(start_ms), side='left'))
+        hi = len(timestamps) if end_ms is None else int(np.searchsorted(timestamps, int(end_ms), side='right'))
+        return {name: values[lo:hi] for name, values in columns.items()}
+
+    def read_dataframe(self, exchange: str, symbol: str, timeframe: str,
+                       start_ms: int = None, end_ms: int = None) -> pd.DataFrame:
+        """期間内のローソク足をAPIクライアントと同じ形式のDataFrameで返す（timestampはUTC）"""
+        arrays = self.read_arrays(exchange, symbol, timeframe, start_ms, end_ms)
+        return candles_to_dataframe(arrays)
+
+    # === 書き込み ===
+
+    def append(self, exchange: str, symbol: str, timeframe: str, candles: pd.DataFrame,
+               covered_ranges: Sequence[Tuple[int, int]] = (), now_ms: int = None) -> int:
+        """
+        ローソク足を追加し、取得済み期間を記録
+
+        Args:
+            candles: timestamp/open/high/low/close/volume（trades任意）を含むDataFrame
+            covered_ranges: APIで取得済みとなった期間 [start_ms, end_ms) のリスト
+            now_ms: 現在時刻（ミリ秒）。これ以降に確定しない足は保存しない
+
+        Returns:
+            int: 新規に保存した行数
+        """
+        tf_ms = timeframe_to_ms(timeframe)
+        now_ms = int(time.time() * 1000) if now_ms is None else int(now_ms)
+        # 形成中の足の開始時刻（これより前に開始した足のみ確定済み）
+        closed_limit = (now_ms // tf_ms) * tf_ms
+
+        new_arrays = dataframe_to_candles(candles)
+        closed = new_arrays['timestamp'] < closed_limit
+        new_arrays = {name: values[closed] for name, values in new_arrays.items()}
+        new_coverage = [(s, min(int(e), closed_limit)) for s, e in covered_ranges]
+
+        key_dir = self._key_dir(exchange, symbol, timeframe)
+        with self._lock(key_dir, exclusive=True):
+            key_dir.mkdir(exist_ok=True)
+            meta = self._read_meta(key_dir)
+            rows = meta['rows']
+            existing = self._map_columns(key_dir, rows)
+
+            # 重複排除（新規データ内・既存データとの重複）
+            _, unique_idx = np.unique(new_arrays['timestamp'], return_index=True)
+            new_arrays = {name: values[unique_idx] for name, values in new_arrays.items()}
+            if rows:
+                fresh = ~np.isin(new_arrays['timestamp'], existing['timestamp'])
+                new_arrays = {name: values[fresh] for name, values in new_arrays.items()}
+
+            added = len(new_arrays['timestamp'])
+            meta['rows'] = rows + added
+            meta['coverage'] = merge_ranges(list(meta['coverage']) + new_coverage)
+            if added and rows and new_arrays['timestamp'][0] <= existing['timestamp'][-1]:
+                self._rewrite_columns(key_dir, existing, new_arrays, meta)
+                self.stats['rewrites'] += 1
+            else:
+                if added:
+                    self._append_columns(key_dir, rows, new_arrays)
+                    self.stats['appends'] += 1
+                self._write_meta(key_dir, meta)
+            self.stats['rows_written'] += added
+
+        return added
+
+    def _append_columns(self, key_dir: Path, rows: int, new_arrays: Dict[str, np.ndarray]):
+        """確定行の末尾に追記（中断された書き込みの残骸は切り詰める）"""
+        for name, dtype in CANDLE_COLUMNS:
+            path = key_dir / f'{name}.bin'
+            with open(path, 'ab') as f:
+                f.truncate(rows * dtype.itemsize)
+                f.write(np.ascontiguousarray(new_arrays[name], dtype=dtype).tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+
+    def _rewrite_columns(self, key_dir: Path, existing: Dict[str, np.ndarray], new_arrays: Dict[str, np.ndarray],
+                         meta: Dict):
+        """
+        過去方向の補完: 時刻順に再構築したカラムとメタデータを隣の一時ディレクトリに書き出し、
+        キーのディレクトリごと置き換える（途中で中断してもカラムとメタデータの組み合わせは崩れない。
+        既存のmemmapは旧ファイルを参照し続ける）
+        """
+        order = np.argsort(np.concatenate([existing['timestamp'], new_arrays['timestamp']]), kind='stable')
+        tmp_dir = key_dir.parent / f'.{key_dir.name}.{os.getpid()}.tmp'
+        old_dir = key_dir.parent / f'.{key_dir.name}.{os.getpid()}.old'
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        shutil.rmtree(old_dir, ignore_errors=True)
+        tmp_dir.mkdir()
+        try:
+            for name, dtype in CANDLE_COLUMNS:
+                merged = np.concatenate([np.asarray(existing[name]), new_arrays[name]]).astype(dtype)[order]
+                with open(tmp_dir / f'{name}.bin', 'wb') as f:
+                    f.write(merged.tobytes())
+                    f.flush()
+                    os.fsync(f.fileno())
+            self._write_meta(tmp_dir, meta)
+            os.replace(key_dir, old_dir)
+            try:
+                os.replace(tmp_dir, key_dir)
+            except OSError:
+                os.replace(old_dir, key_dir)
+                raise
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+        shutil.rmtree(old_dir, ignore_errors=True)
+
+    def get_stats(self) -> Dict[str, int]:
+        """読み書き統計を取得"""
+        return dict(self.stats)
+
+
+def dataframe_to_candles(candles: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """DataFrameをストアのカラム配列に変換（timestampはUTCミリ秒）"""
+    if candles is None or candles.empty:
+        return {name: np.empty(0, dtype=dtype) for name, dtype in CANDLE_COLUMNS}
+
+    if 'timestamp' in candles.columns:
+        raw_ts = candles['timestamp']
+    else:
+        raw_ts = pd.Series(candles.index)
+
+    if pd.api.types.is_numeric_dtype(raw_ts):
+        timestamps = raw_ts.to_numpy(dtype=np.int64)
+    else:
+        timestamps = pd.DatetimeIndex(pd.to_datetime(raw_ts, utc=True)).as_unit('ms').asi8
+
+    arrays = {'timestamp': np.asarray(timestamps, dtype=np.int64)}
+    for name, dtype in CANDLE_COLUMNS[1:]:
+        if name in candles.columns:
+            arrays[name] = candles[name].to_numpy(dtype=dtype)
+        else:
+            arrays[name] = np.zeros(len(candles), dtype=dtype)
+
+    order = np.argsort(arrays['timestamp'], kind='stable')
+    return {name: values[order] for name, values in arrays.items()}
+
+
+def candles_to_dataframe(arrays: Dict[str, np.ndarray]) -> pd.DataFrame:
+    """ストアのカラム配列をDataFrameに変換（timestampはUTC aware）"""
+    df = pd.DataFrame({
+        'timestamp': pd.to_datetime(np.asarray(arrays['timestamp']), unit='ms', utc=True),
+        'open': np.asarray(arrays['open']),
+        'high': np.asarray(arrays['high']),
+        'low': np.asarray(arrays['low']),
+        'close': np.asarray(arrays['close']),
+        'volume': np.asarray(arrays['volume']),
+        'trades': np.asarray(arrays['trades']),
+    })
+    return df
+
+
+_candle_store = None
+
+
+def get_candle_store() -> Optional[OHLCVCandleStore]:
+    """
+    プロセス共通のキャンドルストアを取得
+
+    OHLCV_STORE_ENABLED=false の場合はNone（ストアを使用しない）
+    """
+    global _candle_store
+    if os.environ.get('OHLCV_STORE_ENABLED', 'true').lower() in ('false', '0', 'no'):
+        return None
+    base_dir = os.environ.get('OHLCV_STORE_DIR', DEFAULT_STORE_DIR)
+    if _candle_store is None or str(_candle_store.base_dir) != str(Path(base_dir)):
+        _candle_store = OHLCVCandleStore(base_dir)
+    return _candle_store
@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+レート制限対応の並行OHLCV期間フェッチャー
+
+従来の _get_hyperliquid_ohlcv は1日ずつ同期SDK呼び出しを行い、毎回 asyncio.sleep(0.5) で待機していた。
+このモジュールは:
+- 取得期間を取引所ごとの1リクエスト上限本数に合わせたウィンドウに分割
+- 取引所ごとのトークンバケットでリクエストレートを制御しながら並行取得
+- 429（レート制限）はジッター付き指数バックオフでリトライ
+- 各ウィンドウの結果を結合し、タイムスタンプで重複排除
+
+Usage:
+    fetcher = OHLCVRangeFetcher('hyperliquid')
+    result = await fetcher.fetch(fetch_window, start_ms, end_ms, window_ms)
+
+    # ベンチマーク（ローカルの疑似取引所サーバーを使用）
+    python ohlcv_range_fetcher.py --days 30 --timeframe 15m --latency 0.05
+"""
+
+import asyncio
+import logging
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ExchangeRateProfile:
+    """取引所ごとの取得設定"""
+    name: str
+    max_candles_per_request: int   # 1リクエストで取得できる最大本数
+    requests_per_second: float     # トークンバケットの補充レート
+    burst: int                     # トークンバケットの容量
+    max_concurrency: int           # 同時実行リクエスト数
+    max_retries: int = 5           # 429時の最大リトライ回数
+    backoff_base: float = 0.5      # バックオフの基準秒数
+    backoff_cap: float = 8.0       # バックオフの上限秒数
+
+
+EXCHANGE_RATE_PROFILES = {
+    # Hyperliquid: candleSnapshotは1リクエスト最大5000本
+    'hyperliquid': ExchangeRateProfile('hyperliquid', max_candles_per_request=5000,
+                                       requests_per_second=2.0, burst=4, max_concurrency=4),
+    # Gate.io: fetch_ohlcvはlimit=1000で取得（公開APIは10秒200リクエスト）
+    'gateio': ExchangeRateProfile('gateio', max_candles_per_request=1000,
+                                  requests_per_second=10.0, burst=10, max_concurrency=4),
+}
+
+
+class TokenBucket:
+    """
+    スレッドセーフなトークンバケット
+
+    トークンを先に予約して必要な待機時間だけ sleep するため、
+    異なるイベントループ・スレッドから同じバケットを共有できる。
+    """
+
+    def __init__(self, rate: float, capacity: int, clock: Callable[[], float] = time.monotonic):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self._clock = clock
+        self._tokens = float(capacity)
+        self._last = clock()
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens: float = 1.0) -> float:
+        """トークンを予約し、利用可能になるまでの待機秒数を返す"""
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            self._tokens -= tokens
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    async def acquire(self, tokens: float = 1.0, sleep=asyncio.sleep):
+        wait = self.reserve(tokens)
+        if wait > 0:
+            await sleep(wait)
+
+
+_rate_limiters: Dict[str, TokenBucket] = {}
+_rate_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(profile: ExchangeRateProfile) -> TokenBucket:
+    """取引所ごとにプロセス内で共有するトークンバケットを取得"""
+    with _rate_limiters_lock:
+        limiter = _rate_limiters.get(profile.name)
+        if limiter is None:
+            limiter = TokenBucket(profile.requests_per_second, profile.burst)
+            _rate_limiters[profile.name] = limiter
+        return limiter
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """429（レート制限）エラーかどうか"""
+    if getattr(error, 'status_code', None) == 429:
+        return True
+    if type(error).__name__ in ('RateLimitExceeded', 'DDoSProtection'):
+        return True
+    message = str(error).lower()
+    return '429' in message or 'rate limit' in message or 'too many requests' in message
+
+
+def split_range(start_ms: int, end_ms: int, window_ms: int) -> List[Tuple[int, int]]:
+    """[start_ms, end_ms]（両端含む）を重ならないウィンドウに分割"""
+    if window_ms <= 0:
+        raise ValueError(f"window_msは正の値が必要です: {window_ms}")
+    windows = []
+    current = int(start_ms)
+    while current <= end_ms:
+        window_end = min(current + window_ms - 1, int(end_ms))
+        windows.append((current, window_end))
+        current = window_end + 1
+    return windows
+
+
+@dataclass
+class RangeFetchResult:
+    """期間取得の結果"""
+    rows: List[dict] = field(default_factory=list)                        # 時刻順・重複排除済み
+    failed_windows: List[Tuple[int, int]] = field(default_factory=list)  # リトライ後も失敗したウィンドウ
+    empty_windows: List[Tuple[int, int]] = field(default_factory=list)   # データが返らなかったウィンドウ
+    errors: List[Exception] = field(default_factory=list)
+    windows: int = 0
+    requests: int = 0
+    rate_limited: int = 0
+    elapsed_seconds: float = 0.0
+
+
+class OHLCVRangeFetcher:
+    """ウィンドウ分割・並行取得・429リトライを行う期間フェッチャー"""
+
+    def __init__(self, profile, rate_limiter: TokenBucket = None, rng: random.Random = None,
+                 sleep=asyncio.sleep):
+        """
+        Args:
+            profile: ExchangeRateProfile または取引所名
+            rate_limiter: 共有するトークンバケット（省略時は取引所ごとのプロセス共有バケット）
+            rng: バックオフのジッター用乱数（テストで固定可能）
+            sleep: 待機関数（テストで差し替え可能）
+        """
+        if isinstance(profile, str):
+            profile = EXCHANGE_RATE_PROFILES[profile]
+        self.profile = profile
+        self.rate_limiter = rate_limiter or get_rate_limiter(profile)
+        self.rng = rng or random.Random()
+        self._sleep = sleep
+
+    def window_ms_for(self, timeframe_ms: int) -> int:
+        """1リクエスト上限本数に合わせたウィンドウ幅"""
+        return int(timeframe_ms) * self.profile.max_candles_per_request
+
+    def backoff_seconds(self, attempt: int) -> float:
+        """ジッター付き指数バックオフ（attemptは1始まり）"""
+        delay = min(self.profile.backoff_cap, self.profile.backoff_base * (2 ** (attempt - 1)))
+        return delay * self.rng.uniform(0.5, 1.5)
+
+    async def fetch(self, fetch_window: Callable[[int, int], List[dict]], start_ms: int, end_ms: int,
+                    window_ms: int) -> RangeFetchResult:
+        """
+        期間全体を取得
+
+        Args:
+            fetch_window: (window_start_ms, window_end_ms) を受け取り、'timestamp'（ミリ秒）を含む
+                          行のリストを返す同期関数（スレッドプールで実行される）
+            start_ms: 開始時刻（ミリ秒、含む）
+            end_ms: 終了時刻（ミリ秒、含む）
+            window_ms: 1リクエストのウィンドウ幅
+        """
+        started = time.perf_counter()
+        windows = split_range(start_ms, end_ms, window_ms)
+        result = RangeFetchResult(windows=len(windows))
+        semaphore = asyncio.Semaphore(self.profile.max_concurrency)
+        loop = asyncio.get_running_loop()
+
+        async def run_window(window):
+            async with semaphore:
+                attempt = 0
+                while True:
+                    await self.rate_limiter.acquire(sleep=self._sleep)
+                    result.requests += 1
+                    try:
+                        return await loop.run_in_executor(None, fetch_window, window[0], window[1])
+                    except Exception as e:
+                        if is_rate_limit_error(e) and attempt < self.profile.max_retries:
+                            attempt += 1
+                            result.rate_limited += 1
+                            delay = self.backoff_seconds(attempt)
+                            logger.debug(f"429 rate limited ({self.profile.name}) - retry {attempt} in {delay:.2f}s")
+                            await self._sleep(delay)
+                            continue
+                        raise
+
+        outcomes = await asyncio.gather(*(run_window(w) for w in windows), return_exceptions=True)
+
+        rows_by_ts = {}
+        for window, outcome in zip(windows, outcomes):
+            if isinstance(outcome, Exception):
+                logger.warning(f"⚠️ {self.profile.name} window fetch failed "
+                               f"[{window[0]} - {window[1]}]: {outcome}")
+                result.failed_windows.append(window)
+                result.errors.append(outcome)
+            elif not outcome:
+                result.empty_windows.append(window)
+            else:
+                for row in outcome:
+                    rows_by_ts.setdefault(int(row['timestamp']), row)
+
+        result.rows = [rows_by_ts[ts] for ts in sorted(rows_by_ts)]
+        result.elapsed_seconds = time.perf_counter() - started
+        return result
+
+
+def run_benchmark(days: int = 30, timeframe: str = '15m', latency: float = 0.05,
+                  legacy_sleep: float = 0.5) -> Dict[str, float]:
+    """
+    疑似取引所サーバーで従来方式（1日ずつ逐次）と並行フェッチャーを比較
+
+    Returns:
+        Dict: 各方式の所要時間・リクエスト数
+    """
+    from hyperliquid.info import Info
+    from fake_exchange_server import FakeExchangeServer, fake_meta
+    from ohlcv_candle_store import timeframe_to_ms
+
+    tf_ms = timeframe_to_ms(timeframe)
+    end_ms = (int(time.time() * 1000) // tf_ms) * tf_ms
+    start_ms = end_ms - days * 86_400_000
+    one_day_ms = 86_400_000
+
+    with FakeExchangeServer(latency=latency, max_candles_per_request=5000) as server:
+        info = Info(server.url, skip_ws=True, meta=fake_meta(), spot_meta={'tokens': [], 'universe': []})
+
+        # 従来方式: 1日ずつ逐次 + 固定sleep
+        legacy_started = time.perf_counter()
+        legacy_rows = 0
+        current = start_ms
+        while current < end_ms:
+            legacy_rows += len(info.candles_snapshot('SOL', timeframe, current, min(current + one_day_ms, end_ms)))
+            current += one_day_ms
+            time.sleep(legacy_sleep)
+        legacy_elapsed = time.perf_counter() - legacy_started
+        legacy_requests = server.stats['candle_requests']
+
+        # 並行フェッチャー
+        fetcher = OHLCVRangeFetcher('hyperliquid', rate_limiter=TokenBucket(20.0, 20))
+        fetch_window = lambda ws, we: [{'timestamp': c['t'], **c} for c in info.candles_snapshot('SOL', timeframe, ws, we)]
+        result = asyncio.run(fetcher.fetch(fetch_window, start_ms, end_ms, fetcher.window_ms_for(tf_ms)))
+
+    return {
+        'legacy_seconds': legacy_elapsed,
+        'legacy_requests': legacy_requests,
+        'legacy_rows': legacy_rows,
+        'concurrent_seconds': result.elapsed_seconds,
+        'concurrent_requests': result.requests,
+        'concurrent_rows': len(result.rows),
+    }
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='OHLCV期間フェッチャーのベンチマーク（疑似取引所サーバー使用）')
+    parser.add_argument('--days', type=int, default=30, help='取得日数')
+    parser.add_argument('--timeframe', default='15m', help='時間足')
+    parser.add_argument('--latency', type=float, default=0.05, help='疑似サーバーの応答遅延（秒）')
+    parser.add_argument('--legacy-sleep', type=float, default=0.5, help='従来方式のリクエスト間待機（秒）')
+    args = parser.parse_args()
+
+    stats = run_benchmark(args.days, args.timeframe, args.latency, args.legacy_sleep)
+    print(f"📊 {args.days}日間 {args.timeframe}足")
+    print(f"   従来方式:   {stats['legacy_seconds']:.2f}秒 / {stats['legacy_requests']}リクエスト / {stats['legacy_rows']}本")
+    print(f"   並行取得:   {stats['concurrent_seconds']:.2f}秒 / {stats['concurrent_requests']}リクエスト / {stats['concurrent_rows']}本")
+    if stats['concurrent_seconds'] > 0:
+        print(f"   ⚡ 高速化: {stats['legacy_seconds'] / stats['concurrent_seconds']:.1f}倍")
+
+
+if __name__ == '__main__':
+    main()
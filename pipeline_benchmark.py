@@ -0,0 +1,605 @@
+#!/usr/bin/env python3
+"""
+分析パイプラインのベンチマーク（オフライン・決定的）
+
+合成OHLCVデータ（長さ・ボラティリティ・相場局面を指定、シード固定）に対して
+分析パイプラインの各ステージの処理時間を計測し、JSONのベースラインと比較して
+しきい値を超える劣化を検出する。取引所APIには一切アクセスしない。
+
+計測するステージ:
+    sr_detection           サポート・レジスタンス検出（ExistingSupportResistanceAdapter.find_levels）
+    interaction_detection  レベルとの相互作用検出（support_resistance_ml.detect_level_interactions）
+    feature_building       ML特徴量の構築（EnhancedMLPredictor.create_enhanced_features）
+    ml_train               ブレイクアウト予測モデルの訓練（EnhancedMLPredictor.train_model）
+    ml_predict             全レベルの一括予測（EnhancedMLPredictor.predict_breakouts_batch）
+    market_context         評価足ごとの市場コンテキスト（SimpleMarketContextAnalyzer.analyze_market_phase）
+    leverage_decision      評価足ごとのレバレッジ判定（CoreLeverageDecisionEngine.calculate_safe_leverage）
+    tp_sl_exit             全足をエントリーとしたTP/SL到達判定（TPSLExitResolver.resolve_batch）
+    full_analysis          ScalableAnalysisSystem._generate_real_analysis（取引所の代わりに合成データ、トレード0件はエラー）
+    startup_import         新しいプロセスでのワーカーモジュールの読み込み（import_time_report.measure_import）
+
+使い方:
+    python pipeline_benchmark.py run [--bars 2000] [--regime mixed] [--save-baseline default]
+    python pipeline_benchmark.py run --compare default [--threshold 20]
+    python pipeline_benchmark.py compare benchmarks/baselines/default.json current.json
+
+ステージの準備（データ生成・前段のステージ）は計測に含めない。設定ファイルがないなど
+ステージを実行できない環境では、そのステージを skipped として理由を記録する。
+"""
+
+import os
+import sys
+import json
+import time
+import platform
+import contextlib
+import io
+import statistics
+from pathlib import Path
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from ohlcv_candle_store import timeframe_to_ms
+
+PROJECT_ROOT = Path(__file__).parent
+
+RESULT_VERSION = 1
+DEFAULT_BASELINE_DIR = PROJECT_ROOT / 'benchmarks' / 'baselines'
+
+REGIMES = ('trend', 'range', 'crash', 'mixed')
+
+# 劣化とみなす中央値の増加率（%）と、ノイズとして無視する増加量（ms）
+DEFAULT_THRESHOLD_PCT = 20.0
+DEFAULT_MIN_DELTA_MS = 1.0
+
+STATUS_OK = 'ok'
+STATUS_SKIPPED = 'skipped'
+STATUS_ERROR = 'error'
+
+
+# === 合成データ ===
+
+def generate_synthetic_ohlcv(bars: int = 2000, timeframe: str = '1h', volatility: float = 0.01,
+                             regime: str = 'mixed', seed: int = 42,
+                             start: datetime = datetime(2024, 1, 1, tzinfo=timezone.utc)) -> pd.DataFrame:
+    """
+    合成OHLCVデータを生成（同じ引数なら常に同じデータ）
+
+    Args:
+        bars: 足の本数
+        timeframe: 時間足（timestamp の間隔）
+        volatility: 1本あたりのリターンの標準偏差
+        regime: 'trend'（上昇トレンド） / 'range'（レンジ往復） / 'crash'（急落と戻り） /
+                'mixed'（レンジ → トレンド → 急落を3等分）
+        seed: 乱数シード
+
+    Returns:
+        pd.DataFrame: timestamp（UTC）/ open / high / low / close / volume
+    """
+    if regime not in REGIMES:
+        raise ValueError(f"不明なregime: {regime} (有効値: {REGIMES})")
+    if bars < 2:
+        raise ValueError("barsは2以上を指定してください")
+
+    rng = np.random.default_rng(seed)
+    noise = rng.normal(0.0, volatility, bars)
+
+    def segment_returns(kind: str, size: int, offset: int) -> np.ndarray:
+        t = np.arange(size)
+        eps = noise[offset:offset + size]
+        if kind == 'trend':
+            return eps + volatility * 0.15
+        if kind == 'range':
+            # 周期的な目標水準への平均回帰（サポート・レジスタンスに繰り返し接近する）
+            period = max(size // 6, 8)
+            target = 0.08 * np.sin(2 * np.pi * t / period)
+            log_price = np.zeros(size)
+            for i in range(1, size):
+                log_price[i] = log_price[i - 1] + 0.2 * (target[i] - log_price[i - 1]) + eps[i]
+            return np.diff(log_price, prepend=0.0)
+        # crash: 上昇 → 全体の5%の期間で約30%下落 → 戻り
+        crash_start, crash_len = int(size * 0.5), max(int(size * 0.05), 1)
+        drift = np.full(size, volatility * 0.05)
+        drift[crash_start:crash_start + crash_len] = np.log(0.7) / crash_len
+        drift[crash_start + crash_len:] = volatility * 0.1
+        return eps + drift
+
+    if regime == 'mixed':
+        sizes = [bars // 3, bars // 3, bars - 2 * (bars // 3)]
+        offsets = np.cumsum([0] + sizes[:-1])
+        log_returns = np.concatenate([segment_returns(kind, size, offset) for kind, size, offset
+                                      in zip(('range', 'trend', 'crash'), sizes, offsets)])
+    else:
+        log_returns = segment_returns(regime, bars, 0)
+
+    close = 100.0 * np.exp(np.cumsum(log_returns))
+    open_ = np.concatenate([[100.0], close[:-1]]) * (1 + rng.normal(0.0, volatility * 0.1, bars))
+    wick = np.abs(rng.normal(0.0, volatility * 0.5, (2, bars)))
+    high = np.maximum(open_, close) * (1 + wick[0])
+    low = np.minimum(open_, close) * (1 - wick[1])
+    # 値動きの大きい足ほど出来高が増える
+    volume = rng.lognormal(mean=8.0, sigma=0.3, size=bars) * (1 + np.abs(log_returns) / volatility)
+
+    timestamps = pd.Timestamp(start) + pd.to_timedelta(np.arange(bars) * timeframe_to_ms(timeframe), unit='ms')
+    return pd.DataFrame({
+        'timestamp': timestamps,
+        'open': open_,
+        'high': high,
+        'low': low,
+        'close': close,
+        'volume': volume,
+    })
+
+
+# === ステージ定義 ===
+
+class _OfflineBTCCorrelationAnalyzer:
+    """取引所APIを使わずに固定のBTC相関リスクを返すアナライザー（full_analysis 用）"""
+
+    def predict_altcoin_impact(self, symbol, btc_drop_pct):
+        from interfaces import BTCCorrelationRisk
+        return BTCCorrelationRisk(
+            symbol=symbol,
+            btc_drop_scenario=btc_drop_pct,
+            predicted_altcoin_drop={5: btc_drop_pct * 0.6, 15: btc_drop_pct * 0.8,
+                                    60: btc_drop_pct, 240: btc_drop_pct * 1.2},
+            correlation_strength=0.8,
+            risk_level='MEDIUM',
+            liquidation_risk={5: 0.05, 15: 0.1, 60: 0.15, 240: 0.2}
+        )
+
+    def analyze_correlation(self, btc_data, alt_data):
+        return 0.8
+
+
+class BenchmarkContext:
+    """ステージ間で共有する準備済みデータ（前段のステージの結果は1回だけ計算）"""
+
+    def __init__(self, data: pd.DataFrame, timeframe: str, evaluations: int):
+        self.data = data
+        self.timeframe = timeframe
+        # 評価足: データ後半から等間隔に選ぶ（サポレジ検出の前データを確保）
+        first = len(data) // 2
+        count = max(1, min(evaluations, len(data) - first))
+        positions = np.linspace(first, len(data) - 1, count).astype(int)
+        self.eval_timestamps = [data['timestamp'].iloc[i] for i in positions]
+        self._cache = {}
+
+    def get(self, key: str, factory: Callable[[], Any]):
+        if key not in self._cache:
+            self._cache[key] = factory()
+        return self._cache[key]
+
+    def levels(self):
+        """サポート・レジスタンスレベル（SupportResistanceLevel のリスト）"""
+        def detect():
+            from adapters.existing_adapters import ExistingSupportResistanceAdapter
+            levels = ExistingSupportResistanceAdapter().find_levels(self.data)
+            if not levels:
+                raise RuntimeError("合成データからサポート・レジスタンスが検出されませんでした")
+            return levels
+        return self.get('levels', detect)
+
+    def trained_predictor(self):
+        def train():
+            from enhanced_ml_predictor import EnhancedMLPredictor
+            predictor = EnhancedMLPredictor()
+            if not predictor.train_model(self.data, self.levels()):
+                raise RuntimeError("ブレイクアウト予測モデルを訓練できませんでした")
+            return predictor
+        return self.get('trained_predictor', train)
+
+    def market_contexts(self):
+        def analyze():
+            from engines.leverage_decision_engine import SimpleMarketContextAnalyzer
+            analyzer = SimpleMarketContextAnalyzer()
+            return [analyzer.analyze_market_phase(self.data, ts, is_realtime=False) for ts in self.eval_timestamps]
+        return self.get('market_contexts', analyze)
+
+
+def _stage_sr_detection(ctx: BenchmarkContext):
+    from adapters.existing_adapters import ExistingSupportResistanceAdapter
+    adapter = ExistingSupportResistanceAdapter()
+    return lambda: adapter.find_levels(ctx.data), len(ctx.data)
+
+
+def _stage_interaction_detection(ctx: BenchmarkContext):
+    from support_resistance_visualizer import find_all_levels
+    from support_resistance_ml import detect_level_interactions
+    levels = ctx.get('level_dicts', lambda: find_all_levels(ctx.data))
+    return lambda: detect_level_interactions(ctx.data, levels), len(ctx.data)
+
+
+def _stage_feature_building(ctx: BenchmarkContext):
+    from enhanced_ml_predictor import EnhancedMLPredictor
+    predictor, levels = EnhancedMLPredictor(), ctx.levels()
+    return lambda: predictor.create_enhanced_features(ctx.data, levels), len(ctx.data)
+
+
+def _stage_ml_train(ctx: BenchmarkContext):
+    from enhanced_ml_predictor import EnhancedMLPredictor
+    levels = ctx.levels()
+
+    def train():
+        if not EnhancedMLPredictor().train_model(ctx.data, levels):
+            raise RuntimeError("ブレイクアウト予測モデルを訓練できませんでした")
+    return train, len(ctx.data)
+
+
+def _stage_ml_predict(ctx: BenchmarkContext):
+    predictor, levels = ctx.trained_predictor(), ctx.levels()
+    return lambda: predictor.predict_breakouts_batch(ctx.data, levels), len(levels)
+
+
+def _stage_market_context(ctx: BenchmarkContext):
+    from engines.leverage_decision_engine import SimpleMarketContextAnalyzer
+
+    def analyze():
+        # バックテストと同じく新しいアナライザーで全評価足を分析（事前計算も計測に含める）
+        analyzer = SimpleMarketContextAnalyzer()
+        for ts in ctx.eval_timestamps:
+            analyzer.analyze_market_phase(ctx.data, ts, is_realtime=False)
+    return analyze, len(ctx.eval_timestamps)
+
+
+def _stage_leverage_decision(ctx: BenchmarkContext):
+    from engines.leverage_decision_engine import CoreLeverageDecisionEngine
+    engine = CoreLeverageDecisionEngine(timeframe=ctx.timeframe)
+    levels = ctx.levels()
+    supports = [level for level in levels if level.level_type == 'support']
+    resistances = [level for level in levels if level.level_type == 'resistance']
+    predictions = ctx.trained_predictor().predict_breakouts_batch(ctx.data, levels)
+    predictions = [prediction for prediction in predictions if prediction is not None]
+    btc_risk = _OfflineBTCCorrelationAnalyzer().predict_altcoin_impact('BENCH', -5.0)
+    contexts = ctx.market_contexts()
+
+    def decide():
+        for context in contexts:
+            engine.calculate_safe_leverage('BENCH', supports, resistances, predictions, btc_risk, context)
+    return decide, len(contexts)
+
+
+def _stage_tp_sl_exit(ctx: BenchmarkContext):
+    from engines.tp_sl_exit_resolver import TPSLExitResolver
+    close = ctx.data['close'].to_numpy()
+    entries = np.arange(len(close) - 1)
+
+    def resolve():
+        resolver = TPSLExitResolver(ctx.data)
+        resolver.resolve_batch(entries, close[entries] * 1.03, close[entries] * 0.98)
+    return resolve, len(entries)
+
+
+class _OfflineExchangeClient:
+    """MultiExchangeAPIClient の代わりに合成データを返すクライアント（full_analysis 用）"""
+
+    data: Optional[pd.DataFrame] = None
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def get_ohlcv_dataframe(self, symbol, timeframe, start_time, end_time):
+        data = self.data
+        return data[(data['timestamp'] >= start_time) & (data['timestamp'] <= end_time)].reset_index(drop=True)
+
+    async def get_ohlcv_data(self, symbol, timeframe, start_time, end_time):
+        return self.get_ohlcv_dataframe(symbol, timeframe, start_time, end_time)
+
+
+def _stage_full_analysis(ctx: BenchmarkContext):
+    import tempfile
+    from unittest.mock import patch
+    from engines.high_leverage_bot_orchestrator import HighLeverageBotOrchestrator
+    from scalable_analysis_system import ScalableAnalysisSystem
+
+    if HighLeverageBotOrchestrator(use_default_plugins=True).leverage_decision_engine is None:
+        raise RuntimeError("デフォルトプラグインを初期化できませんでした（設定ファイルを確認してください）")
+
+    # _generate_real_analysis は現在時刻から評価期間を決めるため、合成データを現在の足で終わるようにずらす
+    bar_ms = timeframe_to_ms(ctx.timeframe)
+    data = ctx.data.copy()
+    latest = pd.Timestamp.now(tz='UTC').floor(f'{bar_ms}ms')
+    data['timestamp'] = data['timestamp'] + (latest - data['timestamp'].iloc[-1])
+    _OfflineExchangeClient.data = data
+
+    # 評価期間: 後半の足（支持線・抵抗線検出用の前データを確保）から評価足の数だけ
+    evaluations = len(ctx.eval_timestamps)
+    period_days = evaluations * bar_ms / 86400000
+
+    original_init_plugins = HighLeverageBotOrchestrator._initialize_default_plugins
+    original_tf_config = ScalableAnalysisSystem._load_timeframe_config
+
+    def init_plugins(bot):
+        original_init_plugins(bot)
+        bot.btc_correlation_analyzer = _OfflineBTCCorrelationAnalyzer()
+
+    def tf_config(system, timeframe):
+        # 全ての足を評価する（評価足の数 = evaluations）
+        return dict(original_tf_config(system, timeframe), evaluation_interval_minutes=bar_ms // 60000)
+
+    # 分析DBは一時ディレクトリに作る（コンテキストが破棄されると削除される）
+    workdir = ctx.get('analysis_workdir', lambda: tempfile.TemporaryDirectory(prefix='pipeline_benchmark_'))
+    system = ScalableAnalysisSystem(base_dir=workdir.name)
+
+    def evaluate():
+        with patch('hyperliquid_api_client.MultiExchangeAPIClient', _OfflineExchangeClient), \
+                patch.object(HighLeverageBotOrchestrator, '_initialize_default_plugins', init_plugins), \
+                patch.object(ScalableAnalysisSystem, '_load_timeframe_config', tf_config), \
+                patch.dict(os.environ, {'SHARED_MARKET_DATA_ENABLED': 'false'}):
+            trades = system._generate_real_analysis('BENCH', ctx.timeframe, 'Balanced', custom_period_days=period_days)
+        if not trades:
+            raise RuntimeError("_generate_real_analysis でトレードが生成されませんでした")
+    return evaluate, evaluations
+
+
+def _stage_startup_import(ctx: BenchmarkContext):
+    from import_time_report import measure_import
+
+    def load():
+        report = measure_import('scalable_analysis_system')
+        if report['heavy_packages']:
+            raise RuntimeError(f"起動時に重いパッケージを読み込んでいます: {', '.join(report['heavy_packages'])}")
+    return load, 1
+
+
+STAGES = {
+    'sr_detection': _stage_sr_detection,
+    'interaction_detection': _stage_interaction_detection,
+    'feature_building': _stage_feature_building,
+    'ml_train': _stage_ml_train,
+    'ml_predict': _stage_ml_predict,
+    'market_context': _stage_market_context,
+    'leverage_decision': _stage_leverage_decision,
+    'tp_sl_exit': _stage_tp_sl_exit,
+    'full_analysis': _stage_full_analysis,
+    'startup_import': _stage_startup_import,
+}
+
+
+# === 実行 ===
+
+@contextlib.contextmanager
+def _quiet(verbose: bool):
+    """各ステージの print を抑制（ベンチマーク結果だけを表示）"""
+    if verbose:
+        yield
+        return
+    with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+        yield
+
+
+def run_benchmark(bars: int = 2000, timeframe: str = '1h', volatility: float = 0.01, regime: str = 'mixed',
+                  seed: int = 42, repeat: int = 3, evaluations: int = 50,
+                  stages: Optional[Sequence[str]] = None, verbose: bool = False) -> Dict[str, Any]:
+    """
+    ステージごとの処理時間を計測
+
+    各ステージは準備（計測外）の後、ウォームアップ1回 + repeat 回実行して中央値をとる。
+
+    Args:
+        bars, timeframe, volatility, regime, seed: 合成データの条件
+        repeat: 計測回数
+        evaluations: market_context / leverage_decision / full_analysis で評価する足の数
+        stages: 計測するステージ（省略時は全ステージ）
+
+    Returns:
+        ベンチマーク結果（JSONに保存できる辞書）
+    """
+    stages = list(stages or STAGES)
+    unknown = [name for name in stages if name not in STAGES]
+    if unknown:
+        raise ValueError(f"不明なステージ: {unknown} (有効値: {list(STAGES)})")
+
+    data = generate_synthetic_ohlcv(bars, timeframe, volatility, regime, seed)
+    ctx = BenchmarkContext(data, timeframe, evaluations)
+    results = {}
+
+    # ベンチマーク中の分析はステージプロファイラーに記録しない
+    previous = os.environ.get('STAGE_PROFILER_ENABLED')
+    os.environ['STAGE_PROFILER_ENABLED'] = 'false'
+    try:
+        for name in stages:
+            results[name] = _run_stage(name, ctx, repeat, verbose)
+    finally:
+        if previous is None:
+            os.environ.pop('STAGE_PROFILER_ENABLED', None)
+        else:
+            os.environ['STAGE_PROFILER_ENABLED'] = previous
+
+    return {
+        'version': RESULT_VERSION,
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'environment': {
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+        },
+        'params': {
+            'bars': bars, 'timeframe': timeframe, 'volatility': volatility, 'regime': regime,
+            'seed': seed, 'repeat': repeat, 'evaluations': evaluations,
+        },
+        'stages': results,
+    }
+
+
+def _run_stage(name: str, ctx: BenchmarkContext, repeat: int, verbose: bool) -> Dict[str, Any]:
+    try:
+        with _quiet(verbose):
+            fn, items = STAGES[name](ctx)
+    except Exception as e:
+        return {'status': STATUS_SKIPPED, 'reason': f"{type(e).__name__}: {e}"}
+
+    runs_ms = []
+    try:
+        with _quiet(verbose):
+            fn()  # ウォームアップ
+            for _ in range(max(repeat, 1)):
+                started = time.perf_counter()
+                fn()
+                runs_ms.append((time.perf_counter() - started) * 1000)
+    except Exception as e:
+        return {'status': STATUS_ERROR, 'reason': f"{type(e).__name__}: {e}"}
+
+    median_ms = statistics.median(runs_ms)
+    return {
+        'status': STATUS_OK,
+        'median_ms': median_ms,
+        'min_ms': min(runs_ms),
+        'runs_ms': runs_ms,
+        'items': items,
+        'us_per_item': median_ms * 1000 / items if items else None,
+    }
+
+
+# === ベースライン比較 ===
+
+def baseline_path(name_or_path: str) -> Path:
+    """ベースライン名（benchmarks/baselines/<name>.json）またはファイルパス"""
+    path = Path(name_or_path)
+    if path.suffix == '.json' or path.exists():
+        return path
+    return DEFAULT_BASELINE_DIR / f"{name_or_path}.json"
+
+
+def save_result(result: Dict[str, Any], path) -> Path:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+    return path
+
+
+def load_result(path) -> Dict[str, Any]:
+    with open(path, 'r', encoding='utf-8') as f:
+        result = json.load(f)
+    if result.get('version') != RESULT_VERSION:
+        raise ValueError(f"ベンチマーク結果のバージョンが異なります: {result.get('version')} ({path})")
+    return result
+
+
+def compare_results(baseline: Dict[str, Any], current: Dict[str, Any],
+                    threshold_pct: float = DEFAULT_THRESHOLD_PCT,
+                    min_delta_ms: float = DEFAULT_MIN_DELTA_MS) -> Dict[str, Any]:
+    """
+    ベースラインと今回の結果をステージごとに比較
+
+    中央値が threshold_pct % 以上、かつ min_delta_ms 以上増えたステージを劣化（regression）とする。
+
+    Returns:
+        {'regressions': [ステージ名], 'params_match': bool, 'stages': {ステージ名: 比較結果}}
+    """
+    rows = {}
+    for name in dict.fromkeys(list(baseline.get('stages', {})) + list(current.get('stages', {}))):
+        base = baseline.get('stages', {}).get(name)
+        now = current.get('stages', {}).get(name)
+        if base is None or now is None:
+            rows[name] = {'status': 'missing'}
+            continue
+        if base.get('status') != STATUS_OK or now.get('status') != STATUS_OK:
+            rows[name] = {'status': 'not_comparable', 'baseline_status': base.get('status'),
+                          'current_status': now.get('status')}
+            continue
+        delta_ms = now['median_ms'] - base['median_ms']
+        change_pct = delta_ms / base['median_ms'] * 100 if base['median_ms'] > 0 else 0.0
+        if change_pct >= threshold_pct and delta_ms >= min_delta_ms:
+            status = 'regression'
+        elif -change_pct >= threshold_pct and -delta_ms >= min_delta_ms:
+            status = 'improvement'
+        else:
+            status = STATUS_OK
+        rows[name] = {'status': status, 'baseline_ms': base['median_ms'], 'current_ms': now['median_ms'],
+                      'change_pct': change_pct}
+
+    return {
+        'threshold_pct': threshold_pct,
+        'params_match': baseline.get('params') == current.get('params'),
+        'regressions': [name for name, row in rows.items() if row['status'] == 'regression'],
+        'stages': rows,
+    }
+
+
+def format_result(result: Dict[str, Any]) -> str:
+    params = result['params']
+    lines = [f"📊 パイプラインベンチマーク ({params['bars']}本 {params['timeframe']} {params['regime']} "
+             f"vol={params['volatility']} seed={params['seed']}, {params['repeat']}回の中央値)"]
+    for name, stage in result['stages'].items():
+        if stage['status'] == STATUS_OK:
+            per_item = f"{stage['us_per_item']:10.1f} µs/item" if stage['us_per_item'] is not None else ''
+            lines.append(f"   {name:24s} {stage['median_ms']:10.2f} ms {per_item}")
+        else:
+            lines.append(f"   {name:24s} {stage['status']:>10s}    {stage['reason']}")
+    return "\n".join(lines)
+
+
+def format_comparison(comparison: Dict[str, Any]) -> str:
+    icons = {'regression': '❌', 'improvement': '🚀', STATUS_OK: '✅'}
+    lines = [f"📈 ベースライン比較 (しきい値 {comparison['threshold_pct']:.0f}%)"]
+    if not comparison['params_match']:
+        lines.append("   ⚠️ 合成データの条件がベースラインと異なります")
+    for name, row in comparison['stages'].items():
+        if 'change_pct' in row:
+            lines.append(f"   {icons.get(row['status'], '⚪')} {name:24s} {row['baseline_ms']:10.2f} → "
+                         f"{row['current_ms']:10.2f} ms ({row['change_pct']:+.1f}%)")
+        else:
+            lines.append(f"   ⚪ {name:24s} {row['status']}")
+    if comparison['regressions']:
+        lines.append(f"   ❌ 劣化: {', '.join(comparison['regressions'])}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description='分析パイプラインのベンチマーク（オフライン）')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = subparsers.add_parser('run', help='ステージごとの処理時間を計測')
+    run_parser.add_argument('--bars', type=int, default=2000, help='合成データの本数')
+    run_parser.add_argument('--timeframe', default='1h', help='時間足')
+    run_parser.add_argument('--volatility', type=float, default=0.01, help='1本あたりのリターンの標準偏差')
+    run_parser.add_argument('--regime', choices=REGIMES, default='mixed', help='相場局面')
+    run_parser.add_argument('--seed', type=int, default=42, help='乱数シード')
+    run_parser.add_argument('--repeat', type=int, default=3, help='計測回数')
+    run_parser.add_argument('--evaluations', type=int, default=50, help='足ごとのステージで評価する足の数')
+    run_parser.add_argument('--stages', help=f"計測するステージ（カンマ区切り、有効値: {','.join(STAGES)}）")
+    run_parser.add_argument('--output', help='結果のJSONの保存先')
+    run_parser.add_argument('--save-baseline', metavar='NAME', help='結果をベースラインとして保存')
+    run_parser.add_argument('--compare', metavar='BASELINE', help='ベースラインと比較（名前またはパス）')
+    run_parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD_PCT, help='劣化とみなす増加率（%%）')
+    run_parser.add_argument('--verbose', action='store_true', help='各ステージの出力を表示')
+
+    compare_parser = subparsers.add_parser('compare', help='2つの結果を比較')
+    compare_parser.add_argument('baseline', help='ベースライン（名前またはパス）')
+    compare_parser.add_argument('current', help='比較する結果のJSON')
+    compare_parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD_PCT, help='劣化とみなす増加率（%%）')
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'compare':
+        comparison = compare_results(load_result(baseline_path(args.baseline)), load_result(args.current),
+                                     args.threshold)
+        print(format_comparison(comparison))
+        return 1 if comparison['regressions'] else 0
+
+    stages = [name.strip() for name in args.stages.split(',')] if args.stages else None
+    result = run_benchmark(args.bars, args.timeframe, args.volatility, args.regime, args.seed,
+                           args.repeat, args.evaluations, stages, args.verbose)
+    print(format_result(result))
+    if args.output:
+        print(f"💾 結果を保存: {save_result(result, args.output)}")
+    if args.save_baseline:
+        print(f"💾 ベースラインを保存: {save_result(result, baseline_path(args.save_baseline))}")
+    if args.compare:
+        comparison = compare_results(load_result(baseline_path(args.compare)), result, args.threshold)
+        print(format_comparison(comparison))
+        return 1 if comparison['regressions'] else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
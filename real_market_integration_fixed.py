@@ -2,7 +2,6 @@
 実市場データ統合システム
 既存のOHLCVシステムとMLシステムを統合した実用的な分析エンジン
 """
-import pandas as pd
 import numpy as np
 import os
 import json
@@ -13,6 +12,8 @@ import subprocess
 import sys
 from pathlib import Path
 
+from feature_selection import feature_table_exists, load_feature_table
+
 # ログ設定
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -61,11 +62,11 @@ class RealMarketAnalysisSystem:
                 # まず既存ファイルをチェック
                 reduced_features_file = f"{symbol.lower()}_{timeframe}_90days_reduced_features.csv"
                 
-                if os.path.exists(reduced_features_file):
+                if feature_table_exists(reduced_features_file):
                     logger.info(f"既存データを使用: {reduced_features_file}")
                     try:
                         # データを読み込んで品質チェック
-                        df = pd.read_csv(reduced_features_file)
+                        df = load_feature_table(reduced_features_file)
                         quality_score = 1.0 - (df.isnull().sum().sum() / (len(df) * len(df.columns)))
                         
                         # データベースに記録
@@ -110,9 +111,9 @@ class RealMarketAnalysisSystem:
                         
                         result = subprocess.run(cmd, capture_output=True, text=True, timeout=600)
                         
-                        if result.returncode == 0 and os.path.exists(reduced_features_file):
+                        if result.returncode == 0 and feature_table_exists(reduced_features_file):
                             # 新しく生成されたファイルを処理
-                            df = pd.read_csv(reduced_features_file)
+                            df = load_feature_table(reduced_features_file)
                             quality_score = 1.0 - (df.isnull().sum().sum() / (len(df) * len(df.columns)))
                             
                             with sqlite3.connect(self.db_path) as conn:
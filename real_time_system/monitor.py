@@ -7,12 +7,14 @@ Phase 1: Automated monitoring and alerting system.
 import os
 import sys
 import json
+import asyncio
 import argparse
 import logging
 import signal
 import time
 import threading
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
 from typing import Dict, List, Optional, Any
 from pathlib import Path
 
@@ -27,7 +29,8 @@ except ImportError:
     HighLeverageBotOrchestrator = None
 
 from real_time_system.alert_manager import AlertManager, AlertType, AlertPriority
-from real_time_system.utils.scheduler_utils import TaskScheduler, RateLimiter
+from real_time_system.utils.scheduler_utils import TaskScheduler, RateLimiter, LatencyTracker
+from real_time_system.utils.candle_cache import CandleCache, latest_candle_close
 from real_time_system.utils.colored_log import get_colored_logger, print_banner, print_system_status, print_trading_opportunity
 
 
@@ -63,6 +66,13 @@ class RealTimeMonitor:
             delay_seconds=self.config.get('monitoring', {}).get('api_rate_limit_delay', 1.0)
         )
         
+        # Async monitoring core: shared candle cache and candle-close -> alert latency
+        self.candle_cache = CandleCache(
+            lookback_days=self.config.get('monitoring', {}).get('candle_lookback_days', 90),
+            exchange_limits=self.config.get('monitoring', {}).get('exchange_concurrency')
+        )
+        self.latency_tracker = LatencyTracker()
+        
         # Initialize trading bot orchestrator
         self.trading_bot = None
         if HighLeverageBotOrchestrator:
@@ -77,6 +87,11 @@ class RealTimeMonitor:
         self.start_time = None
         self.monitored_symbols = set()
         self.last_config_reload = datetime.now()
+        self.async_mode = False
+        self._async_loop = None
+        self._async_stop = None
+        self._analysis_executor = None
+        self._thread_bots = threading.local()
         
         # Setup signal handlers (only if running in main thread)
         try:
@@ -232,6 +247,11 @@ class RealTimeMonitor:
                 success = self.alert_manager.send_alert(alert)
                 if success:
                     self.logger.alert_sent(f"Trading opportunity for {symbol}")
+                    candle_close_time = result.get('candle_close_time')
+                    if candle_close_time is not None:
+                        self.latency_tracker.record(
+                            symbol, (datetime.now(timezone.utc) - candle_close_time).total_seconds()
+                        )
                 else:
                     self.logger.error(f"Failed to send alert for {symbol}")
             
@@ -271,8 +291,8 @@ class RealTimeMonitor:
     def _health_check_task(self):
         """Periodic health check task."""
         try:
-            # Check scheduler status
-            if not self.scheduler.is_running():
+            # Check scheduler status (the async core does not use the scheduler)
+            if not self.async_mode and not self.scheduler.is_running():
                 self.logger.error("Scheduler is not running!")
                 return
             
@@ -295,6 +315,121 @@ class RealTimeMonitor:
         except Exception as e:
             self.logger.error(f"Health check failed: {e}")
     
+    def _run_bot_analysis(self, symbol: str, timeframe: str, strategy: str, data) -> Any:
+        """Run one analysis on this worker thread's own orchestrator with cached candles injected."""
+        bot = getattr(self._thread_bots, 'bot', None)
+        if bot is None:
+            bot = HighLeverageBotOrchestrator()
+            self._thread_bots.bot = bot
+        
+        # The orchestrator reuses _prepared_data/_cached_data when set, so replace both per call
+        bot._prepared_data = None
+        bot._cached_data = data.copy()
+        return bot.analyze_symbol(symbol=symbol, timeframe=timeframe, strategy=strategy)
+    
+    async def _analyze_symbol_async(self, symbol: str, symbol_config: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Analyze a symbol: refresh candles through the cache, then run timeframes x strategies in parallel."""
+        if not HighLeverageBotOrchestrator:
+            self.logger.warning("Trading bot not available for analysis")
+            return None
+        
+        loop = asyncio.get_running_loop()
+        exchange = symbol_config.get('exchange') or self.config.get('monitoring', {}).get('exchange')
+        timeframes = symbol_config.get('timeframes', ['1h'])
+        strategies = symbol_config.get('strategies', ['Conservative_ML'])
+        
+        frames = await asyncio.gather(
+            *(self.candle_cache.get(symbol, timeframe, exchange) for timeframe in timeframes),
+            return_exceptions=True
+        )
+        
+        jobs = []
+        for timeframe, data in zip(timeframes, frames):
+            if isinstance(data, Exception):
+                self.logger.error(f"Candle refresh failed for {symbol} {timeframe}: {data}")
+                continue
+            candle_close_time = latest_candle_close(data, timeframe, datetime.now(timezone.utc))
+            for strategy in strategies:
+                future = loop.run_in_executor(
+                    self._analysis_executor, self._run_bot_analysis, symbol, timeframe, strategy, data
+                )
+                jobs.append((timeframe, strategy, candle_close_time, future))
+        
+        outcomes = await asyncio.gather(*(job[3] for job in jobs), return_exceptions=True)
+        
+        results = []
+        for (timeframe, strategy, candle_close_time, _), analysis in zip(jobs, outcomes):
+            if isinstance(analysis, Exception):
+                self.logger.error(f"Analysis failed for {symbol} {timeframe} {strategy}: {analysis}")
+                continue
+            if isinstance(analysis, dict) and 'leverage' in analysis and 'confidence' in analysis:
+                analysis['symbol'] = symbol
+                analysis['timeframe'] = timeframe
+                analysis['strategy'] = strategy
+                analysis['timestamp'] = datetime.now()
+                analysis['candle_close_time'] = candle_close_time
+                results.append(analysis)
+        
+        return {'symbol': symbol, 'results': results} if results else None
+    
+    async def _monitor_symbol_loop(self, symbol: str, interval_minutes: int):
+        """Async monitoring loop for a single symbol."""
+        loop = asyncio.get_running_loop()
+        while True:
+            cycle_start = loop.time()
+            symbol_config = self.watchlist['symbols'].get(symbol, {})
+            
+            if symbol_config.get('enabled', True):
+                self.logger.debug(f"Monitoring {symbol}")
+                try:
+                    analysis = await self._analyze_symbol_async(symbol, symbol_config)
+                    if analysis:
+                        # Alert delivery is blocking I/O; keep it off the event loop
+                        await loop.run_in_executor(None, self._process_analysis_results, analysis)
+                except Exception as e:
+                    self.logger.error(f"Error in monitoring task for {symbol}: {e}")
+            
+            await asyncio.sleep(max(0.0, interval_minutes * 60 - (loop.time() - cycle_start)))
+    
+    async def _health_check_loop(self):
+        """Periodic health check for the async core."""
+        loop = asyncio.get_running_loop()
+        interval = self.config.get('system', {}).get('health_check_interval', 300)
+        while True:
+            await asyncio.sleep(interval)
+            await loop.run_in_executor(None, self._health_check_task)
+    
+    async def _run_async(self, symbols: List[str], interval_minutes: Optional[int] = None):
+        """Run the async monitoring core until stop() is called."""
+        self._async_loop = asyncio.get_running_loop()
+        self._async_stop = asyncio.Event()
+        self._analysis_executor = ThreadPoolExecutor(
+            max_workers=self.config.get('monitoring', {}).get('max_parallel_workers', 5),
+            thread_name_prefix="monitor-analysis"
+        )
+        
+        if interval_minutes is None:
+            interval_minutes = self.config['monitoring']['default_interval_minutes']
+        
+        tasks = []
+        for symbol in symbols:
+            if not self.watchlist['symbols'].get(symbol, {}).get('enabled', True):
+                self.logger.info(f"Symbol {symbol} is disabled in watchlist")
+                continue
+            tasks.append(asyncio.create_task(self._monitor_symbol_loop(symbol, interval_minutes)))
+            self.monitored_symbols.add(symbol)
+            self.logger.task_status(f"monitor_{symbol}", "started", f"interval: {interval_minutes}m (async)")
+        tasks.append(asyncio.create_task(self._health_check_loop()))
+        
+        try:
+            await self._async_stop.wait()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            self._analysis_executor.shutdown(wait=False, cancel_futures=True)
+            self._async_loop = None
+    
     def add_symbol_monitoring(self, symbol: str, interval_minutes: Optional[int] = None):
         """Add or update symbol monitoring."""
         if symbol not in self.watchlist['symbols']:
@@ -344,12 +479,17 @@ class RealTimeMonitor:
             return True
         return False
     
-    def start(self, symbols: Optional[List[str]] = None, interval_minutes: Optional[int] = None):
-        """Start the monitoring system."""
+    def start(self, symbols: Optional[List[str]] = None, interval_minutes: Optional[int] = None,
+              use_async: Optional[bool] = None):
+        """Start the monitoring system (use_async defaults to monitoring.async_mode in the config)."""
         if self.running:
             self.logger.warning("Monitor is already running")
             return
         
+        if use_async is None:
+            use_async = self.config.get('monitoring', {}).get('async_mode', False)
+        self.async_mode = use_async
+        
         print_banner("LONG TRADER REAL-TIME MONITOR", "Automated Trading Opportunity Detection")
         self.logger.system_start({
             'symbols': symbols or list(self.watchlist['symbols'].keys()),
@@ -378,6 +518,16 @@ class RealTimeMonitor:
                 if config.get('enabled', True)
             ]
         
+        if self.async_mode:
+            self.logger.monitor_status(symbols_to_monitor)
+            self.logger.success(f"Async monitor started with {len(symbols_to_monitor)} symbols")
+            try:
+                asyncio.run(self._run_async(symbols_to_monitor, interval_minutes))
+            except KeyboardInterrupt:
+                self.logger.info("Received keyboard interrupt")
+                self.stop()
+            return
+        
         # Start scheduler
         self.scheduler.start()
         
@@ -426,6 +576,10 @@ class RealTimeMonitor:
         )
         self.alert_manager.send_alert(shutdown_alert)
         
+        # Stop async core
+        if self._async_loop is not None:
+            self._async_loop.call_soon_threadsafe(self._async_stop.set)
+        
         # Stop scheduler
         timeout = self.config.get('system', {}).get('graceful_shutdown_timeout', 30)
         self.scheduler.stop(timeout)
@@ -443,9 +597,12 @@ class RealTimeMonitor:
             'start_time': self.start_time.isoformat() if self.start_time else None,
             'uptime_seconds': uptime,
             'monitored_symbols': list(self.monitored_symbols),
+            'mode': 'async' if self.async_mode else 'scheduler',
             'scheduler_running': self.scheduler.is_running(),
             'task_status': self.scheduler.get_task_status(),
-            'alert_stats': self.alert_manager.get_statistics()
+            'alert_stats': self.alert_manager.get_statistics(),
+            'candle_cache': self.candle_cache.get_status(),
+            'alert_latency': self.latency_tracker.get_stats()
         }
     
     def test_system(self) -> Dict[str, Any]:
@@ -474,6 +631,8 @@ def main():
     parser.add_argument('--symbols', help='Comma-separated list of symbols to monitor')
     parser.add_argument('--test', action='store_true', help='Test system components and exit')
     parser.add_argument('--status', action='store_true', help='Show system status and exit')
+    parser.add_argument('--async', dest='use_async', action='store_true',
+                        help='Use the async monitoring core (incremental candle cache, per-exchange limits)')
     
     args = parser.parse_args()
     
@@ -512,7 +671,7 @@ def main():
     
     # Start monitoring
     try:
-        monitor.start(symbols=symbols, interval_minutes=args.interval)
+        monitor.start(symbols=symbols, interval_minutes=args.interval, use_async=args.use_async or None)
     except Exception as e:
         monitor.logger.error(f"Monitor failed: {e}")
         sys.exit(1)
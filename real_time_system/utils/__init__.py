@@ -2,6 +2,6 @@
 Utility modules for real-time monitoring system.
 """
 
-from .scheduler_utils import TaskScheduler, RateLimiter, ScheduledTask
+from .scheduler_utils import TaskScheduler, RateLimiter, ScheduledTask, LatencyTracker
 
-__all__ = ['TaskScheduler', 'RateLimiter', 'ScheduledTask']
\ No newline at end of file
+__all__ = ['TaskScheduler', 'RateLimiter', 'ScheduledTask', 'LatencyTracker']
\ No newline at end of file
@@ -0,0 +1,207 @@
+"""
+Per-symbol candle cache for the async monitoring core.
+
+The first request for a (symbol, timeframe) fetches the full lookback window.
+Later requests fetch only from the newest cached bar onwards (the newest bar
+may still have been forming, so it is refetched and replaced) and merge the
+result into the cached frame, trimmed back to the lookback window.
+
+Concurrent requests for the same (exchange, symbol, timeframe) share one
+in-flight refresh, and fetches are limited per exchange with a semaphore.
+"""
+
+import asyncio
+import time
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EXCHANGE_CONCURRENCY = 4
+
+# fetch_func(exchange, symbol, timeframe, start_time, end_time) -> DataFrame with a 'timestamp' column
+FetchFunc = Callable[[Optional[str], str, str, datetime, datetime], Awaitable[pd.DataFrame]]
+
+
+@dataclass
+class CandleCacheEntry:
+    """Cached candles for one (exchange, symbol, timeframe)."""
+    data: pd.DataFrame
+    refreshed_at: datetime
+    full_fetches: int = 0
+    incremental_fetches: int = 0
+    last_fetch_rows: int = 0
+    last_fetch_seconds: float = 0.0
+
+
+def exchange_concurrency_limit(exchange: Optional[str], overrides: Optional[Dict[str, int]] = None) -> int:
+    """Concurrent fetch limit for an exchange (config override, then rate profile, then default)."""
+    if overrides and exchange in overrides:
+        return max(1, int(overrides[exchange]))
+    try:
+        from ohlcv_range_fetcher import EXCHANGE_RATE_PROFILES
+        profile = EXCHANGE_RATE_PROFILES.get(exchange)
+        if profile is not None:
+            return profile.max_concurrency
+    except ImportError:
+        pass
+    return DEFAULT_EXCHANGE_CONCURRENCY
+
+
+def merge_candles(cached: pd.DataFrame, fetched: pd.DataFrame, start_time: datetime) -> pd.DataFrame:
+    """Merge newly fetched bars into the cached frame (fetched bars win) and drop bars before start_time."""
+    if fetched is None or fetched.empty:
+        merged = cached
+    elif cached is None or cached.empty:
+        merged = fetched
+    else:
+        merged = pd.concat([cached[cached['timestamp'] < fetched['timestamp'].min()], fetched],
+                           ignore_index=True)
+    merged = merged.drop_duplicates(subset=['timestamp'], keep='last').sort_values('timestamp')
+    return merged[merged['timestamp'] >= start_time].reset_index(drop=True)
+
+
+def latest_candle_close(data: pd.DataFrame, timeframe: str, now: datetime) -> Optional[datetime]:
+    """Close time of the newest completed candle (the newest bar is skipped while it is still forming)."""
+    if data is None or data.empty:
+        return None
+    from ohlcv_candle_store import timeframe_to_ms
+    close_time = data['timestamp'].iloc[-1] + pd.Timedelta(milliseconds=timeframe_to_ms(timeframe))
+    if close_time > now:
+        # forming bar: the previous candle closed when it opened
+        close_time = data['timestamp'].iloc[-1]
+    return close_time.to_pydatetime()
+
+
+class CandleCache:
+    """Async per-symbol candle cache with incremental refresh and request deduplication."""
+
+    def __init__(self, fetch_func: Optional[FetchFunc] = None, lookback_days: int = 90,
+                 exchange_limits: Optional[Dict[str, int]] = None,
+                 clock: Callable[[], datetime] = None):
+        self.fetch_func = fetch_func or self._fetch_from_exchange
+        self.lookback = timedelta(days=lookback_days)
+        self.exchange_limits = exchange_limits or {}
+        self._clock = clock or (lambda: datetime.now(timezone.utc))
+        self._entries: Dict[Tuple[Optional[str], str, str], CandleCacheEntry] = {}
+        self._inflight: Dict[Tuple[Optional[str], str, str], asyncio.Future] = {}
+        self._semaphores: Dict[Optional[str], asyncio.Semaphore] = {}
+        self._clients = {}
+        self._loop = None
+        self.stats = {'requests': 0, 'deduplicated': 0, 'full_fetches': 0,
+                      'incremental_fetches': 0, 'failed_fetches': 0}
+
+    def _semaphore(self, exchange: Optional[str]) -> asyncio.Semaphore:
+        semaphore = self._semaphores.get(exchange)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(exchange_concurrency_limit(exchange, self.exchange_limits))
+            self._semaphores[exchange] = semaphore
+        return semaphore
+
+    async def _fetch_from_exchange(self, exchange: Optional[str], symbol: str, timeframe: str,
+                                   start_time: datetime, end_time: datetime) -> pd.DataFrame:
+        """Default fetcher: one MultiExchangeAPIClient per exchange (None uses the configured default)."""
+        client = self._clients.get(exchange)
+        if client is None:
+            from hyperliquid_api_client import MultiExchangeAPIClient
+            client = MultiExchangeAPIClient(exchange_type=exchange)
+            self._clients[exchange] = client
+        return await client.get_ohlcv_data(symbol, timeframe, start_time, end_time)
+
+    async def get(self, symbol: str, timeframe: str, exchange: Optional[str] = None) -> pd.DataFrame:
+        """
+        Get up-to-date candles for the lookback window.
+
+        The returned frame is shared with the cache and other callers; copy it before mutating.
+        """
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # semaphores and in-flight tasks belong to one event loop (the monitor may be restarted)
+            self._loop = loop
+            self._semaphores = {}
+            self._inflight = {}
+
+        key = (exchange, symbol, timeframe)
+        self.stats['requests'] += 1
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._refresh(key))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _, key=key: self._inflight.pop(key, None))
+        else:
+            self.stats['deduplicated'] += 1
+        # shield: a cancelled caller must not cancel the refresh shared with other callers
+        return await asyncio.shield(task)
+
+    async def _refresh(self, key: Tuple[Optional[str], str, str]) -> pd.DataFrame:
+        exchange, symbol, timeframe = key
+        entry = self._entries.get(key)
+        end_time = self._clock()
+        window_start = end_time - self.lookback
+
+        incremental = entry is not None and not entry.data.empty and \
+            entry.data['timestamp'].iloc[-1] >= window_start
+        fetch_start = entry.data['timestamp'].iloc[-1].to_pydatetime() if incremental else window_start
+
+        started = time.perf_counter()
+        async with self._semaphore(exchange):
+            try:
+                fetched = await self.fetch_func(exchange, symbol, timeframe, fetch_start, end_time)
+            except Exception:
+                self.stats['failed_fetches'] += 1
+                raise
+        elapsed = time.perf_counter() - started
+
+        if fetched is not None and not fetched.empty:
+            fetched = fetched.copy()
+            fetched['timestamp'] = pd.to_datetime(fetched['timestamp'], utc=True)
+        if incremental:
+            data = merge_candles(entry.data, fetched, window_start)
+            self.stats['incremental_fetches'] += 1
+        else:
+            if fetched is None or fetched.empty:
+                raise ValueError(f"No candles returned for {symbol} {timeframe}")
+            data = merge_candles(None, fetched, window_start)
+            self.stats['full_fetches'] += 1
+            entry = CandleCacheEntry(data=data, refreshed_at=end_time)
+
+        entry.data = data
+        entry.refreshed_at = end_time
+        entry.last_fetch_rows = 0 if fetched is None else len(fetched)
+        entry.last_fetch_seconds = elapsed
+        if incremental:
+            entry.incremental_fetches += 1
+        else:
+            entry.full_fetches += 1
+        self._entries[key] = entry
+
+        logger.debug(f"{'Incremental' if incremental else 'Full'} candle refresh {symbol} {timeframe}: "
+                     f"{entry.last_fetch_rows} rows in {elapsed:.2f}s")
+        return data
+
+    def invalidate(self, symbol: Optional[str] = None):
+        """Drop cached candles (all, or for one symbol) so the next request fetches the full window."""
+        for key in [k for k in self._entries if symbol is None or k[1] == symbol]:
+            del self._entries[key]
+
+    def get_status(self) -> Dict[str, Dict]:
+        """Cache statistics and per-key freshness."""
+        return {
+            'stats': dict(self.stats),
+            'entries': {
+                f"{exchange or 'default'}:{symbol}:{timeframe}": {
+                    'rows': len(entry.data),
+                    'last_candle': entry.data['timestamp'].iloc[-1].isoformat() if not entry.data.empty else None,
+                    'refreshed_at': entry.refreshed_at.isoformat(),
+                    'full_fetches': entry.full_fetches,
+                    'incremental_fetches': entry.incremental_fetches,
+                    'last_fetch_rows': entry.last_fetch_rows,
+                    'last_fetch_seconds': round(entry.last_fetch_seconds, 3),
+                }
+                for (exchange, symbol, timeframe), entry in list(self._entries.items())
+            }
+        }
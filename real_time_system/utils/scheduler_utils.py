@@ -221,6 +221,40 @@ class RateLimiter:
             self.last_call = time.time()
 
 
+class LatencyTracker:
+    """Per-symbol latency samples (e.g. candle close -> alert) with summary statistics."""
+
+    def __init__(self, max_samples: int = 500):
+        self.max_samples = max_samples
+        self.samples: Dict[str, List[float]] = {}
+        self.lock = threading.Lock()
+
+    def record(self, symbol: str, seconds: float):
+        """Record one latency sample for a symbol."""
+        with self.lock:
+            samples = self.samples.setdefault(symbol, [])
+            samples.append(float(seconds))
+            if len(samples) > self.max_samples:
+                del samples[:len(samples) - self.max_samples]
+
+    def get_stats(self) -> Dict[str, Dict[str, float]]:
+        """Count, last, mean, p95 and max latency per symbol."""
+        with self.lock:
+            stats = {}
+            for symbol, samples in self.samples.items():
+                if not samples:
+                    continue
+                ordered = sorted(samples)
+                stats[symbol] = {
+                    'count': len(samples),
+                    'last_seconds': samples[-1],
+                    'mean_seconds': sum(samples) / len(samples),
+                    'p95_seconds': ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))],
+                    'max_seconds': ordered[-1]
+                }
+            return stats
+
+
 def format_duration(seconds: int) -> str:
     """Format duration in human readable format."""
     if seconds < 60:
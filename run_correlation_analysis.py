@@ -9,6 +9,9 @@ python run_correlation_analysis.py --mode backtest --symbols ETH,SOL,HYPE
 # モデル訓練
 python run_correlation_analysis.py --mode train --symbol ETH
 
+# 複数銘柄の一括訓練（BTCデータ・特徴量は1回だけ取得・計算）
+python run_correlation_analysis.py --mode train --symbols ETH,SOL,HYPE
+
 # 予測実行
 python run_correlation_analysis.py --mode predict --symbol ETH --btc-drop -5.0 --leverage 10
 """
@@ -41,8 +44,18 @@ def main():
     
     if args.mode == 'train':
         # モデル訓練モード
+        if args.symbols:
+            predictor = BTCAltcoinCorrelationPredictor()
+            symbols = [s.strip().upper() for s in args.symbols.split(',') if s.strip()]
+            results = predictor.train_prediction_models(symbols)
+            for symbol, success in results.items():
+                if success:
+                    predictor.save_model(symbol)
+                print(f"{'✅' if success else '❌'} {symbol}: モデル訓練{'完了' if success else '失敗'}")
+            return 0 if all(results.values()) else 1
+        
         if not args.symbol:
-            print("訓練モードでは --symbol が必要です")
+            print("訓練モードでは --symbol または --symbols が必要です")
             return 1
         
         predictor = BTCAltcoinCorrelationPredictor()
@@ -6,7 +6,6 @@ import pandas as pd
 import numpy as np
 import os
 import json
-import sqlite3
 from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from multiprocessing import cpu_count
 import shutil
@@ -16,23 +15,21 @@ from datetime import datetime, timedelta, timezone
 import logging
 from pathlib import Path
 import asyncio
-import aiohttp
 import time
 from typing import List
-import requests
 
 # 価格データ整合性チェックシステムのインポート
 from engines.price_consistency_validator import PriceConsistencyValidator, UnifiedPriceData
 
 # 進捗ロガーのインポート
 from progress_logger import SymbolProgressLogger
+from trade_archive import TradeArchive
+from sqlite_access import db_connection, execute_write
+from stage_profiler import flush_stage_profiles
 
 # Discord通知システムのインポート
 from discord_notifier import discord_notifier
 
-# エラー例外のインポート
-from engines.leverage_decision_engine import InsufficientConfigurationError
-
 # Stage 9フィルタリングシステム削除済み (2025年6月29日)
 # 理由: 性能問題 - "軽量事前チェック"と謳いながら重い計算を実行
 # 詳細: README.md参照
@@ -50,6 +47,20 @@ except ImportError:
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# WORKER_START_METHOD=forkserver のときにforkサーバーで事前に読み込むモジュール
+# （ワーカーは読み込み済みの状態からforkされるため、ML系ライブラリの読み込みがワーカーごとに発生しない）
+WORKER_PRELOAD_MODULES = [
+    'scalable_analysis_system',
+    'engines.high_leverage_bot_orchestrator',
+    'support_resistance_ml',
+    'enhanced_ml_predictor',
+    'btc_altcoin_correlation_predictor',
+    'sklearn.ensemble',
+    'sklearn.preprocessing',
+    'sklearn.model_selection',
+    'lightgbm',
+]
+
 class ScalableAnalysisSystem:
     def __init__(self, base_dir="large_scale_analysis"):
         import os
@@ -78,6 +89,7 @@ class ScalableAnalysisSystem:
         self.charts_dir = self.base_dir / "charts"
         self.data_dir = self.base_dir / "data"
         self.compressed_dir = self.base_dir / "compressed"
+        self.trade_archive = TradeArchive(self.base_dir / "trade_archive")
         
         # Note: 初期化ログを削除（冗長出力防止）
         
@@ -102,7 +114,7 @@ class ScalableAnalysisSystem:
     
     def init_database(self):
         """SQLiteデータベースを初期化"""
-        with sqlite3.connect(self.db_path) as conn:
+        with db_connection(self.db_path) as conn:
             cursor = conn.cursor()
             
             # 既存テーブル確認
@@ -182,7 +194,7 @@ class ScalableAnalysisSystem:
         try:
             from execution_log_database import ExecutionLogDatabase
             db = ExecutionLogDatabase()
-            with sqlite3.connect(db.db_path) as conn:
+            with db_connection(db.db_path) as conn:
                 cursor = conn.execute(
                     'SELECT status FROM execution_logs WHERE execution_id = ?',
                     (execution_id,)
@@ -229,13 +241,23 @@ class ScalableAnalysisSystem:
         self.max_workers = max_workers  # インスタンス変数として保存
         # self.progress_logger = progress_logger  # 🐛 Pickle化エラー修正: インスタンス変数への保存を無効化
         
+        import os
+        import json
+        
+        # 戦略だけが異なる設定（同じ銘柄・時間足・期間）は1タスクにまとめ、
+        # 戦略に依存しないステージを足ごとに1回だけ計算して各戦略のTP/SL計算に分配する
+        planned_configs = batch_configs
+        if os.environ.get('SHARED_STAGE_GRAPH_ENABLED', 'true').lower() not in ('false', '0', 'no'):
+            from batch_task_scheduler import group_shared_stage_configs
+            planned_configs = group_shared_stage_configs(batch_configs)
+            if len(planned_configs) < len(batch_configs):
+                logger.info(f"🔗 戦略非依存ステージの共有: {len(batch_configs)}設定 → {len(planned_configs)}タスク")
+        
         # バッチをチャンクに分割
-        chunk_size = max(1, len(batch_configs) // max_workers)
-        chunks = [batch_configs[i:i + chunk_size] for i in range(0, len(batch_configs), chunk_size)]
+        chunk_size = max(1, len(planned_configs) // max_workers)
+        chunks = [planned_configs[i:i + chunk_size] for i in range(0, len(planned_configs), chunk_size)]
         
         # 期間設定を環境変数に設定（子プロセス用）
-        import os
-        import json
         if custom_period_settings and custom_period_settings.get('mode'):
             os.environ['CUSTOM_PERIOD_SETTINGS'] = json.dumps(custom_period_settings)
             logger.info(f"📅 期間設定を環境変数に設定: {custom_period_settings}")
@@ -260,34 +282,47 @@ class ScalableAnalysisSystem:
             except Exception as e:
                 logger.warning(f"⚠️ FileBasedProgressTracker初期化エラー: {e}")
         
-        with ProcessPoolExecutor(max_workers=max_workers) as executor:
-            futures = []
-            for i, chunk in enumerate(chunks):
-                # execution_idを明示的に渡す
-                future = executor.submit(self._process_chunk, chunk, i, self.current_execution_id)
-                futures.append(future)
-            
-            # 結果収集（タイムアウト付き）
-            total_processed = 0
-            for i, future in enumerate(futures):
-                try:
-                    # 各チャンクに30分のタイムアウトを設定
-                    processed_count = future.result(timeout=1800)  # 30 minutes
-                    total_processed += processed_count
+        # 同じ銘柄・時間足のOHLCVは親で1回だけ取得し、共有メモリ経由で子プロセスに渡す
+        shared_publisher = self._preload_shared_market_data(batch_configs, custom_period_settings)
+        shared_descriptors = shared_publisher.descriptors() or None
+        
+        # BATCH_SCHEDULER_MODE: cost_aware（設定ごとにコスト順で投入）/ chunked（従来の静的チャンク分割）
+        scheduler_mode = os.environ.get('BATCH_SCHEDULER_MODE', 'cost_aware').lower()
+        
+        with shared_publisher:
+            if scheduler_mode != 'chunked':
+                total_processed = self._run_cost_aware_batch(planned_configs, max_workers, shared_descriptors,
+                                                             custom_period_settings, progress_logger)
+            else:
+                with self._create_worker_pool(max_workers) as executor:
+                    futures = []
+                    for i, chunk in enumerate(chunks):
+                        # execution_idを明示的に渡す
+                        future = executor.submit(self._process_chunk, chunk, i, self.current_execution_id,
+                                                 shared_market_data=shared_descriptors)
+                        futures.append(future)
                     
-                    if progress_logger:
-                        # 進捗ログは個別戦略完了時に出力されるため、ここでは簡潔に
-                        pass
-                    else:
-                        logger.info(f"チャンク {i+1}/{len(futures)} 完了: {processed_count}パターン処理")
-                except Exception as e:
-                    logger.error(f"チャンク {i+1} 処理エラー: {e}")
-                    if progress_logger:
-                        progress_logger.log_error(f"チャンク {i+1} 処理エラー: {e}", "バックテスト")
-                    # エラーが発生してもプロセスプールを破損させない
-                    if "BrokenProcessPool" in str(e):
-                        logger.error("プロセスプール破損検出 - 残りのチャンクをスキップ")
-                        break
+                    # 結果収集（タイムアウト付き）
+                    total_processed = 0
+                    for i, future in enumerate(futures):
+                        try:
+                            # 各チャンクに30分のタイムアウトを設定
+                            processed_count = future.result(timeout=1800)  # 30 minutes
+                            total_processed += processed_count
+                    
+                            if progress_logger:
+                                # 進捗ログは個別戦略完了時に出力されるため、ここでは簡潔に
+                                pass
+                            else:
+                                logger.info(f"チャンク {i+1}/{len(futures)} 完了: {processed_count}パターン処理")
+                        except Exception as e:
+                            logger.error(f"チャンク {i+1} 処理エラー: {e}")
+                            if progress_logger:
+                                progress_logger.log_error(f"チャンク {i+1} 処理エラー: {e}", "バックテスト")
+                            # エラーが発生してもプロセスプールを破損させない
+                            if "BrokenProcessPool" in str(e):
+                                logger.error("プロセスプール破損検出 - 残りのチャンクをスキップ")
+                                break
         
         if progress_logger:
             progress_logger.log_phase_complete("バックテスト")
@@ -308,12 +343,214 @@ class ScalableAnalysisSystem:
         
         return total_processed
     
+    def _analysis_data_window(self, timeframe, custom_period_settings=None):
+        """_generate_real_analysis が取得するOHLCV期間（支持線・抵抗線用の前データを含む）"""
+        if custom_period_settings and custom_period_settings.get('mode') == 'custom':
+            start_time = datetime.fromisoformat(custom_period_settings['start_date'].replace('T', ' ')).replace(tzinfo=timezone.utc)
+            end_time = datetime.fromisoformat(custom_period_settings['end_date'].replace('T', ' ')).replace(tzinfo=timezone.utc)
+        else:
+            evaluation_period_days = self._load_timeframe_config(timeframe).get('data_days', 90)
+            end_time = datetime.now(timezone.utc)
+            start_time = end_time - timedelta(days=evaluation_period_days)
+        return start_time - timedelta(days=10), end_time
+
+    def _create_worker_pool(self, max_workers):
+        """
+        バッチ分析用のプロセスプールを作成
+
+        WORKER_START_METHOD で子プロセスの起動方式を選ぶ（デフォルト: プラットフォーム標準）。
+        forkserver の場合は WORKER_PRELOAD_MODULES をforkサーバーで1回だけ読み込み、各ワーカーは
+        そこからforkする。forkサーバーは最初のプール作成時の環境変数を引き継ぐため、実行IDなど
+        実行ごとに変わる値は引数で渡すこと。
+        """
+        start_method = os.environ.get('WORKER_START_METHOD', 'default').lower()
+        if start_method in ('', 'default'):
+            return ProcessPoolExecutor(max_workers=max_workers)
+        
+        import multiprocessing
+        try:
+            context = multiprocessing.get_context(start_method)
+        except ValueError:
+            logger.warning(f"⚠️ 未対応のWORKER_START_METHOD: {start_method}（標準の起動方式を使用）")
+            return ProcessPoolExecutor(max_workers=max_workers)
+        if start_method == 'forkserver':
+            context.set_forkserver_preload(WORKER_PRELOAD_MODULES)
+        logger.info(f"🧵 ワーカー起動方式: {start_method}")
+        return ProcessPoolExecutor(max_workers=max_workers, mp_context=context)
+
+    def _preload_shared_market_data(self, batch_configs, custom_period_settings=None):
+        """
+        複数の戦略で使う (銘柄, 時間足) のOHLCVを親プロセスで1回だけ取得し、共有メモリに公開
+
+        SHARED_MARKET_DATA_ENABLED=false で無効。SHARED_MARKET_DATA_MIN_CONFIGS（デフォルト2）未満の
+        設定でしか使われない組み合わせは子プロセスで従来通り取得する。取得に失敗した組み合わせも同様。
+        """
+        from shared_market_data import SharedMarketDataPublisher
+
+        publisher = SharedMarketDataPublisher()
+        if os.environ.get('SHARED_MARKET_DATA_ENABLED', 'true').lower() in ('false', '0', 'no'):
+            return publisher
+
+        try:
+            min_configs = max(1, int(os.environ.get('SHARED_MARKET_DATA_MIN_CONFIGS', '2')))
+        except ValueError:
+            min_configs = 2
+
+        usage = {}
+        for config in batch_configs:
+            if isinstance(config, dict) and 'symbol' in config and 'timeframe' in config:
+                key = (config['symbol'], config['timeframe'])
+                usage[key] = usage.get(key, 0) + 1
+        targets = [key for key, count in usage.items() if count >= min_configs]
+        if not targets:
+            return publisher
+
+        period_settings = custom_period_settings if custom_period_settings and custom_period_settings.get('mode') else None
+        exchange = self._get_exchange_from_config(None)
+
+        try:
+            from hyperliquid_api_client import MultiExchangeAPIClient
+            api_client = MultiExchangeAPIClient(exchange_type=exchange)
+        except Exception as e:
+            logger.warning(f"⚠️ 共有市場データ用APIクライアント初期化エラー: {e}（子プロセスで取得）")
+            return publisher
+        
+        loop = asyncio.new_event_loop()
+        try:
+            for symbol, timeframe in targets:
+                try:
+                    data_start_time, end_time = self._analysis_data_window(timeframe, period_settings)
+                    ohlcv_df = loop.run_until_complete(
+                        api_client.get_ohlcv_data(symbol, timeframe, data_start_time, end_time)
+                    )
+                    # カスタム期間以外は現在までのデータ（子プロセスは開始時の現在時刻までを要求する）
+                    publisher.publish(exchange, symbol, timeframe, ohlcv_df, data_start_time, end_time,
+                                      up_to_date=not (period_settings and period_settings.get('mode') == 'custom'))
+                except Exception as e:
+                    logger.warning(f"⚠️ 共有市場データ事前取得エラー {symbol} {timeframe}: {e}（子プロセスで取得）")
+        finally:
+            loop.close()
+
+        stats = publisher.get_stats()
+        if stats['blocks']:
+            logger.info(f"📦 共有市場データ公開: {stats['blocks']}件, {stats['rows']}本, "
+                        f"{stats['bytes'] / 1024 / 1024:.2f}MB ({stats['publish_seconds'] * 1000:.1f}ms)")
+        return publisher
+
+    def _run_cost_aware_batch(self, batch_configs, max_workers, shared_descriptors=None,
+                              custom_period_settings=None, progress_logger=None):
+        """
+        設定ごとのタスクを推定コストの長い順にプロセスプールへ投入して実行
+        
+        推定コストは足数と過去の実行実績（base_dir/task_cost_history.json）から算出。
+        タスク単位のタイムアウト（BATCH_TASK_TIMEOUT秒、デフォルト1800）とリトライ（BATCH_TASK_MAX_RETRIES回、
+        デフォルト1）はプールを作り直さずに行う。
+        """
+        from batch_task_scheduler import (
+            TaskCostModel, CostAwareTaskScheduler, BatchTask, estimate_bar_count, config_strategies,
+            DEFAULT_TASK_TIMEOUT, DEFAULT_MAX_RETRIES
+        )
+        
+        try:
+            task_timeout = float(os.environ.get('BATCH_TASK_TIMEOUT', DEFAULT_TASK_TIMEOUT))
+            max_retries = int(os.environ.get('BATCH_TASK_MAX_RETRIES', DEFAULT_MAX_RETRIES))
+        except ValueError:
+            task_timeout, max_retries = DEFAULT_TASK_TIMEOUT, DEFAULT_MAX_RETRIES
+        
+        cost_model = TaskCostModel(str(self.base_dir / 'task_cost_history.json'))
+        period_settings = custom_period_settings if custom_period_settings and custom_period_settings.get('mode') else None
+        
+        window_bars = {}
+        tasks = []
+        for i, config in enumerate(batch_configs):
+            timeframe = config.get('timeframe') if isinstance(config, dict) else None
+            if timeframe not in window_bars:
+                try:
+                    data_start_time, end_time = self._analysis_data_window(timeframe, period_settings)
+                    window_bars[timeframe] = estimate_bar_count(timeframe, (end_time - data_start_time).total_seconds())
+                except Exception:
+                    window_bars[timeframe] = estimate_bar_count(timeframe, 90 * 86400)
+            bars = window_bars[timeframe]
+            tasks.append(BatchTask(task_id=i, config=config, bars=bars,
+                                   estimated_seconds=cost_model.estimate_group(timeframe, config_strategies(config), bars)))
+        
+        pool = {'executor': self._create_worker_pool(max_workers)}
+        submitted = []
+        
+        def submit(task):
+            # 最初の1巡だけ従来と同じ決定的な起動遅延を入れる
+            startup_delay = len(submitted) < max_workers
+            submitted.append(task.task_id)
+            return pool['executor'].submit(self._process_task, task.config, task.task_id, self.current_execution_id,
+                                           shared_market_data=shared_descriptors, startup_delay=startup_delay)
+        
+        def reset_pool():
+            # タイムアウトしたワーカーはFutureのキャンセルでは止まらないため、プロセスを終了して作り直す
+            executor = pool['executor']
+            for process in list((getattr(executor, '_processes', None) or {}).values()):
+                process.terminate()
+            executor.shutdown(wait=False, cancel_futures=True)
+            pool['executor'] = self._create_worker_pool(max_workers)
+        
+        def on_complete(task):
+            if task.result.get('processed'):
+                cost_model.record_group(task.config.get('timeframe'), config_strategies(task.config), task.bars,
+                                        task.result.get('seconds', 0))
+            if not progress_logger:
+                logger.info(f"タスク {task.label} 完了: {task.result.get('seconds', 0):.1f}秒 "
+                            f"(推定{task.estimated_seconds:.1f}秒, PID {task.result.get('pid')})")
+        
+        execution_id = self.current_execution_id
+        should_cancel = (lambda: self._should_cancel_execution(execution_id)) if execution_id else None
+        
+        scheduler = CostAwareTaskScheduler(task_timeout=task_timeout, max_retries=max_retries)
+        summary = None
+        try:
+            summary = scheduler.run(tasks, submit, should_cancel=should_cancel, on_complete=on_complete,
+                                    reset_pool=reset_pool)
+        finally:
+            pool['executor'].shutdown(wait=True, cancel_futures=True)
+            cost_model.save()
+        
+        if progress_logger:
+            for label in summary.failed_tasks:
+                progress_logger.log_error(f"タスク {label} 処理エラー", "バックテスト")
+        logger.info(f"📋 タスクスケジュール完了: {summary.completed}/{len(tasks)}タスク, "
+                    f"失敗{summary.failed} (タイムアウト{summary.timed_out}), 再実行{summary.retried}, "
+                    f"取消{summary.cancelled}, 所要{summary.makespan_seconds:.1f}秒")
+        return summary.processed
+    
+    def _process_task(self, config, task_id, execution_id=None, shared_market_data=None, startup_delay=False):
+        """
+        1設定分のタスクを処理（プロセス内で実行）し、処理件数と所要時間を返す
+        
+        失敗した分析がある場合は 'error' と、失敗した戦略だけの再実行用設定 'retry_config' を含める
+        （CostAwareTaskScheduler が失敗として再実行する）。
+        """
+        started = time.time()
+        failures = []
+        processed = self._process_chunk([config], task_id, execution_id, shared_market_data=shared_market_data,
+                                        startup_delay=startup_delay, failures=failures)
+        result = {'processed': processed, 'seconds': time.time() - started, 'pid': os.getpid()}
+        if failures:
+            result['error'] = '; '.join(f"{strategy}: {error}" for strategy, error in failures)
+            failed_strategies = [strategy for strategy, _ in failures]
+            if isinstance(config, dict) and config.get('strategies'):
+                # グループ設定は成功した戦略を除いて再実行する
+                shared = {k: v for k, v in config.items() if k != 'strategies'}
+                if len(failed_strategies) > 1:
+                    result['retry_config'] = dict(shared, strategy='+'.join(failed_strategies),
+                                                  strategies=failed_strategies)
+                else:
+                    result['retry_config'] = dict(shared, strategy=failed_strategies[0])
+        return result
+    
     def _create_pre_tasks(self, batch_configs, execution_id):
         """Pre-task作成（分析実行前にpendingレコード作成）"""
         logger.info(f"🎯 Pre-task作成開始: {len(batch_configs)}タスク, execution_id={execution_id}")
         logger.info(f"  🗃️ 作成先DB: {self.db_path.absolute()}")
         
-        with sqlite3.connect(self.db_path) as conn:
+        with db_connection(self.db_path) as conn:
             cursor = conn.cursor()
             
             created_count = 0
@@ -402,15 +639,26 @@ class ScalableAnalysisSystem:
                 console_handler_child.setFormatter(formatter)
                 module_logger.addHandler(console_handler_child)
     
-    def _process_chunk(self, configs_chunk, chunk_id, execution_id=None):
-        """チャンクを処理（プロセス内で実行）"""
+    def _process_chunk(self, configs_chunk, chunk_id, execution_id=None, shared_market_data=None, startup_delay=True,
+                       failures=None):
+        """
+        チャンクを処理（プロセス内で実行）
+        
+        failures にリストを渡すと、失敗した分析の (戦略名, エラー) を追加する（失敗はログに記録して続行）。
+        """
         import time
         import random
         import os
+        from batch_task_scheduler import config_strategies
         
         # 子プロセスでのロギング設定を追加
         self._setup_child_process_logging()
         
+        # 親プロセスが共有メモリに公開したOHLCVの記述子を登録（アタッチは初回利用時）
+        if shared_market_data:
+            from shared_market_data import install_shared_descriptors
+            install_shared_descriptors(shared_market_data)
+        
         # execution_idを環境変数に設定（子プロセス用）
         if execution_id:
             os.environ['CURRENT_EXECUTION_ID'] = execution_id
@@ -431,7 +679,8 @@ class ScalableAnalysisSystem:
         # TODO: ランダム遅延は品質問題のためコメントアウト (2024-06-18)
         # time.sleep(random.uniform(0.1, 0.5))
         # チャンクIDベースの決定的遅延に変更
-        time.sleep(0.1 + (chunk_id % 5) * 0.1)  # 0.1-0.5秒の決定的遅延
+        if startup_delay:
+            time.sleep(0.1 + (chunk_id % 5) * 0.1)  # 0.1-0.5秒の決定的遅延
         
         processed = 0
         for config in configs_chunk:
@@ -449,6 +698,11 @@ class ScalableAnalysisSystem:
                     logger.error(f"Config is not a dict: {type(config)} - {config}")
                     continue
                 
+                # 戦略非依存ステージを共有するグループ設定（group_shared_stage_configs）
+                if config.get('strategies'):
+                    processed += self._process_strategy_group(config, execution_id, failures=failures)
+                    continue
+                
                 # config辞書から適切なキーを取得
                 if 'strategy' in config:
                     strategy = config['strategy']
@@ -493,10 +747,15 @@ class ScalableAnalysisSystem:
                     
                     if processed % 10 == 0:
                         logger.info(f"Chunk {chunk_id}: {processed}/{len(configs_chunk)} 完了")
+                elif failures is not None:
+                    # 分析の失敗は _generate_single_analysis 内で記録済み（task_status='failed'）
+                    failures.append((strategy, "分析失敗"))
             except Exception as e:
                 logger.error(f"分析エラー {config}: {e}")
                 import traceback
                 logger.error(f"Traceback: {traceback.format_exc()}")
+                if failures is not None:
+                    failures.extend((strategy, str(e)) for strategy in config_strategies(config) or [str(config)])
         
         # 🔧 子プロセス完了後: 一時ファイルから詳細ログを読み取り
         try:
@@ -523,53 +782,122 @@ class ScalableAnalysisSystem:
         except Exception as cleanup_error:
             logger.warning(f"一時ファイル処理エラー: {cleanup_error}")
         
+        if shared_market_data:
+            from shared_market_data import get_worker_metrics, format_worker_metrics
+            logger.info(f"📦 チャンク {chunk_id} 共有市場データ: {format_worker_metrics(get_worker_metrics())}")
+        
         return processed
     
+    def _process_strategy_group(self, group_config, execution_id=None, failures=None):
+        """グループ設定の全戦略をまとめて分析し、成功した戦略数を返す（失敗した戦略は failures に追加）"""
+        symbol, timeframe = group_config.get('symbol'), group_config.get('timeframe')
+        if not symbol or not timeframe:
+            logger.error(f"Missing required keys in config: {group_config}")
+            return 0
+        
+        strategies = []
+        for strategy in group_config['strategies']:
+            if not strategy or strategy == 'Default':
+                logger.warning(f"Invalid or missing strategy in config: {group_config}")
+                continue
+            strategies.append(strategy)
+        if not strategies:
+            return 0
+        
+        logger.info(f"🔍 分析開始: {symbol} {timeframe} {'/'.join(strategies)} (戦略非依存ステージ共有, execution_id: {execution_id})")
+        results = self._generate_group_analysis(symbol, timeframe, strategies, execution_id)
+        if failures is not None:
+            failures.extend((strategy, "分析失敗") for strategy, (success, _) in results.items() if not success)
+        return sum(1 for success, _ in results.values() if success)
+    
     def _update_task_status(self, symbol, timeframe, config, status, error_message=None):
-        """task_statusをリアルタイム更新"""
+        """task_statusを更新（遅延書き込みキュー経由で他の更新とまとめて書き込む）"""
         execution_id = os.environ.get('CURRENT_EXECUTION_ID')
         logger.info(f"🔄 task_status更新: {symbol} {timeframe} {config} → {status}")
         logger.info(f"  🗃️ 更新先DB: {self.db_path.absolute()}")
         logger.info(f"  🔑 execution_id: {execution_id}")
         
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            
-            try:
-                if status == 'running':
-                    cursor.execute('''
-                        UPDATE analyses 
-                        SET task_status = ?, task_started_at = ?
-                        WHERE symbol = ? AND timeframe = ? AND config = ? AND execution_id = ?
-                    ''', (status, datetime.now(timezone.utc).isoformat(), symbol, timeframe, config, execution_id))
-                elif status == 'failed':
-                    cursor.execute('''
-                        UPDATE analyses 
-                        SET task_status = ?, error_message = ?
-                        WHERE symbol = ? AND timeframe = ? AND config = ? AND execution_id = ?
-                    ''', (status, error_message, symbol, timeframe, config, execution_id))
-                elif status == 'completed':
-                    cursor.execute('''
-                        UPDATE analyses 
-                        SET task_status = ?, task_completed_at = ?
-                        WHERE symbol = ? AND timeframe = ? AND config = ? AND execution_id = ?
-                    ''', (status, datetime.now(timezone.utc).isoformat(), symbol, timeframe, config, execution_id))
-                
-                updated_rows = cursor.rowcount
-                conn.commit()
+        if status == 'running':
+            sql = '''
+                UPDATE analyses 
+                SET task_status = ?, task_started_at = ?
+                WHERE symbol = ? AND timeframe = ? AND config = ? AND execution_id = ?
+            '''
+            params = (status, datetime.now(timezone.utc).isoformat(), symbol, timeframe, config, execution_id)
+        elif status == 'failed':
+            sql = '''
+                UPDATE analyses 
+                SET task_status = ?, error_message = ?
+                WHERE symbol = ? AND timeframe = ? AND config = ? AND execution_id = ?
+            '''
+            params = (status, error_message, symbol, timeframe, config, execution_id)
+        elif status == 'completed':
+            sql = '''
+                UPDATE analyses 
+                SET task_status = ?, task_completed_at = ?
+                WHERE symbol = ? AND timeframe = ? AND config = ? AND execution_id = ?
+            '''
+            params = (status, datetime.now(timezone.utc).isoformat(), symbol, timeframe, config, execution_id)
+        else:
+            return
+        
+        try:
+            # 同じタスク・同じステータスの未反映の更新は最新の1件にまとめる
+            updated_rows = execute_write(self.db_path, sql, params,
+                                         key=('task_status', symbol, timeframe, config, execution_id, status))
+            if updated_rows is None:
+                logger.info(f"✅ task_status更新をキューに追加")
+            else:
                 logger.info(f"✅ task_status更新成功: {updated_rows}行更新")
-                
-            except Exception as e:
-                logger.error(f"❌ task_status更新エラー: {symbol} {timeframe} {config}")
-                logger.error(f"  🗃️ DB path: {self.db_path.absolute()}")
-                logger.error(f"  📝 エラー詳細: {str(e)}")
-                raise
+            
+        except Exception as e:
+            logger.error(f"❌ task_status更新エラー: {symbol} {timeframe} {config}")
+            logger.error(f"  🗃️ DB path: {self.db_path.absolute()}")
+            logger.error(f"  📝 エラー詳細: {str(e)}")
+            raise
     
     def _generate_single_analysis(self, symbol, timeframe, config, execution_id=None):
         """単一の分析を生成（ハイレバレッジボット使用版 + task_status更新）"""
-        analysis_id = f"{symbol}_{timeframe}_{config}"
         start_time = time.time()
+        self._start_single_analysis(symbol, timeframe, config, execution_id)
+        
+        # ハイレバレッジボットを使用した分析を試行
+        try:
+            # execution_idをログ出力
+            logger.info(f"🎯 リアル分析開始: {symbol} {timeframe} {config} (execution_id: {execution_id})")
+            trades_data = self._generate_real_analysis(symbol, timeframe, config, execution_id=execution_id)
+        except Exception as e:
+            return self._fail_single_analysis(symbol, timeframe, config, execution_id, e, start_time)
+        
+        return self._complete_single_analysis(symbol, timeframe, config, execution_id, trades_data, start_time)
+    
+    def _generate_group_analysis(self, symbol, timeframe, configs, execution_id=None):
+        """
+        同じ銘柄・時間足の複数戦略の分析を生成（戦略非依存ステージは共有）
         
+        分析自体は _generate_real_analysis_group で1回だけ実行し、通知・task_status更新・
+        メトリクス計算・保存は戦略ごとに _generate_single_analysis と同じ処理を行う。
+        
+        Returns:
+            Dict[str, tuple]: 戦略名 → (成功したか, メトリクス)
+        """
+        start_time = time.time()
+        for config in configs:
+            self._start_single_analysis(symbol, timeframe, config, execution_id)
+        
+        try:
+            logger.info(f"🎯 リアル分析開始: {symbol} {timeframe} {'/'.join(configs)} (execution_id: {execution_id})")
+            trades_by_config = self._generate_real_analysis_group(symbol, timeframe, configs, execution_id=execution_id)
+        except Exception as e:
+            return {config: self._fail_single_analysis(symbol, timeframe, config, execution_id, e, start_time)
+                    for config in configs}
+        
+        return {config: self._complete_single_analysis(symbol, timeframe, config, execution_id,
+                                                       trades_by_config[config], start_time)
+                for config in configs}
+    
+    def _start_single_analysis(self, symbol, timeframe, config, execution_id=None):
+        """分析開始時の通知とtask_status更新"""
         # 🆕 Discord通知: 子プロセス開始（既存チェック前に実行）
         try:
             logger.info(f"🔔 Discord開始通知呼び出し: {symbol} {config} - {timeframe}")
@@ -591,47 +919,47 @@ class ScalableAnalysisSystem:
             self._update_task_status(symbol, timeframe, config, 'running')
         except Exception as e:
             logger.warning(f"Failed to update task_status to running: {e}")
+    
+    def _fail_single_analysis(self, symbol, timeframe, config, execution_id, error, start_time):
+        """分析失敗時の通知とtask_status更新"""
+        logger.error(f"Real analysis failed for {symbol} {timeframe} {config}: {error}")
+        logger.error(f"Analysis terminated - no fallback to sample data")
         
-        # ハイレバレッジボットを使用した分析を試行
+        execution_time = time.time() - start_time
+        
+        # 🆕 Discord通知: 子プロセス失敗
         try:
-            # execution_idをログ出力
-            logger.info(f"🎯 リアル分析開始: {symbol} {timeframe} {config} (execution_id: {execution_id})")
-            trades_data = self._generate_real_analysis(symbol, timeframe, config, execution_id=execution_id)
-        except Exception as e:
-            logger.error(f"Real analysis failed for {symbol} {timeframe} {config}: {e}")
-            logger.error(f"Analysis terminated - no fallback to sample data")
-            
-            execution_time = time.time() - start_time
-            
-            # 🆕 Discord通知: 子プロセス失敗
-            try:
-                logger.info(f"🔔 Discord失敗通知呼び出し: {symbol} {config} - {timeframe}")
-                result = discord_notifier.child_process_completed(
-                    symbol=symbol,
-                    strategy_name=config,
-                    timeframe=timeframe,
-                    execution_id=execution_id or "unknown",
-                    success=False,
-                    execution_time=execution_time,
-                    error_msg=str(e)[:100]  # エラーメッセージを100文字に制限
-                )
-                logger.info(f"🔔 Discord失敗通知結果: {result}")
-            except Exception as discord_error:
-                logger.warning(f"Discord失敗通知エラー: {discord_error}")
-            
-            # task_statusを'failed'に更新
-            try:
-                self._update_task_status(symbol, timeframe, config, 'failed', str(e))
-            except Exception as update_error:
-                logger.warning(f"Failed to update task_status to failed: {update_error}")
-            
-            return False, None
+            logger.info(f"🔔 Discord失敗通知呼び出し: {symbol} {config} - {timeframe}")
+            result = discord_notifier.child_process_completed(
+                symbol=symbol,
+                strategy_name=config,
+                timeframe=timeframe,
+                execution_id=execution_id or "unknown",
+                success=False,
+                execution_time=execution_time,
+                error_msg=str(error)[:100]  # エラーメッセージを100文字に制限
+            )
+            logger.info(f"🔔 Discord失敗通知結果: {result}")
+        except Exception as discord_error:
+            logger.warning(f"Discord失敗通知エラー: {discord_error}")
+        
+        # task_statusを'failed'に更新
+        try:
+            self._update_task_status(symbol, timeframe, config, 'failed', str(error))
+        except Exception as update_error:
+            logger.warning(f"Failed to update task_status to failed: {update_error}")
+        
+        return False, None
+    
+    def _complete_single_analysis(self, symbol, timeframe, config, execution_id, trades_data, start_time):
+        """分析結果のメトリクス計算・保存と完了通知"""
+        analysis_id = f"{symbol}_{timeframe}_{config}"
         
         # メトリクス計算
         metrics = self._calculate_metrics(trades_data)
         
         # データ圧縮保存
-        compressed_path = self._save_compressed_data(analysis_id, trades_data)
+        compressed_path = self._save_compressed_data(analysis_id, trades_data, symbol, timeframe, config)
         
         # チャート生成（必要時のみ）
         chart_path = None
@@ -743,6 +1071,25 @@ class ScalableAnalysisSystem:
     
     def _generate_real_analysis(self, symbol, timeframe, config, custom_period_days=None, execution_id=None):
         """条件ベースのハイレバレッジ分析 - 市場条件を満たした場合のみシグナル生成"""
+        return self._generate_real_analysis_group(
+            symbol, timeframe, [config], custom_period_days=custom_period_days, execution_id=execution_id
+        )[config]
+    
+    def _generate_real_analysis_group(self, symbol, timeframe, configs, custom_period_days=None, execution_id=None):
+        """
+        同じ銘柄・時間足・期間の複数戦略をまとめて条件ベース分析
+        
+        データ取得・サポレジ検出・ブレイクアウト予測・BTC相関・市場コンテキスト・レバレッジ判定と
+        支持線・抵抗線の再検出・エントリー価格の取得は戦略に依存しないため足ごとに1回だけ実行し、
+        戦略ごとのエントリー条件評価・TP/SL計算・到達判定（_build_strategy_trade）に分配する。
+        各戦略のトレードは戦略ごとに _generate_real_analysis を実行した場合と同一。
+        
+        Returns:
+            Dict[str, list]: 戦略名 → トレードのリスト
+        """
+        configs = list(dict.fromkeys(configs))
+        label = '/'.join(configs)
+        
         # 変数初期化（安全性確保）
         custom_period_settings = None
         
@@ -776,9 +1123,9 @@ class ScalableAnalysisSystem:
             from engines.high_leverage_bot_orchestrator import HighLeverageBotOrchestrator
             
             # 取引所設定を取得
-            exchange = self._get_exchange_from_config(config)
+            exchange = self._get_exchange_from_config(configs[0])
             
-            logger.info(f"🎯 実データによる戦略分析を開始: {symbol} {timeframe} {config} ({exchange})")
+            logger.info(f"🎯 実データによる戦略分析を開始: {symbol} {timeframe} {label} ({exchange})")
             logger.info("   ⏳ データ取得とML分析のため、処理に数分かかる場合があります...")
             
             # 修正: ハードコード値問題解決のため、毎回新しいボットを作成（キャッシュ無効化）
@@ -787,14 +1134,13 @@ class ScalableAnalysisSystem:
             logger.info(f"🔄 {symbol} 新規ボットでデータ取得中... (価格多様性確保のため)")
             
             # 複数回分析を実行してトレードデータを生成（完全ログ抑制）
-            trades = []
             import sys
             import os
             import contextlib
             import time
             
             # 進捗表示用
-            logger.info(f"🔄 {symbol} {timeframe} {config}: 条件ベース分析開始")
+            logger.info(f"🔄 {symbol} {timeframe} {label}: 条件ベース分析開始")
             
             # 完全にログを抑制するコンテキストマネージャー（デバッグモード時は無効）
             @contextlib.contextmanager
@@ -851,13 +1197,13 @@ class ScalableAnalysisSystem:
             # 条件ベースの分析実行
             current_time = effective_start_time
             total_evaluations = 0
-            signals_generated = 0
+            signals_generated = {config: 0 for config in configs}
             
             # 重要変数の初期化（安全性確保）
             result = {}
+            trades = {config: [] for config in configs}
             ohlcv_df = None
-            bot = None
-            
+
             # 🔧 OHLCVデータを事前取得（実データ利用）
             try:
                 # APIクライアント初期化
@@ -871,25 +1217,21 @@ class ScalableAnalysisSystem:
                 lookback_days = 10  # 200本分の日数（時間足により調整）
                 data_start_time = start_time - timedelta(days=lookback_days)
                 
-                ohlcv_df = api_client.get_ohlcv_dataframe(
-                    symbol=symbol,
-                    timeframe=timeframe,
-                    start_time=data_start_time,
-                    end_time=end_time
-                )
+                # 親プロセスが共有メモリに公開済みならコピーせずに利用
+                from shared_market_data import get_shared_ohlcv
+                ohlcv_df = get_shared_ohlcv(exchange, symbol, timeframe, data_start_time, end_time)
+                if ohlcv_df is not None:
+                    logger.info(f"📦 共有メモリのOHLCVデータを使用: {symbol} {timeframe}")
+                else:
+                    ohlcv_df = api_client.get_ohlcv_dataframe(
+                        symbol=symbol,
+                        timeframe=timeframe,
+                        start_time=data_start_time,
+                        end_time=end_time
+                    )
                 
                 if ohlcv_df is not None and not ohlcv_df.empty:
                     logger.info(f"✅ OHLCVデータ取得成功: {len(ohlcv_df)}本")
-                    
-                    # RealPreparedDataの作成
-                    from engines.data_preparers import RealPreparedData
-                    real_prepared_data = RealPreparedData(ohlcv_df)
-                    
-                    # FilteringFrameworkの初期化（実データ使用）
-                    self.filtering_framework = FilteringFramework(
-                        prepared_data_factory=lambda: real_prepared_data,
-                        strategy_factory=lambda: self._create_strategy_from_config(config)
-                    )
                 else:
                     logger.warning(f"⚠️ OHLCVデータ取得失敗、モックデータを使用")
                     ohlcv_df = None
@@ -913,7 +1255,30 @@ class ScalableAnalysisSystem:
                 print(f"💯 全データ評価: 間引きなし、制限なし")
             else:
                 logger.warning("⚠️ OHLCVデータが取得できませんでした")
-                return []
+                return {config: [] for config in configs}
+            
+            # 足ごとの評価エンジン（BACKTEST_ENGINE_MODE: incremental / legacy / parity）
+            from engines.incremental_backtest_engine import (
+                IncrementalBacktestEngine, ENGINE_MODES, ENGINE_MODE_INCREMENTAL,
+                ENGINE_MODE_LEGACY, ENGINE_MODE_PARITY
+            )
+            backtest_engine_mode = os.environ.get('BACKTEST_ENGINE_MODE', ENGINE_MODE_INCREMENTAL).lower()
+            if backtest_engine_mode not in ENGINE_MODES:
+                logger.warning(f"⚠️ 不明なBACKTEST_ENGINE_MODE: {backtest_engine_mode}、{ENGINE_MODE_INCREMENTAL}を使用")
+                backtest_engine_mode = ENGINE_MODE_INCREMENTAL
+            incremental_engine = None
+            if bot is not None and backtest_engine_mode != ENGINE_MODE_LEGACY:
+                incremental_engine = IncrementalBacktestEngine(
+                    bot, symbol, timeframe, configs[0],
+                    custom_period_settings=custom_period_settings,
+                    execution_id=execution_id,
+                    parity_check=backtest_engine_mode == ENGINE_MODE_PARITY
+                )
+            
+            # エントリー条件は戦略ごとにタスク内で1回だけ解決し、不合格理由は戦略ごとに件数で集計する
+            from engines.entry_condition_evaluator import EntryConditionDiagnostics
+            entry_evaluators = {}
+            entry_diagnostics = {config: EntryConditionDiagnostics() for config in configs}
             
             # 全OHLCVデータを順次評価（制限なし）
             for current_index in range(evaluation_start_index, len(ohlcv_df)):
@@ -924,6 +1289,7 @@ class ScalableAnalysisSystem:
                 # Stage 9フィルタリング削除済み (2025年6月29日)
                 # 理由: 重複処理と性能劣化問題 - Stage 8で十分な分析実行
                 
+                # === 戦略に依存しないステージ（データ・サポレジ・ML予測・BTC相関・市場コンテキスト・レバレッジ判定） ===
                 try:
                     # 出力抑制で市場条件の評価（バックテストフラグ付き）
                     with suppress_all_output():
@@ -931,10 +1297,13 @@ class ScalableAnalysisSystem:
                         if total_evaluations == 1:
                             logger.info(f"🔍 ボット分析開始: execution_id={execution_id}")
                         
-                        result = bot.analyze_symbol(symbol, timeframe, config, is_backtest=True, target_timestamp=current_time, custom_period_settings=custom_period_settings, execution_id=execution_id)
+                        if incremental_engine is not None:
+                            result = incremental_engine.evaluate(current_time)
+                        else:
+                            result = bot.analyze_symbol(symbol, timeframe, configs[0], is_backtest=True, target_timestamp=current_time, custom_period_settings=custom_period_settings, execution_id=execution_id)
                     
                     # 🔍 ProcessPoolExecutor環境診断: 結果の型・内容詳細調査
-                    logger.info(f"🔍 子プロセス結果診断: {symbol} {timeframe} {config}")
+                    logger.info(f"🔍 子プロセス結果診断: {symbol} {timeframe} {label}")
                     logger.info(f"   結果の型: {type(result)}")
                     if hasattr(result, 'early_exit'):
                         logger.info(f"   AnalysisResult detected - early_exit: {result.early_exit}")
@@ -947,147 +1316,18 @@ class ScalableAnalysisSystem:
                             logger.info(f"   辞書キー: {list(result.keys()) if result else 'None/Empty'}")
                     
                     # 🎯 DISCORD通知処理（ProcessPoolExecutor専用・確実実行版）
-                    self._handle_discord_notification_for_result(result, symbol, timeframe, config, execution_id)
+                    for config in configs:
+                        self._handle_discord_notification_for_result(result, symbol, timeframe, config, execution_id)
                     
                     # 🔍 AnalysisResult対応: Early Exitの詳細ログ出力（ProcessPoolExecutor対応強化版）
                     from engines.analysis_result import AnalysisResult
-                    import sys
                     if isinstance(result, AnalysisResult):
                         # 必ずEarly Exit検出ログを出力（通知前確認用）
                         logger.info(f"⚡ AnalysisResult処理開始: early_exit={result.early_exit}")
                         
                         if result.early_exit:
-                            # ProcessPoolExecutor環境での確実なログ出力
-                            detailed_msg = result.get_detailed_log_message()
-                            user_msg = result.get_user_friendly_message()
-                            
-                            # 強制的なログ出力とフラッシュ（ProcessPoolExecutor対応）
-                            logger.info(f"📋 {detailed_msg}")
-                            logger.info(f"💡 {user_msg}")
-                            
-                            # 改善提案も出力
-                            suggestions = result.get_suggestions()
-                            if suggestions:
-                                logger.info(f"🎯 改善提案: {'; '.join(suggestions)}")
-                            
-                            # ProcessPoolExecutor環境での確実な出力確保
-                            sys.stdout.flush()
-                            sys.stderr.flush()
-                            
-                            # ログハンドラーの強制フラッシュ
-                            for handler in logger.handlers:
-                                if hasattr(handler, 'flush'):
-                                    handler.flush()
-                            
-                            # 🎯 Discord webhook通知: 子プロセスのEarly Exit詳細送信
-                            try:
-                                # 同期実行（ProcessPoolExecutor環境では非同期は使用できない）
-                                import requests
-                                
-                                # ProcessPoolExecutor環境での環境変数再読み込み
-                                try:
-                                    from dotenv import load_dotenv
-                                    load_dotenv()
-                                except ImportError:
-                                    pass
-                                
-                                # Discord webhook URL (環境変数から取得)
-                                webhook_url = os.environ.get('DISCORD_WEBHOOK_URL')
-                                
-                                # デバッグログ: Discord通知試行ログ
-                                logger.info(f"🎯 Discord通知試行: {symbol} {timeframe} {config}")
-                                logger.info(f"   webhook_url設定: {bool(webhook_url)}")
-                                logger.info(f"   Early Exit詳細: {result.exit_stage}/{result.exit_reason}")
-                                
-                                if webhook_url:
-                                    # embed作成
-                                    embed = {
-                                        "title": f"🚨 Early Exit Analysis: {symbol}",
-                                        "color": 0xFF4444,  # 赤色
-                                        "timestamp": datetime.now().isoformat(),
-                                        "fields": [
-                                            {"name": "Symbol", "value": symbol, "inline": True},
-                                            {"name": "Timeframe", "value": timeframe, "inline": True},
-                                            {"name": "Strategy", "value": config, "inline": True},
-                                            {"name": "Exit Stage", "value": result.exit_stage.value if result.exit_stage else 'unknown', "inline": True},
-                                            {"name": "Exit Reason", "value": result.exit_reason.value if result.exit_reason else 'unknown', "inline": True},
-                                            {"name": "Execution ID", "value": f"`{execution_id}`", "inline": False},
-                                            {"name": "Detailed Message", "value": detailed_msg[:1000], "inline": False},
-                                            {"name": "User Message", "value": user_msg[:1000], "inline": False}
-                                        ],
-                                        "footer": {"text": "Long Trader - Early Exit Analysis"}
-                                    }
-                                    
-                                    # 改善提案を追加
-                                    if suggestions:
-                                        embed["fields"].append({
-                                            "name": "💡 Suggestions",
-                                            "value": "\n".join([f"• {s}" for s in suggestions[:5]])[:1000],
-                                            "inline": False
-                                        })
-                                    
-                                    # Discord APIに送信
-                                    payload = {
-                                        "embeds": [embed],
-                                        "username": "Long Trader Bot"
-                                    }
-                                    
-                                    # 最大3回のリトライ（ProcessPoolExecutor環境では軽量化）
-                                    for attempt in range(3):
-                                        try:
-                                            response = requests.post(webhook_url, json=payload, timeout=10)
-                                            if response.status_code == 200:
-                                                logger.info(f"✅ Discord通知送信成功: {symbol} Early Exit")
-                                                break
-                                            elif response.status_code == 429:  # Rate limit
-                                                retry_after = int(response.headers.get('Retry-After', 1))
-                                                logger.warning(f"Discord rate limit, retrying after {retry_after}s")
-                                                time.sleep(retry_after)
-                                            else:
-                                                logger.warning(f"Discord API error: {response.status_code}")
-                                                break
-                                        except Exception as e:
-                                            if attempt == 2:  # 最後の試行
-                                                logger.error(f"❌ Discord送信失敗: {e}")
-                                                break
-                                            wait_time = 2 ** attempt
-                                            logger.warning(f"Discord送信失敗 (attempt {attempt + 1}/3): {e}, retrying in {wait_time}s")
-                                            time.sleep(wait_time)
-                                else:
-                                    logger.warning("⚠️ DISCORD_WEBHOOK_URL not set, skipping notification")
-                                    
-                            except Exception as discord_error:
-                                logger.error(f"❌ Discord通知システムエラー: {discord_error}")
-                                import traceback
-                                logger.error(f"   スタックトレース: {traceback.format_exc()}")
-                            
-                            # 🔧 ProcessPoolExecutor環境用: AnalysisResult詳細を一時ファイルに出力
-                            try:
-                                import tempfile
-                                import json
-                                analysis_log = {
-                                    'timestamp': datetime.now().isoformat(),
-                                    'execution_id': execution_id,
-                                    'symbol': symbol,
-                                    'timeframe': timeframe,
-                                    'strategy': config,
-                                    'detailed_msg': detailed_msg,
-                                    'user_msg': user_msg,
-                                    'suggestions': suggestions,
-                                    'early_exit': True,
-                                    'stage': result.exit_stage.value if result.exit_stage else 'unknown',
-                                    'reason': result.exit_reason.value if result.exit_reason else 'unknown'
-                                }
-                                
-                                log_file = f"/tmp/analysis_log_{execution_id}_{symbol}_{timeframe}_{config}.json"
-                                with open(log_file, 'w', encoding='utf-8') as f:
-                                    json.dump(analysis_log, f, ensure_ascii=False, indent=2)
-                                
-                                # 親プロセス確認用
-                                print(f"📝 子プロセス詳細ログ出力: {log_file}", flush=True)
-                            except Exception as log_error:
-                                logger.warning(f"一時ファイルログ出力エラー: {log_error}")
-                            
+                            for config in configs:
+                                self._report_early_exit(result, symbol, timeframe, config, execution_id)
                             continue
                         elif result.completed and result.recommendation:
                             # 成功時のログも出力
@@ -1131,13 +1371,24 @@ class ScalableAnalysisSystem:
                             logger.error(f"🚨 analyze_symbol結果が無効 #{total_evaluations}: current_price missing")
                         continue
                     
-                    # エントリー条件の評価
+                except Exception as e:
+                    logger.warning(f"⚠️ 分析エラー (評価{total_evaluations}): {str(e)[:100]}")
+                    logger.warning(f"Analysis failed for {symbol} at {current_time}: {e}")
+                    continue
+                
+                # === 戦略ごとのエントリー条件（戦略名で条件が異なる） ===
+                entering_configs = []
+                for config in configs:
+                    # analyze_symbolの戻り値は戦略名を含むため、戦略ごとに差し替えて評価
+                    strategy_result = dict(result, strategy=config) if 'strategy' in result else result
                     try:
-                        should_enter = self._evaluate_entry_conditions(result, timeframe)
+                        should_enter = self._evaluate_entry_conditions(
+                            strategy_result, timeframe, entry_evaluators, entry_diagnostics[config]
+                        )
                     except Exception as e:
                         logger.error(f"🚨 エントリー条件評価でエラー #{total_evaluations}:")
                         logger.error(f"   エラー: {str(e)}")
-                        logger.error(f"   分析結果: {result}")
+                        logger.error(f"   分析結果: {strategy_result}")
                         continue
                     
                     if not should_enter:
@@ -1147,45 +1398,33 @@ class ScalableAnalysisSystem:
                             logger.error(f"🚨 OP条件不満足 #{total_evaluations}: leverage={result.get('leverage')}, confidence={result.get('confidence')}, RR={result.get('risk_reward_ratio')}")
                         continue
                     
-                    signals_generated += 1
+                    signals_generated[config] += 1
                     
                     # 進捗表示（条件満足時）
-                    if signals_generated % 5 == 0:
+                    if signals_generated[config] % 5 == 0:
                         progress_pct = ((current_time - start_time).total_seconds() / 
                                       (end_time - start_time).total_seconds()) * 100
-                        logger.info(f"🎯 {symbol} {timeframe}: シグナル生成 {signals_generated}件 (進捗: {progress_pct:.1f}%)")
-                    
+                        logger.info(f"🎯 {symbol} {timeframe} {config}: シグナル生成 {signals_generated[config]}件 (進捗: {progress_pct:.1f}%)")
+                    entering_configs.append(config)
+                
+                if not entering_configs:
+                    continue
+                
+                # === 全戦略で共有する支持線・抵抗線検出とエントリー価格 ===
+                try:
                     # レバレッジとTP/SL価格を計算
                     leverage = result.get('leverage', 5.0)
                     confidence = result.get('confidence', 70.0) / 100.0
-                    risk_reward = result.get('risk_reward_ratio', 2.0)
                     current_price = result.get('current_price')
                     if current_price is None:
                         logger.error(f"No current_price in analysis result for {symbol}")
                         raise Exception(f"Missing current_price in analysis result for {symbol}")
                     
-                    # TP/SL計算機能を使用
-                    from engines.stop_loss_take_profit_calculators import (
-                        DefaultSLTPCalculator, ConservativeSLTPCalculator, AggressiveSLTPCalculator,
-                        TraditionalSLTPCalculator, MLSLTPCalculator
-                    )
                     from interfaces.data_types import MarketContext
                     
                     # 条件満足時の実際のタイムスタンプ
                     trade_time = current_time
                     
-                    # 戦略に応じたTP/SL計算器を選択
-                    if 'Conservative' in config:
-                        sltp_calculator = ConservativeSLTPCalculator()
-                    elif 'Aggressive_Traditional' in config:
-                        sltp_calculator = TraditionalSLTPCalculator()
-                    elif 'Aggressive' in config:
-                        sltp_calculator = AggressiveSLTPCalculator()
-                    elif 'Full_ML' in config:
-                        sltp_calculator = MLSLTPCalculator()
-                    else:
-                        sltp_calculator = DefaultSLTPCalculator()
-                    
                     # 模擬的な市場コンテキスト
                     market_context = MarketContext(
                         current_price=current_price,
@@ -1196,7 +1435,7 @@ class ScalableAnalysisSystem:
                         timestamp=trade_time
                     )
                     
-                    # 実際の支持線・抵抗線データを検出（柔軟なアダプター版）
+                    # 実際の支持線・抵抗線データを検出（柔軟なアダプター版、全戦略で共有）
                     try:
                         from engines.support_resistance_adapter import FlexibleSupportResistanceDetector
                         
@@ -1293,175 +1532,85 @@ class ScalableAnalysisSystem:
                         else:
                             logger.info(f"       ML予測: 無効化")
                         
-                        # TP/SL価格を実際のデータで計算
-                        sltp_levels = sltp_calculator.calculate_levels(
-                            current_price=current_price,
-                            leverage=leverage,
-                            support_levels=support_levels,
-                            resistance_levels=resistance_levels,
-                            market_context=market_context
-                        )
-                        
                     except Exception as e:
                         # 支持線・抵抗線データ不足の場合は、この評価をスキップして次に進む
                         error_msg = f"支持線・抵抗線データの検出・分析に失敗: {str(e)}"
-                        logger.warning(f"⚠️ {symbol} {timeframe} {config}: {error_msg} (評価{total_evaluations}をスキップ)")
+                        for config in entering_configs:
+                            logger.warning(f"⚠️ {symbol} {timeframe} {config}: {error_msg} (評価{total_evaluations}をスキップ)")
                         logger.info(f"   📅 スキップした時刻: {current_time.strftime('%Y-%m-%d %H:%M')} → 次の評価に継続")
                         logger.warning(f"Support/resistance analysis failed for {symbol} at {current_time}: {error_msg}")
                         # 次の評価時点に進む（continue先でevaluation_intervalが加算される）
                         continue
                     
-                    # 🔧 重要な修正: 実際の市場データから各トレードのエントリー価格を取得
-                    # 理由: current_priceが固定値のため、実際の時系列データを使用
-                    entry_price = self._get_real_market_price(bot, symbol, timeframe, trade_time)
-                    
-                    # SL/TP価格をエントリー価格ベースで再計算
-                    sltp_levels = sltp_calculator.calculate_levels(
-                        current_price=entry_price,  # エントリー価格をベースに計算
-                        leverage=leverage,
-                        support_levels=support_levels,
-                        resistance_levels=resistance_levels,
-                        market_context=market_context
-                    )
-                    
-                    # 実際のTP/SL価格（エントリー価格ベース）
-                    tp_price = sltp_levels.take_profit_price
-                    sl_price = sltp_levels.stop_loss_price
-                    
-                    # 🔧 ロングポジションの価格論理チェック
-                    if sl_price >= entry_price:
-                        logger.error(f"重大エラー: 損切り価格({sl_price:.4f})がエントリー価格({entry_price:.4f})以上")
-                        continue
-                    if tp_price <= entry_price:
-                        logger.error(f"重大エラー: 利確価格({tp_price:.4f})がエントリー価格({entry_price:.4f})以下")
-                        continue
-                    if sl_price >= tp_price:
-                        logger.error(f"重大エラー: 損切り価格({sl_price:.4f})が利確価格({tp_price:.4f})以上")
-                        continue
-                    
-                    # 戦略分析では、current_priceもentry_priceと同じにして整合性を保つ
-                    # これにより、同じローソク足のopen vs closeによる価格差を防ぐ
-                    current_price = entry_price
-                    
-                    # 価格データ整合性チェック実行
-                    price_consistency_result = self.price_validator.validate_price_consistency(
-                        analysis_price=current_price,
-                        entry_price=entry_price,
-                        symbol=symbol,
-                        context=f"{timeframe}_{config}_trade_{len(trades)+1}"
-                    )
-                    
-                    if not price_consistency_result.is_consistent:
-                        logger.warning(f"価格整合性問題検出: {symbol} {timeframe} - {price_consistency_result.message}")
-                        for recommendation in price_consistency_result.recommendations:
-                            logger.warning(f"推奨対応: {recommendation}")
-                        
-                        # 重大な価格不整合の場合は取引をスキップ
-                        if price_consistency_result.inconsistency_level.value == 'critical':
-                            logger.error(f"重大な価格不整合のためトレードをスキップ: {symbol} at {trade_time}")
+                    # 戦略に応じたTP/SL計算器でTP/SL価格を実際のデータで計算（失敗した戦略はこの評価をスキップ）
+                    strategy_calculators = []
+                    for config in entering_configs:
+                        sltp_calculator = self._create_sltp_calculator(config)
+                        try:
+                            sltp_calculator.calculate_levels(
+                                current_price=current_price,
+                                leverage=leverage,
+                                support_levels=support_levels,
+                                resistance_levels=resistance_levels,
+                                market_context=market_context
+                            )
+                        except Exception as e:
+                            error_msg = f"支持線・抵抗線データの検出・分析に失敗: {str(e)}"
+                            logger.warning(f"⚠️ {symbol} {timeframe} {config}: {error_msg} (評価{total_evaluations}をスキップ)")
+                            logger.info(f"   📅 スキップした時刻: {current_time.strftime('%Y-%m-%d %H:%M')} → 次の評価に継続")
+                            logger.warning(f"Support/resistance analysis failed for {symbol} at {current_time}: {error_msg}")
                             continue
+                        strategy_calculators.append((config, sltp_calculator))
                     
-                    # 統一価格データの作成
-                    unified_price_data = self.price_validator.create_unified_price_data(
-                        analysis_price=current_price,
-                        entry_price=entry_price,
-                        symbol=symbol,
-                        timeframe=timeframe,
-                        market_timestamp=trade_time,
-                        data_source=exchange
-                    )
-                    
-                    # TP/SL到達ベースのクローズ判定（実際の市場データを使用）
-                    exit_time, exit_price, is_success = self._find_tp_sl_exit(
-                        bot, symbol, timeframe, trade_time, entry_price, tp_price, sl_price
-                    )
-                    
-                    # 到達判定が失敗した場合のフォールバック
-                    if exit_time is None:
-                        # 営業時間内（平日の9:00-21:00 JST = 0:00-12:00 UTC）に調整
-                        if trade_time.weekday() >= 5:  # 土日は月曜に移動
-                            trade_time += timedelta(days=(7 - trade_time.weekday()))
-                        # 時間調整（9:00-21:00 JST = 0:00-12:00 UTC）
-                        hour = trade_time.hour
-                        if hour < 0:  # JST 9:00 = UTC 0:00
-                            trade_time = trade_time.replace(hour=0)
-                        elif hour > 12:  # JST 21:00 = UTC 12:00
-                            trade_time = trade_time.replace(hour=12)
-                        
-                        # フォールバック: 時間足に応じた期間後に建値決済
-                        exit_minutes = self._get_fallback_exit_minutes(timeframe)
-                        exit_time = trade_time + timedelta(minutes=exit_minutes)
-                        # フォールバック: 判定不能のため建値決済（プラマイ0）
-                        is_success = None  # 判定不能を示す
-                        exit_price = entry_price  # 建値決済
-                    
-                    # PnL計算
-                    pnl_pct = (exit_price - entry_price) / entry_price
-                    leveraged_pnl = pnl_pct * leverage
-                    
-                    # バックテスト結果の総合検証
-                    backtest_validation = self.price_validator.validate_backtest_result(
-                        entry_price=entry_price,
-                        stop_loss_price=sl_price,
-                        take_profit_price=tp_price,
-                        exit_price=exit_price,
-                        duration_minutes=int((exit_time - trade_time).total_seconds() / 60),
-                        symbol=symbol
-                    )
-                    
-                    if not backtest_validation['is_valid']:
-                        logger.warning(f"バックテスト結果異常検知: {symbol} {timeframe}")
-                        logger.warning(f"問題: {', '.join(backtest_validation['issues'])}")
-                        
-                        # 重大な問題がある場合は銘柄追加自体を停止
-                        if backtest_validation['severity_level'] == 'critical':
-                            logger.error(f"重大なバックテスト異常のため銘柄追加を停止: {symbol} at {trade_time}")
-                            logger.error(f"詳細: {', '.join(backtest_validation['issues'])}")
-                            raise Exception(f"重大なバックテスト異常検知: {', '.join(backtest_validation['issues'])}")
-                    
-                    # 日本時間（UTC+9）で表示
-                    jst_entry_time = trade_time + timedelta(hours=9)
-                    jst_exit_time = exit_time + timedelta(hours=9)
-                    
-                    trades.append({
-                        'entry_time': jst_entry_time.strftime('%Y-%m-%d %H:%M:%S JST'),
-                        'exit_time': jst_exit_time.strftime('%Y-%m-%d %H:%M:%S JST'),
-                        'entry_price': entry_price,
-                        'exit_price': exit_price,
-                        'take_profit_price': tp_price,
-                        'stop_loss_price': sl_price,
-                        'leverage': leverage,
-                        'pnl_pct': leveraged_pnl,
-                        'confidence': confidence,
-                        'is_success': is_success,
-                        'trade_type': 'breakeven' if is_success is None else ('profit' if is_success else 'loss'),
-                        'strategy': config,
-                        # 価格整合性情報の追加
-                        'price_consistency_score': unified_price_data.consistency_score,
-                        'price_validation_level': price_consistency_result.inconsistency_level.value,
-                        'backtest_validation_severity': backtest_validation['severity_level'],
-                        'analysis_price': current_price  # デバッグ用
-                    })
+                    if not strategy_calculators:
+                        continue
                     
+                    # 🔧 重要な修正: 実際の市場データから各トレードのエントリー価格を取得
+                    # 理由: current_priceが固定値のため、実際の時系列データを使用
+                    entry_price = self._get_real_market_price(bot, symbol, timeframe, trade_time)
                 except Exception as e:
                     logger.warning(f"⚠️ 分析エラー (評価{total_evaluations}): {str(e)[:100]}")
                     logger.warning(f"Analysis failed for {symbol} at {current_time}: {e}")
+                    continue
+                
+                # === 戦略ごとのTP/SL計算・到達判定 ===
+                for config, sltp_calculator in strategy_calculators:
+                    try:
+                        trade = self._build_strategy_trade(
+                            bot, symbol, timeframe, config, exchange, sltp_calculator,
+                            trade_time, entry_price, leverage, confidence,
+                            support_levels, resistance_levels, market_context,
+                            trade_number=len(trades[config]) + 1
+                        )
+                    except Exception as e:
+                        logger.warning(f"⚠️ 分析エラー (評価{total_evaluations}): {str(e)[:100]}")
+                        logger.warning(f"Analysis failed for {symbol} at {current_time}: {e}")
+                        continue
+                    if trade is not None:
+                        trades[config].append(trade)
                 
                 # forループなので自動的に次のインデックスに進む
             
             # 全データ評価完了のログ
-            logger.info(f"✅ {symbol} {timeframe} {config}: 全{total_evaluations}本のデータを評価完了")
-            
-            if not trades:
-                print(f"ℹ️ {symbol} {timeframe} {config}: 評価期間中に条件を満たすシグナルが見つかりませんでした")
-                return []  # 空のリストを返す（エラーにしない）
-            
-            evaluation_rate = (signals_generated / total_evaluations * 100) if total_evaluations > 0 else 0
-            logger.info(f"✅ {symbol} {timeframe} {config}: 条件ベース分析完了")
-            print(f"   📊 総評価数: {total_evaluations}, シグナル生成: {signals_generated}件 ({evaluation_rate:.1f}%)")
+            logger.info(f"✅ {symbol} {timeframe} {label}: 全{total_evaluations}本のデータを評価完了")
+            if incremental_engine is not None:
+                logger.info(f"⚡ 評価エンジン({backtest_engine_mode}): {incremental_engine.get_stats()}")
+            for config in configs:
+                entry_diagnostics[config].log_summary(logger, f"{symbol} {timeframe} {config}")
+            # ステージ別の処理時間をexecution_id単位で保存（ワーカープロセスの集計も合算される）
+            flush_stage_profiles()
+            
+            for config in configs:
+                if not trades[config]:
+                    print(f"ℹ️ {symbol} {timeframe} {config}: 評価期間中に条件を満たすシグナルが見つかりませんでした")
+                    continue
+                
+                evaluation_rate = (signals_generated[config] / total_evaluations * 100) if total_evaluations > 0 else 0
+                logger.info(f"✅ {symbol} {timeframe} {config}: 条件ベース分析完了")
+                print(f"   📊 総評価数: {total_evaluations}, シグナル生成: {signals_generated[config]}件 ({evaluation_rate:.1f}%)")
             
             # 価格整合性チェック結果のサマリーを表示
-            if trades:
+            if any(trades.values()):
                 validation_summary = self.price_validator.get_validation_summary(hours=24)
                 if validation_summary['total_validations'] > 0:
                     print(f"   🔍 価格整合性チェック: {validation_summary['consistency_rate']:.1f}% 整合性")
@@ -1475,157 +1624,321 @@ class ScalableAnalysisSystem:
             logger.error(f"Condition-based analysis failed: {e}")
             raise
     
-    def _evaluate_entry_conditions(self, analysis_result, timeframe):
+    def _create_sltp_calculator(self, config):
+        """戦略に応じたTP/SL計算器を選択"""
+        from engines.stop_loss_take_profit_calculators import (
+            DefaultSLTPCalculator, ConservativeSLTPCalculator, AggressiveSLTPCalculator,
+            TraditionalSLTPCalculator, MLSLTPCalculator
+        )
+        
+        if 'Conservative' in config:
+            return ConservativeSLTPCalculator()
+        elif 'Aggressive_Traditional' in config:
+            return TraditionalSLTPCalculator()
+        elif 'Aggressive' in config:
+            return AggressiveSLTPCalculator()
+        elif 'Full_ML' in config:
+            return MLSLTPCalculator()
+        return DefaultSLTPCalculator()
+    
+    def _build_strategy_trade(self, bot, symbol, timeframe, config, exchange, sltp_calculator,
+                              trade_time, entry_price, leverage, confidence,
+                              support_levels, resistance_levels, market_context, trade_number):
         """
-        エントリー条件を評価して、シグナル生成が適切かを判定
+        1戦略分のトレードを作成（TP/SL計算・価格整合性チェック・TP/SL到達判定）
         
-        Args:
-            analysis_result: ハイレバボットからの分析結果
-            timeframe: 時間足
-            
         Returns:
-            bool: エントリー条件を満たしているかどうか
+            dict: トレード（価格の論理チェック・整合性チェックで除外された場合はNone）
         """
+        # SL/TP価格をエントリー価格ベースで再計算
+        sltp_levels = sltp_calculator.calculate_levels(
+            current_price=entry_price,  # エントリー価格をベースに計算
+            leverage=leverage,
+            support_levels=support_levels,
+            resistance_levels=resistance_levels,
+            market_context=market_context
+        )
         
-        # 基本的な条件チェック
-        leverage = analysis_result.get('leverage', 0)
-        confidence = analysis_result.get('confidence', 0) / 100.0  # パーセントから比率に変換
-        risk_reward = analysis_result.get('risk_reward_ratio', 0)
-        current_price = analysis_result.get('current_price', 0)
+        # 実際のTP/SL価格（エントリー価格ベース）
+        tp_price = sltp_levels.take_profit_price
+        sl_price = sltp_levels.stop_loss_price
         
-        # 統合設定から条件を取得（戦略も考慮）
-        try:
-            from config.unified_config_manager import UnifiedConfigManager
-            config_manager = UnifiedConfigManager()
-            
-            # 分析中の戦略を取得（デフォルトはBalanced）
-            strategy = analysis_result.get('strategy', 'Balanced')
-            
-            # 統合設定から条件を取得
-            conditions = config_manager.get_entry_conditions(timeframe, strategy)
+        # 🔧 ロングポジションの価格論理チェック
+        if sl_price >= entry_price:
+            logger.error(f"重大エラー: 損切り価格({sl_price:.4f})がエントリー価格({entry_price:.4f})以上")
+            return None
+        if tp_price <= entry_price:
+            logger.error(f"重大エラー: 利確価格({tp_price:.4f})がエントリー価格({entry_price:.4f})以下")
+            return None
+        if sl_price >= tp_price:
+            logger.error(f"重大エラー: 損切り価格({sl_price:.4f})が利確価格({tp_price:.4f})以上")
+            return None
+        
+        # 戦略分析では、current_priceもentry_priceと同じにして整合性を保つ
+        # これにより、同じローソク足のopen vs closeによる価格差を防ぐ
+        current_price = entry_price
+        
+        # 価格データ整合性チェック実行
+        price_consistency_result = self.price_validator.validate_price_consistency(
+            analysis_price=current_price,
+            entry_price=entry_price,
+            symbol=symbol,
+            context=f"{timeframe}_{config}_trade_{trade_number}"
+        )
+        
+        if not price_consistency_result.is_consistent:
+            logger.warning(f"価格整合性問題検出: {symbol} {timeframe} - {price_consistency_result.message}")
+            for recommendation in price_consistency_result.recommendations:
+                logger.warning(f"推奨対応: {recommendation}")
             
-            # フィルターパラメータからエントリー条件をオーバーライド
-            import os
-            filter_params_env = os.getenv('FILTER_PARAMS')
-            if filter_params_env:
-                try:
-                    import json
-                    filter_params = json.loads(filter_params_env)
-                    entry_conditions = filter_params.get('entry_conditions', {})
-                    
-                    if entry_conditions:
-                        # WebUIからのパラメータで設定をオーバーライド
-                        original_conditions = conditions.copy()
-                        if 'min_leverage' in entry_conditions:
-                            conditions['min_leverage'] = entry_conditions['min_leverage']
-                        if 'min_confidence' in entry_conditions:
-                            conditions['min_confidence'] = entry_conditions['min_confidence']
-                        if 'min_risk_reward' in entry_conditions:
-                            conditions['min_risk_reward'] = entry_conditions['min_risk_reward']
-                        
-                        logger.info(f"🔧 エントリー条件をWebUIパラメータでオーバーライド:")
-                        logger.info(f"   min_leverage: {original_conditions.get('min_leverage')} → {conditions['min_leverage']}")
-                        logger.info(f"   min_confidence: {original_conditions.get('min_confidence')} → {conditions['min_confidence']}")
-                        logger.info(f"   min_risk_reward: {original_conditions.get('min_risk_reward')} → {conditions['min_risk_reward']}")
-                except Exception as e:
-                    logger.warning(f"⚠️ フィルターパラメータのエントリー条件解析エラー: {e}")
+            # 重大な価格不整合の場合は取引をスキップ
+            if price_consistency_result.inconsistency_level.value == 'critical':
+                logger.error(f"重大な価格不整合のためトレードをスキップ: {symbol} at {trade_time}")
+                return None
+        
+        # 統一価格データの作成
+        unified_price_data = self.price_validator.create_unified_price_data(
+            analysis_price=current_price,
+            entry_price=entry_price,
+            symbol=symbol,
+            timeframe=timeframe,
+            market_timestamp=trade_time,
+            data_source=exchange
+        )
+        
+        # TP/SL到達ベースのクローズ判定（実際の市場データを使用）
+        exit_time, exit_price, is_success = self._find_tp_sl_exit(
+            bot, symbol, timeframe, trade_time, entry_price, tp_price, sl_price
+        )
+        
+        # 到達判定が失敗した場合のフォールバック
+        if exit_time is None:
+            # 営業時間内（平日の9:00-21:00 JST = 0:00-12:00 UTC）に調整
+            if trade_time.weekday() >= 5:  # 土日は月曜に移動
+                trade_time += timedelta(days=(7 - trade_time.weekday()))
+            # 時間調整（9:00-21:00 JST = 0:00-12:00 UTC）
+            hour = trade_time.hour
+            if hour < 0:  # JST 9:00 = UTC 0:00
+                trade_time = trade_time.replace(hour=0)
+            elif hour > 12:  # JST 21:00 = UTC 12:00
+                trade_time = trade_time.replace(hour=12)
+            
+            # フォールバック: 時間足に応じた期間後に建値決済
+            exit_minutes = self._get_fallback_exit_minutes(timeframe)
+            exit_time = trade_time + timedelta(minutes=exit_minutes)
+            # フォールバック: 判定不能のため建値決済（プラマイ0）
+            is_success = None  # 判定不能を示す
+            exit_price = entry_price  # 建値決済
+        
+        # PnL計算
+        pnl_pct = (exit_price - entry_price) / entry_price
+        leveraged_pnl = pnl_pct * leverage
+        
+        # バックテスト結果の総合検証
+        backtest_validation = self.price_validator.validate_backtest_result(
+            entry_price=entry_price,
+            stop_loss_price=sl_price,
+            take_profit_price=tp_price,
+            exit_price=exit_price,
+            duration_minutes=int((exit_time - trade_time).total_seconds() / 60),
+            symbol=symbol
+        )
+        
+        if not backtest_validation['is_valid']:
+            logger.warning(f"バックテスト結果異常検知: {symbol} {timeframe}")
+            logger.warning(f"問題: {', '.join(backtest_validation['issues'])}")
             
-        except Exception as e:
-            # 設定読み込み失敗時は銘柄追加を停止
-            error_msg = f"エントリー条件設定が読み込めませんでした: {e}"
-            print(f"❌ 設定エラー: {error_msg}")
-            raise InsufficientConfigurationError(
-                message=error_msg,
-                error_type="entry_conditions_config_failed",
-                missing_config="unified_entry_conditions"
-            )
+            # 重大な問題がある場合は銘柄追加自体を停止
+            if backtest_validation['severity_level'] == 'critical':
+                logger.error(f"重大なバックテスト異常のため銘柄追加を停止: {symbol} at {trade_time}")
+                logger.error(f"詳細: {', '.join(backtest_validation['issues'])}")
+                raise Exception(f"重大なバックテスト異常検知: {', '.join(backtest_validation['issues'])}")
+        
+        # 日本時間（UTC+9）で表示
+        jst_entry_time = trade_time + timedelta(hours=9)
+        jst_exit_time = exit_time + timedelta(hours=9)
+        
+        return {
+            'entry_time': jst_entry_time.strftime('%Y-%m-%d %H:%M:%S JST'),
+            'exit_time': jst_exit_time.strftime('%Y-%m-%d %H:%M:%S JST'),
+            'entry_price': entry_price,
+            'exit_price': exit_price,
+            'take_profit_price': tp_price,
+            'stop_loss_price': sl_price,
+            'leverage': leverage,
+            'pnl_pct': leveraged_pnl,
+            'confidence': confidence,
+            'is_success': is_success,
+            'trade_type': 'breakeven' if is_success is None else ('profit' if is_success else 'loss'),
+            'strategy': config,
+            # 価格整合性情報の追加
+            'price_consistency_score': unified_price_data.consistency_score,
+            'price_validation_level': price_consistency_result.inconsistency_level.value,
+            'backtest_validation_severity': backtest_validation['severity_level'],
+            'analysis_price': current_price  # デバッグ用
+        }
+    
+    def _report_early_exit(self, result, symbol, timeframe, config, execution_id):
+        """Early Exitの詳細をログ・Discord・一時ファイル（親プロセス表示用）に出力"""
+        import sys
+        
+        # ProcessPoolExecutor環境での確実なログ出力
+        detailed_msg = result.get_detailed_log_message()
+        user_msg = result.get_user_friendly_message()
         
-        # 🔍 詳細なエラー検証とログ機能
-        logger.error(f"🔍 エントリー条件評価開始:")
-        logger.error(f"   分析結果の生データ:")
-        logger.error(f"     leverage: {leverage} (型: {type(leverage)})")
-        logger.error(f"     confidence: {confidence} (型: {type(confidence)}) [元の値: {analysis_result.get('confidence')}]")
-        logger.error(f"     risk_reward_ratio: {risk_reward} (型: {type(risk_reward)})")
-        logger.error(f"     current_price: {current_price} (型: {type(current_price)})")
-        
-        # None値チェックと詳細エラー報告
-        validation_errors = []
-        
-        if leverage is None:
-            validation_errors.append("leverage is None - 分析結果からレバレッジ値が取得できませんでした")
-        if confidence is None:
-            validation_errors.append("confidence is None - 分析結果から信頼度が取得できませんでした")
-        if risk_reward is None:
-            validation_errors.append("risk_reward_ratio is None - 分析結果からリスクリワード比が取得できませんでした")
-        if current_price is None:
-            validation_errors.append("current_price is None - 分析結果から現在価格が取得できませんでした")
-        
-        # None値がある場合は詳細エラー情報を出力
-        if validation_errors:
-            logger.error(f"🚨 分析結果にNone値が含まれています:")
-            for error in validation_errors:
-                logger.error(f"   ❌ {error}")
-            logger.error(f"   📊 分析結果の全内容:")
-            for key, value in analysis_result.items():
-                logger.error(f"     {key}: {value} (型: {type(value)})")
-            
-            # None値エラーとして例外を発生
-            raise ValueError(f"分析結果にNone値が含まれています: {', '.join(validation_errors)}")
-        
-        # 条件評価
-        conditions_met = []
+        # 強制的なログ出力とフラッシュ（ProcessPoolExecutor対応）
+        logger.info(f"📋 {detailed_msg}")
+        logger.info(f"💡 {user_msg}")
         
+        # 改善提案も出力
+        suggestions = result.get_suggestions()
+        if suggestions:
+            logger.info(f"🎯 改善提案: {'; '.join(suggestions)}")
+        
+        # ProcessPoolExecutor環境での確実な出力確保
+        sys.stdout.flush()
+        sys.stderr.flush()
+        
+        # ログハンドラーの強制フラッシュ
+        for handler in logger.handlers:
+            if hasattr(handler, 'flush'):
+                handler.flush()
+        
+        # 🎯 Discord webhook通知: 子プロセスのEarly Exit詳細送信
         try:
-            # 1. レバレッジ条件
-            leverage_ok = leverage >= conditions['min_leverage']
-            conditions_met.append(('leverage', leverage_ok, f"{leverage:.1f}x >= {conditions['min_leverage']}x"))
+            # 同期実行（ProcessPoolExecutor環境では非同期は使用できない）
+            import requests
             
-            # 2. 信頼度条件
-            confidence_ok = confidence >= conditions['min_confidence']
-            conditions_met.append(('confidence', confidence_ok, f"{confidence:.1%} >= {conditions['min_confidence']:.1%}"))
+            # ProcessPoolExecutor環境での環境変数再読み込み
+            try:
+                from dotenv import load_dotenv
+                load_dotenv()
+            except ImportError:
+                pass
             
-            # 3. リスクリワード条件
-            risk_reward_ok = risk_reward >= conditions['min_risk_reward']
-            conditions_met.append(('risk_reward', risk_reward_ok, f"{risk_reward:.1f} >= {conditions['min_risk_reward']}"))
+            # Discord webhook URL (環境変数から取得)
+            webhook_url = os.environ.get('DISCORD_WEBHOOK_URL')
             
-            # 4. 価格の有効性
-            price_ok = current_price > 0
-            conditions_met.append(('price', price_ok, f"price={current_price}"))
+            # デバッグログ: Discord通知試行ログ
+            logger.info(f"🎯 Discord通知試行: {symbol} {timeframe} {config}")
+            logger.info(f"   webhook_url設定: {bool(webhook_url)}")
+            logger.info(f"   Early Exit詳細: {result.exit_stage}/{result.exit_reason}")
+            
+            if webhook_url:
+                # embed作成
+                embed = {
+                    "title": f"🚨 Early Exit Analysis: {symbol}",
+                    "color": 0xFF4444,  # 赤色
+                    "timestamp": datetime.now().isoformat(),
+                    "fields": [
+                        {"name": "Symbol", "value": symbol, "inline": True},
+                        {"name": "Timeframe", "value": timeframe, "inline": True},
+                        {"name": "Strategy", "value": config, "inline": True},
+                        {"name": "Exit Stage", "value": result.exit_stage.value if result.exit_stage else 'unknown', "inline": True},
+                        {"name": "Exit Reason", "value": result.exit_reason.value if result.exit_reason else 'unknown', "inline": True},
+                        {"name": "Execution ID", "value": f"`{execution_id}`", "inline": False},
+                        {"name": "Detailed Message", "value": detailed_msg[:1000], "inline": False},
+                        {"name": "User Message", "value": user_msg[:1000], "inline": False}
+                    ],
+                    "footer": {"text": "Long Trader - Early Exit Analysis"}
+                }
+                
+                # 改善提案を追加
+                if suggestions:
+                    embed["fields"].append({
+                        "name": "💡 Suggestions",
+                        "value": "\n".join([f"• {s}" for s in suggestions[:5]])[:1000],
+                        "inline": False
+                    })
+                
+                # Discord APIに送信
+                payload = {
+                    "embeds": [embed],
+                    "username": "Long Trader Bot"
+                }
+                
+                # 最大3回のリトライ（ProcessPoolExecutor環境では軽量化）
+                for attempt in range(3):
+                    try:
+                        response = requests.post(webhook_url, json=payload, timeout=10)
+                        if response.status_code == 200:
+                            logger.info(f"✅ Discord通知送信成功: {symbol} Early Exit")
+                            break
+                        elif response.status_code == 429:  # Rate limit
+                            retry_after = int(response.headers.get('Retry-After', 1))
+                            logger.warning(f"Discord rate limit, retrying after {retry_after}s")
+                            time.sleep(retry_after)
+                        else:
+                            logger.warning(f"Discord API error: {response.status_code}")
+                            break
+                    except Exception as e:
+                        if attempt == 2:  # 最後の試行
+                            logger.error(f"❌ Discord送信失敗: {e}")
+                            break
+                        wait_time = 2 ** attempt
+                        logger.warning(f"Discord送信失敗 (attempt {attempt + 1}/3): {e}, retrying in {wait_time}s")
+                        time.sleep(wait_time)
+            else:
+                logger.warning("⚠️ DISCORD_WEBHOOK_URL not set, skipping notification")
+                
+        except Exception as discord_error:
+            logger.error(f"❌ Discord通知システムエラー: {discord_error}")
+            import traceback
+            logger.error(f"   スタックトレース: {traceback.format_exc()}")
+        
+        # 🔧 ProcessPoolExecutor環境用: AnalysisResult詳細を一時ファイルに出力
+        try:
+            import tempfile
+            import json
+            analysis_log = {
+                'timestamp': datetime.now().isoformat(),
+                'execution_id': execution_id,
+                'symbol': symbol,
+                'timeframe': timeframe,
+                'strategy': config,
+                'detailed_msg': detailed_msg,
+                'user_msg': user_msg,
+                'suggestions': suggestions,
+                'early_exit': True,
+                'stage': result.exit_stage.value if result.exit_stage else 'unknown',
+                'reason': result.exit_reason.value if result.exit_reason else 'unknown'
+            }
             
-        except Exception as e:
-            logger.error(f"🚨 エントリー条件評価中にエラーが発生:")
-            logger.error(f"   エラー内容: {str(e)}")
-            logger.error(f"   エラータイプ: {type(e).__name__}")
-            logger.error(f"   値の詳細:")
-            logger.error(f"     leverage: {leverage} (型: {type(leverage)})")
-            logger.error(f"     confidence: {confidence} (型: {type(confidence)})")
-            logger.error(f"     risk_reward: {risk_reward} (型: {type(risk_reward)})")
-            logger.error(f"     current_price: {current_price} (型: {type(current_price)})")
-            raise ValueError(f"エントリー条件評価エラー: {str(e)}") from e
-        
-        # 全ての条件が満たされているかをチェック
-        all_conditions_met = all(condition[1] for condition in conditions_met)
-        
-        # 条件評価結果の詳細ログ
-        logger.error(f"🎯 エントリー条件評価結果:")
-        for condition_name, result, description in conditions_met:
-            status = "✅ OK" if result else "❌ NG"
-            logger.error(f"   {condition_name}: {status} - {description}")
-        logger.error(f"   最終判定: {'✅ 通過' if all_conditions_met else '❌ 除外'}")
-        
-        # デバッグログ: OPの条件評価詳細
-        if 'OP' in str(analysis_result.get('symbol', '')):
-            logger.error(f"🔍 OP条件評価詳細:")
-            logger.error(f"   レバレッジ: {leverage} (必要: {conditions['min_leverage']}) → {leverage_ok}")
-            logger.error(f"   信頼度: {confidence:.1%} (必要: {conditions['min_confidence']:.1%}) → {confidence_ok}")
-            logger.error(f"   RR比: {risk_reward} (必要: {conditions['min_risk_reward']}) → {risk_reward_ok}")
-            logger.error(f"   結果: {all_conditions_met}")
-        
-        # デバッグ用ログ（条件満足時のみ詳細表示）
-        if all_conditions_met:
-            print(f"   ✅ エントリー条件満足: L={leverage:.1f}x, C={confidence:.1%}, RR={risk_reward:.1f}")
-        
-        return all_conditions_met
+            log_file = f"/tmp/analysis_log_{execution_id}_{symbol}_{timeframe}_{config}.json"
+            with open(log_file, 'w', encoding='utf-8') as f:
+                json.dump(analysis_log, f, ensure_ascii=False, indent=2)
+            
+            # 親プロセス確認用
+            print(f"📝 子プロセス詳細ログ出力: {log_file}", flush=True)
+        except Exception as log_error:
+            logger.warning(f"一時ファイルログ出力エラー: {log_error}")
+    
+    def _evaluate_entry_conditions(self, analysis_result, timeframe, evaluators=None, diagnostics=None):
+        """
+        エントリー条件を評価して、シグナル生成が適切かを判定
+        
+        Args:
+            analysis_result: ハイレバボットからの分析結果
+            timeframe: 時間足
+            evaluators: 戦略名 → CompiledEntryConditions のキャッシュ（タスク内で共有）
+            diagnostics: 不合格理由を集計する EntryConditionDiagnostics
+            
+        Returns:
+            bool: エントリー条件を満たしているかどうか
+        """
+        from engines.entry_condition_evaluator import compile_entry_conditions
+        
+        # 分析中の戦略を取得（デフォルトはBalanced）
+        strategy = analysis_result.get('strategy', 'Balanced')
+        
+        # 統合設定・FILTER_PARAMSの解決はタスク内で戦略ごとに1回だけ
+        evaluator = evaluators.get(strategy) if evaluators is not None else None
+        if evaluator is None:
+            evaluator = compile_entry_conditions(timeframe, strategy)
+            if evaluators is not None:
+                evaluators[strategy] = evaluator
+        
+        return evaluator.evaluate(analysis_result, diagnostics)
     
     def _create_strategy_from_config(self, config: str):
         """設定から戦略オブジェクトを作成"""
@@ -1842,8 +2155,23 @@ class ScalableAnalysisSystem:
         base_metrics.update(price_consistency_metrics)
         return base_metrics
     
-    def _save_compressed_data(self, analysis_id, trades_df):
-        """データを圧縮して保存"""
+    def _save_compressed_data(self, analysis_id, trades_df, symbol=None, timeframe=None, config=None):
+        """
+        トレードデータを保存し、analyses.compressed_path に記録するパスを返す
+
+        既定はカラム型トレードアーカイブのパーティション（TRADE_ARCHIVE_FORMAT=pickle で従来の pkl.gz）
+        """
+        if os.environ.get('TRADE_ARCHIVE_FORMAT', 'columnar').lower() != 'pickle':
+            if symbol is None or timeframe is None or config is None:
+                parts = str(analysis_id).split('_', 2)
+                if len(parts) == 3:
+                    symbol, timeframe, config = parts
+            if symbol is not None and timeframe is not None and config is not None:
+                try:
+                    return self.trade_archive.write(symbol, timeframe, config, trades_df)
+                except Exception as e:
+                    logger.warning(f"⚠️ トレードアーカイブ保存エラー（pkl.gzで保存）: {analysis_id} - {e}")
+
         compressed_path = self.compressed_dir / f"{analysis_id}.pkl.gz"
         
         with gzip.open(compressed_path, 'wb') as f:
@@ -1884,7 +2212,7 @@ class ScalableAnalysisSystem:
         logger.info(f"  🗃️ 保存先DB: {self.db_path.absolute()}")
         logger.info(f"  🔑 execution_id: {execution_id or os.environ.get('CURRENT_EXECUTION_ID', 'None')}")
         
-        with sqlite3.connect(self.db_path) as conn:
+        with db_connection(self.db_path) as conn:
             cursor = conn.cursor()
             
             # execution_idを環境変数または引数から取得
@@ -1984,7 +2312,7 @@ class ScalableAnalysisSystem:
     
     def query_analyses(self, filters=None, order_by='sharpe_ratio', limit=100):
         """分析結果をクエリ"""
-        with sqlite3.connect(self.db_path) as conn:
+        with db_connection(self.db_path) as conn:
             query = "SELECT * FROM analyses WHERE status='completed'"
             params = []
             
@@ -2033,7 +2361,7 @@ class ScalableAnalysisSystem:
     
     def get_statistics(self):
         """システム統計を取得"""
-        with sqlite3.connect(self.db_path) as conn:
+        with db_connection(self.db_path) as conn:
             cursor = conn.cursor()
             
             # 基本統計
@@ -2070,7 +2398,7 @@ class ScalableAnalysisSystem:
         analysis_id = f"{symbol}_{timeframe}_{config}"
         
         # データベースからパスを取得
-        with sqlite3.connect(self.db_path) as conn:
+        with db_connection(self.db_path) as conn:
             cursor = conn.cursor()
             cursor.execute(
                 "SELECT compressed_path FROM analyses WHERE symbol=? AND timeframe=? AND config=?",
@@ -2084,16 +2412,36 @@ class ScalableAnalysisSystem:
             
             compressed_path = result[0]
         
-        # 圧縮データを読み込み
+        # 圧縮データを読み込み（アーカイブのパーティション、または移行前の pkl.gz）
         try:
-            with gzip.open(compressed_path, 'rb') as f:
-                trades_df = pickle.load(f)
+            if TradeArchive.is_partition(compressed_path):
+                trades_df = self.trade_archive.read_trades(compressed_path)
+            else:
+                with gzip.open(compressed_path, 'rb') as f:
+                    trades_df = pickle.load(f)
             logger.info(f"トレードデータ読み込み完了: {analysis_id} ({len(trades_df)}トレード)")
             return trades_df
         except Exception as e:
             logger.error(f"データ読み込みエラー {analysis_id}: {e}")
             return None
     
+    def load_symbol_trade_arrays(self, symbol, columns=None, **filters):
+        """
+        銘柄の完了済み分析の全トレードを列ごとのNumPy配列で一括読み込み
+
+        Args:
+            columns: 読み込む列（Noneは全列）。'timeframe' / 'config' で分析の時間足・戦略を付与
+            **filters: start_time / end_time / is_success / leverage_buckets（TradeFilter参照）
+        """
+        with db_connection(self.db_path) as conn:
+            sources = conn.execute(
+                """SELECT timeframe, config, compressed_path FROM analyses
+                   WHERE symbol=? AND status='completed' AND compressed_path IS NOT NULL
+                   ORDER BY timeframe, config""",
+                (symbol,)
+            ).fetchall()
+        return self.trade_archive.read_sources(sources, columns, **filters)
+
     def load_multiple_trades(self, criteria=None):
         """複数の圧縮トレードデータを一括読み込み"""
         # クエリ条件に基づいて分析を取得
@@ -2195,7 +2543,7 @@ class ScalableAnalysisSystem:
     def get_analysis_details(self, symbol, timeframe, config):
         """分析の詳細情報を取得（データベース + トレードデータ）"""
         # データベースから基本情報取得
-        with sqlite3.connect(self.db_path) as conn:
+        with db_connection(self.db_path) as conn:
             query = """
                 SELECT * FROM analyses 
                 WHERE symbol=? AND timeframe=? AND config=?
@@ -2305,6 +2653,8 @@ class ScalableAnalysisSystem:
     
     async def send_discord_early_exit_notification(self, symbol: str, timeframe: str, strategy: str, execution_id: str, exit_stage: str, exit_reason: str, detailed_msg: str, user_msg: str, suggestions: List[str]):
         """Discord webhook通知: 子プロセスのEarly Exit詳細送信"""
+        import aiohttp
+        
         try:
             # Discord webhook URL (環境変数から取得)
             webhook_url = os.environ.get('DISCORD_WEBHOOK_URL')
@@ -2374,7 +2724,7 @@ class ScalableAnalysisSystem:
     
     def cleanup_low_performers(self, min_sharpe=0.5):
         """低パフォーマンス分析のクリーンアップ"""
-        with sqlite3.connect(self.db_path) as conn:
+        with db_connection(self.db_path) as conn:
             cursor = conn.cursor()
             
             # 削除対象を取得
@@ -2388,7 +2738,10 @@ class ScalableAnalysisSystem:
             deleted_files = 0
             for chart_path, data_path in to_delete:
                 for file_path in [chart_path, data_path]:
-                    if file_path and os.path.exists(file_path):
+                    if file_path and os.path.isdir(file_path):
+                        shutil.rmtree(file_path)
+                        deleted_files += 1
+                    elif file_path and os.path.exists(file_path):
                         os.remove(file_path)
                         deleted_files += 1
             
@@ -2626,61 +2979,28 @@ class ScalableAnalysisSystem:
             if market_data.empty:
                 return None, None, None
             
-            # タイムスタンプカラムの準備
-            if 'timestamp' not in market_data.columns:
-                if market_data.index.name == 'timestamp' or pd.api.types.is_datetime64_any_dtype(market_data.index):
-                    market_data = market_data.reset_index()
-                    if 'index' in market_data.columns:
-                        market_data = market_data.rename(columns={'index': 'timestamp'})
-                else:
-                    market_data['timestamp'] = pd.to_datetime(market_data.index, utc=True)
-            
-            # タイムスタンプを統一
-            market_data['timestamp'] = pd.to_datetime(market_data['timestamp'], utc=True)
-            if market_data['timestamp'].dt.tz is None:
-                market_data['timestamp'] = market_data['timestamp'].dt.tz_localize('UTC')
-            else:
-                market_data['timestamp'] = market_data['timestamp'].dt.tz_convert('UTC')
+            # タイムスタンプ正規化・high/lowの区間テーブルはデータごとに1回だけ構築
+            resolver = self._get_tp_sl_resolver(market_data)
             
-            # entry_timeをUTCに変換
-            if entry_time.tzinfo is None:
-                entry_time_utc = entry_time.replace(tzinfo=timezone.utc)
-            else:
-                entry_time_utc = entry_time.astimezone(timezone.utc)
-            
-            # エントリー後のデータを取得
-            after_entry_data = market_data[market_data['timestamp'] > entry_time_utc].copy()
-            
-            if after_entry_data.empty:
-                return None, None, None
-            
-            # 各ローソク足でTP/SL到達をチェック
-            for _, candle in after_entry_data.iterrows():
-                # ロングポジションを想定
-                candle_high = float(candle['high'])
-                candle_low = float(candle['low'])
-                
-                # 利確ライン到達チェック
-                if candle_high >= tp_price:
-                    exit_time = candle['timestamp']
-                    exit_price = tp_price
-                    is_success = True
-                    return exit_time, exit_price, is_success
-                
-                # 損切りライン到達チェック
-                if candle_low <= sl_price:
-                    exit_time = candle['timestamp']
-                    exit_price = sl_price
-                    is_success = False
-                    return exit_time, exit_price, is_success
-            
-            # 評価期間内に到達しなかった場合
-            return None, None, None
+            # ロングポジションを想定（同一足でTP/SL両方に到達した場合は利確を優先）
+            return resolver.resolve(entry_time, tp_price, sl_price, side='long')
             
         except Exception as e:
             logger.warning(f"TP/SL到達判定エラー: {symbol} - {e}")
             return None, None, None
     
+    def _get_tp_sl_resolver(self, market_data):
+        """市場データに対応するTPSLExitResolverを取得（同一データならキャッシュを再利用）"""
+        from engines.tp_sl_exit_resolver import TPSLExitResolver
+        
+        cached = getattr(self, '_tp_sl_resolver_cache', None)
+        if cached is not None and cached[0] is market_data and cached[1] == len(market_data):
+            return cached[2]
+        
+        resolver = TPSLExitResolver(market_data)
+        self._tp_sl_resolver_cache = (market_data, len(market_data), resolver)
+        return resolver
+    
     def _get_fallback_exit_minutes(self, timeframe):
         """時間足に応じたフォールバック退出時間を取得"""
         fallback_minutes = {
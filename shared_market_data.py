@@ -0,0 +1,351 @@
+"""
+共有メモリによる市場データ受け渡し
+
+generate_batch_analysis の親プロセスが (取引所, 銘柄, 時間足) ごとにOHLCVを1回だけ取得し、
+multiprocessing.shared_memory のブロックに列ごとに配置する。ProcessPoolExecutor の子プロセスには
+ブロック名・行数・列オフセットだけを持つ小さな記述子（SharedOHLCVDescriptor）を渡し、
+子プロセスはコピーせずにNumPyビューとしてアタッチする。
+
+- 親: SharedMarketDataPublisher.publish() → 記述子、終了時に close() でunlink
+- 子: install_shared_descriptors() で記述子を登録し、get_shared_ohlcv() で期間を満たす場合のみ取得
+  （公開時点の最新まで取得したデータは、公開後に開始したタスクの「現在まで」の要求も公開時点までのデータで満たす）
+- 子プロセスのRSS・アタッチ時間は get_worker_metrics() で取得
+"""
+
+import os
+import threading
+import time
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from multiprocessing import shared_memory
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+from ohlcv_candle_store import TIMEFRAME_MS
+
+logger = logging.getLogger(__name__)
+
+# 列の先頭をキャッシュライン境界に揃える
+COLUMN_ALIGNMENT = 64
+
+# 共有メモリに載せる列（timestampは元データの単位のdatetime64、UTC）
+SHARED_COLUMNS = ('timestamp', 'open', 'high', 'low', 'close', 'volume', 'trades')
+
+
+@dataclass(frozen=True)
+class SharedOHLCVDescriptor:
+    """子プロセスに渡す共有OHLCVブロックの記述子（pickle可能で小さい）"""
+    exchange: str
+    symbol: str
+    timeframe: str
+    shm_name: str
+    rows: int
+    columns: Tuple[Tuple[str, str, int], ...]  # (列名, dtype, オフセット)
+    window_start_ms: int
+    window_end_ms: int
+    nbytes: int
+    up_to_date: bool = False  # window_end が公開時の現在時刻（最新の足まで取得したデータ）
+
+    @property
+    def key(self) -> Tuple[str, str, str]:
+        return (self.exchange, self.symbol, self.timeframe)
+
+    def covers(self, start_ms: int, end_ms: int) -> bool:
+        """
+        要求期間を取得済み期間で満たせるか
+
+        終了側は1足分の遅れを許容する。最新まで取得したデータ（up_to_date）の場合、子プロセスの要求の終了時刻は
+        タスク開始時の現在時刻で公開時刻より後になるため、終了側は公開時点までのデータで満たすものとする。
+        """
+        tolerance = TIMEFRAME_MS.get(self.timeframe, 0)
+        if self.window_start_ms > start_ms:
+            return False
+        return self.up_to_date or end_ms <= self.window_end_ms + tolerance
+
+
+def _to_ms(value) -> int:
+    """datetime / Timestamp をUTCミリ秒に変換"""
+    timestamp = pd.Timestamp(value)
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.tz_localize('UTC')
+    return int(timestamp.value // 1_000_000)
+
+
+def _align(offset: int) -> int:
+    return (offset + COLUMN_ALIGNMENT - 1) // COLUMN_ALIGNMENT * COLUMN_ALIGNMENT
+
+
+def _frame_to_columns(df: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """OHLCV DataFrameを共有用の列配列に変換（timestamp昇順）"""
+    timestamps = pd.DatetimeIndex(pd.to_datetime(df['timestamp'], utc=True)).tz_convert(None)
+    arrays = {'timestamp': np.ascontiguousarray(timestamps.to_numpy())}
+    for name in SHARED_COLUMNS[1:]:
+        if name in df.columns and pd.api.types.is_numeric_dtype(df[name]):
+            arrays[name] = np.ascontiguousarray(df[name].to_numpy())
+    order = np.argsort(arrays['timestamp'], kind='stable')
+    if not np.array_equal(order, np.arange(len(order))):
+        arrays = {name: values[order] for name, values in arrays.items()}
+    return arrays
+
+
+class SharedMarketDataPublisher:
+    """
+    親プロセス側: OHLCVを共有メモリに公開し、終了時にunlinkする
+
+    with SharedMarketDataPublisher() as publisher:
+        descriptor = publisher.publish('hyperliquid', 'SOL', '1h', df, start, end)
+        executor.submit(worker, ..., publisher.descriptors())
+    """
+
+    def __init__(self):
+        self._blocks: Dict[Tuple[str, str, str], shared_memory.SharedMemory] = {}
+        self._descriptors: Dict[Tuple[str, str, str], SharedOHLCVDescriptor] = {}
+        self.publish_seconds = 0.0
+
+    def publish(self, exchange: str, symbol: str, timeframe: str, df: pd.DataFrame,
+                window_start, window_end, up_to_date: bool = False) -> Optional[SharedOHLCVDescriptor]:
+        """
+        DataFrameを共有メモリに書き込み、記述子を返す（空データはNone）
+
+        up_to_date=True は window_end が取得時の現在時刻であることを示す（公開後の「現在まで」の要求にも使う）
+        """
+        if df is None or df.empty:
+            return None
+
+        started = time.perf_counter()
+        key = (exchange, symbol, timeframe)
+        if key in self._blocks:
+            self._release(key)
+
+        arrays = _frame_to_columns(df)
+        layout = []
+        offset = 0
+        for name, values in arrays.items():
+            offset = _align(offset)
+            layout.append((name, values.dtype.str, offset))
+            offset += values.nbytes
+
+        block = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+        try:
+            for (name, dtype, column_offset) in layout:
+                values = arrays[name]
+                view = np.ndarray(values.shape, dtype=dtype, buffer=block.buf, offset=column_offset)
+                view[:] = values
+                del view
+        except Exception:
+            block.close()
+            block.unlink()
+            raise
+
+        descriptor = SharedOHLCVDescriptor(
+            exchange=exchange, symbol=symbol, timeframe=timeframe, shm_name=block.name,
+            rows=len(arrays['timestamp']), columns=tuple(layout),
+            window_start_ms=_to_ms(window_start), window_end_ms=_to_ms(window_end), nbytes=offset,
+            up_to_date=up_to_date
+        )
+        self._blocks[key] = block
+        self._descriptors[key] = descriptor
+        self.publish_seconds += time.perf_counter() - started
+        return descriptor
+
+    def descriptors(self) -> List[SharedOHLCVDescriptor]:
+        """公開中の記述子一覧"""
+        return list(self._descriptors.values())
+
+    def get_stats(self) -> Dict:
+        """公開ブロック数・合計サイズ・書き込み時間"""
+        return {
+            'blocks': len(self._descriptors),
+            'rows': sum(d.rows for d in self._descriptors.values()),
+            'bytes': sum(d.nbytes for d in self._descriptors.values()),
+            'publish_seconds': self.publish_seconds,
+        }
+
+    def _release(self, key):
+        block = self._blocks.pop(key)
+        self._descriptors.pop(key, None)
+        block.close()
+        try:
+            block.unlink()
+        except FileNotFoundError:
+            pass
+
+    def close(self):
+        """全ブロックを解放（子プロセスがアタッチ中でも親からunlinkしてよい）"""
+        for key in list(self._blocks):
+            self._release(key)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class _WorkerState:
+    """子プロセス側: 登録済み記述子とアタッチ済みブロック"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.descriptors: Dict[Tuple[str, str, str], SharedOHLCVDescriptor] = {}
+        self.attached: Dict[str, Tuple[shared_memory.SharedMemory, Dict[str, np.ndarray]]] = {}
+        self.attach_count = 0
+        self.attach_seconds_total = 0.0
+        self.attach_seconds_max = 0.0
+        self.hits = 0
+        self.misses = 0
+
+
+_worker_state = _WorkerState()
+
+
+def install_shared_descriptors(descriptors: Optional[Iterable[SharedOHLCVDescriptor]]):
+    """親から受け取った記述子を登録（同じキーは新しい記述子で置き換え）"""
+    if not descriptors:
+        return
+    with _worker_state.lock:
+        for descriptor in descriptors:
+            current = _worker_state.descriptors.get(descriptor.key)
+            if current is not None and current.shm_name != descriptor.shm_name:
+                _detach_block(current.shm_name)
+            _worker_state.descriptors[descriptor.key] = descriptor
+
+
+def _attach(descriptor: SharedOHLCVDescriptor) -> Dict[str, np.ndarray]:
+    """ブロックにアタッチして読み取り専用の列ビューを返す（プロセス内でキャッシュ）"""
+    attached = _worker_state.attached.get(descriptor.shm_name)
+    if attached is not None:
+        return attached[1]
+
+    started = time.perf_counter()
+    block = shared_memory.SharedMemory(name=descriptor.shm_name)
+    arrays = {}
+    for name, dtype, offset in descriptor.columns:
+        view = np.ndarray((descriptor.rows,), dtype=dtype, buffer=block.buf, offset=offset)
+        view.flags.writeable = False
+        arrays[name] = view
+    elapsed = time.perf_counter() - started
+
+    _worker_state.attached[descriptor.shm_name] = (block, arrays)
+    _worker_state.attach_count += 1
+    _worker_state.attach_seconds_total += elapsed
+    _worker_state.attach_seconds_max = max(_worker_state.attach_seconds_max, elapsed)
+    return arrays
+
+
+def _detach_block(shm_name: str):
+    attached = _worker_state.attached.pop(shm_name, None)
+    if attached is None:
+        return
+    block, arrays = attached
+    arrays.clear()
+    try:
+        block.close()
+    except BufferError:
+        # 呼び出し側がまだビューを保持している場合はGCに任せる
+        pass
+
+
+def _timestamp_array(datetimes: np.ndarray):
+    """datetime64ビューをコピーせずにUTCのdatetime配列として扱う"""
+    unit = np.datetime_data(datetimes.dtype)[0]
+    try:
+        return pd.arrays.DatetimeArray._simple_new(datetimes, dtype=pd.DatetimeTZDtype(unit, 'UTC'))
+    except (AttributeError, TypeError):
+        return pd.DatetimeIndex(datetimes).tz_localize('UTC')
+
+
+def get_shared_ohlcv(exchange: Optional[str], symbol: str, timeframe: str,
+                     start_time: datetime, end_time: datetime) -> Optional[pd.DataFrame]:
+    """
+    共有メモリからOHLCVを取得
+
+    記述子が未登録・取得済み期間が要求期間を満たさない場合はNone（呼び出し側はAPI取得にフォールバック）。
+    返すDataFrameの数値列は共有メモリの読み取り専用ビュー（コピーなし）。
+    """
+    with _worker_state.lock:
+        descriptor = _worker_state.descriptors.get((exchange, symbol, timeframe))
+        start_ms, end_ms = _to_ms(start_time), _to_ms(end_time)
+        if descriptor is None or not descriptor.covers(start_ms, end_ms):
+            if _worker_state.descriptors:
+                _worker_state.misses += 1
+            return None
+
+        try:
+            arrays = _attach(descriptor)
+        except FileNotFoundError:
+            logger.warning(f"⚠️ 共有市場データが解放済み: {symbol} {timeframe}")
+            _worker_state.descriptors.pop(descriptor.key, None)
+            _worker_state.misses += 1
+            return None
+
+        timestamps = arrays['timestamp']
+        lo = int(np.searchsorted(timestamps, np.datetime64(start_ms, 'ms'), side='left'))
+        hi = int(np.searchsorted(timestamps, np.datetime64(end_ms, 'ms'), side='right'))
+        _worker_state.hits += 1
+
+    columns = {'timestamp': _timestamp_array(timestamps[lo:hi])}
+    for name, values in arrays.items():
+        if name != 'timestamp':
+            columns[name] = values[lo:hi]
+    return pd.DataFrame(columns, copy=False)
+
+
+def _current_rss_bytes() -> Optional[int]:
+    """現在のプロセスのRSS（バイト）"""
+    if psutil is not None:
+        try:
+            return psutil.Process(os.getpid()).memory_info().rss
+        except Exception:
+            pass
+    try:
+        with open('/proc/self/status', 'r') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def get_worker_metrics() -> Dict:
+    """このプロセスの共有市場データ利用状況（RSS・アタッチ時間・ヒット数）"""
+    with _worker_state.lock:
+        return {
+            'pid': os.getpid(),
+            'rss_bytes': _current_rss_bytes(),
+            'registered_blocks': len(_worker_state.descriptors),
+            'attached_blocks': len(_worker_state.attached),
+            'attach_count': _worker_state.attach_count,
+            'attach_seconds_total': _worker_state.attach_seconds_total,
+            'attach_seconds_max': _worker_state.attach_seconds_max,
+            'hits': _worker_state.hits,
+            'misses': _worker_state.misses,
+        }
+
+
+def format_worker_metrics(metrics: Dict) -> str:
+    """ログ出力用の1行表現"""
+    rss = metrics.get('rss_bytes')
+    rss_text = f"{rss / 1024 / 1024:.1f}MB" if rss is not None else "N/A"
+    return (f"PID={metrics['pid']} RSS={rss_text} "
+            f"アタッチ={metrics['attach_count']}回 (合計{metrics['attach_seconds_total'] * 1000:.2f}ms, "
+            f"最大{metrics['attach_seconds_max'] * 1000:.2f}ms) "
+            f"ヒット={metrics['hits']} ミス={metrics['misses']}")
+
+
+def reset_worker_state():
+    """登録済み記述子・アタッチ済みブロック・統計をクリア"""
+    global _worker_state
+    with _worker_state.lock:
+        for shm_name in list(_worker_state.attached):
+            _detach_block(shm_name)
+    _worker_state = _WorkerState()
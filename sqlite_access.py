@@ -0,0 +1,538 @@
+#!/usr/bin/env python3
+"""
+SQLite共通アクセス層（analysis.db / execution_logs.db）
+
+操作ごとに sqlite3.connect() していた箇所を、プロセス内で再利用する接続プールに置き換える。
+
+- db_connection(): `with sqlite3.connect(path) as conn:` と同じ使い方（正常終了でcommit、例外でrollback）。
+  接続はプロセス内で再利用し、WALジャーナル・busy_timeout・synchronous=NORMAL を設定済み。
+  SQL文は定数文字列なので接続ごとのステートメントキャッシュ（cached_statements）がプリペアドステートメントとして働く
+- execute_write() / enqueue_write(): 書き込みを遅延キューに積み、バックグラウンドスレッドが
+  1トランザクションにまとめて書き込む（同じキーの更新は最後の1件に集約）。
+  同じプロセスで db_connection() を使う前には未反映の書き込みを先に反映するため、プロセス内の読み書きの順序は保たれる。
+  プロセス終了時（atexit / multiprocessing の終了処理）にも反映する
+- checkpoint(): WALの内容をDBファイルに反映（DBファイルをコピーするバックアップの前に呼ぶ）
+- `python sqlite_access.py benchmark`: 書き込みN並列 + ダッシュボード読み込みM並列の競合ベンチマーク
+
+環境変数:
+    SQLITE_WAL_ENABLED            WALジャーナルを使う（デフォルト: true）
+    SQLITE_BUSY_TIMEOUT_MS        ロック待ちの上限ミリ秒（デフォルト: 30000）
+    SQLITE_WRITE_BEHIND_ENABLED   遅延書き込みを使う（デフォルト: true、falseで即時書き込み）
+    SQLITE_WRITE_BEHIND_INTERVAL  遅延書き込みの反映間隔（秒、デフォルト: 0.2）
+"""
+
+import os
+import sys
+import time
+import atexit
+import sqlite3
+import logging
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from multiprocessing import util as multiprocessing_util
+from typing import Callable, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+# 1つのDBファイルあたりプールに残すアイドル接続数
+MAX_IDLE_CONNECTIONS = 4
+
+# 接続ごとのステートメントキャッシュ
+CACHED_STATEMENTS = 256
+
+# キューがこの件数に達したら反映間隔を待たずに書き込む
+WRITE_BEHIND_MAX_BATCH = 200
+
+
+def _env_enabled(name: str, default: str = 'true') -> bool:
+    return os.environ.get(name, default).lower() not in ('false', '0', 'no')
+
+
+def _busy_timeout_ms() -> int:
+    try:
+        return int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', '30000'))
+    except ValueError:
+        return 30000
+
+
+def _write_behind_interval() -> float:
+    try:
+        return float(os.environ.get('SQLITE_WRITE_BEHIND_INTERVAL', '0.2'))
+    except ValueError:
+        return 0.2
+
+
+def _file_identity(path: str):
+    """DBファイルの (デバイス, inode)。削除・再作成された場合は接続を作り直す"""
+    try:
+        stat = os.stat(path)
+        return (stat.st_dev, stat.st_ino)
+    except OSError:
+        return None
+
+
+class _PooledConnection:
+    __slots__ = ('conn', 'identity')
+
+    def __init__(self, conn: sqlite3.Connection, identity):
+        self.conn = conn
+        self.identity = identity
+
+
+class SQLiteConnectionPool:
+    """DBファイルごとのアイドル接続を保持するプロセス内プール（スレッド間で共有）"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pid = os.getpid()
+        self.idle: Dict[str, List[_PooledConnection]] = {}
+        self.stats = {'opened': 0, 'reused': 0, 'checkouts': 0, 'discarded': 0}
+        # fork前の接続は子プロセスで閉じずに参照だけ保持する（SQLiteはfork越しの接続を使えない）
+        self._abandoned: List[sqlite3.Connection] = []
+
+    def _reset_after_fork(self):
+        for entries in self.idle.values():
+            self._abandoned.extend(entry.conn for entry in entries)
+        self.idle = {}
+        self.pid = os.getpid()
+        self.stats = {'opened': 0, 'reused': 0, 'checkouts': 0, 'discarded': 0}
+
+    def _open(self, path: str) -> _PooledConnection:
+        timeout_ms = _busy_timeout_ms()
+        conn = sqlite3.connect(path, timeout=timeout_ms / 1000, check_same_thread=False,
+                               cached_statements=CACHED_STATEMENTS)
+        conn.execute(f"PRAGMA busy_timeout = {timeout_ms}")
+        if path != ':memory:' and _env_enabled('SQLITE_WAL_ENABLED'):
+            try:
+                conn.execute("PRAGMA journal_mode = WAL")
+                conn.execute("PRAGMA synchronous = NORMAL")
+            except sqlite3.OperationalError as e:
+                # 他のプロセスがロック中でもジャーナルモード以外は使える
+                logger.debug(f"WAL設定をスキップ: {path} - {e}")
+        self.stats['opened'] += 1
+        return _PooledConnection(conn, _file_identity(path))
+
+    def acquire(self, path: str) -> _PooledConnection:
+        with self.lock:
+            if self.pid != os.getpid():
+                self._reset_after_fork()
+            self.stats['checkouts'] += 1
+            entries = self.idle.get(path)
+            while entries:
+                entry = entries.pop()
+                if entry.identity is not None and entry.identity == _file_identity(path):
+                    self.stats['reused'] += 1
+                    return entry
+                # DBファイルが削除・再作成された
+                self.stats['discarded'] += 1
+                entry.conn.close()
+        return self._open(path)
+
+    def release(self, path: str, entry: _PooledConnection):
+        if entry.conn.in_transaction:
+            entry.conn.rollback()
+        entry.conn.row_factory = None
+        with self.lock:
+            if self.pid != os.getpid():
+                return
+            entries = self.idle.setdefault(path, [])
+            if len(entries) < MAX_IDLE_CONNECTIONS:
+                entries.append(entry)
+                return
+        entry.conn.close()
+
+    def close_all(self):
+        with self.lock:
+            if self.pid != os.getpid():
+                self._reset_after_fork()
+                return
+            for entries in self.idle.values():
+                for entry in entries:
+                    entry.conn.close()
+            self.idle = {}
+
+
+class WriteBehindQueue:
+    """
+    遅延書き込みキュー
+
+    操作は DBファイルごとに積まれ、反映時に BEGIN IMMEDIATE の1トランザクションで実行する。
+    key を指定した操作は同じキーの未反映の操作を置き換える（順序は最後に積んだ位置）。
+    1操作の失敗はSAVEPOINTで切り離し、同じバッチの他の操作は反映する。
+    """
+
+    def __init__(self, pool: SQLiteConnectionPool):
+        self.pool = pool
+        self.lock = threading.Lock()
+        # 操作の中から db_connection() を使っても止まらないように再入可能にする
+        self.flush_lock = threading.RLock()
+        self.pending: Dict[str, OrderedDict] = {}
+        self.sequence = 0
+        self.pid = os.getpid()
+        self.thread: Optional[threading.Thread] = None
+        self.wakeup = threading.Event()
+        self.stats = {'queued': 0, 'coalesced': 0, 'batches': 0, 'flushed': 0, 'failed': 0, 'flush_seconds': 0.0}
+
+    def _ensure_worker(self):
+        if self.pid != os.getpid():
+            # fork前に積まれた操作は親プロセスが反映する
+            self.pending = {}
+            self.pid = os.getpid()
+            self.thread = None
+        if self.thread is None or not self.thread.is_alive():
+            self.thread = threading.Thread(target=self._run, name='sqlite-write-behind', daemon=True)
+            self.thread.start()
+            _register_exit_flush()
+
+    def enqueue(self, path: str, operation: Callable[[sqlite3.Connection], None], key=None):
+        with self.lock:
+            self._ensure_worker()
+            operations = self.pending.setdefault(path, OrderedDict())
+            if key is None:
+                self.sequence += 1
+                key = ('__seq__', self.sequence)
+            elif key in operations:
+                self.stats['coalesced'] += 1
+                del operations[key]
+            operations[key] = operation
+            self.stats['queued'] += 1
+            size = sum(len(ops) for ops in self.pending.values())
+        if size >= WRITE_BEHIND_MAX_BATCH:
+            self.wakeup.set()
+
+    def has_pending(self, path: Optional[str] = None) -> bool:
+        if self.pid != os.getpid():
+            return False
+        if path is None:
+            return any(self.pending.values())
+        return bool(self.pending.get(path))
+
+    def flush(self, path: Optional[str] = None) -> int:
+        """未反映の操作を書き込み、書き込んだ操作数を返す"""
+        with self.flush_lock:
+            with self.lock:
+                if self.pid != os.getpid():
+                    return 0
+                paths = [path] if path is not None else list(self.pending)
+                batches = [(p, self.pending.pop(p)) for p in paths if self.pending.get(p)]
+            return sum(self._write_batch(p, operations) for p, operations in batches)
+
+    def _write_batch(self, path: str, operations: OrderedDict) -> int:
+        started = time.perf_counter()
+        entry = self.pool.acquire(path)
+        conn = entry.conn
+        written = 0
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for operation in operations.values():
+                conn.execute("SAVEPOINT write_behind_op")
+                try:
+                    operation(conn)
+                    conn.execute("RELEASE write_behind_op")
+                    written += 1
+                except Exception as e:
+                    conn.execute("ROLLBACK TO write_behind_op")
+                    conn.execute("RELEASE write_behind_op")
+                    self.stats['failed'] += 1
+                    logger.error(f"❌ 遅延書き込みエラー: {path} - {e}")
+            conn.commit()
+        except sqlite3.OperationalError as e:
+            # ロック待ちのタイムアウト等: 次回の反映で再試行（新しく積まれた同じキーの操作を優先）
+            if conn.in_transaction:
+                conn.rollback()
+            logger.warning(f"⚠️ 遅延書き込みを再試行予定: {path} - {e}")
+            with self.lock:
+                # 失敗したバッチを元の順序のまま先頭に戻し、その後に反映中に積まれた操作を続ける
+                newer = self.pending.get(path, OrderedDict())
+                self.pending[path] = OrderedDict(
+                    [(key, newer.get(key, operation)) for key, operation in operations.items()] +
+                    [(key, operation) for key, operation in newer.items() if key not in operations]
+                )
+            written = 0
+        finally:
+            self.pool.release(path, entry)
+        self.stats['batches'] += 1
+        self.stats['flushed'] += written
+        self.stats['flush_seconds'] += time.perf_counter() - started
+        return written
+
+    def _run(self):
+        while True:
+            self.wakeup.wait(_write_behind_interval())
+            self.wakeup.clear()
+            if self.pid != os.getpid():
+                return
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"❌ 遅延書き込みスレッドエラー: {e}")
+
+
+_pool = SQLiteConnectionPool()
+_write_queue = WriteBehindQueue(_pool)
+
+
+def _reinit_after_fork():
+    """fork直後の子プロセス: 親のスレッドが保持していた可能性のあるロックを作り直す"""
+    _pool.lock = threading.Lock()
+    _pool._reset_after_fork()
+    _write_queue.lock = threading.Lock()
+    _write_queue.flush_lock = threading.RLock()
+    _write_queue.wakeup = threading.Event()
+    _write_queue.pending = {}
+    _write_queue.thread = None
+    _write_queue.pid = os.getpid()
+
+
+os.register_at_fork(after_in_child=_reinit_after_fork)
+
+
+def _normalize_path(db_path) -> str:
+    path = str(db_path)
+    return path if path == ':memory:' else os.path.abspath(path)
+
+
+@contextmanager
+def db_connection(db_path):
+    """
+    プールから接続を取得（`with sqlite3.connect(db_path) as conn:` の置き換え）
+
+    このプロセスで積まれた未反映の書き込みを先に反映する。row_factory は取得ごとに初期化される。
+    """
+    path = _normalize_path(db_path)
+    if _write_queue.has_pending(path):
+        _write_queue.flush(path)
+    entry = _pool.acquire(path)
+    conn = entry.conn
+    conn.row_factory = None
+    try:
+        yield conn
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    finally:
+        _pool.release(path, entry)
+
+
+def enqueue_write(db_path, operation: Callable[[sqlite3.Connection], None], key=None):
+    """接続を受け取る書き込み操作を遅延キューに積む（遅延書き込みが無効なら即時実行）"""
+    path = _normalize_path(db_path)
+    if not _env_enabled('SQLITE_WRITE_BEHIND_ENABLED'):
+        with db_connection(path) as conn:
+            operation(conn)
+        return
+    _write_queue.enqueue(path, operation, key)
+
+
+def execute_write(db_path, sql: str, params: Sequence = (), key=None) -> Optional[int]:
+    """
+    1文の書き込み（UPDATE / INSERT）を遅延キューに積む
+
+    Returns:
+        即時実行した場合は更新行数、遅延キューに積んだ場合はNone
+    """
+    path = _normalize_path(db_path)
+    if not _env_enabled('SQLITE_WRITE_BEHIND_ENABLED'):
+        with db_connection(path) as conn:
+            return conn.execute(sql, params).rowcount
+    params = tuple(params)
+    _write_queue.enqueue(path, lambda conn: conn.execute(sql, params), key)
+    return None
+
+
+def flush_pending_writes(db_path=None) -> int:
+    """未反映の遅延書き込みを反映（db_path省略時は全DB）"""
+    return _write_queue.flush(None if db_path is None else _normalize_path(db_path))
+
+
+def checkpoint(db_path):
+    """遅延書き込みとWALの内容をDBファイルに反映（ファイルコピーによるバックアップの前に呼ぶ）"""
+    if not os.path.exists(str(db_path)):
+        return
+    flush_pending_writes(db_path)
+    try:
+        with db_connection(db_path) as conn:
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    except sqlite3.Error as e:
+        logger.warning(f"⚠️ WALチェックポイントエラー: {db_path} - {e}")
+
+
+def close_all_connections():
+    """未反映の書き込みを反映してプールの接続をすべて閉じる"""
+    try:
+        flush_pending_writes()
+    finally:
+        _pool.close_all()
+
+
+def get_access_stats() -> Dict:
+    """接続プールと遅延書き込みの統計"""
+    return {'pool': dict(_pool.stats), 'write_behind': dict(_write_queue.stats)}
+
+
+def _flush_on_exit():
+    try:
+        close_all_connections()
+    except Exception as e:
+        logger.error(f"❌ 終了時の遅延書き込み反映エラー: {e}")
+
+
+_exit_flush_pid = None
+
+
+def _register_exit_flush():
+    """
+    終了時の反映を登録（プロセスごとに1回）
+
+    通常の終了は atexit、multiprocessing の子プロセスは os._exit 前の終了処理（Finalize）で反映する。
+    子プロセスの起動時に親の Finalize は消去されるため、最初に書き込みを積んだ時点で登録する。
+    """
+    global _exit_flush_pid
+    if _exit_flush_pid == os.getpid():
+        return
+    _exit_flush_pid = os.getpid()
+    multiprocessing_util.Finalize(None, _flush_on_exit, exitpriority=100)
+
+
+atexit.register(_flush_on_exit)
+
+
+# === 競合ベンチマーク ===
+
+def _benchmark_setup(db_path: str, mode: str, rows: int):
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(f"PRAGMA journal_mode = {'WAL' if mode == 'pooled' else 'DELETE'}")
+        conn.execute("""CREATE TABLE analyses (id INTEGER PRIMARY KEY, symbol TEXT, config TEXT,
+                        task_status TEXT, updated_at REAL)""")
+        conn.execute("""CREATE TABLE execution_steps (id INTEGER PRIMARY KEY AUTOINCREMENT, execution_id TEXT,
+                        step_name TEXT, status TEXT, created_at REAL)""")
+        conn.executemany("INSERT INTO analyses (symbol, config, task_status) VALUES (?, ?, 'pending')",
+                         [(f"SYM{i % 10}", f"C{i}") for i in range(rows)])
+
+
+def _benchmark_writer(db_path: str, mode: str, writer_id: int, updates: int, rows: int) -> Dict:
+    """書き込みプロセス: タスクステータス更新と実行ステップ追加を交互に行う"""
+    errors = 0
+    started = time.perf_counter()
+    for i in range(updates):
+        row_id = (writer_id * updates + i) % rows + 1
+        status = 'running' if i % 2 == 0 else 'completed'
+        try:
+            if mode == 'pooled':
+                execute_write(db_path, "UPDATE analyses SET task_status = ?, updated_at = ? WHERE id = ?",
+                              (status, time.time(), row_id), key=('task_status', row_id))
+                execute_write(db_path, "INSERT INTO execution_steps (execution_id, step_name, status, created_at) "
+                                       "VALUES (?, ?, ?, ?)", (f"exec_{writer_id}", f"step_{i}", status, time.time()))
+            else:
+                with sqlite3.connect(db_path) as conn:
+                    conn.execute("UPDATE analyses SET task_status = ?, updated_at = ? WHERE id = ?",
+                                 (status, time.time(), row_id))
+                    conn.commit()
+                with sqlite3.connect(db_path) as conn:
+                    conn.execute("INSERT INTO execution_steps (execution_id, step_name, status, created_at) "
+                                 "VALUES (?, ?, ?, ?)", (f"exec_{writer_id}", f"step_{i}", status, time.time()))
+                    conn.commit()
+        except sqlite3.OperationalError:
+            errors += 1
+    if mode == 'pooled':
+        flush_pending_writes()
+    return {'seconds': time.perf_counter() - started, 'errors': errors, 'writes': updates * 2}
+
+
+def _benchmark_reader(db_path: str, mode: str, duration: float) -> Dict:
+    """ダッシュボード相当の読み込みプロセス: 集計クエリをポーリングし、1回ごとの待ち時間を記録"""
+    latencies = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        try:
+            if mode == 'pooled':
+                with db_connection(db_path) as conn:
+                    conn.execute("SELECT task_status, COUNT(*) FROM analyses GROUP BY task_status").fetchall()
+                    conn.execute("SELECT COUNT(*) FROM execution_steps").fetchone()
+            else:
+                with sqlite3.connect(db_path) as conn:
+                    conn.execute("SELECT task_status, COUNT(*) FROM analyses GROUP BY task_status").fetchall()
+                    conn.execute("SELECT COUNT(*) FROM execution_steps").fetchone()
+                conn.close()
+        except sqlite3.OperationalError:
+            errors += 1
+        latencies.append(time.perf_counter() - started)
+        time.sleep(0.005)
+    return {'latencies': latencies, 'errors': errors}
+
+
+def run_contention_benchmark(writers: int = 4, readers: int = 2, updates_per_writer: int = 200,
+                             mode: str = 'pooled', rows: int = 500) -> Dict:
+    """
+    N書き込みプロセス + Mダッシュボード読み込みプロセスの競合ベンチマーク
+
+    mode='legacy': 操作ごとに sqlite3.connect（rollbackジャーナル、デフォルトのタイムアウト）
+    mode='pooled': 接続プール + WAL + 遅延書き込み
+    """
+    import tempfile
+    from concurrent.futures import ProcessPoolExecutor
+
+    import numpy as np
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'bench.db')
+        _benchmark_setup(db_path, mode, rows)
+        started = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=writers + readers) as executor:
+            write_futures = [executor.submit(_benchmark_writer, db_path, mode, i, updates_per_writer, rows)
+                             for i in range(writers)]
+            # 読み込みは書き込みの想定時間だけポーリングする
+            read_futures = [executor.submit(_benchmark_reader, db_path, mode, 2.0) for _ in range(readers)]
+            write_results = [f.result() for f in write_futures]
+            read_results = [f.result() for f in read_futures]
+        elapsed = time.perf_counter() - started
+
+        with sqlite3.connect(db_path) as conn:
+            steps = conn.execute("SELECT COUNT(*) FROM execution_steps").fetchone()[0]
+        conn.close()
+
+    latencies = np.array([lat for result in read_results for lat in result['latencies']] or [0.0])
+    total_writes = sum(r['writes'] for r in write_results)
+    writer_seconds = max(r['seconds'] for r in write_results)
+    return {
+        'mode': mode,
+        'writers': writers,
+        'readers': readers,
+        'elapsed_seconds': elapsed,
+        'writes_per_second': total_writes / writer_seconds if writer_seconds > 0 else 0.0,
+        'write_errors': sum(r['errors'] for r in write_results),
+        'steps_written': steps,
+        'reads': int(sum(len(r['latencies']) for r in read_results)),
+        'read_errors': sum(r['errors'] for r in read_results),
+        'read_p50_ms': float(np.percentile(latencies, 50) * 1000),
+        'read_p95_ms': float(np.percentile(latencies, 95) * 1000),
+    }
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='SQLite共通アクセス層')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    bench_parser = subparsers.add_parser('benchmark', help='書き込み・読み込み競合のベンチマーク')
+    bench_parser.add_argument('--writers', type=int, default=4, help='書き込みプロセス数')
+    bench_parser.add_argument('--readers', type=int, default=2, help='ダッシュボード読み込みプロセス数')
+    bench_parser.add_argument('--updates', type=int, default=200, help='書き込みプロセスあたりの更新数')
+    args = parser.parse_args()
+
+    print(f"📊 SQLite競合ベンチマーク (書き込み{args.writers}並列 + 読み込み{args.readers}並列, "
+          f"{args.updates}更新/プロセス)")
+    for mode in ('legacy', 'pooled'):
+        result = run_contention_benchmark(args.writers, args.readers, args.updates, mode)
+        print(f"   {mode:7s}: 書き込み {result['writes_per_second']:8.0f}件/秒 "
+              f"(ロックエラー {result['write_errors']}件), "
+              f"読み込み p50={result['read_p50_ms']:.2f}ms p95={result['read_p95_ms']:.2f}ms "
+              f"(エラー {result['read_errors']}件)")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -15,25 +15,18 @@
 
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-from sklearn.model_selection import TimeSeriesSplit
-from sklearn.preprocessing import StandardScaler
-from sklearn.metrics import classification_report, confusion_matrix, roc_auc_score
-from sklearn.ensemble import RandomForestClassifier
-import lightgbm as lgb
-try:
-    import xgboost as xgb
-    HAS_XGBOOST = True
-except ImportError:
-    HAS_XGBOOST = False
-    print("XGBoostがインストールされていません。LightGBMとRandomForestのみ使用します。")
-import joblib
+import importlib.util
 import argparse
 import warnings
 import os
 warnings.filterwarnings('ignore')
 
+# 学習・可視化用のライブラリ（sklearn / lightgbm / xgboost / matplotlib）は使う関数の中で読み込む
+# （サポレジ検出だけを使うワーカーの起動を軽くする）
+HAS_XGBOOST = importlib.util.find_spec('xgboost') is not None
+if not HAS_XGBOOST:
+    print("XGBoostがインストールされていません。LightGBMとRandomForestのみ使用します。")
+
 # 現在の実行IDを動的に取得する関数
 def get_current_execution_id():
     """現在の実行IDを環境変数から動的に取得"""
@@ -88,12 +81,38 @@ def check_cancellation_requested():
         # エラーがあっても処理を継続
         return False
 
-def detect_level_interactions(df, levels, distance_threshold=0.02):
+INTERACTION_LOOKAHEAD = 10  # 相互作用の結果を判定する先読み本数
+
+
+def _forward_extreme(values, first, last, reducer, lookahead=INTERACTION_LOOKAHEAD):
+    """
+    各足 i (first <= i < last) について values[i+1 : i+1+lookahead] の最大・最小を求める
+
+    組み込みの max()/min() と同じく、先頭要素がNaNなら結果はNaN、
+    それ以外のNaNは無視する。
+    """
+    windows = np.lib.stride_tricks.sliding_window_view(values, lookahead)[first + 1:last + 1]
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        extreme = reducer(windows, axis=1)
+    return np.where(np.isnan(windows[:, 0]), np.nan, extreme)
+
+
+def detect_level_interactions(df, levels, distance_threshold=0.02, chunk_size=None):
     """
     価格がサポート・レジスタンスレベルと相互作用した履歴を検出
     
+    レベル×足の距離マスクと、スライディングウィンドウで求めた先読み10本の
+    最高値・最安値から、反発/ブレイクアウトをまとめて判定する。
+    
+    Args:
+        df: OHLCVデータ
+        levels: find_all_levels のレベル一覧
+        distance_threshold: レベルに接近したとみなす距離
+        chunk_size: 一度に判定する足数（指定時はマスクをレベル数×chunk_sizeに抑える）
+    
     Returns:
-        interactions: レベルとの相互作用リスト
+        interactions: レベルとの相互作用リスト（レベル順・時刻順）
         - timestamp: 発生時刻
         - level_price: レベル価格
         - level_type: 'support' or 'resistance'
@@ -103,60 +122,60 @@ def detect_level_interactions(df, levels, distance_threshold=0.02):
     print(f"レベルとの相互作用を検出中... (レベル数: {len(levels)})")
     interactions = []
     
-    for level_idx, level in enumerate(levels):
-        if level_idx % 10 == 0:
-            print(f"  処理中: {level_idx + 1}/{len(levels)} レベル...")
+    # 前後10本のバーを確認できる範囲
+    first, last = INTERACTION_LOOKAHEAD, len(df) - INTERACTION_LOOKAHEAD
+    if last > first:
+        closes = df['close'].to_numpy(dtype=float)
+        window_closes = closes[first:last]
+        future_max_high = _forward_extreme(df['high'].to_numpy(dtype=float), first, last, np.nanmax)
+        future_min_low = _forward_extreme(df['low'].to_numpy(dtype=float), first, last, np.nanmin)
+        step = chunk_size or (last - first)
+    
+    for block_start in range(0, len(levels), 10):
+        print(f"  処理中: {block_start + 1}/{len(levels)} レベル...")
+        
+        # キャンセル確認（10レベル毎にチェック）
+        if check_cancellation_requested():
+            print("レベル相互作用検出を停止します。")
+            return []
+        
+        block = levels[block_start:block_start + 10]
+        level_prices = np.array([level['price'] for level in block], dtype=float)[:, None]
+        is_resistance = np.array([level['type'] == 'resistance' for level in block])[:, None]
+        hits_by_level = [[] for _ in block]
+        
+        for chunk_start in (range(0, last - first, step) if last > first else []):
+            chunk = slice(chunk_start, chunk_start + step)
+            current_prices = window_closes[chunk][None, :]
+            future_highs = future_max_high[chunk][None, :]
+            future_lows = future_min_low[chunk][None, :]
             
-            # キャンセル確認（10レベル毎にチェック）
-            if check_cancellation_requested():
-                print("レベル相互作用検出を停止します。")
-                return []
-        level_price = level['price']
-        level_type = level['type']
-        
-        # 価格がレベルに接近したポイントを検出
-        for i in range(10, len(df) - 10):  # 前後10本のバーを確認できる範囲
-            current_price = df.iloc[i]['close']
+            with np.errstate(divide='ignore', invalid='ignore'):
+                # レベルとの距離を計算
+                near = np.abs(current_prices - level_prices) / level_prices <= distance_threshold
             
-            # レベルとの距離を計算
-            distance_pct = abs(current_price - level_price) / level_price
+            # 抵抗線: 2%以上上抜け → breakout / 2%以上下落 → bounce
+            # 支持線: 2%以上下抜け → breakout / 2%以上上昇 → bounce
+            breakout = np.where(is_resistance,
+                                future_highs > level_prices * 1.02,
+                                future_lows < level_prices * 0.98)
+            bounce = ~breakout & np.where(is_resistance,
+                                          future_lows < current_prices * 0.98,
+                                          future_highs > current_prices * 1.02)
             
-            if distance_pct <= distance_threshold:
-                # レベルに接近した
-                
-                # 次の10本のバーで何が起きたか確認
-                future_prices = df.iloc[i+1:i+11]['close'].values
-                future_highs = df.iloc[i+1:i+11]['high'].values
-                future_lows = df.iloc[i+1:i+11]['low'].values
-                
-                if level_type == 'resistance':
-                    # 抵抗線の場合
-                    if max(future_highs) > level_price * 1.02:  # 2%以上上抜け
-                        outcome = 'breakout'
-                    else:
-                        # 反発して下落したか確認
-                        if min(future_lows) < current_price * 0.98:  # 2%以上下落
-                            outcome = 'bounce'
-                        else:
-                            continue  # 明確な動きなし
-                else:
-                    # 支持線の場合
-                    if min(future_lows) < level_price * 0.98:  # 2%以上下抜け
-                        outcome = 'breakout'
-                    else:
-                        # 反発して上昇したか確認
-                        if max(future_highs) > current_price * 1.02:  # 2%以上上昇
-                            outcome = 'bounce'
-                        else:
-                            continue  # 明確な動きなし
-                
+            level_rows, bar_columns = np.nonzero(near & (breakout | bounce))
+            for row, column in zip(level_rows, bar_columns):
+                hits_by_level[row].append((first + chunk_start + int(column), bool(breakout[row, column])))
+        
+        for level, hits in zip(block, hits_by_level):
+            for i, is_breakout in hits:
                 # 相互作用を記録
                 interactions.append({
-                    'timestamp': df.iloc[i]['timestamp'],
+                    'timestamp': df['timestamp'].iloc[i],
                     'index': i,
-                    'level_price': level_price,
-                    'level_type': level_type,
-                    'outcome': outcome,
+                    'level_price': level['price'],
+                    'level_type': level['type'],
+                    'outcome': 'breakout' if is_breakout else 'bounce',
                     'level_strength': level['strength'],
                     'level_touch_count': level['touch_count'],
                     'level_avg_bounce': level['avg_bounce'],
@@ -291,6 +310,12 @@ def train_models(X, y):
     """
     複数のモデルを訓練
     """
+    from sklearn.model_selection import TimeSeriesSplit
+    from sklearn.preprocessing import StandardScaler
+    from sklearn.metrics import roc_auc_score
+    from sklearn.ensemble import RandomForestClassifier
+    import lightgbm as lgb
+
     # データ分割（時系列を考慮）
     tscv = TimeSeriesSplit(n_splits=5)
     
@@ -315,6 +340,7 @@ def train_models(X, y):
     }
     
     if HAS_XGBOOST:
+        import xgboost as xgb
         models['XGBoost'] = xgb.XGBClassifier(
             n_estimators=100,
             max_depth=5,
@@ -390,6 +416,8 @@ def visualize_results(df, levels, interactions, model_results):
     """
     予測結果の可視化
     """
+    import matplotlib.pyplot as plt
+
     print("可視化処理を開始...")
     # 1. モデル性能比較
     print("  1. モデル性能比較グラフを作成中...")
@@ -546,6 +574,8 @@ def generate_report(interactions, model_results):
             print(f"- {row['feature']}: {row['importance']:.4f}")
 
 def main():
+    import joblib
+
     parser = argparse.ArgumentParser(description='サポート・レジスタンス反発/ブレイクアウト予測')
     parser.add_argument('--symbol', type=str, default='HYPE', help='通貨シンボル')
     parser.add_argument('--timeframe', type=str, default='15m', help='時間足')
@@ -635,6 +665,8 @@ def visualize_sr_with_ml_predictions(df, levels, interactions, model, scaler, fe
     """
     ML予測結果を含むサポート・レジスタンスチャートを生成
     """
+    import matplotlib.pyplot as plt
+
     plt.figure(figsize=(18, 12))
     
     # 現在価格
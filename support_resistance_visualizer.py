@@ -11,13 +11,12 @@
 
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import matplotlib.patches as mpatches
 import argparse
-from scipy.signal import argrelextrema
-from matplotlib.colors import LinearSegmentedColormap
 import warnings
 import logging
+
+from feature_selection import load_feature_table
+
 warnings.filterwarnings('ignore')
 
 # ロガー設定
@@ -28,6 +27,8 @@ def detect_fractal_levels(df, window=5):
     """
     フラクタル分析による局所最高値・最安値の検出
     """
+    from scipy.signal import argrelextrema
+
     high = df['high']
     low = df['low']
     
@@ -346,6 +347,8 @@ def visualize_support_resistance(df, levels, symbol, timeframe):
     """
     サポート・レジスタンスの強度を可視化（シンプル版）
     """
+    import matplotlib.pyplot as plt
+
     plt.figure(figsize=(16, 10))
     ax1 = plt.gca()
     
@@ -517,7 +520,7 @@ def main():
         days = config.get(args.timeframe, {'days': 60})['days']
         
         filename = f"{args.symbol.lower()}_{args.timeframe}_{days}days_with_indicators.csv"
-        df = pd.read_csv(filename)
+        df = load_feature_table(filename)
         df['timestamp'] = pd.to_datetime(df['timestamp'])
         
         print(f"データ読み込み完了: {len(df)}行")
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+コスト考慮スケジューラー（batch_task_scheduler）のテストケース
+
+推定コストの長い順に投入されること、タスク単位のリトライ・タイムアウトで他のタスクが失われないこと、
+混在バッチのメイクスパンが静的チャンク分割より短くなることを確認する
+"""
+
+import unittest
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+# プロジェクトルートをパスに追加
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# BaseTestを継承してテスト環境の安全性を確保
+try:
+    from tests_organized.base_test import BaseTest
+    USE_BASE_TEST = True
+except ImportError:
+    USE_BASE_TEST = False
+    print("⚠️ BaseTestが利用できません。標準のunittestを使用します。")
+
+from batch_task_scheduler import (
+    TaskCostModel, CostAwareTaskScheduler, BatchTask, estimate_bar_count, simulate_makespan,
+    DEFAULT_SECONDS_PER_BAR
+)
+
+
+def _task(task_id, estimated, timeframe='1h'):
+    return BatchTask(task_id=task_id, config={'symbol': 'SOL', 'timeframe': timeframe, 'strategy': f"S{task_id}"},
+                     bars=100, estimated_seconds=estimated)
+
+
+class TestBatchTaskScheduler(BaseTest if USE_BASE_TEST else unittest.TestCase):
+    """コスト考慮スケジューラーのテスト"""
+
+    def setUp(self):
+        """テスト前準備"""
+        if USE_BASE_TEST:
+            super().setUp()
+        self.executor = ThreadPoolExecutor(max_workers=2)
+
+    def tearDown(self):
+        """テスト後クリーンアップ"""
+        self.executor.shutdown(wait=True)
+        if USE_BASE_TEST:
+            super().tearDown()
+
+    def _run(self, tasks, work, **kwargs):
+        scheduler = CostAwareTaskScheduler(poll_interval=0.02, **kwargs)
+        return scheduler.run(tasks, lambda task: self.executor.submit(work, task))
+
+    def test_cost_model(self):
+        """足数に比例した推定、実績の移動平均、JSONでの保存と再読み込み"""
+        self.assertEqual(estimate_bar_count('1m', 86400), 1440)
+        self.assertEqual(estimate_bar_count('1h', 86400), 24)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'history.json')
+            model = TaskCostModel(path)
+            self.assertAlmostEqual(model.estimate('1m', 'Balanced', 1000), 1000 * DEFAULT_SECONDS_PER_BAR)
+
+            model.record('1m', 'Balanced', 1000, 20.0)
+            self.assertAlmostEqual(model.estimate('1m', 'Balanced', 500), 10.0)
+            # 戦略の実績がなければ時間足の実績を使う
+            self.assertAlmostEqual(model.estimate('1m', 'Aggressive_ML', 500), 10.0)
+            model.record('1m', 'Balanced', 1000, 40.0)
+            self.assertAlmostEqual(model.estimate('1m', 'Balanced', 1000), 0.7 * 20.0 + 0.3 * 40.0)
+            model.save()
+
+            reloaded = TaskCostModel(path)
+            self.assertEqual(reloaded.seconds_per_bar, model.seconds_per_bar)
+            self.assertEqual(reloaded.samples['1m|Balanced'], 2)
+
+    def test_longest_first_order(self):
+        """推定時間の長い順に開始される"""
+        self.executor.shutdown()
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        started = []
+        tasks = [_task(i, estimated) for i, estimated in enumerate([1.0, 30.0, 5.0, 30.0, 12.0])]
+
+        summary = self._run(tasks, lambda task: started.append(task.task_id) or {'processed': 1})
+        self.assertEqual(started, [1, 3, 4, 2, 0])
+        self.assertEqual((summary.processed, summary.completed, summary.failed), (5, 5, 0))
+
+    def test_retry_and_failure_isolation(self):
+        """例外のタスクだけ再実行し、再実行でも失敗したタスク以外は処理される"""
+        calls = {}
+        lock = threading.Lock()
+
+        def work(task):
+            with lock:
+                calls[task.task_id] = calls.get(task.task_id, 0) + 1
+                attempt = calls[task.task_id]
+            if task.task_id == 1 and attempt == 1:
+                raise RuntimeError("一時的なエラー")
+            if task.task_id == 2:
+                raise RuntimeError("恒常的なエラー")
+            return {'processed': 1}
+
+        summary = self._run([_task(i, 10.0 - i) for i in range(5)], work, max_retries=1)
+        self.assertEqual(calls, {0: 1, 1: 2, 2: 2, 3: 1, 4: 1})
+        self.assertEqual((summary.processed, summary.failed, summary.retried), (4, 1, 2))
+        self.assertEqual(summary.failed_tasks, ['SOL 1h S2'])
+
+    def test_error_result_is_retried(self):
+        """結果に 'error' があるタスクは失敗として再実行し、'retry_config' の設定で投入し直す"""
+        configs = []
+
+        def work(task):
+            configs.append(dict(task.config))
+            if task.config.get('strategies'):
+                return {'processed': 1, 'error': 'S2: 分析失敗',
+                        'retry_config': {'symbol': 'SOL', 'timeframe': '1h', 'strategy': 'S2'}}
+            return {'processed': 1}
+
+        group = BatchTask(task_id=0, config={'symbol': 'SOL', 'timeframe': '1h', 'strategy': 'S1+S2',
+                                             'strategies': ['S1', 'S2']}, bars=100, estimated_seconds=10.0)
+        summary = self._run([group], work, max_retries=1)
+        self.assertEqual(configs[1], {'symbol': 'SOL', 'timeframe': '1h', 'strategy': 'S2'})
+        self.assertEqual((summary.processed, summary.completed, summary.failed, summary.retried), (2, 1, 0, 1))
+
+        summary = self._run([_task(0, 1.0)], lambda task: {'processed': 0, 'error': '分析失敗'}, max_retries=1)
+        self.assertEqual((summary.completed, summary.failed, summary.retried), (0, 1, 1))
+        self.assertEqual(summary.failed_tasks, ['SOL 1h S0'])
+
+    def test_task_timeout(self):
+        """タイムアウトしたタスクは放棄し、残りのタスクは空いたワーカーで続行"""
+        release = threading.Event()
+
+        def work(task):
+            if task.task_id == 0:
+                release.wait(5)
+                return {'processed': 1}
+            time.sleep(0.01)
+            return {'processed': 1}
+
+        try:
+            summary = self._run([_task(i, 10.0 - i) for i in range(6)], work, task_timeout=0.2)
+        finally:
+            release.set()
+        self.assertEqual((summary.timed_out, summary.failed, summary.processed), (1, 1, 5))
+
+    def test_task_timeout_resets_pool(self):
+        """タイムアウト時はプールを作り直し、止まったワーカーの後ろで待っていたタスクも処理する"""
+        self.executor.shutdown()
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        release = threading.Event()
+        old_executors = []
+
+        def work(task):
+            if task.task_id == 0 and task.attempts == 1:
+                release.wait(5)
+            return {'processed': 1}
+
+        def reset_pool():
+            old_executors.append(self.executor)
+            self.executor = ThreadPoolExecutor(max_workers=1)
+
+        scheduler = CostAwareTaskScheduler(poll_interval=0.02, task_timeout=0.2)
+        started = time.time()
+        try:
+            summary = scheduler.run([_task(i, 10.0 - i) for i in range(4)],
+                                    lambda task: self.executor.submit(work, task), reset_pool=reset_pool)
+        finally:
+            release.set()
+            for executor in old_executors:
+                executor.shutdown(wait=True)
+        self.assertLess(time.time() - started, 4)
+        self.assertEqual((summary.timed_out, summary.failed, summary.pool_resets, summary.processed), (1, 1, 1, 3))
+
+    def test_cancellation(self):
+        """キャンセル要求時は未開始のタスクを取り消す"""
+        self.executor.shutdown()
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        scheduler = CostAwareTaskScheduler(poll_interval=0.02)
+        summary = scheduler.run([_task(i, 1.0) for i in range(20)],
+                                lambda task: self.executor.submit(lambda: time.sleep(0.05) or {'processed': 1}),
+                                should_cancel=lambda: True)
+        self.assertGreater(summary.cancelled, 0)
+        self.assertEqual(summary.completed + summary.cancelled, 20)
+
+    def test_mixed_batch_makespan(self):
+        """1m/5m/15m/1h 混在バッチではLPTのメイクスパンが静的チャンク分割より短い"""
+        model = TaskCostModel()
+        durations = [model.estimate(tf, None, estimate_bar_count(tf, 90 * 86400))
+                     for tf in ('1m', '5m', '15m', '1h') for _ in range(3)]
+        chunked = simulate_makespan(durations, 4, 'chunked')
+        lpt = simulate_makespan(durations, 4, 'lpt')
+        self.assertLess(lpt, chunked)
+        # LPTは最長タスクと平均負荷の大きい方以上、その4/3倍以内
+        lower_bound = max(max(durations), sum(durations) / 4)
+        self.assertGreaterEqual(lpt, lower_bound)
+        self.assertLessEqual(lpt, lower_bound * 4 / 3)
+        self.assertEqual(simulate_makespan([], 4), 0.0)
+
+    def test_batch_analysis_per_task(self):
+        """generate_batch_analysis は設定ごとに投入し、実績をコスト履歴に保存する"""
+        from scalable_analysis_system import ScalableAnalysisSystem
+
+        configs = [{'symbol': 'SOL', 'timeframe': tf, 'strategy': 'Balanced'} for tf in ('1h', '15m', '5m', '1m')]
+        processed = []
+
+        def fake_single_analysis(system, symbol, timeframe, config, execution_id=None):
+            processed.append(timeframe)
+            return True, {}
+
+        with tempfile.TemporaryDirectory() as tmp, \
+                patch.dict(os.environ, {'SHARED_MARKET_DATA_ENABLED': 'false'}), \
+                patch('scalable_analysis_system.ProcessPoolExecutor', ThreadPoolExecutor), \
+                patch.object(ScalableAnalysisSystem, '_setup_child_process_logging'), \
+                patch.object(ScalableAnalysisSystem, '_generate_single_analysis', fake_single_analysis):
+            system = ScalableAnalysisSystem(base_dir=tmp)
+            with patch.dict(os.environ, {'BATCH_SCHEDULER_MODE': 'cost_aware'}):
+                self.assertEqual(system.generate_batch_analysis(configs, max_workers=1), 4)
+            # 1並列なので推定時間の長い順（足数の多い順）に処理される
+            self.assertEqual(processed, ['1m', '5m', '15m', '1h'])
+            history = TaskCostModel(os.path.join(tmp, 'task_cost_history.json'))
+            self.assertEqual(sorted(history.samples), sorted(['1h', '15m', '5m', '1m'] +
+                                                             [f"{tf}|Balanced" for tf in ('1h', '15m', '5m', '1m')]))
+
+            processed.clear()
+            with patch.dict(os.environ, {'BATCH_SCHEDULER_MODE': 'chunked'}):
+                self.assertEqual(system.generate_batch_analysis(configs, max_workers=1), 4)
+            self.assertEqual(processed, ['1h', '15m', '5m', '1m'])
+
+    def test_batch_analysis_retries_failed_analysis(self):
+        """分析が失敗した設定はスケジューラーで再実行される"""
+        from scalable_analysis_system import ScalableAnalysisSystem
+
+        configs = [{'symbol': 'SOL', 'timeframe': tf, 'strategy': 'Balanced'} for tf in ('1h', '15m')]
+        calls = []
+
+        def flaky_single_analysis(system, symbol, timeframe, config, execution_id=None):
+            calls.append(timeframe)
+            if timeframe == '1h' and calls.count('1h') == 1:
+                return False, None
+            return True, {}
+
+        with tempfile.TemporaryDirectory() as tmp, \
+                patch.dict(os.environ, {'SHARED_MARKET_DATA_ENABLED': 'false', 'BATCH_SCHEDULER_MODE': 'cost_aware'}), \
+                patch('scalable_analysis_system.ProcessPoolExecutor', ThreadPoolExecutor), \
+                patch.object(ScalableAnalysisSystem, '_setup_child_process_logging'), \
+                patch.object(ScalableAnalysisSystem, '_generate_single_analysis', flaky_single_analysis):
+            system = ScalableAnalysisSystem(base_dir=tmp)
+            self.assertEqual(system.generate_batch_analysis(configs, max_workers=1), 2)
+        self.assertEqual(sorted(calls), ['15m', '1h', '1h'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+BreakoutModelRegistryのテストケース
+
+同じデータ・同じ設定の訓練済みモデルがプロセスやオーケストレーターをまたいで再利用されること、
+古さの判定（新しい足の本数・経過時間）で再訓練されること、ヒット・ミス統計を確認する
+"""
+
+import unittest
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+import pandas as pd
+import numpy as np
+from datetime import datetime
+from unittest.mock import patch
+
+# プロジェクトルートをパスに追加
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# BaseTestを継承してテスト環境の安全性を確保
+try:
+    from tests_organized.base_test import BaseTest
+    USE_BASE_TEST = True
+except ImportError:
+    USE_BASE_TEST = False
+    print("⚠️ BaseTestが利用できません。標準のunittestを使用します。")
+
+from breakout_model_registry import BreakoutModelRegistry, data_window_hash, predictor_signature
+from adapters.existing_adapters import ExistingMLPredictorAdapter
+from interfaces import SupportResistanceLevel
+
+
+class _CountingPredictor(ExistingMLPredictorAdapter):
+    """訓練回数を数える予測器"""
+
+    def __init__(self, model_params=None):
+        super().__init__()
+        self.train_calls = 0
+        self.model_params = model_params or {'depth': 3}
+
+    def train_model(self, data, levels):
+        self.train_calls += 1
+        trained = super().train_model(data, levels)
+        self.accuracy_metrics['trained_rows'] = len(data)
+        return trained
+
+
+def _make_ohlcv(periods, seed=7):
+    rng = np.random.default_rng(seed)
+    closes = 100 * np.exp(np.cumsum(rng.normal(0, 0.004, periods)))
+    return pd.DataFrame({
+        'timestamp': pd.date_range('2024-01-01', periods=periods, freq='1h', tz='UTC'),
+        'open': closes,
+        'high': closes * 1.002,
+        'low': closes * 0.998,
+        'close': closes,
+        'volume': rng.uniform(1000, 5000, periods)
+    })
+
+
+def _levels(price):
+    now = datetime.now()
+    return [
+        SupportResistanceLevel(price=price * 0.97, strength=0.7, touch_count=3, level_type='support',
+                               first_touch=now, last_touch=now, volume_at_level=1000.0, distance_from_current=0.03),
+        SupportResistanceLevel(price=price * 1.03, strength=0.6, touch_count=2, level_type='resistance',
+                               first_touch=now, last_touch=now, volume_at_level=1000.0, distance_from_current=0.03),
+    ]
+
+
+class TestBreakoutModelRegistry(BaseTest if USE_BASE_TEST else unittest.TestCase):
+    """訓練済みモデルレジストリのテスト"""
+
+    def setUp(self):
+        """テスト前準備"""
+        if USE_BASE_TEST:
+            super().setUp()
+        self._tmp = tempfile.TemporaryDirectory()
+        self.registry_dir = self._tmp.name
+        self.data = _make_ohlcv(300)
+        self.levels = _levels(float(self.data['close'].iloc[-1]))
+
+    def tearDown(self):
+        """テスト後クリーンアップ"""
+        self._tmp.cleanup()
+        if USE_BASE_TEST:
+            super().tearDown()
+
+    def _ensure(self, registry, predictor, data=None, symbol='SOL', timeframe='1h', **kwargs):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return registry.ensure_trained(predictor, symbol, timeframe,
+                                           self.data if data is None else data, self.levels, **kwargs)
+
+    def test_reuse_across_registries(self):
+        """別プロセス（別インスタンス）でも同じウィンドウは訓練せずに読み込む"""
+        first = _CountingPredictor()
+        entry = self._ensure(BreakoutModelRegistry(self.registry_dir), first)
+        self.assertEqual(first.train_calls, 1)
+        self.assertTrue(os.path.exists(os.path.join(self.registry_dir, 'models', entry['model_key'][:2],
+                                                    entry['model_key'], 'model.pkl')))
+
+        registry = BreakoutModelRegistry(self.registry_dir)
+        second = _CountingPredictor()
+        reused = self._ensure(registry, second)
+        self.assertEqual(second.train_calls, 0)
+        self.assertTrue(second.is_trained)
+        self.assertEqual(second.get_model_accuracy(), first.get_model_accuracy())
+        self.assertEqual(reused['model_key'], entry['model_key'])
+
+        stats = registry.get_stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['trains']), (1, 0, 0))
+        self.assertEqual(stats['hit_rate'], 1.0)
+
+    def test_key_components(self):
+        """銘柄・時間足・ハイパーパラメータ・データが異なれば別モデル"""
+        registry = BreakoutModelRegistry(self.registry_dir)
+        self._ensure(registry, _CountingPredictor())
+        variants = [
+            dict(predictor=_CountingPredictor(), symbol='ETH'),
+            dict(predictor=_CountingPredictor(), timeframe='15m'),
+            dict(predictor=_CountingPredictor(model_params={'depth': 5})),
+            dict(predictor=_CountingPredictor(), data=_make_ohlcv(300, seed=8)),
+        ]
+        for variant in variants:
+            predictor = variant.pop('predictor')
+            self._ensure(registry, predictor, **variant)
+            self.assertEqual(predictor.train_calls, 1, variant)
+        self.assertEqual(registry.get_stats()['misses'], 5)
+
+        self.assertNotEqual(predictor_signature(_CountingPredictor()),
+                            predictor_signature(_CountingPredictor(model_params={'depth': 5})))
+        self.assertEqual(data_window_hash(self.data), data_window_hash(self.data.copy()))
+
+    def test_warm_reuse_for_new_bars(self):
+        """新しい足が上限以内なら過去ウィンドウのモデルを再利用し、超えたら再訓練"""
+        registry = BreakoutModelRegistry(self.registry_dir, max_new_bars=5)
+        first = _CountingPredictor()
+        self._ensure(registry, first, data=self.data.iloc[:290])
+
+        predictor = _CountingPredictor()
+        entry = self._ensure(registry, predictor, data=self.data.iloc[:295])
+        self.assertEqual(predictor.train_calls, 0)
+        self.assertEqual(entry['rows'], 290)
+        self.assertEqual(registry.get_stats()['warm_hits'], 1)
+
+        # 読み込み済みのモデルは再読み込みしない
+        with patch.object(predictor, 'load_model') as load_model:
+            self._ensure(registry, predictor, data=self.data.iloc[:295], loaded_entry=entry)
+        load_model.assert_not_called()
+
+        self._ensure(registry, predictor, data=self.data.iloc[:296])
+        self.assertEqual(predictor.train_calls, 1)
+        self.assertEqual(registry.get_stats()['stale'], 1)
+
+        # 過去の足が書き換わった場合は再利用しない
+        modified = self.data.iloc[:292].copy()
+        modified.loc[10, 'close'] *= 1.01
+        other = _CountingPredictor()
+        self._ensure(registry, other, data=modified)
+        self.assertEqual(other.train_calls, 1)
+
+    def test_window_hash_computed_once(self):
+        """同じウィンドウの参照ではハッシュを再計算せず、期間・行数の合う候補がなければ計算しない"""
+        import breakout_model_registry
+        registry = BreakoutModelRegistry(self.registry_dir, max_new_bars=5)
+        predictor = _CountingPredictor()
+        entry = self._ensure(registry, predictor, data=self.data.iloc[:290])
+
+        with patch.object(breakout_model_registry, 'data_window_hash', wraps=data_window_hash) as hashed:
+            for _ in range(3):
+                self._ensure(registry, predictor, data=self.data.iloc[:290], loaded_entry=entry)
+                self._ensure(registry, predictor, data=self.data.iloc[:293], loaded_entry=entry)
+            self.assertEqual(hashed.call_count, 0)
+            self.assertEqual(registry.get_stats()['hits'], 3)
+            self.assertEqual(registry.get_stats()['warm_hits'], 3)
+
+            # 登録済みのウィンドウと期間が異なるデータはハッシュせずに判定する
+            self.assertEqual(registry.find(entry['series_key'], self.data.iloc[5:290]), (None, 'miss'))
+            self.assertEqual(hashed.call_count, 0)
+
+    def test_max_age(self):
+        """訓練から一定時間を超えたモデルは再訓練"""
+        registry = BreakoutModelRegistry(self.registry_dir, max_age_seconds=60)
+        self._ensure(registry, _CountingPredictor())
+
+        predictor = _CountingPredictor()
+        with patch('breakout_model_registry.time.time', return_value=time.time() + 120):
+            self._ensure(registry, predictor)
+        self.assertEqual(predictor.train_calls, 1)
+        self.assertEqual(registry.get_stats()['stale'], 1)
+
+    def test_training_failure_not_cached(self):
+        """訓練に失敗したモデルは保存しない"""
+        registry = BreakoutModelRegistry(self.registry_dir)
+        predictor = _CountingPredictor()
+        self.assertIsNone(self._ensure(registry, predictor, data=self.data.iloc[:50]))
+        self.assertFalse(predictor.is_trained)
+        self.assertEqual(registry.get_stats()['train_failures'], 1)
+        self.assertEqual(registry.get_stats()['stores'], 0)
+
+    def test_orchestrator_reuses_trained_model(self):
+        """オーケストレーターを作り直しても同じ銘柄・データでは再訓練しない"""
+        from engines.high_leverage_bot_orchestrator import HighLeverageBotOrchestrator
+
+        predictors = []
+        with patch.dict(os.environ, {'BREAKOUT_MODEL_REGISTRY_DIR': self.registry_dir}), \
+                contextlib.redirect_stdout(io.StringIO()):
+            for _ in range(2):
+                orchestrator = HighLeverageBotOrchestrator(use_default_plugins=False)
+                predictor = _CountingPredictor()
+                orchestrator.set_breakout_predictor(predictor)
+                predictions = orchestrator._predict_breakouts(self.data, self.levels, symbol='SOL', timeframe='1h')
+                self.assertEqual(len(predictions), 2)
+                predictors.append(predictor)
+
+            # 別銘柄は別モデル
+            orchestrator._predict_breakouts(self.data, self.levels, symbol='ETH', timeframe='1h')
+
+        # 1回目: 訓練 / 2回目: 読み込みのみ / 別銘柄: 訓練
+        self.assertEqual([p.train_calls for p in predictors], [1, 1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+BTCAltcoinBacktester の急落イベント抽出のテストケース
+
+配列演算による抽出が、従来の1本ずつのループ（ローリング平均の再計算・np.polyfit・
+抽出後の重複除去）と同じイベントを返すことを確認する
+"""
+
+import unittest
+import os
+import sys
+import numpy as np
+import pandas as pd
+from unittest.mock import patch
+
+# プロジェクトルートをパスに追加
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# BaseTestを継承してテスト環境の安全性を確保
+try:
+    from tests_organized.base_test import BaseTest
+    USE_BASE_TEST = True
+except ImportError:
+    USE_BASE_TEST = False
+    print("⚠️ BaseTestが利用できません。標準のunittestを使用します。")
+
+
+def _make_btc(size, seed, start='2024-03-01'):
+    """急落区間・出来高ゼロ区間を含むBTC 1分足"""
+    rng = np.random.default_rng(seed)
+    returns = rng.normal(0, 0.001, size)
+    for crash in rng.choice(np.arange(300, size - 200), size=25, replace=False):
+        returns[crash:crash + rng.integers(5, 40)] -= rng.uniform(0.001, 0.004)
+    close = 30000.0 * np.cumprod(1 + returns)
+    volume = rng.uniform(10, 100, size)
+    volume[1000:1100] = 0.0
+    index = pd.date_range(start, periods=size, freq='1min', name='timestamp')
+    return pd.DataFrame({'close': close, 'volume': volume}, index=index)
+
+
+def _reference_events(btc_data, btc_drop_threshold):
+    """従来の extract_btc_drop_events のループ（イベントは (時刻, 下落率, 持続, 出来高, トレンド) で返す）"""
+    events = []
+    returns = btc_data['close'].pct_change()
+    rolling_returns = returns.rolling(15).sum() * 100
+    volatility = returns.rolling(1440).std()
+    median_vol = volatility.median()
+
+    for i in range(len(rolling_returns)):
+        if pd.isna(rolling_returns.iloc[i]):
+            continue
+        drop_pct = rolling_returns.iloc[i]
+        current_vol = volatility.iloc[i] if not pd.isna(volatility.iloc[i]) else median_vol
+        adjusted_threshold = btc_drop_threshold * (current_vol / median_vol)
+
+        if drop_pct <= adjusted_threshold:
+            timestamp = btc_data.index[i]
+            volume_ma = btc_data['volume'].rolling(60).mean().iloc[i]
+            current_volume = btc_data['volume'].iloc[i]
+            volume_spike = current_volume / volume_ma if volume_ma > 0 else 1.0
+
+            if i >= 240:
+                trend_data = btc_data['close'].iloc[i-240:i]
+                trend_slope = np.polyfit(range(len(trend_data)), trend_data.values, 1)[0]
+                if trend_slope > 0.1:
+                    prior_trend = 'up'
+                elif trend_slope < -0.1:
+                    prior_trend = 'down'
+                else:
+                    prior_trend = 'sideways'
+            else:
+                prior_trend = 'unknown'
+
+            duration = 15
+            for j in range(i + 1, min(len(returns), i + 120)):
+                if returns.iloc[j] >= 0:
+                    break
+                duration += 1
+
+            events.append((timestamp, drop_pct, duration, volume_spike, prior_trend))
+
+    filtered_events = []
+    for event in events:
+        if not filtered_events or (event[0] - filtered_events[-1][0]).total_seconds() > 1800:
+            filtered_events.append(event)
+    return filtered_events
+
+
+class _FakeInfo:
+    def __init__(self, *args, **kwargs):
+        pass
+
+
+class TestBTCDropEventExtraction(BaseTest if USE_BASE_TEST else unittest.TestCase):
+    """急落イベント抽出のテスト"""
+
+    def setUp(self):
+        """テスト前準備"""
+        if USE_BASE_TEST:
+            super().setUp()
+        with patch('btc_altcoin_backtester.Info', _FakeInfo), \
+             patch('btc_altcoin_correlation_predictor.Info', _FakeInfo):
+            from btc_altcoin_backtester import BTCAltcoinBacktester
+            self.backtester = BTCAltcoinBacktester(btc_drop_threshold=-1.0)
+
+    def assertEventsMatch(self, events, expected):
+        self.assertEqual(len(events), len(expected))
+        for event, (timestamp, drop_pct, duration, volume_spike, prior_trend) in zip(events, expected):
+            self.assertEqual(event.timestamp, timestamp)
+            self.assertAlmostEqual(event.drop_pct, drop_pct, places=9)
+            self.assertEqual(event.duration_minutes, duration)
+            self.assertAlmostEqual(event.volume_spike, volume_spike, places=9)
+            self.assertEqual(event.prior_trend, prior_trend)
+            self.assertEqual(event.market_hour, timestamp.hour)
+            self.assertEqual(event.is_weekend, timestamp.weekday() >= 5)
+
+    def test_events_match_reference_loop(self):
+        """従来のループと同じイベント・属性を返す"""
+        for seed, threshold in ((0, -1.0), (1, -0.5), (2, -2.0)):
+            with self.subTest(seed=seed, threshold=threshold):
+                btc = _make_btc(6000, seed)
+                self.backtester.btc_drop_threshold = threshold
+                expected = _reference_events(btc, threshold)
+                self.assertTrue(expected)
+                self.assertEventsMatch(self.backtester._detect_drop_events(btc), expected)
+
+    def test_edge_cases(self):
+        """ボラティリティを計算できない短いデータ・急落のないデータではイベントなし"""
+        self.assertEqual(self.backtester._detect_drop_events(_make_btc(1000, 3)), [])
+
+        flat = _make_btc(3000, 4)
+        flat['close'] = 30000.0
+        self.assertEqual(self.backtester._detect_drop_events(flat), [])
+
+        # 末尾付近の急落は持続時間がデータの終端で打ち切られる
+        btc = _make_btc(3000, 5)
+        btc.iloc[-20:, btc.columns.get_loc('close')] = btc['close'].iloc[-21] * np.cumprod(np.full(20, 0.995))
+        expected = _reference_events(btc, -1.0)
+        self.assertTrue(expected)
+        self.assertEventsMatch(self.backtester._detect_drop_events(btc), expected)
+
+    def test_extract_uses_fetched_data(self):
+        """extract_btc_drop_events は1分足を1回取得して抽出・分析する"""
+        btc = _make_btc(4000, 6)
+        with patch.object(self.backtester.predictor, 'fetch_historical_data', return_value=btc) as fetch, \
+             patch.object(self.backtester, '_analyze_drop_events') as analyze:
+            events = self.backtester.extract_btc_drop_events(days=3)
+
+        fetch.assert_called_once_with('BTC', '1m', 3)
+        analyze.assert_called_once_with(events)
+        self.assertEventsMatch(events, _reference_events(btc, -1.0))
+
+
+if __name__ == '__main__':
+    unittest.main()
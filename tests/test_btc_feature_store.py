@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+BTC特徴量ストア（btc_feature_store）と複数銘柄の一括訓練のテストケース
+
+追記による増分更新が全期間の再計算と一致すること、ストアの特徴量を使った
+calculate_features が従来の計算と一致すること、一括訓練でBTCデータを1回だけ
+取得することを確認する
+"""
+
+import unittest
+import os
+import sys
+import tempfile
+import numpy as np
+import pandas as pd
+from unittest.mock import patch
+
+# プロジェクトルートをパスに追加
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# BaseTestを継承してテスト環境の安全性を確保
+try:
+    from tests_organized.base_test import BaseTest
+    USE_BASE_TEST = True
+except ImportError:
+    USE_BASE_TEST = False
+    print("⚠️ BaseTestが利用できません。標準のunittestを使用します。")
+
+from btc_feature_store import BTCFeatureStore, BTC_FEATURE_COLUMNS, compute_btc_features
+
+
+def _make_candles(size, seed, start='2024-03-01', drift=0.0):
+    """1分足のローソク足（fetch_historical_data と同じくタイムゾーンなしの時刻インデックス）"""
+    rng = np.random.default_rng(seed)
+    close = 100.0 * np.cumprod(1 + rng.normal(drift, 0.002, size))
+    index = pd.date_range(start, periods=size, freq='1min', name='timestamp')
+    return pd.DataFrame({
+        'open': close * (1 + rng.normal(0, 0.0005, size)),
+        'high': close * 1.001,
+        'low': close * 0.999,
+        'close': close,
+        'volume': rng.uniform(10, 100, size),
+    }, index=index)
+
+
+class _FakeInfo:
+    def __init__(self, *args, **kwargs):
+        pass
+
+
+class TestBTCFeatureStore(BaseTest if USE_BASE_TEST else unittest.TestCase):
+    """BTC特徴量ストアのテスト"""
+
+    def setUp(self):
+        """テスト前準備"""
+        if USE_BASE_TEST:
+            super().setUp()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = BTCFeatureStore(self.tmp.name)
+        self.btc = _make_candles(3000, seed=0)
+
+    def tearDown(self):
+        """テスト後クリーンアップ"""
+        self.tmp.cleanup()
+        if USE_BASE_TEST:
+            super().tearDown()
+
+    def test_incremental_refresh_matches_full(self):
+        """分割して追記した特徴量が全期間の一括計算と一致し、保存済みの足は再計算しない"""
+        self.assertEqual(self.store.refresh(self.btc.iloc[:1000]), 1000)
+        self.assertEqual(self.store.refresh(self.btc.iloc[:2200]), 1200)
+        self.assertEqual(self.store.refresh(self.btc.iloc[2100:2200]), 0)
+        self.assertEqual(self.store.refresh(self.btc), 800)
+        self.assertEqual(self.store.get_stats()['appends'], 2)
+
+        stored = self.store.read_features()
+        expected, _ = compute_btc_features(self.btc['close'].to_numpy(), self.btc['volume'].to_numpy())
+        self.assertEqual(list(stored.columns), list(BTC_FEATURE_COLUMNS))
+        self.assertTrue(stored.index.equals(self.btc.index))
+        np.testing.assert_allclose(stored.to_numpy(), expected, rtol=1e-9, atol=1e-12, equal_nan=True)
+
+        # 別インスタンス（別プロセス相当）からも読める
+        window = BTCFeatureStore(self.tmp.name).read_features(self.btc.index[100], self.btc.index[199])
+        self.assertEqual(len(window), 100)
+        self.assertEqual(window.index[0], self.btc.index[100])
+
+    def test_backfill_and_stale_store_rebuild(self):
+        """過去方向の補完・長期間の空白では全体を再計算する"""
+        self.store.refresh(self.btc.iloc[1000:])
+        self.store.refresh(self.btc)
+        self.assertEqual(len(self.store.read_features()), len(self.btc))
+        self.assertEqual(self.store.get_stats()['rebuilds'], 2)
+
+        later = _make_candles(100, seed=1, start='2024-04-01')
+        self.assertEqual(self.store.refresh(later), 100)
+        stored = self.store.read_features()
+        self.assertTrue(stored.index.equals(later.index))
+
+    def test_forming_bar_not_stored(self):
+        """形成中の足は保存せず、確定後の値で追記する"""
+        data = self.btc.iloc[:1001].copy()
+        forming_at = data.index[-1] + pd.Timedelta(seconds=30)
+        forming = data.copy()
+        forming.iloc[-1, forming.columns.get_loc('close')] = 1.0
+        forming.iloc[-1, forming.columns.get_loc('volume')] = 0.1
+
+        self.assertEqual(self.store.refresh(forming, now=forming_at), 1000)
+        self.assertEqual(self.store.read_features().index[-1], self.btc.index[999])
+
+        # 確定後の足（と次の形成中の足）で更新すると確定値が保存される
+        self.assertEqual(self.store.refresh(self.btc.iloc[:1002], now=forming_at + pd.Timedelta(minutes=1)), 1)
+        stored = self.store.read_features()
+        expected, _ = compute_btc_features(data['close'].to_numpy(), data['volume'].to_numpy())
+        self.assertTrue(stored.index.equals(data.index))
+        np.testing.assert_allclose(stored.to_numpy(), expected, rtol=1e-9, atol=1e-12, equal_nan=True)
+
+    def test_calculate_features_matches_legacy(self):
+        """ストアの特徴量を使った特徴量がBTCを毎回計算する従来の特徴量と一致する"""
+        with patch('btc_altcoin_correlation_predictor.Info', _FakeInfo):
+            from btc_altcoin_correlation_predictor import BTCAltcoinCorrelationPredictor
+            predictor = BTCAltcoinCorrelationPredictor()
+
+        alt = _make_candles(3000, seed=2)
+        self.store.refresh(self.btc)
+        legacy = predictor.calculate_features(self.btc, alt)
+        stored = predictor.calculate_features(self.btc, alt, btc_features=self.store.read_features())
+
+        self.assertEqual(list(stored.columns), list(legacy.columns))
+        self.assertTrue(stored.index.equals(legacy.index))
+        np.testing.assert_allclose(stored.to_numpy(dtype=float), legacy.to_numpy(dtype=float),
+                                   rtol=1e-7, atol=1e-9)
+
+    def test_batch_training_fetches_btc_once(self):
+        """一括訓練はBTCデータを1回だけ取得し、全銘柄・全予測時間幅のモデルを訓練する"""
+        candles = {'BTC': self.btc, 'ETH': _make_candles(3000, seed=3), 'SOL': _make_candles(3000, seed=4)}
+        with patch('btc_altcoin_correlation_predictor.Info', _FakeInfo), \
+             patch.dict(os.environ, {'BTC_FEATURE_STORE_DIR': self.tmp.name, 'BTC_FEATURE_STORE_ENABLED': 'true'}):
+            from btc_altcoin_correlation_predictor import BTCAltcoinCorrelationPredictor
+            predictor = BTCAltcoinCorrelationPredictor()
+            with patch.object(predictor, 'fetch_historical_data',
+                              side_effect=lambda symbol, timeframe='1m', days=30: candles[symbol]) as fetch:
+                results = predictor.train_prediction_models(['ETH', 'SOL'], max_workers=4)
+
+        self.assertEqual(results, {'ETH': True, 'SOL': True})
+        self.assertEqual([call.args[0] for call in fetch.call_args_list], ['BTC', 'ETH', 'SOL'])
+        for symbol in ('ETH', 'SOL'):
+            self.assertEqual(sorted(predictor.models[symbol]), [5, 15, 60, 240])
+            model = predictor.models[symbol][60]
+            self.assertEqual(model.n_features_in_, len(predictor.create_prediction_features(-5.0, 60000.0)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+EnhancedMLPredictor.predict_breakouts_batch のテストケース
+
+市場特徴量を1回だけ計算し、レベル特徴量を積み上げた行列で各モデルを1回ずつ呼び出しても、
+レベルごとの predict_breakout / create_enhanced_features と同じ予測になることを確認する
+"""
+
+import unittest
+import contextlib
+import io
+import os
+import sys
+import pandas as pd
+import numpy as np
+from datetime import datetime
+from unittest.mock import patch
+
+# プロジェクトルートをパスに追加
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# BaseTestを継承してテスト環境の安全性を確保
+try:
+    from tests_organized.base_test import BaseTest
+    USE_BASE_TEST = True
+except ImportError:
+    USE_BASE_TEST = False
+    print("⚠️ BaseTestが利用できません。標準のunittestを使用します。")
+
+from enhanced_ml_predictor import EnhancedMLPredictor
+from adapters.existing_adapters import ExistingMLPredictorAdapter
+from interfaces import SupportResistanceLevel
+
+
+def _level(price, level_type, strength=0.6, touches=3):
+    now = datetime.now()
+    return SupportResistanceLevel(price=price, strength=strength, touch_count=touches, level_type=level_type,
+                                  first_touch=now, last_touch=now, volume_at_level=1000.0,
+                                  distance_from_current=0.0)
+
+
+def _quiet(func, *args, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return func(*args, **kwargs)
+
+
+class _BatchOnlyPredictor(ExistingMLPredictorAdapter):
+    """一括予測の呼び出しを記録する予測器"""
+
+    def __init__(self):
+        super().__init__()
+        self.batch_calls = 0
+
+    def predict_breakouts_batch(self, current_data, levels):
+        self.batch_calls += 1
+        return [super(_BatchOnlyPredictor, self).predict_breakout(current_data, level) for level in levels]
+
+    def predict_breakout(self, current_data, level):
+        raise AssertionError("一括予測が使われていません")
+
+
+class TestEnhancedMLBatchPrediction(BaseTest if USE_BASE_TEST else unittest.TestCase):
+    """一括ブレイクアウト予測のテスト"""
+
+    @classmethod
+    def setUpClass(cls):
+        rng = np.random.default_rng(0)
+        periods = 800
+        closes = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, periods)))
+        cls.data = pd.DataFrame({
+            'timestamp': pd.date_range('2024-01-01', periods=periods, freq='1h'),
+            'open': closes,
+            'high': closes * 1.005,
+            'low': closes * 0.995,
+            'close': closes,
+            'volume': rng.uniform(1000, 5000, periods)
+        })
+        price = closes[-1]
+        cls.supports = [_level(price * f, 'support', strength=s) for f, s in ((0.95, 0.5), (0.97, 0.7), (0.99, 0.9))]
+        cls.resistances = [_level(price * f, 'resistance', strength=s, touches=t)
+                           for f, s, t in ((1.01, 0.4, 2), (1.03, 0.6, 4), (1.05, 0.8, 5))]
+
+        cls.predictor = EnhancedMLPredictor()
+        for params in cls.predictor.model_params.values():
+            params['n_estimators'] = 20
+        trained = _quiet(cls.predictor.train_model, cls.data, cls.supports + cls.resistances)
+        assert trained, "テスト用モデルの訓練に失敗"
+
+    def _reference(self, level_set):
+        """create_enhanced_features の最新行で各モデルを個別に呼び出した予測"""
+        features = _quiet(self.predictor.create_enhanced_features, self.data, level_set)
+        X = self.predictor.scaler.transform(features[self.predictor.feature_columns].iloc[-1:].fillna(0))
+        probs = [model.predict_proba(X)[0, 1] for model in self.predictor.models.values()]
+        weights = [self.predictor.ensemble_weights[name] for name in self.predictor.models]
+        return np.average(probs, weights=weights), max(0.1, 1.0 - np.std(probs) * 2)
+
+    def test_level_sets_match_per_row_prediction(self):
+        """積み上げた行列での予測はレベル集合ごとの個別予測と一致し、各モデルは1回だけ呼ばれる"""
+        level_sets = [[s, r] for s in self.supports for r in self.resistances]
+        targets = [level_set[i % 2] for i, level_set in enumerate(level_sets)]
+
+        models = self.predictor.models
+        with patch.object(self.predictor, '_create_market_features',
+                          wraps=self.predictor._create_market_features) as market, \
+                patch.dict(models, {name: _CountingModel(model) for name, model in models.items()}):
+            predictions = _quiet(self.predictor._predict_level_sets, self.data, level_sets, targets)
+            self.assertEqual(market.call_count, 1)
+            self.assertTrue(all(model.calls == 1 for model in self.predictor.models.values()))
+
+        for level_set, target, prediction in zip(level_sets, targets, predictions):
+            expected_prob, expected_confidence = self._reference(level_set)
+            self.assertIs(prediction.level, target)
+            self.assertAlmostEqual(prediction.breakout_probability, expected_prob, places=12)
+            self.assertAlmostEqual(prediction.bounce_probability, 1.0 - expected_prob, places=12)
+            self.assertAlmostEqual(prediction.prediction_confidence, expected_confidence, places=12)
+
+    def test_batch_matches_predict_breakout(self):
+        """predict_breakouts_batch の各要素は predict_breakout と同じ"""
+        levels = self.supports + self.resistances
+        expected = [_quiet(self.predictor.predict_breakout, self.data, level) for level in levels]
+        with patch.object(self.predictor, '_create_market_features',
+                          wraps=self.predictor._create_market_features) as market:
+            batch = _quiet(self.predictor.predict_breakouts_batch, self.data, levels)
+        self.assertEqual(batch, expected)
+        self.assertLessEqual(market.call_count, 1)
+
+    def test_feature_columns_unchanged(self):
+        """create_enhanced_features の列順（訓練時の特徴量カラム）は従来通り"""
+        features = _quiet(self.predictor.create_enhanced_features, self.data,
+                          [self.supports[0], self.resistances[0]])
+        columns = list(features.columns)
+        start = columns.index('volume_trend') + 1
+        self.assertEqual(columns[start:start + len(EnhancedMLPredictor.LEVEL_FEATURE_COLUMNS)],
+                         EnhancedMLPredictor.LEVEL_FEATURE_COLUMNS)
+        self.assertEqual(columns[-1], 'rsi_lag_5')
+        self.assertIsNone(_quiet(self.predictor.create_enhanced_features, self.data, [self.supports[0]]))
+
+    def test_untrained_and_empty(self):
+        """未訓練時はデフォルト予測、レベルが空なら空リスト"""
+        predictor = EnhancedMLPredictor()
+        levels = [self.supports[0], self.resistances[0]]
+        batch = _quiet(predictor.predict_breakouts_batch, self.data, levels)
+        self.assertEqual(batch, [_quiet(predictor.predict_breakout, self.data, level) for level in levels])
+        self.assertEqual(self.predictor.predict_breakouts_batch(self.data, []), [])
+
+    def test_orchestrator_uses_batch(self):
+        """オーケストレーターは一括予測に対応した予測器では1回の呼び出しで全レベルを予測する"""
+        from engines.high_leverage_bot_orchestrator import HighLeverageBotOrchestrator
+
+        with patch.dict(os.environ, {'BREAKOUT_MODEL_REGISTRY_ENABLED': 'false'}), \
+                contextlib.redirect_stdout(io.StringIO()):
+            orchestrator = HighLeverageBotOrchestrator(use_default_plugins=False)
+            predictor = _BatchOnlyPredictor()
+            orchestrator.set_breakout_predictor(predictor)
+            predictions = orchestrator._predict_breakouts(self.data, self.supports + self.resistances,
+                                                          symbol='SOL', timeframe='1h')
+        self.assertEqual(predictor.batch_calls, 1)
+        self.assertEqual(len(predictions), 6)
+
+
+class _CountingModel:
+    """predict_proba の呼び出し回数を数えるラッパー"""
+
+    def __init__(self, model):
+        self.model = model
+        self.calls = 0
+
+    def predict_proba(self, X):
+        self.calls += 1
+        return self.model.predict_proba(X)
+
+
+if __name__ == '__main__':
+    unittest.main()
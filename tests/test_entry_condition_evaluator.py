@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+コンパイル済みエントリー条件評価器（entry_condition_evaluator）のテストケース
+
+条件の1回解決とFILTER_PARAMSオーバーライド、1件評価とベクトル化評価の一致、
+診断情報の集計と ScalableAnalysisSystem._evaluate_entry_conditions のキャッシュを確認する
+"""
+
+import unittest
+import os
+import sys
+import json
+import logging
+import numpy as np
+from unittest.mock import patch
+
+# プロジェクトルートをパスに追加
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# BaseTestを継承してテスト環境の安全性を確保
+try:
+    from tests_organized.base_test import BaseTest
+    USE_BASE_TEST = True
+except ImportError:
+    USE_BASE_TEST = False
+    print("⚠️ BaseTestが利用できません。標準のunittestを使用します。")
+
+from engines.entry_condition_evaluator import (
+    CompiledEntryConditions, EntryConditionDiagnostics, compile_entry_conditions,
+    load_filter_entry_conditions, CONDITION_NAMES, INVALID_INPUT
+)
+from engines.leverage_decision_engine import InsufficientConfigurationError
+
+# 統合設定から返される条件（設定ファイルの内容に依存しないよう固定）
+BASE_CONDITIONS = {'min_leverage': 3.0, 'min_confidence': 0.5, 'min_risk_reward': 2.0, 'max_leverage': 50}
+
+
+class TestEntryConditionEvaluator(BaseTest if USE_BASE_TEST else unittest.TestCase):
+    """コンパイル済みエントリー条件評価器のテスト"""
+
+    def setUp(self):
+        """テスト前準備"""
+        if USE_BASE_TEST:
+            super().setUp()
+        self.config_patch = patch('config.unified_config_manager.UnifiedConfigManager.get_entry_conditions',
+                                  side_effect=lambda timeframe, strategy=None: dict(BASE_CONDITIONS))
+        self.config_patch.start()
+        self.evaluator = CompiledEntryConditions(
+            timeframe='1h', strategy='Balanced',
+            min_leverage=3.0, min_confidence=0.5, min_risk_reward=2.0
+        )
+
+    def tearDown(self):
+        """テスト後クリーンアップ"""
+        self.config_patch.stop()
+        if USE_BASE_TEST:
+            super().tearDown()
+
+    def test_compile_with_filter_overrides(self):
+        """統合設定の条件をFILTER_PARAMSで上書きし、不正なFILTER_PARAMSは無視する"""
+        base = compile_entry_conditions('1h', 'Balanced', overrides={})
+        self.assertEqual(base.overridden, ())
+        self.assertEqual(base.conditions['max_leverage'], 50)
+
+        filter_params = json.dumps({'entry_conditions': {'min_leverage': 7.5, 'min_confidence': 0.9}})
+        with patch.dict(os.environ, {'FILTER_PARAMS': filter_params}):
+            compiled = compile_entry_conditions('1h', 'Balanced')
+        self.assertEqual((compiled.min_leverage, compiled.min_confidence), (7.5, 0.9))
+        self.assertEqual(compiled.min_risk_reward, base.min_risk_reward)
+        self.assertEqual(compiled.overridden, ('min_leverage', 'min_confidence'))
+
+        with self.assertLogs('engines.entry_condition_evaluator', level='WARNING'):
+            self.assertEqual(load_filter_entry_conditions('{不正なJSON'), {})
+
+        # 不変
+        with self.assertRaises(Exception):
+            compiled.min_leverage = 1.0
+
+        # 設定モジュールが読み込めない場合は銘柄追加を停止
+        with patch.dict('sys.modules', {'config.unified_config_manager': None}):
+            with self.assertRaises(InsufficientConfigurationError) as ctx:
+                compile_entry_conditions('1h', 'Balanced')
+        self.assertEqual(ctx.exception.error_type, 'entry_conditions_config_failed')
+
+    def test_evaluate_and_diagnostics(self):
+        """1件評価の判定と、不合格理由を件数で集計する"""
+        diagnostics = EntryConditionDiagnostics(max_samples=1)
+        passing = {'leverage': 5.0, 'confidence': 70.0, 'risk_reward_ratio': 2.5, 'current_price': 100.0}
+        self.assertTrue(self.evaluator.evaluate(passing, diagnostics))
+        self.assertFalse(self.evaluator.evaluate(dict(passing, leverage=1.0, confidence=40.0), diagnostics))
+        self.assertFalse(self.evaluator.evaluate(dict(passing, current_price=0), diagnostics))
+
+        with self.assertRaises(ValueError):
+            self.evaluator.evaluate(dict(passing, risk_reward_ratio=None), diagnostics)
+        with self.assertRaises(ValueError):
+            self.evaluator.evaluate(dict(passing, leverage='5x'), diagnostics)
+
+        summary = diagnostics.summary()
+        self.assertEqual((summary['evaluated'], summary['passed'], summary['rejected']), (5, 1, 4))
+        self.assertEqual(summary['failures'], {'leverage': 1, 'confidence': 1, 'price': 1, INVALID_INPUT: 2})
+        self.assertEqual(summary['samples'], [(('leverage', 'confidence'), (1.0, 40.0, 2.5, 100.0))])
+
+        with self.assertLogs('scalable_test', level='INFO') as logs:
+            diagnostics.log_summary(logging.getLogger('scalable_test'), 'SOL 1h Balanced')
+        self.assertEqual(len([line for line in logs.output if line.startswith('INFO')]), 1)
+
+    def test_batch_matches_scalar(self):
+        """ベクトル化評価の通過マスクと不合格件数が1件ずつの評価と一致する"""
+        rng = np.random.default_rng(0)
+        size = 500
+        leverage = rng.uniform(0, 10, size)
+        confidence = rng.uniform(0, 100, size)
+        risk_reward = rng.uniform(0, 5, size)
+        price = rng.choice([0.0, 50.0, 100.0], size)
+        leverage[::37] = np.nan
+
+        scalar_diagnostics = EntryConditionDiagnostics()
+        expected = []
+        for values in zip(leverage, confidence, risk_reward, price):
+            result = dict(zip(('leverage', 'confidence', 'risk_reward_ratio', 'current_price'),
+                              (None if np.isnan(value) else value for value in values)))
+            try:
+                expected.append(self.evaluator.evaluate(result, scalar_diagnostics))
+            except ValueError:
+                expected.append(False)
+
+        batch_diagnostics = EntryConditionDiagnostics()
+        mask, failure_counts = self.evaluator.evaluate_batch(leverage, confidence, risk_reward, price,
+                                                             batch_diagnostics)
+        np.testing.assert_array_equal(mask, expected)
+        self.assertEqual(set(failure_counts), set(CONDITION_NAMES) | {INVALID_INPUT})
+        self.assertEqual({name: count for name, count in failure_counts.items() if count},
+                         scalar_diagnostics.summary()['failures'])
+        self.assertEqual(batch_diagnostics.summary()['passed'], int(mask.sum()))
+
+        with self.assertRaises(ValueError):
+            self.evaluator.evaluate_batch([1.0, 2.0], [50.0], [2.0, 3.0], [1.0, 1.0])
+
+    def test_system_resolves_conditions_once(self):
+        """ScalableAnalysisSystem はタスク内で戦略ごとに1回だけ条件を解決する"""
+        from scalable_analysis_system import ScalableAnalysisSystem
+        import engines.entry_condition_evaluator as evaluator_module
+
+        system = ScalableAnalysisSystem.__new__(ScalableAnalysisSystem)
+        result = {'leverage': 5.0, 'confidence': 70.0, 'risk_reward_ratio': 2.5,
+                  'current_price': 100.0, 'strategy': 'Balanced'}
+        evaluators = {}
+        diagnostics = EntryConditionDiagnostics()
+        with patch.object(evaluator_module, 'compile_entry_conditions',
+                          wraps=evaluator_module.compile_entry_conditions) as compile_mock:
+            outcomes = [system._evaluate_entry_conditions(result, '1h', evaluators, diagnostics)
+                        for _ in range(10)]
+        self.assertEqual(compile_mock.call_count, 1)
+        self.assertEqual(outcomes, [True] * 10)
+        self.assertEqual(list(evaluators), ['Balanced'])
+        self.assertEqual(diagnostics.summary()['evaluated'], 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
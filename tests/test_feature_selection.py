@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+特徴量選択エンジン（feature_selection）のテストケース
+
+相関による削減が従来の二重ループと同じ列を削除すること、逆相関行列のVIFと
+ランク1ダウンデートが列ごとのOLSによるVIFと一致すること、特徴量テーブルが
+型を保って読み書きできることを確認する
+"""
+
+import unittest
+import os
+import sys
+import tempfile
+import numpy as np
+import pandas as pd
+
+# プロジェクトルートをパスに追加
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# BaseTestを継承してテスト環境の安全性を確保
+try:
+    from tests_organized.base_test import BaseTest
+    USE_BASE_TEST = True
+except ImportError:
+    USE_BASE_TEST = False
+    print("⚠️ BaseTestが利用できません。標準のunittestを使用します。")
+
+from feature_selection import (
+    IncrementalVIF, prune_correlated_features, eliminate_by_vif,
+    write_feature_table, read_feature_table, load_feature_table, feature_table_exists, feature_table_path
+)
+
+
+def _make_features(rows=500, seed=0):
+    """高相関・多重共線性・定数列を含む特徴量"""
+    rng = np.random.default_rng(seed)
+    base = rng.normal(size=(rows, 6))
+    data = pd.DataFrame(base, columns=[f'f{i}' for i in range(6)])
+    data['near_f0'] = data['f0'] + rng.normal(scale=0.05, size=rows)
+    data['near_f0_b'] = data['f0'] + rng.normal(scale=0.1, size=rows)
+    data['combo'] = data['f1'] + data['f2'] + rng.normal(scale=0.2, size=rows)
+    data['combo_b'] = data['f3'] - data['f4'] + rng.normal(scale=0.3, size=rows)
+    data['mix'] = data['combo'] * 0.5 + data['f5'] + rng.normal(scale=0.2, size=rows)
+    data['constant'] = 1.0
+    data['neg_f5'] = -data['f5'] + rng.normal(scale=0.05, size=rows)
+    return data
+
+
+def _reference_prune(data, threshold):
+    """従来の corr_matrix.iloc による二重ループ"""
+    corr_matrix = data.corr()
+    high_corr_pairs = []
+    for i in range(len(corr_matrix.columns)):
+        for j in range(i + 1, len(corr_matrix.columns)):
+            if abs(corr_matrix.iloc[i, j]) > threshold:
+                high_corr_pairs.append((corr_matrix.columns[i], corr_matrix.columns[j]))
+    removed = set()
+    for col1, col2 in high_corr_pairs:
+        if col1 not in removed:
+            removed.add(col2)
+    return removed, len(high_corr_pairs)
+
+
+def _reference_vif(data):
+    """標準化データで各列を他の列に定数項なしで回帰した 1 / (1 - R^2)（variance_inflation_factor と同じ定義）"""
+    values = data.to_numpy(dtype=float)
+    values = (values - values.mean(axis=0)) / values.std(axis=0)
+    result = []
+    for i in range(values.shape[1]):
+        y = values[:, i]
+        X = np.delete(values, i, axis=1)
+        coef, *_ = np.linalg.lstsq(X, y, rcond=None)
+        r_squared = 1 - np.sum((y - X @ coef) ** 2) / np.sum(y ** 2)
+        result.append(1.0 / (1.0 - r_squared))
+    return pd.Series(result, index=data.columns)
+
+
+class TestFeatureSelection(BaseTest if USE_BASE_TEST else unittest.TestCase):
+    """特徴量選択エンジンのテスト"""
+
+    def setUp(self):
+        """テスト前準備"""
+        if USE_BASE_TEST:
+            super().setUp()
+        self.data = _make_features()
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        """テスト後クリーンアップ"""
+        self.tmp.cleanup()
+        if USE_BASE_TEST:
+            super().tearDown()
+
+    def test_correlation_pruning_matches_loop(self):
+        """上三角マスクによる削減が従来の二重ループと同じ列・ペア数になる"""
+        for threshold in (0.5, 0.9, 0.95, 0.99):
+            with self.subTest(threshold=threshold):
+                remaining, removed, n_pairs = prune_correlated_features(self.data, threshold)
+                expected_removed, expected_pairs = _reference_prune(self.data, threshold)
+                self.assertEqual(set(removed), expected_removed)
+                self.assertEqual(n_pairs, expected_pairs)
+                self.assertEqual(remaining, [c for c in self.data.columns if c not in expected_removed])
+
+        # 連鎖: f0 と高相関の near_f0 は削除され、near_f0 と near_f0_b のペアは削除判定に使われない
+        _, removed, _ = prune_correlated_features(self.data, 0.95)
+        self.assertIn('near_f0', removed)
+        self.assertIn('constant', prune_correlated_features(self.data, 0.95)[0])
+
+    def test_vif_matches_ols_and_downdates(self):
+        """逆相関行列のVIFが列ごとのOLSと一致し、列の削除後も再計算と一致する"""
+        features = self.data.drop(columns=['constant'])
+        vif = IncrementalVIF(features)
+        np.testing.assert_allclose(vif.vifs().to_numpy(), _reference_vif(features).to_numpy(), rtol=1e-8)
+
+        for column in ('mix', 'f0', 'combo_b'):
+            vif.remove(column)
+            features = features.drop(columns=[column])
+            self.assertEqual(vif.columns, list(features.columns))
+            np.testing.assert_allclose(vif.vifs().to_numpy(), _reference_vif(features).to_numpy(), rtol=1e-8)
+
+        # 定数列・非有限値の列はNaNで、他の列のVIFに影響しない
+        data = self.data.copy()
+        data['with_inf'] = np.where(np.arange(len(data)) == 3, np.inf, 1.0)
+        vifs = IncrementalVIF(data).vifs()
+        self.assertTrue(np.isnan(vifs['constant']) and np.isnan(vifs['with_inf']))
+        np.testing.assert_allclose(vifs.drop(['constant', 'with_inf']).to_numpy(),
+                                   _reference_vif(self.data.drop(columns=['constant'])).to_numpy(), rtol=1e-8)
+
+    def test_vif_elimination_matches_iterative_refit(self):
+        """反復削除が毎回VIFを再計算する従来の手順と同じ列を同じ順で削除する"""
+        collinear = self.data.copy()
+        collinear['diff'] = collinear['f1'] - collinear['f2']
+
+        for data in (self.data, collinear):
+            remaining, removed = eliminate_by_vif(data, threshold=5, max_iterations=10)
+
+            expected = []
+            current = data.drop(columns=['constant'])
+            for _ in range(10):
+                with np.errstate(divide='ignore'):
+                    vifs = _reference_vif(current)
+                if vifs.max() <= 5:
+                    break
+                expected.append(vifs.idxmax())
+                current = current.drop(columns=[vifs.idxmax()])
+
+            self.assertTrue(expected)
+            self.assertEqual(removed, expected)
+            self.assertEqual(remaining, [c for c in data.columns if c not in expected])
+            self.assertEqual(eliminate_by_vif(data, threshold=5, max_iterations=1)[1], expected[:1])
+
+        # 完全な共線性のある列はVIFがinfになり、最初に削除される
+        vifs = IncrementalVIF(collinear).vifs()
+        self.assertTrue(np.isinf(vifs[['f1', 'f2', 'diff']]).all())
+        self.assertEqual(removed[0], 'f1')
+
+    def test_feature_table_roundtrip(self):
+        """特徴量テーブルは型を保って読み書きでき、列を指定して読み込める"""
+        data = pd.DataFrame({
+            'timestamp': pd.date_range('2024-01-01', periods=5, freq='h'),
+            'close': [1.0, np.nan, 3.0, 4.0, 5.0],
+            'trades': np.arange(5, dtype=np.int64),
+            'flag': [True, False, True, True, False],
+            'label': ['a', None, 'ccc', 'd', 'e'],
+        })
+        data['timestamp_utc'] = data['timestamp'].dt.tz_localize('Asia/Tokyo')
+        csv_path = os.path.join(self.tmp.name, 'hype_1h_90days_with_indicators.csv')
+
+        self.assertFalse(feature_table_exists(csv_path))
+        table = write_feature_table(csv_path, data)
+        self.assertEqual(table, str(feature_table_path(csv_path)))
+        self.assertTrue(table.endswith('hype_1h_90days_with_indicators.features'))
+        self.assertTrue(feature_table_exists(csv_path))
+
+        loaded = read_feature_table(table)
+        pd.testing.assert_frame_equal(loaded, data)
+        projected = load_feature_table(csv_path, columns=['close', 'timestamp'])
+        pd.testing.assert_frame_equal(projected, data[['close', 'timestamp']])
+        with self.assertRaises(KeyError):
+            read_feature_table(table, columns=['missing'])
+
+        # 置き換え・0行
+        write_feature_table(csv_path, data.iloc[:0])
+        self.assertEqual(len(load_feature_table(csv_path)), 0)
+
+        # テーブルがなければ従来のCSVを読む
+        legacy_path = os.path.join(self.tmp.name, 'sol_1h_90days_reduced_features.csv')
+        data[['close', 'trades']].to_csv(legacy_path, index=False)
+        self.assertTrue(feature_table_exists(legacy_path))
+        pd.testing.assert_frame_equal(load_feature_table(legacy_path), data[['close', 'trades']])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+IncrementalBacktestEngineのテストケース
+
+足ごとにanalyze_symbolを呼び出す従来経路と、STEP 1-4を使い回す
+インクリメンタル経路の結果が一致することを確認する
+"""
+
+import unittest
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import pandas as pd
+import numpy as np
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+# プロジェクトルートをパスに追加
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# BaseTestを継承してテスト環境の安全性を確保
+try:
+    from tests_organized.base_test import BaseTest
+    USE_BASE_TEST = True
+except ImportError:
+    USE_BASE_TEST = False
+    print("⚠️ BaseTestが利用できません。標準のunittestを使用します。")
+
+from interfaces import SupportResistanceLevel, BTCCorrelationRisk, LeverageRecommendation
+from adapters.existing_adapters import ExistingMLPredictorAdapter
+from engines.high_leverage_bot_orchestrator import HighLeverageBotOrchestrator
+from engines.leverage_decision_engine import SimpleMarketContextAnalyzer
+from engines.incremental_backtest_engine import (
+    IncrementalBacktestEngine, IncrementalBacktestParityError, compare_analysis_results
+)
+
+
+class _FixedSupportResistanceAnalyzer:
+    """固定レベルを返すテスト用サポレジアナライザー"""
+
+    def __init__(self, supports, resistances):
+        self.supports = supports
+        self.resistances = resistances
+
+    def _level(self, price, level_type):
+        now = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        return SupportResistanceLevel(
+            price=price, strength=0.8, touch_count=4, level_type=level_type,
+            first_touch=now, last_touch=now, volume_at_level=1000.0,
+            distance_from_current=0.0
+        )
+
+    def find_levels(self, data, **kwargs):
+        return ([self._level(p, 'support') for p in self.supports] +
+                [self._level(p, 'resistance') for p in self.resistances])
+
+
+class _FixedBTCCorrelationAnalyzer:
+    """固定のBTC相関リスクを返すテスト用アナライザー"""
+
+    def predict_altcoin_impact(self, symbol, btc_drop_pct):
+        return BTCCorrelationRisk(
+            symbol=symbol,
+            btc_drop_scenario=btc_drop_pct,
+            predicted_altcoin_drop={5: -3.0, 15: -4.0, 60: -5.0, 240: -6.0},
+            correlation_strength=0.6,
+            risk_level='LOW',
+            liquidation_risk={5: 0.01, 15: 0.02, 60: 0.03, 240: 0.04}
+        )
+
+
+class _PriceDependentLeverageEngine:
+    """評価時点の価格に応じてレバレッジが変化するテスト用判定エンジン"""
+
+    def calculate_safe_leverage(self, symbol, support_levels, resistance_levels,
+                                breakout_predictions, btc_correlation_risk, market_context):
+        price = market_context.current_price
+        return LeverageRecommendation(
+            recommended_leverage=max(1.0, price - 97.0),
+            max_safe_leverage=10.0,
+            risk_reward_ratio=1.5,
+            stop_loss_price=price * 0.97,
+            take_profit_price=price * 1.05,
+            confidence_level=0.6,
+            reasoning=[market_context.trend_direction, market_context.market_phase],
+            market_conditions=market_context
+        )
+
+
+class _CustomMarketContextAnalyzer(SimpleMarketContextAnalyzer):
+    """事前計算の対象外となる独自アナライザー"""
+    pass
+
+
+class TestIncrementalBacktestEngine(BaseTest if USE_BASE_TEST else unittest.TestCase):
+    """インクリメンタル・バックテストエンジンのテスト"""
+
+    def setUp(self):
+        """テスト前準備"""
+        if USE_BASE_TEST:
+            super().setUp()
+
+        self.ohlcv_data = self._create_test_ohlcv_data()
+        self.symbol = 'TEST'
+        self.timeframe = '1h'
+
+    def _create_test_ohlcv_data(self, periods=240):
+        """レベルの上下を往復するテスト用OHLCVデータ"""
+        np.random.seed(42)
+        start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        timestamps = [start + timedelta(hours=i) for i in range(periods)]
+
+        base = 100 + 8 * np.sin(np.arange(periods) / 15.0) + np.cumsum(np.random.normal(0, 0.4, periods))
+        opens = base + np.random.normal(0, 0.3, periods)
+        closes = base + np.random.normal(0, 0.3, periods)
+        highs = np.maximum(opens, closes) + np.abs(np.random.normal(0, 0.5, periods))
+        lows = np.minimum(opens, closes) - np.abs(np.random.normal(0, 0.5, periods))
+        volumes = np.random.uniform(1000, 5000, periods)
+
+        return pd.DataFrame({
+            'timestamp': timestamps,
+            'open': opens,
+            'high': highs,
+            'low': lows,
+            'close': closes,
+            'volume': volumes
+        })
+
+    def _create_bot(self, market_context_analyzer=None, supports=(90.0, 95.0, 99.0), resistances=(104.0, 108.0)):
+        bot = HighLeverageBotOrchestrator(use_default_plugins=False)
+        bot.set_support_resistance_analyzer(_FixedSupportResistanceAnalyzer(list(supports), list(resistances)))
+        bot.set_breakout_predictor(ExistingMLPredictorAdapter())
+        bot.set_btc_correlation_analyzer(_FixedBTCCorrelationAnalyzer())
+        bot.set_market_context_analyzer(market_context_analyzer or SimpleMarketContextAnalyzer())
+        # 設定ファイルがない環境では分析時の再初期化に失敗し、このエンジンが使われる
+        bot.set_leverage_decision_engine(_PriceDependentLeverageEngine())
+        bot._cached_data = self.ohlcv_data
+        return bot
+
+    def _legacy(self, bot, target_timestamp):
+        try:
+            return bot.analyze_symbol(self.symbol, self.timeframe, 'Conservative_ML',
+                                      is_backtest=True, target_timestamp=target_timestamp), None
+        except Exception as e:
+            return None, e
+
+    def _incremental(self, engine, target_timestamp):
+        try:
+            return engine.evaluate(target_timestamp), None
+        except Exception as e:
+            return None, e
+
+    def _target_timestamps(self):
+        """各足・足の中間（同距離）・時刻の巻き戻りを含む評価時刻"""
+        timestamps = list(self.ohlcv_data['timestamp'])
+        targets = timestamps[::3]
+        targets += [ts + timedelta(minutes=30) for ts in timestamps[100:110]]
+        targets += [timestamps[20], timestamps[5] - timedelta(minutes=20), timestamps[-1] + timedelta(hours=5)]
+        targets += timestamps[150:160]
+        return targets
+
+    def _assert_parity(self, bot, engine, targets):
+        outcomes = set()
+        with contextlib.redirect_stdout(io.StringIO()):
+            for target in targets:
+                legacy_result, legacy_error = self._legacy(bot, target)
+                incremental_result, incremental_error = self._incremental(engine, target)
+
+                if legacy_error is not None or incremental_error is not None:
+                    self.assertEqual(str(legacy_error), str(incremental_error), f"例外が一致しません: {target}")
+                    outcomes.add('error')
+                    continue
+
+                self.assertEqual(compare_analysis_results(legacy_result, incremental_result), [],
+                                 f"結果が一致しません: {target}")
+                outcomes.add(type(legacy_result).__name__)
+        return outcomes
+
+    def test_parity_with_legacy_path(self):
+        """従来経路と全評価時刻で一致する"""
+        bot = self._create_bot()
+        engine = IncrementalBacktestEngine(bot, self.symbol, self.timeframe, 'Conservative_ML')
+        outcomes = self._assert_parity(bot, engine, self._target_timestamps())
+
+        self.assertTrue(outcomes)
+        stats = engine.get_stats()
+        self.assertEqual(stats['prime_count'], 1)
+        self.assertGreater(stats['fast_context_hits'], 0)
+        self.assertEqual(stats['fallback_context_calls'], 0)
+
+    def test_parity_with_early_exit_in_invariant_stages(self):
+        """STEP 2でEarly Exitする場合も同じAnalysisResultを返す"""
+        bot = self._create_bot(supports=(), resistances=())
+        engine = IncrementalBacktestEngine(bot, self.symbol, self.timeframe, 'Conservative_ML')
+        outcomes = self._assert_parity(bot, engine, self._target_timestamps()[:20])
+
+        self.assertEqual(outcomes, {'AnalysisResult'})
+        self.assertEqual(engine.get_stats()['prime_count'], 1)
+
+    def test_custom_market_context_analyzer_uses_fallback(self):
+        """独自の市場コンテキストアナライザーでは足ごとにアナライザーを呼び出す"""
+        bot = self._create_bot(market_context_analyzer=_CustomMarketContextAnalyzer())
+        engine = IncrementalBacktestEngine(bot, self.symbol, self.timeframe, 'Conservative_ML')
+        self._assert_parity(bot, engine, self._target_timestamps()[:20])
+
+        stats = engine.get_stats()
+        self.assertEqual(stats['fast_context_hits'], 0)
+        self.assertGreater(stats['fallback_context_calls'], 0)
+
+    def test_parity_check_mode(self):
+        """parity_checkモードでは不一致を検出せず従来経路の結果を返す"""
+        bot = self._create_bot()
+        engine = IncrementalBacktestEngine(bot, self.symbol, self.timeframe, 'Conservative_ML',
+                                           parity_check=True, strict_parity=True)
+        with contextlib.redirect_stdout(io.StringIO()):
+            for target in self._target_timestamps()[:30]:
+                try:
+                    engine.evaluate(target)
+                except IncrementalBacktestParityError:
+                    raise
+                except Exception:
+                    pass
+
+        stats = engine.get_stats()
+        self.assertEqual(stats['parity_checks'], 30)
+        self.assertEqual(stats['parity_mismatches'], 0)
+
+    def test_parity_mismatch_is_detected(self):
+        """結果が異なる場合はIncrementalBacktestParityErrorを送出する"""
+        bot = self._create_bot(supports=(), resistances=())
+        engine = IncrementalBacktestEngine(bot, self.symbol, self.timeframe, 'Conservative_ML',
+                                           parity_check=True, strict_parity=True)
+        engine._evaluate_incremental = lambda target_timestamp: {'leverage': 1.0}
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            with self.assertRaises(IncrementalBacktestParityError):
+                engine.evaluate(self.ohlcv_data['timestamp'].iloc[50])
+        self.assertEqual(engine.get_stats()['parity_mismatches'], 1)
+
+
+class _FakeExchangeClient:
+    """固定のOHLCVデータを返すMultiExchangeAPIClientの代替"""
+
+    data = None
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def get_ohlcv_dataframe(self, symbol, timeframe, start_time, end_time):
+        data = self.data
+        return data[(data['timestamp'] >= start_time) & (data['timestamp'] <= end_time)].reset_index(drop=True)
+
+    async def get_ohlcv_data(self, symbol, timeframe, start_time, end_time):
+        return self.get_ohlcv_dataframe(symbol, timeframe, start_time, end_time)
+
+
+def _install_test_plugins(bot):
+    """取引所APIや設定ファイルに依存しないプラグイン（デフォルトプラグインの代わり）"""
+    bot.support_resistance_analyzer = _FixedSupportResistanceAnalyzer([90.0, 95.0], [106.0, 110.0])
+    bot.breakout_predictor = ExistingMLPredictorAdapter()
+    bot.btc_correlation_analyzer = _FixedBTCCorrelationAnalyzer()
+    bot.market_context_analyzer = SimpleMarketContextAnalyzer()
+    bot.leverage_decision_engine = _PriceDependentLeverageEngine()
+
+
+class TestGenerateRealAnalysisIntegration(BaseTest if USE_BASE_TEST else unittest.TestCase):
+    """ScalableAnalysisSystem._generate_real_analysis から評価エンジンを通したトレード生成のテスト"""
+
+    ENTRY_CONDITIONS = {'min_leverage': 2.0, 'min_confidence': 0.5, 'min_risk_reward': 1.0}
+
+    def setUp(self):
+        """テスト前準備"""
+        if USE_BASE_TEST:
+            super().setUp()
+        self.tmp = tempfile.TemporaryDirectory()
+
+        # 評価期間（直近5日）と支持線・抵抗線用の前データを含む1時間足
+        periods = 24 * 20
+        end = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+        rng = np.random.default_rng(7)
+        close = 100 + 6 * np.sin(np.arange(periods) / 12.0) + rng.normal(0, 0.3, periods)
+        opens = np.concatenate([[close[0]], close[:-1]])
+        self.ohlcv_data = pd.DataFrame({
+            'timestamp': pd.date_range(end=end, periods=periods, freq='h'),
+            'open': opens,
+            'high': np.maximum(opens, close) + rng.uniform(0.1, 0.6, periods),
+            'low': np.minimum(opens, close) - rng.uniform(0.1, 0.6, periods),
+            'close': close,
+            'volume': rng.uniform(1000, 5000, periods)
+        })
+
+    def tearDown(self):
+        """テスト後クリーンアップ"""
+        self.tmp.cleanup()
+        if USE_BASE_TEST:
+            super().tearDown()
+
+    def _run(self, strategy, engine_mode):
+        from scalable_analysis_system import ScalableAnalysisSystem
+
+        engines = []
+        original_init = IncrementalBacktestEngine.__init__
+
+        def counting_init(engine, *args, **kwargs):
+            engines.append(engine)
+            original_init(engine, *args, **kwargs)
+
+        _FakeExchangeClient.data = self.ohlcv_data
+        with patch('hyperliquid_api_client.MultiExchangeAPIClient', _FakeExchangeClient), \
+                patch.object(HighLeverageBotOrchestrator, '_initialize_default_plugins', _install_test_plugins), \
+                patch('config.unified_config_manager.UnifiedConfigManager.get_entry_conditions',
+                      return_value=self.ENTRY_CONDITIONS), \
+                patch.object(IncrementalBacktestEngine, '__init__', counting_init), \
+                patch.dict(os.environ, {'SHARED_MARKET_DATA_ENABLED': 'false', 'BACKTEST_ENGINE_MODE': engine_mode}), \
+                contextlib.redirect_stdout(io.StringIO()):
+            system = ScalableAnalysisSystem(base_dir=self.tmp.name)
+            trades = system._generate_real_analysis('TEST', '1h', strategy, custom_period_days=5)
+        return trades, engines
+
+    def test_trades_generated_through_incremental_engine(self):
+        """本番経路で評価エンジンが作られ、足ごとに評価されてトレードが生成される"""
+        trades, engines = self._run('Balanced', 'incremental')
+
+        self.assertEqual(len(engines), 1)
+        stats = engines[0].get_stats()
+        self.assertEqual(stats['prime_count'], 1)
+        self.assertGreater(stats['evaluations'], 100)
+        self.assertTrue(trades)
+        for trade in trades:
+            self.assertGreaterEqual(trade['leverage'], 2.0)
+            self.assertGreater(trade['entry_price'], 0)
+
+        # 従来経路（足ごとの analyze_symbol）と同じトレード
+        legacy_trades, legacy_engines = self._run('Balanced', 'legacy')
+        self.assertEqual(legacy_engines, [])
+        self.assertEqual(pd.DataFrame(legacy_trades).to_dict('records'), pd.DataFrame(trades).to_dict('records'))
+
+
+if __name__ == '__main__':
+    unittest.main()
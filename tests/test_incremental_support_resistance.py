@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+IncrementalSupportResistanceDetectorのテストケース
+
+足を1本ずつ追加しても find_all_levels と同じレベル一覧になること、
+クラスター構造が cluster_price_levels と同じ分割を維持すること、
+1本あたりの処理量が履歴の長さに依存しないことを確認する
+"""
+
+import unittest
+import unittest.mock
+import contextlib
+import io
+import os
+import random
+import sys
+import pandas as pd
+import numpy as np
+
+# プロジェクトルートをパスに追加
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# BaseTestを継承してテスト環境の安全性を確保
+try:
+    from tests_organized.base_test import BaseTest
+    USE_BASE_TEST = True
+except ImportError:
+    USE_BASE_TEST = False
+    print("⚠️ BaseTestが利用できません。標準のunittestを使用します。")
+
+from engines.incremental_support_resistance import (
+    IncrementalSupportResistanceDetector, SortedLevelClusters
+)
+from engines.support_resistance_adapter import (
+    FlexibleSupportResistanceDetector, IncrementalSupportResistanceAdapter
+)
+from support_resistance_visualizer import find_all_levels, cluster_price_levels
+
+
+def _make_ohlcv(periods, seed=1):
+    rng = np.random.default_rng(seed)
+    closes = 100 * np.exp(np.cumsum(rng.normal(0, 0.004, periods)))
+    return pd.DataFrame({
+        'timestamp': pd.date_range('2024-01-01', periods=periods, freq='1h', tz='UTC'),
+        'open': closes,
+        'high': closes * (1 + np.abs(rng.normal(0, 0.002, periods))),
+        'low': closes * (1 - np.abs(rng.normal(0, 0.002, periods))),
+        'close': closes,
+        'volume': rng.uniform(1000, 5000, periods)
+    })
+
+
+def _batch_levels(df, min_touches=2):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return find_all_levels(df, min_touches=min_touches)
+
+
+class TestIncrementalSupportResistance(BaseTest if USE_BASE_TEST else unittest.TestCase):
+    """スライディングウィンドウ支持線・抵抗線検出のテスト"""
+
+    def setUp(self):
+        """テスト前準備"""
+        if USE_BASE_TEST:
+            super().setUp()
+        IncrementalSupportResistanceAdapter.clear_cache()
+
+    def assertLevelsEqual(self, actual, expected):
+        self.assertEqual(len(actual), len(expected))
+        for got, want in zip(actual, expected):
+            self.assertEqual(got['type'], want['type'])
+            self.assertEqual(got['touch_count'], want['touch_count'])
+            self.assertEqual(list(got['timestamps']), list(want['timestamps']))
+            for key in ('price', 'strength', 'avg_bounce', 'max_bounce', 'avg_volume',
+                        'avg_volume_spike', 'max_volume_spike', 'time_span', 'recency'):
+                self.assertTrue(np.isclose(got[key], want[key], rtol=1e-9, equal_nan=True)
+                                or got[key] == want[key], f"{key}: {got[key]} != {want[key]}")
+            self.assertEqual(len(got['bounce_details']), len(want['bounce_details']))
+
+    def test_matches_find_all_levels_bar_by_bar(self):
+        """1本ずつ追加した各時点で find_all_levels と一致する"""
+        df = _make_ohlcv(400)
+        df.loc[100, 'high'] = np.nan
+        df.loc[200:215, 'volume'] = np.nan
+
+        detector = IncrementalSupportResistanceDetector()
+        for end in list(range(5, 120)) + list(range(120, 400, 17)) + [400]:
+            detector.update(df.iloc[:end])
+            self.assertLevelsEqual(detector.get_levels(2), _batch_levels(df.iloc[:end]))
+
+        self.assertEqual(detector.stats['resets'], 0)
+        self.assertLevelsEqual(detector.get_levels(3), _batch_levels(df, min_touches=3))
+
+    def test_cluster_structure_matches_greedy_clustering(self):
+        """挿入・削除を繰り返してもcluster_price_levelsと同じ分割になる"""
+        rng = random.Random(3)
+        clusters = SortedLevelClusters(tolerance_pct=0.02)
+        present = []
+        for step in range(600):
+            if present and rng.random() < 0.3:
+                key = present.pop(rng.randrange(len(present)))
+                clusters.remove(key)
+            else:
+                key = (round(rng.uniform(90, 110), 2), step)
+                present.append(key)
+                clusters.insert(key)
+
+            expected = cluster_price_levels([(index, price) for price, index in sorted(present, key=lambda k: k[1])],
+                                            tolerance_pct=0.02)
+            self.assertEqual([[key[1] for key in cluster] for cluster in clusters.as_lists()],
+                             [[level[0] for level in cluster] for cluster in expected])
+
+    def test_per_bar_work_independent_of_history(self):
+        """1本追加あたりの処理量は履歴の長さに依存しない"""
+        work = []
+        for history in (2000, 20000):
+            df = _make_ohlcv(history + 50, seed=5)
+            detector = IncrementalSupportResistanceDetector()
+            detector.update(df.iloc[:history])
+            before = dict(detector.stats)
+            for end in range(history + 1, history + 51):
+                detector.update(df.iloc[:end])
+            work.append(detector.stats['pivot_checks'] - before['pivot_checks'])
+            self.assertEqual(detector.stats['bars_processed'] - before['bars_processed'], 50)
+            # 同じデータのスライスなら処理済みの足全体の比較は行わない
+            self.assertEqual(detector.stats['full_prefix_checks'], 0)
+
+        self.assertEqual(work[0], work[1])
+
+    def test_changed_history_resets_state(self):
+        """処理済みの足が書き換わった場合は作り直す"""
+        df = _make_ohlcv(200)
+        detector = IncrementalSupportResistanceDetector()
+        detector.update(df)
+
+        modified = df.copy()
+        modified.loc[199, 'high'] *= 1.05
+        detector.update(modified)
+        self.assertEqual(detector.stats['resets'], 1)
+        self.assertLevelsEqual(detector.get_levels(2), _batch_levels(modified))
+
+    def test_changed_middle_bar_resets_state(self):
+        """先頭・末尾以外の処理済みの足が書き換わった場合も作り直す"""
+        df = _make_ohlcv(300)
+        detector = IncrementalSupportResistanceDetector()
+        detector.update(df.iloc[:250])
+
+        modified = df.copy()
+        modified.loc[120, 'low'] *= 0.9
+        self.assertFalse(detector.matches_prefix(modified))
+        self.assertTrue(detector.matches_prefix(df.copy()))
+        self.assertEqual(detector.stats['full_prefix_checks'], 2)
+
+        detector.update(modified)
+        self.assertEqual(detector.stats['resets'], 1)
+        self.assertLevelsEqual(detector.get_levels(2), _batch_levels(modified))
+
+    def test_flexible_detector_reuses_state(self):
+        """検出器を作り直しても系列の状態は引き継がれる"""
+        df = _make_ohlcv(300)
+        current_price = float(df['close'].iloc[-1])
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            first = FlexibleSupportResistanceDetector(use_ml_enhancement=False)
+            self.assertEqual(first.get_provider_info()['base_provider'], 'IncrementalSupportResistance v1.0.0')
+            first.detect_levels(df.iloc[:250], current_price)
+            second = FlexibleSupportResistanceDetector(use_ml_enhancement=False)
+            support, resistance = second.detect_levels(df, current_price)
+
+        detectors = list(IncrementalSupportResistanceAdapter._detectors.values())
+        self.assertEqual(len(detectors), 1)
+        self.assertEqual(detectors[0].stats['bars_processed'], 300)
+
+        with contextlib.redirect_stdout(io.StringIO()), \
+                unittest.mock.patch.dict(os.environ, {'SR_DETECTOR_MODE': 'batch'}):
+            batch = FlexibleSupportResistanceDetector(use_ml_enhancement=False)
+            batch_support, batch_resistance = batch.detect_levels(df, current_price)
+        self.assertEqual([level.price for level in support], [level.price for level in batch_support])
+        self.assertEqual([level.price for level in resistance], [level.price for level in batch_resistance])
+
+    def test_non_range_index_falls_back_to_batch(self):
+        """RangeIndex以外の入力は従来のfind_all_levelsで検出する"""
+        df = _make_ohlcv(200)
+        indexed = df.set_index(pd.Index(np.arange(200) * 2))
+        adapter = IncrementalSupportResistanceAdapter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            levels = adapter.detect_basic_levels(indexed)
+        self.assertLevelsEqual(levels, _batch_levels(indexed))
+        self.assertEqual(len(IncrementalSupportResistanceAdapter._detectors), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -192,10 +192,7 @@ class IntegrationTestRunner:
             from scalable_analysis_system import ScalableAnalysisSystem
             
             # テスト用分析システム作成
-            analysis_system = ScalableAnalysisSystem()
-            analysis_system.base_dir = self.temp_dir
-            analysis_system.compressed_dir = os.path.join(self.temp_dir, "compressed")
-            os.makedirs(analysis_system.compressed_dir, exist_ok=True)
+            analysis_system = ScalableAnalysisSystem(base_dir=self.temp_dir)
             
             # 設定生成
             configs = analysis_system._generate_analysis_configs(symbol)
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+重いライブラリの遅延読み込みと読み込み時間レポート（import_time_report）のテストケース
+
+ワーカーが読み込むモジュールが起動時に sklearn / lightgbm / matplotlib などを読み込まないこと、
+-X importtime の出力を正しく集計できること、ワーカーの起動方式を環境変数で切り替えられることを確認する
+"""
+
+import unittest
+import os
+import sys
+import subprocess
+from unittest.mock import patch
+
+# プロジェクトルートをパスに追加
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# BaseTestを継承してテスト環境の安全性を確保
+try:
+    from tests_organized.base_test import BaseTest
+    USE_BASE_TEST = True
+except ImportError:
+    USE_BASE_TEST = False
+    print("⚠️ BaseTestが利用できません。標準のunittestを使用します。")
+
+from import_time_report import parse_importtime, summarize_packages, HEAVY_PACKAGES
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SAMPLE_OUTPUT = """import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   _io
+import time:       300 |        300 |     numpy.core
+import time:      1500 |       1800 |   numpy
+import time:       200 |       2000 | enhanced_ml_predictor
+unrelated line
+"""
+
+
+class TestLazyImports(BaseTest if USE_BASE_TEST else unittest.TestCase):
+    """遅延読み込みのテスト"""
+
+    def setUp(self):
+        """テスト前準備"""
+        if USE_BASE_TEST:
+            super().setUp()
+
+    def tearDown(self):
+        """テスト後クリーンアップ"""
+        if USE_BASE_TEST:
+            super().tearDown()
+
+    def _loaded_heavy_packages(self, module):
+        code = (f"import sys, {module}\n"
+                f"print('HEAVY:' + ','.join(p for p in {HEAVY_PACKAGES!r} if p in sys.modules))")
+        completed = subprocess.run([sys.executable, '-c', code], cwd=PROJECT_ROOT,
+                                   capture_output=True, text=True, timeout=120)
+        self.assertEqual(completed.returncode, 0, completed.stderr[-2000:])
+        # 読み込み時のprint出力があるため結果の行だけを見る
+        lines = [line for line in completed.stdout.splitlines() if line.startswith('HEAVY:')]
+        self.assertEqual(len(lines), 1, completed.stdout[-2000:])
+        return [package for package in lines[0][len('HEAVY:'):].split(',') if package]
+
+    def test_worker_modules_do_not_load_heavy_packages(self):
+        """ワーカーが読み込むモジュールは起動時に重いパッケージを読み込まない"""
+        for module in ('scalable_analysis_system', 'enhanced_ml_predictor', 'support_resistance_ml',
+                       'btc_altcoin_correlation_predictor', 'stage_profiler'):
+            with self.subTest(module=module):
+                self.assertEqual(self._loaded_heavy_packages(module), [])
+
+    def test_lazy_imports_still_train(self):
+        """遅延読み込みにしても訓練時には必要なライブラリが使える"""
+        import numpy as np
+        import pandas as pd
+        import support_resistance_ml
+
+        rng = np.random.default_rng(0)
+        X = pd.DataFrame(rng.normal(size=(120, 3)), columns=['a', 'b', 'c'])
+        y = pd.Series((X['a'] > 0).astype(int))
+        with patch.object(support_resistance_ml, 'HAS_XGBOOST', False):
+            results = support_resistance_ml.train_models(X, y)
+        self.assertIn('LightGBM', results)
+        self.assertIn('RandomForest', results)
+
+    def test_parse_importtime(self):
+        """-X importtime の出力をモジュールごと・パッケージごとに集計する"""
+        entries = parse_importtime(SAMPLE_OUTPUT)
+        self.assertEqual([e['module'] for e in entries], ['_io', 'numpy.core', 'numpy', 'enhanced_ml_predictor'])
+        self.assertEqual([e['depth'] for e in entries], [1, 2, 1, 0])
+        self.assertEqual(entries[2]['cumulative_us'], 1800)
+        self.assertEqual(summarize_packages(entries), {'numpy': 1.8, 'enhanced_ml_predictor': 0.2, '_io': 0.12})
+
+    def test_worker_start_method(self):
+        """WORKER_START_METHOD でワーカーの起動方式を切り替える"""
+        import scalable_analysis_system
+        from scalable_analysis_system import ScalableAnalysisSystem
+
+        created = []
+
+        def fake_pool(max_workers, mp_context=None):
+            created.append((max_workers, mp_context))
+            return 'pool'
+
+        system = ScalableAnalysisSystem.__new__(ScalableAnalysisSystem)
+        with patch.object(scalable_analysis_system, 'ProcessPoolExecutor', fake_pool):
+            with patch.dict(os.environ, {'WORKER_START_METHOD': 'default'}):
+                self.assertEqual(system._create_worker_pool(2), 'pool')
+            with patch.dict(os.environ, {'WORKER_START_METHOD': 'no-such-method'}):
+                system._create_worker_pool(2)
+            with patch.dict(os.environ, {'WORKER_START_METHOD': 'spawn'}):
+                system._create_worker_pool(3)
+        self.assertEqual(created[:2], [(2, None), (2, None)])
+        self.assertEqual(created[2][0], 3)
+        self.assertEqual(created[2][1].get_start_method(), 'spawn')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+市場コンテキストの足ごとの系列（MarketContextSeries）のテストケース
+
+SimpleMarketContextAnalyzer.compute_context_series() の各足の値が、その足までのデータで
+従来の計算を呼んだ結果と一致すること、全期間データに対する索引参照が従来の
+最近傍足探索と一致することを確認する
+"""
+
+import unittest
+import os
+import sys
+import pandas as pd
+import numpy as np
+from datetime import timedelta
+from unittest.mock import patch
+
+# プロジェクトルートをパスに追加
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# BaseTestを継承してテスト環境の安全性を確保
+try:
+    from tests_organized.base_test import BaseTest
+    USE_BASE_TEST = True
+except ImportError:
+    USE_BASE_TEST = False
+    print("⚠️ BaseTestが利用できません。標準のunittestを使用します。")
+
+from engines.leverage_decision_engine import SimpleMarketContextAnalyzer, InsufficientMarketDataError
+
+
+def _make_ohlcv(size=120, tz='UTC', seed=0):
+    """ボラティリティの異なる区間を含むOHLCVデータ"""
+    rng = np.random.default_rng(seed)
+    scale = np.where(np.arange(size) < size // 2, 0.004, 0.03)
+    close = 100.0 * np.cumprod(1 + rng.normal(0.001, scale))
+    open_ = np.concatenate([[100.0], close[:-1]])
+    return pd.DataFrame({
+        'timestamp': pd.date_range('2024-01-01', periods=size, freq='1h', tz=tz),
+        'open': open_,
+        'high': np.maximum(open_, close) * 1.002,
+        'low': np.minimum(open_, close) * 0.998,
+        'close': close,
+        'volume': rng.uniform(1000, 5000, size),
+    })
+
+
+class TestMarketContextSeries(BaseTest if USE_BASE_TEST else unittest.TestCase):
+    """足ごとの市場コンテキスト系列のテスト"""
+
+    def setUp(self):
+        """テスト前準備"""
+        if USE_BASE_TEST:
+            super().setUp()
+        self.analyzer = SimpleMarketContextAnalyzer()
+        self.data = _make_ohlcv()
+
+    def assertContextEqual(self, actual, expected, msg=None):
+        self.assertAlmostEqual(actual.current_price, expected.current_price, places=9, msg=msg)
+        self.assertAlmostEqual(actual.volume_24h / expected.volume_24h, 1.0, places=9, msg=msg)
+        self.assertAlmostEqual(actual.volatility, expected.volatility, places=9, msg=msg)
+        self.assertEqual(actual.trend_direction, expected.trend_direction, msg)
+        self.assertEqual(actual.market_phase, expected.market_phase, msg)
+
+    def test_series_matches_prefix_reference(self):
+        """i番目の足の値は、i番目の足までのデータで従来の計算をした結果と一致する（未来を参照しない）"""
+        series = self.analyzer.compute_context_series(self.data)
+        self.assertEqual(len(series), len(self.data))
+        phases = set()
+        for i in range(len(self.data)):
+            prefix = self.data.iloc[:i + 1].copy()
+            expected = self.analyzer._analyze_market_phase_reference(
+                prefix, self.data['timestamp'].iloc[i], is_realtime=False)
+            self.assertContextEqual(series.context_at(i), expected, msg=f"bar {i}")
+            phases.add(expected.market_phase)
+        # 複数のフェーズを通る
+        self.assertGreater(len(phases), 1)
+
+    def test_targets_match_reference(self):
+        """全期間データでの評価時刻（足の間・範囲外・同距離）が従来の最近傍足探索と一致する"""
+        timestamps = self.data['timestamp']
+        targets = list(timestamps.iloc[::7])
+        targets += [ts + timedelta(minutes=m) for ts in timestamps.iloc[::11] for m in (1, 29, 30, 31, 59)]
+        targets += [timestamps.iloc[0] - timedelta(days=3), timestamps.iloc[-1] + timedelta(days=3)]
+
+        with patch.object(SimpleMarketContextAnalyzer, '_analyze_market_phase_reference',
+                          wraps=self.analyzer._analyze_market_phase_reference) as reference:
+            for target in targets:
+                actual = self.analyzer.analyze_market_phase(self.data, target, is_realtime=False)
+                reference.assert_not_called()
+                expected = self.analyzer._analyze_market_phase_reference(
+                    self.data.copy(), target, is_realtime=False)
+                reference.reset_mock()
+                self.assertContextEqual(actual, expected, msg=str(target))
+
+    def test_naive_and_index_timestamps(self):
+        """タイムゾーンなしの時刻・日時インデックスのデータでも従来と一致する"""
+        naive = _make_ohlcv(size=40, tz=None, seed=1)
+        indexed = naive.set_index('timestamp')
+        target = naive['timestamp'].iloc[17] + timedelta(minutes=10)
+        expected = self.analyzer._analyze_market_phase_reference(naive.copy(), target, is_realtime=False)
+        self.assertContextEqual(self.analyzer.analyze_market_phase(naive, target, is_realtime=False), expected)
+        self.assertContextEqual(self.analyzer.analyze_market_phase(indexed, target, is_realtime=False), expected)
+
+        # タイムゾーンの有無が一致しない場合は従来と同じくエラー
+        with self.assertRaises(InsufficientMarketDataError):
+            self.analyzer.analyze_market_phase(naive, self.data['timestamp'].iloc[0], is_realtime=False)
+
+    def test_unordered_data_falls_back(self):
+        """時刻が単調増加でないデータは従来の計算を使う"""
+        shuffled = self.data.sample(frac=1.0, random_state=0).reset_index(drop=True)
+        target = self.data['timestamp'].iloc[50] + timedelta(minutes=20)
+        expected = self.analyzer._analyze_market_phase_reference(shuffled.copy(), target, is_realtime=False)
+        with patch.object(SimpleMarketContextAnalyzer, '_analyze_market_phase_reference',
+                          wraps=self.analyzer._analyze_market_phase_reference) as reference:
+            actual = self.analyzer.analyze_market_phase(shuffled, target, is_realtime=False)
+        self.assertEqual(reference.call_count, 1)
+        self.assertContextEqual(actual, expected)
+
+    def test_series_cached_per_dataframe(self):
+        """同じデータフレームでは系列を1回だけ計算し、変更・別データでは計算し直す"""
+        timestamps = self.data['timestamp']
+        with patch.object(SimpleMarketContextAnalyzer, 'compute_context_series',
+                          wraps=self.analyzer.compute_context_series) as compute:
+            for ts in timestamps.iloc[:30]:
+                self.analyzer.analyze_market_phase(self.data, ts, is_realtime=False)
+            self.assertEqual(compute.call_count, 1)
+
+            self.data.loc[self.data.index[-1], 'close'] *= 1.5
+            changed = self.analyzer.analyze_market_phase(self.data, timestamps.iloc[5], is_realtime=False)
+            self.assertEqual(compute.call_count, 2)
+            expected = self.analyzer._analyze_market_phase_reference(
+                self.data.copy(), timestamps.iloc[5], is_realtime=False)
+            self.assertContextEqual(changed, expected)
+
+            # リアルタイム分析は系列を使わない
+            realtime = self.analyzer.analyze_market_phase(self.data)
+            self.assertEqual(compute.call_count, 2)
+            self.assertEqual(realtime.current_price, float(self.data['close'].iloc[-1]))
+
+        with self.assertRaises(InsufficientMarketDataError):
+            self.analyzer.compute_context_series(self.data.iloc[:0])
+
+
+if __name__ == '__main__':
+    unittest.main()
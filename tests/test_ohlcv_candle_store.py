@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+OHLCVCandleStoreのテストケース
+
+追記・ギャップ検出・過去方向の補完・形成中の足の除外・
+MultiExchangeAPIClientとの連携（保存済み期間はAPIを呼ばない）を確認する
+"""
+
+import unittest
+import asyncio
+import os
+import sys
+import pandas as pd
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+# プロジェクトルートをパスに追加
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# BaseTestを継承してテスト環境の安全性を確保
+try:
+    from tests_organized.base_test import BaseTest
+    USE_BASE_TEST = True
+except ImportError:
+    USE_BASE_TEST = False
+    print("⚠️ BaseTestが利用できません。標準のunittestを使用します。")
+
+from ohlcv_candle_store import OHLCVCandleStore, subtract_ranges, merge_ranges
+
+HOUR_MS = 3_600_000
+DAY_MS = 24 * HOUR_MS
+BASE_MS = int(datetime(2024, 1, 1, tzinfo=timezone.utc).timestamp() * 1000)
+
+
+def _make_candles(start_ms, count, step_ms=HOUR_MS):
+    timestamps = start_ms + np.arange(count, dtype=np.int64) * step_ms
+    prices = 100 + (timestamps - BASE_MS) / HOUR_MS * 0.1
+    return pd.DataFrame({
+        'timestamp': pd.to_datetime(timestamps, unit='ms', utc=True),
+        'open': prices,
+        'high': prices + 1,
+        'low': prices - 1,
+        'close': prices + 0.5,
+        'volume': np.full(count, 10.0),
+        'trades': np.full(count, 3, dtype=np.int64),
+    })
+
+
+def _append_in_worker(args):
+    base_dir, start_ms, count = args
+    store = OHLCVCandleStore(base_dir)
+    return store.append('hyperliquid', 'SOL', '1h', _make_candles(start_ms, count),
+                        covered_ranges=[(start_ms, start_ms + count * HOUR_MS)],
+                        now_ms=BASE_MS + 1000 * DAY_MS)
+
+
+class _FakeInfo:
+    """candles_snapshotの呼び出し回数を記録するHyperliquid Infoの代替"""
+
+    calls = []
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def candles_snapshot(self, symbol, timeframe, start_ms, end_ms):
+        _FakeInfo.calls.append((symbol, timeframe, start_ms, end_ms))
+        first = -(-start_ms // HOUR_MS) * HOUR_MS
+        return [{'t': t, 'o': 1.0, 'h': 2.0, 'l': 0.5, 'c': 1.5, 'v': 10.0, 'n': 5}
+                for t in range(first, end_ms + 1, HOUR_MS)]
+
+
+class TestOHLCVCandleStore(BaseTest if USE_BASE_TEST else unittest.TestCase):
+    """ローカルキャンドルストアのテスト"""
+
+    def setUp(self):
+        """テスト前準備"""
+        if USE_BASE_TEST:
+            super().setUp()
+        else:
+            import tempfile
+            self.test_dir = tempfile.mkdtemp()
+
+        self.store_dir = os.path.join(self.test_dir, 'ohlcv_store')
+        self.store = OHLCVCandleStore(self.store_dir)
+        self.far_future = BASE_MS + 1000 * DAY_MS
+
+    def test_range_helpers(self):
+        """区間の結合と差分"""
+        self.assertEqual(merge_ranges([(5, 10), (0, 3), (3, 4), (9, 12)]), [(0, 4), (5, 12)])
+        self.assertEqual(subtract_ranges(0, 20, [(2, 5), (8, 10)]), [(0, 2), (5, 8), (10, 20)])
+        self.assertEqual(subtract_ranges(0, 10, [(0, 10)]), [])
+
+    def test_append_read_and_gap_detection(self):
+        """追記した期間はギャップとして検出されず、memmapで読み込める"""
+        added = self.store.append('hyperliquid', 'SOL', '1h', _make_candles(BASE_MS, 48),
+                                  covered_ranges=[(BASE_MS, BASE_MS + 2 * DAY_MS)], now_ms=self.far_future)
+        self.assertEqual(added, 48)
+
+        self.assertEqual(self.store.missing_ranges('hyperliquid', 'SOL', '1h', BASE_MS, BASE_MS + 2 * DAY_MS - 1), [])
+        self.assertEqual(self.store.missing_ranges('hyperliquid', 'SOL', '1h', BASE_MS, BASE_MS + 3 * DAY_MS - 1),
+                         [(BASE_MS + 2 * DAY_MS, BASE_MS + 3 * DAY_MS)])
+
+        arrays = self.store.read_arrays('hyperliquid', 'SOL', '1h', BASE_MS + HOUR_MS, BASE_MS + 10 * HOUR_MS)
+        self.assertIsInstance(arrays['close'], np.memmap)
+        self.assertEqual(len(arrays['timestamp']), 10)
+
+        df = self.store.read_dataframe('hyperliquid', 'SOL', '1h')
+        pd.testing.assert_frame_equal(df.drop(columns='timestamp'),
+                                      _make_candles(BASE_MS, 48).drop(columns='timestamp'))
+        self.assertEqual(str(df['timestamp'].dt.tz), 'UTC')
+
+        # 重複データは追加されない
+        self.assertEqual(self.store.append('hyperliquid', 'SOL', '1h', _make_candles(BASE_MS, 48),
+                                           now_ms=self.far_future), 0)
+
+    def test_backfill_keeps_order_and_existing_maps(self):
+        """過去方向の補完後も時刻順で、既存の読み込み結果は変化しない"""
+        self.store.append('hyperliquid', 'SOL', '1h', _make_candles(BASE_MS + DAY_MS, 24),
+                          covered_ranges=[(BASE_MS + DAY_MS, BASE_MS + 2 * DAY_MS)], now_ms=self.far_future)
+        before = self.store.read_arrays('hyperliquid', 'SOL', '1h')
+        before_copy = np.array(before['timestamp'])
+
+        self.store.append('hyperliquid', 'SOL', '1h', _make_candles(BASE_MS, 24),
+                          covered_ranges=[(BASE_MS, BASE_MS + DAY_MS)], now_ms=self.far_future)
+
+        after = self.store.read_arrays('hyperliquid', 'SOL', '1h')
+        self.assertEqual(len(after['timestamp']), 48)
+        self.assertTrue(np.all(np.diff(after['timestamp']) > 0))
+        np.testing.assert_array_equal(before['timestamp'], before_copy)
+        self.assertEqual(self.store.coverage('hyperliquid', 'SOL', '1h'), [(BASE_MS, BASE_MS + 2 * DAY_MS)])
+
+    def test_interrupted_backfill_keeps_previous_data(self):
+        """補完の書き込みが途中で失敗してもカラムとメタデータは補完前のまま残る"""
+        self.store.append('hyperliquid', 'SOL', '1h', _make_candles(BASE_MS + DAY_MS, 24),
+                          covered_ranges=[(BASE_MS + DAY_MS, BASE_MS + 2 * DAY_MS)], now_ms=self.far_future)
+        before = self.store.read_dataframe('hyperliquid', 'SOL', '1h')
+
+        with patch.object(OHLCVCandleStore, '_write_meta', side_effect=OSError('disk full')):
+            with self.assertRaises(OSError):
+                self.store.append('hyperliquid', 'SOL', '1h', _make_candles(BASE_MS, 24),
+                                  covered_ranges=[(BASE_MS, BASE_MS + DAY_MS)], now_ms=self.far_future)
+
+        pd.testing.assert_frame_equal(self.store.read_dataframe('hyperliquid', 'SOL', '1h'), before)
+        self.assertEqual(self.store.coverage('hyperliquid', 'SOL', '1h'), [(BASE_MS + DAY_MS, BASE_MS + 2 * DAY_MS)])
+
+        # 再実行で補完され、一時ディレクトリは残らない
+        self.store.append('hyperliquid', 'SOL', '1h', _make_candles(BASE_MS, 24),
+                          covered_ranges=[(BASE_MS, BASE_MS + DAY_MS)], now_ms=self.far_future)
+        self.assertEqual(len(self.store.read_arrays('hyperliquid', 'SOL', '1h')['timestamp']), 48)
+        symbol_dir = os.path.join(self.store_dir, 'hyperliquid', 'SOL')
+        self.assertEqual(sorted(os.listdir(symbol_dir)), ['.1h.lock', '1h'])
+
+    def test_forming_candle_is_not_stored(self):
+        """形成中の足は保存せず、その期間は未取得のまま"""
+        now_ms = BASE_MS + 10 * HOUR_MS + 30 * 60 * 1000
+        self.store.append('hyperliquid', 'SOL', '1h', _make_candles(BASE_MS, 11),
+                          covered_ranges=[(BASE_MS, now_ms)], now_ms=now_ms)
+
+        arrays = self.store.read_arrays('hyperliquid', 'SOL', '1h')
+        self.assertEqual(len(arrays['timestamp']), 10)
+        self.assertEqual(self.store.missing_ranges('hyperliquid', 'SOL', '1h', BASE_MS, now_ms),
+                         [(BASE_MS + 10 * HOUR_MS, now_ms + 1)])
+
+    def test_concurrent_process_appends(self):
+        """複数プロセスからの同時追記でもデータが壊れない"""
+        jobs = [(self.store_dir, BASE_MS + i * DAY_MS, 24) for i in range(6)]
+        with ProcessPoolExecutor(max_workers=3) as executor:
+            added = list(executor.map(_append_in_worker, jobs + jobs))
+
+        self.assertEqual(sum(added), 6 * 24)
+        arrays = self.store.read_arrays('hyperliquid', 'SOL', '1h')
+        np.testing.assert_array_equal(arrays['timestamp'], BASE_MS + np.arange(6 * 24, dtype=np.int64) * HOUR_MS)
+        self.assertEqual(self.store.coverage('hyperliquid', 'SOL', '1h'), [(BASE_MS, BASE_MS + 6 * DAY_MS)])
+
+    def test_api_client_fetches_only_missing_ranges(self):
+        """MultiExchangeAPIClientは保存済みの期間をAPIから再取得しない"""
+        async def no_sleep(*args, **kwargs):
+            return None
+
+        _FakeInfo.calls = []
+        with patch.dict(os.environ, {'OHLCV_STORE_DIR': self.store_dir, 'OHLCV_STORE_ENABLED': 'true'}), \
+             patch('hyperliquid_api_client.Info', _FakeInfo), \
+             patch('hyperliquid_api_client.asyncio.sleep', no_sleep):
+            from hyperliquid_api_client import MultiExchangeAPIClient
+            client = MultiExchangeAPIClient(exchange_type='hyperliquid')
+
+            start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+            end = start + timedelta(days=3)
+            first = asyncio.run(client.get_ohlcv_data('SOL', '1h', start, end))
+            first_calls = len(_FakeInfo.calls)
+            # 3日分の1h足は1リクエストの上限本数に収まるため1回で取得
+            self.assertEqual(first_calls, 1)
+
+            second = asyncio.run(client.get_ohlcv_data('SOL', '1h', start, end))
+            self.assertEqual(len(_FakeInfo.calls), first_calls)
+            pd.testing.assert_frame_equal(first, second)
+
+            asyncio.run(client.get_ohlcv_data('SOL', '1h', start, end + timedelta(days=1)))
+            new_calls = _FakeInfo.calls[first_calls:]
+            self.assertEqual(len(new_calls), 1)
+            self.assertGreater(new_calls[0][2], int(end.timestamp() * 1000))
+
+    def test_btc_correlation_predictor_reuses_store(self):
+        """BTC相関予測の過去データ取得もストアを共有し、2回目はAPIを呼ばない"""
+        _FakeInfo.calls = []
+        with patch.dict(os.environ, {'OHLCV_STORE_DIR': self.store_dir, 'OHLCV_STORE_ENABLED': 'true'}), \
+             patch('btc_altcoin_correlation_predictor.Info', _FakeInfo), \
+             patch('btc_altcoin_correlation_predictor.time.sleep'):
+            from btc_altcoin_correlation_predictor import BTCAltcoinCorrelationPredictor
+            predictor = BTCAltcoinCorrelationPredictor()
+
+            first = predictor.fetch_historical_data('BTC', '1h', days=2)
+            first_calls = len(_FakeInfo.calls)
+            self.assertEqual(first_calls, 2)
+            self.assertTrue(first.index.is_unique)
+            self.assertIsNone(first.index.tz)
+
+            second = predictor.fetch_historical_data('BTC', '1h', days=2)
+            # 形成中の足を含む直近の期間のみ再取得される
+            self.assertLessEqual(len(_FakeInfo.calls) - first_calls, 1)
+            self.assertGreaterEqual(len(second), len(first) - 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+OHLCVRangeFetcherのテストケース
+
+ウィンドウ分割・並行取得・429リトライ・重複排除と、
+疑似取引所サーバーに対するMultiExchangeAPIClientの取得を確認する
+"""
+
+import unittest
+import asyncio
+import os
+import random
+import sys
+import threading
+import time
+import pandas as pd
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+# プロジェクトルートをパスに追加
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# BaseTestを継承してテスト環境の安全性を確保
+try:
+    from tests_organized.base_test import BaseTest
+    USE_BASE_TEST = True
+except ImportError:
+    USE_BASE_TEST = False
+    print("⚠️ BaseTestが利用できません。標準のunittestを使用します。")
+
+from ohlcv_range_fetcher import (
+    OHLCVRangeFetcher, ExchangeRateProfile, TokenBucket, split_range, is_rate_limit_error
+)
+from fake_exchange_server import FakeExchangeServer
+
+HOUR_MS = 3_600_000
+DAY_MS = 24 * HOUR_MS
+BASE_MS = int(datetime(2024, 1, 1, tzinfo=timezone.utc).timestamp() * 1000)
+
+
+class _RateLimitError(Exception):
+    status_code = 429
+
+
+async def _no_sleep(*args, **kwargs):
+    return None
+
+
+def _profile(**overrides):
+    settings = dict(name='test', max_candles_per_request=24, requests_per_second=1000.0,
+                    burst=1000, max_concurrency=4)
+    settings.update(overrides)
+    return ExchangeRateProfile(**settings)
+
+
+class TestOHLCVRangeFetcher(BaseTest if USE_BASE_TEST else unittest.TestCase):
+    """期間フェッチャーのテスト"""
+
+    def _hourly_window(self, window_start, window_end):
+        first = -(-window_start // HOUR_MS) * HOUR_MS
+        return [{'timestamp': t} for t in range(first, window_end + 1, HOUR_MS)]
+
+    def test_split_range(self):
+        """ウィンドウは重ならず期間全体を覆う"""
+        windows = split_range(0, 99, 30)
+        self.assertEqual(windows, [(0, 29), (30, 59), (60, 89), (90, 99)])
+        self.assertEqual(split_range(5, 5, 10), [(5, 5)])
+        self.assertEqual(split_range(10, 5, 10), [])
+        with self.assertRaises(ValueError):
+            split_range(0, 10, 0)
+
+    def test_windows_sized_to_candle_cap(self):
+        """ウィンドウ幅は1リクエストの上限本数に合わせる"""
+        fetcher = OHLCVRangeFetcher(_profile(), sleep=_no_sleep)
+        calls = []
+
+        def fetch_window(window_start, window_end):
+            calls.append((window_start, window_end))
+            return self._hourly_window(window_start, window_end)
+
+        result = asyncio.run(fetcher.fetch(fetch_window, BASE_MS, BASE_MS + 5 * DAY_MS - 1,
+                                           fetcher.window_ms_for(HOUR_MS)))
+
+        self.assertEqual(len(calls), 5)
+        self.assertEqual(result.windows, 5)
+        self.assertEqual([row['timestamp'] for row in result.rows],
+                         list(range(BASE_MS, BASE_MS + 5 * DAY_MS, HOUR_MS)))
+
+    def test_concurrent_windows(self):
+        """ウィンドウは同時実行数の上限まで並行に取得される"""
+        fetcher = OHLCVRangeFetcher(_profile(max_concurrency=4), sleep=_no_sleep)
+        lock = threading.Lock()
+        state = {'in_flight': 0, 'max_in_flight': 0}
+
+        def fetch_window(window_start, window_end):
+            with lock:
+                state['in_flight'] += 1
+                state['max_in_flight'] = max(state['max_in_flight'], state['in_flight'])
+            time.sleep(0.05)
+            with lock:
+                state['in_flight'] -= 1
+            return self._hourly_window(window_start, window_end)
+
+        started = time.perf_counter()
+        asyncio.run(fetcher.fetch(fetch_window, BASE_MS, BASE_MS + 8 * DAY_MS - 1, DAY_MS))
+        elapsed = time.perf_counter() - started
+
+        self.assertGreater(state['max_in_flight'], 1)
+        self.assertLessEqual(state['max_in_flight'], 4)
+        self.assertLess(elapsed, 8 * 0.05)
+
+    def test_rate_limit_retry_with_backoff(self):
+        """429はジッター付きバックオフでリトライし、それ以外のエラーは失敗ウィンドウになる"""
+        sleeps = []
+
+        async def record_sleep(seconds):
+            sleeps.append(seconds)
+
+        fetcher = OHLCVRangeFetcher(_profile(backoff_base=1.0), rng=random.Random(0), sleep=record_sleep)
+        attempts = {}
+
+        def fetch_window(window_start, window_end):
+            attempts[window_start] = attempts.get(window_start, 0) + 1
+            if window_start == BASE_MS and attempts[window_start] <= 2:
+                raise _RateLimitError('Too many requests')
+            if window_start == BASE_MS + DAY_MS:
+                raise RuntimeError('connection reset')
+            return self._hourly_window(window_start, window_end)
+
+        result = asyncio.run(fetcher.fetch(fetch_window, BASE_MS, BASE_MS + 3 * DAY_MS - 1, DAY_MS))
+
+        self.assertEqual(attempts[BASE_MS], 3)
+        self.assertEqual(result.rate_limited, 2)
+        self.assertEqual(len(sleeps), 2)
+        self.assertTrue(0.5 <= sleeps[0] <= 1.5)
+        self.assertTrue(1.0 <= sleeps[1] <= 3.0)
+        self.assertEqual(result.failed_windows, [(BASE_MS + DAY_MS, BASE_MS + 2 * DAY_MS - 1)])
+        self.assertEqual(len(result.rows), 48)
+
+    def test_rate_limit_gives_up_after_max_retries(self):
+        """429が続く場合は最大リトライ回数で失敗ウィンドウとする"""
+        fetcher = OHLCVRangeFetcher(_profile(max_retries=2), sleep=_no_sleep)
+
+        def fetch_window(window_start, window_end):
+            raise _RateLimitError('429')
+
+        result = asyncio.run(fetcher.fetch(fetch_window, BASE_MS, BASE_MS + DAY_MS - 1, DAY_MS))
+        self.assertEqual(result.requests, 3)
+        self.assertEqual(len(result.failed_windows), 1)
+
+    def test_stitch_and_deduplicate(self):
+        """ウィンドウ間で重複した足は1本にまとめ、時刻順に並べる"""
+        fetcher = OHLCVRangeFetcher(_profile(), sleep=_no_sleep)
+
+        def fetch_window(window_start, window_end):
+            # ウィンドウ境界をまたいで1本余分に返す取引所を想定
+            rows = self._hourly_window(window_start, window_end + HOUR_MS)
+            return list(reversed(rows))
+
+        result = asyncio.run(fetcher.fetch(fetch_window, BASE_MS, BASE_MS + 2 * DAY_MS - 1, DAY_MS))
+        timestamps = [row['timestamp'] for row in result.rows]
+        self.assertEqual(timestamps, list(range(BASE_MS, BASE_MS + 2 * DAY_MS + HOUR_MS, HOUR_MS)))
+
+    def test_token_bucket(self):
+        """トークンバケットは容量を超えた分の待機時間を返す"""
+        now = [0.0]
+        bucket = TokenBucket(rate=2.0, capacity=2, clock=lambda: now[0])
+        self.assertEqual(bucket.reserve(), 0.0)
+        self.assertEqual(bucket.reserve(), 0.0)
+        self.assertAlmostEqual(bucket.reserve(), 0.5)
+        self.assertAlmostEqual(bucket.reserve(), 1.0)
+        now[0] = 10.0
+        self.assertEqual(bucket.reserve(), 0.0)
+
+    def test_is_rate_limit_error(self):
+        """429系のエラー判定"""
+        self.assertTrue(is_rate_limit_error(_RateLimitError('x')))
+        self.assertTrue(is_rate_limit_error(Exception('HTTP 429 Too Many Requests')))
+        self.assertTrue(is_rate_limit_error(type('RateLimitExceeded', (Exception,), {})('gateio')))
+        self.assertFalse(is_rate_limit_error(RuntimeError('connection reset')))
+
+    def _hyperliquid_fetch(self, candles_snapshot, max_candles_per_request, days=10):
+        """疑似の candles_snapshot で _get_hyperliquid_ohlcv を実行し、(DataFrame, failed_ranges) を返す"""
+        from hyperliquid_api_client import MultiExchangeAPIClient
+        # クライアントの初期化だけ疑似サーバーに接続し、取得は candles_snapshot を差し替える
+        with FakeExchangeServer() as server, patch.dict(os.environ, {'HYPERLIQUID_API_URL': server.url}):
+            client = MultiExchangeAPIClient(exchange_type='hyperliquid')
+        client.hyperliquid_client = type('FakeInfo', (), {'candles_snapshot': staticmethod(candles_snapshot)})()
+        start = datetime.fromtimestamp(BASE_MS / 1000, tz=timezone.utc)
+        failed_ranges = []
+        with patch('ohlcv_range_fetcher.EXCHANGE_RATE_PROFILES',
+                   {'hyperliquid': _profile(name='hyperliquid', max_candles_per_request=max_candles_per_request)}):
+            df = asyncio.run(client._get_hyperliquid_ohlcv('SOL', '1h', start, start + timedelta(days=days),
+                                                           failed_ranges=failed_ranges))
+        return df, failed_ranges
+
+    def test_api_client_failure_tolerance_per_day(self):
+        """失敗の許容は日単位（データのない日が3割まで）で、空のウィンドウは取得済み扱い"""
+        def candles(days_without_data, failing_days=()):
+            def candles_snapshot(symbol, timeframe, start_ms, end_ms):
+                if (start_ms - BASE_MS) // DAY_MS in failing_days:
+                    raise RuntimeError('connection reset')
+                return [{'t': row['timestamp'], 'o': 1.0, 'h': 2.0, 'l': 0.5, 'c': 1.5, 'v': 10.0, 'n': 5}
+                        for row in self._hourly_window(start_ms, end_ms)
+                        if (row['timestamp'] - BASE_MS) // DAY_MS not in days_without_data]
+            return candles_snapshot
+
+        # 1日ずつのウィンドウ: 上場前の2日は空の応答（取得済み）、1日は取得失敗（未取得）
+        df, failed_ranges = self._hyperliquid_fetch(candles({0, 1}, failing_days={5}), max_candles_per_request=24)
+        self.assertEqual(len(df), 7 * 24 + 1)  # 終了時刻の足を含む
+        self.assertEqual(failed_ranges, [(BASE_MS + 5 * DAY_MS, BASE_MS + 6 * DAY_MS)])
+
+        with self.assertRaises(ValueError):
+            self._hyperliquid_fetch(candles({0, 1, 2}, failing_days={5}), max_candles_per_request=24)
+
+        # 1ウィンドウに全期間が収まる場合も、データのない日数で判定する
+        df, failed_ranges = self._hyperliquid_fetch(candles({0, 1, 2}), max_candles_per_request=1000)
+        self.assertEqual((len(df), failed_ranges), (7 * 24 + 1, []))
+        with self.assertRaises(ValueError):
+            self._hyperliquid_fetch(candles({0, 1, 2, 3}), max_candles_per_request=1000)
+
+    def test_api_client_against_fake_server(self):
+        """MultiExchangeAPIClientが疑似サーバーから429を挟んでも欠損なく取得する"""
+        with FakeExchangeServer(latency=0.01, max_candles_per_request=100, rate_limit_every=3) as server, \
+             patch.dict(os.environ, {'HYPERLIQUID_API_URL': server.url, 'OHLCV_STORE_ENABLED': 'false'}), \
+             patch('ohlcv_range_fetcher.EXCHANGE_RATE_PROFILES',
+                   {'hyperliquid': _profile(name='hyperliquid', max_candles_per_request=100, backoff_base=0.01)}):
+            from hyperliquid_api_client import MultiExchangeAPIClient
+            client = MultiExchangeAPIClient(exchange_type='hyperliquid')
+
+            start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+            end = start + timedelta(days=20) - timedelta(hours=1)
+            df = asyncio.run(client.get_ohlcv_data('SOL', '1h', start, end))
+
+            self.assertEqual(len(df), 20 * 24)
+            self.assertTrue(df['timestamp'].is_monotonic_increasing)
+            self.assertTrue(df['timestamp'].is_unique)
+            self.assertEqual(df['timestamp'].iloc[0], pd.Timestamp(start))
+            self.assertGreater(server.stats['rate_limited'], 0)
+            self.assertGreater(server.stats['max_in_flight'], 1)
+
+            # 同じ期間は同じデータ（決定的）
+            again = asyncio.run(client.get_ohlcv_data('SOL', '1h', start, end))
+            pd.testing.assert_frame_equal(df, again)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+パイプラインベンチマーク（pipeline_benchmark）のテストケース
+
+合成OHLCVデータが決定的で局面ごとの特徴を持つこと、ベースライン比較が
+しきい値を超える劣化だけを検出すること、計測結果がJSONで往復できることを確認する
+"""
+
+import unittest
+import os
+import sys
+import tempfile
+import numpy as np
+
+# プロジェクトルートをパスに追加
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# BaseTestを継承してテスト環境の安全性を確保
+try:
+    from tests_organized.base_test import BaseTest
+    USE_BASE_TEST = True
+except ImportError:
+    USE_BASE_TEST = False
+    print("⚠️ BaseTestが利用できません。標準のunittestを使用します。")
+
+import pipeline_benchmark
+from pipeline_benchmark import generate_synthetic_ohlcv, compare_results, run_benchmark
+
+
+def _result(stages, params=None):
+    return {'version': pipeline_benchmark.RESULT_VERSION, 'params': params or {'bars': 100}, 'stages': stages}
+
+
+class TestPipelineBenchmark(BaseTest if USE_BASE_TEST else unittest.TestCase):
+    """パイプラインベンチマークのテスト"""
+
+    def setUp(self):
+        """テスト前準備"""
+        if USE_BASE_TEST:
+            super().setUp()
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        """テスト後クリーンアップ"""
+        self.tmp.cleanup()
+        if USE_BASE_TEST:
+            super().tearDown()
+
+    def test_synthetic_data_deterministic(self):
+        """同じ条件なら同じデータ、シードが違えば別のデータになり、OHLCの整合性を保つ"""
+        first = generate_synthetic_ohlcv(500, '15m', regime='mixed', seed=7)
+        second = generate_synthetic_ohlcv(500, '15m', regime='mixed', seed=7)
+        other = generate_synthetic_ohlcv(500, '15m', regime='mixed', seed=8)
+
+        self.assertTrue(first.equals(second))
+        self.assertFalse(np.allclose(first['close'], other['close']))
+        self.assertEqual(len(first), 500)
+        self.assertEqual((first['timestamp'].iloc[1] - first['timestamp'].iloc[0]).total_seconds(), 900)
+        self.assertTrue((first['high'] >= first[['open', 'close']].max(axis=1)).all())
+        self.assertTrue((first['low'] <= first[['open', 'close']].min(axis=1)).all())
+        self.assertTrue((first['volume'] > 0).all())
+
+        with self.assertRaises(ValueError):
+            generate_synthetic_ohlcv(100, regime='sideways')
+
+    def test_regimes(self):
+        """局面ごとに値動きの特徴が異なる"""
+        trend = generate_synthetic_ohlcv(1000, regime='trend', seed=1)['close']
+        ranging = generate_synthetic_ohlcv(1000, regime='range', seed=1)['close']
+        crash = generate_synthetic_ohlcv(1000, regime='crash', seed=1)['close']
+
+        self.assertGreater(trend.iloc[-1] / trend.iloc[0], 1.5)
+        self.assertLess(abs(np.log(ranging.iloc[-1] / ranging.iloc[0])), 0.3)
+        drawdown = (crash / crash.cummax() - 1).min()
+        self.assertLess(drawdown, -0.25)
+
+    def test_compare_flags_regressions(self):
+        """しきい値以上かつ最小増加量以上の増加だけを劣化とする"""
+        baseline = _result({
+            'slow': {'status': 'ok', 'median_ms': 100.0},
+            'noise': {'status': 'ok', 'median_ms': 0.5},
+            'fast': {'status': 'ok', 'median_ms': 100.0},
+            'stable': {'status': 'ok', 'median_ms': 100.0},
+            'skipped': {'status': 'skipped', 'reason': 'config'},
+        })
+        current = _result({
+            'slow': {'status': 'ok', 'median_ms': 130.0},
+            'noise': {'status': 'ok', 'median_ms': 1.0},
+            'fast': {'status': 'ok', 'median_ms': 50.0},
+            'stable': {'status': 'ok', 'median_ms': 110.0},
+            'skipped': {'status': 'ok', 'median_ms': 10.0},
+        }, params={'bars': 200})
+
+        comparison = compare_results(baseline, current, threshold_pct=20)
+        self.assertEqual(comparison['regressions'], ['slow'])
+        self.assertFalse(comparison['params_match'])
+        self.assertEqual(comparison['stages']['noise']['status'], 'ok')
+        self.assertEqual(comparison['stages']['fast']['status'], 'improvement')
+        self.assertEqual(comparison['stages']['stable']['status'], 'ok')
+        self.assertEqual(comparison['stages']['skipped']['status'], 'not_comparable')
+        self.assertEqual(compare_results(baseline, current, threshold_pct=50)['regressions'], [])
+
+    def test_run_and_compare_cli(self):
+        """少ない本数で計測し、JSONの保存・読み込み・CLIでの比較ができる"""
+        previous = os.environ.get('STAGE_PROFILER_ENABLED')
+        result = run_benchmark(bars=600, timeframe='1h', regime='range', repeat=1, evaluations=5,
+                               stages=['sr_detection', 'market_context', 'tp_sl_exit'])
+        self.assertEqual(list(result['stages']), ['sr_detection', 'market_context', 'tp_sl_exit'])
+        for stage in result['stages'].values():
+            self.assertEqual(stage['status'], 'ok', stage.get('reason'))
+            self.assertGreater(stage['median_ms'], 0)
+        self.assertEqual(result['stages']['market_context']['items'], 5)
+        # 計測中に無効化したステージプロファイラーの設定は元に戻る
+        self.assertEqual(os.environ.get('STAGE_PROFILER_ENABLED'), previous)
+
+        path = pipeline_benchmark.save_result(result, os.path.join(self.tmp.name, 'baseline.json'))
+        self.assertEqual(pipeline_benchmark.load_result(path), result)
+
+        slower = pipeline_benchmark.load_result(path)
+        slower['stages']['tp_sl_exit']['median_ms'] = result['stages']['tp_sl_exit']['median_ms'] * 3 + 5
+        slower_path = pipeline_benchmark.save_result(slower, os.path.join(self.tmp.name, 'current.json'))
+        self.assertEqual(pipeline_benchmark.main(['compare', str(path), str(path)]), 0)
+        self.assertEqual(pipeline_benchmark.main(['compare', str(path), str(slower_path)]), 1)
+
+        with self.assertRaises(ValueError):
+            run_benchmark(bars=100, stages=['unknown'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -457,6 +457,90 @@ class TestDataConsistency(BaseTest if USE_BASE_TEST else unittest.TestCase):
         test_case.tearDown()
 
 
+class TestIndicatorArrays(BaseTest if USE_BASE_TEST else unittest.TestCase):
+    """指標配列（全期間を事前計算した配列の参照）のテスト"""
+    
+    def setUp(self):
+        """テスト前準備"""
+        if USE_BASE_TEST:
+            super().setUp()
+        
+        rng = np.random.default_rng(3)
+        periods = 400
+        closes = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, periods)))
+        self.ohlcv_data = pd.DataFrame({
+            'timestamp': pd.date_range('2024-01-15', periods=periods, freq='1min', tz='UTC'),
+            'open': closes,
+            'high': closes * 1.003,
+            'low': closes * 0.997,
+            'close': closes,
+            'volume': rng.uniform(0, 5, periods).round()
+        })
+        self.ohlcv_data.loc[100:130, 'volume'] = 0
+        self.ohlcv_data.loc[200, 'close'] = np.nan
+        self.ohlcv_data.loc[300, 'high'] = np.nan
+    
+    def _call(self, prepared_data, method, eval_time, period):
+        try:
+            return getattr(prepared_data, method)(eval_time, period)
+        except Exception as e:
+            return type(e).__name__
+    
+    def test_matches_per_call_computation(self):
+        """配列参照の値は従来の都度計算と完全に一致する"""
+        from engines.data_preparers import RealPreparedData
+        
+        fast = RealPreparedData(self.ohlcv_data)
+        slow = RealPreparedData(self.ohlcv_data, use_indicator_arrays=False)
+        
+        timestamps = self.ohlcv_data['timestamp']
+        eval_times = ([timestamps.iloc[0] - timedelta(minutes=5)] + list(timestamps[::3])
+                      + [t + timedelta(seconds=30) for t in timestamps[::11]]
+                      + [timestamps.iloc[-1] + timedelta(hours=1)])
+        
+        for method in ('get_atr_at', 'get_rsi', 'get_moving_average', 'get_vwap', 'get_volatility_at'):
+            for period in (1, 2, 14, 20, 50):
+                for eval_time in eval_times:
+                    expected = self._call(slow, method, eval_time, period)
+                    actual = self._call(fast, method, eval_time, period)
+                    if isinstance(expected, float) and np.isnan(expected):
+                        self.assertTrue(np.isnan(actual), f"{method}({eval_time}, {period})")
+                    else:
+                        self.assertEqual(actual, expected, f"{method}({eval_time}, {period})")
+        
+        self.assertEqual(slow.get_indicator_stats()['count'], 0)
+    
+    def test_registry_is_bounded(self):
+        """保持する指標配列は上限数を超えない（古いものから破棄）"""
+        from engines.data_preparers import RealPreparedData
+        
+        prepared_data = RealPreparedData(self.ohlcv_data, max_indicator_arrays=2)
+        eval_time = self.ohlcv_data['timestamp'].iloc[250]
+        
+        prepared_data.get_rsi(eval_time, 14)
+        prepared_data.get_atr_at(eval_time, 14)
+        prepared_data.get_rsi(eval_time, 14)
+        prepared_data.get_moving_average(eval_time, 20)
+        
+        stats = prepared_data.get_indicator_stats()
+        self.assertEqual(stats['arrays'], [('rsi', 14), ('sma', 20)])
+        self.assertEqual(stats['bytes'], 2 * len(self.ohlcv_data) * 8)
+    
+    def test_precompute(self):
+        """precompute指定時は初期化時に計算し、参照時は再計算しない"""
+        from engines.data_preparers import RealPreparedData
+        
+        prepared_data = RealPreparedData(self.ohlcv_data, precompute=True)
+        self.assertEqual(set(prepared_data.get_indicator_stats()['arrays']),
+                         {(name, periods[0]) for name, periods in RealPreparedData.DEFAULT_PRECOMPUTE.items()})
+        
+        with patch.dict(RealPreparedData.INDICATOR_REGISTRY, {'atr': Mock(side_effect=AssertionError)}):
+            prepared_data.get_atr_at(self.ohlcv_data['timestamp'].iloc[50], 14)
+        
+        custom = RealPreparedData(self.ohlcv_data, precompute={'vwap': [10, 30]})
+        self.assertEqual(custom.get_indicator_stats()['arrays'], [('vwap', 10), ('vwap', 30)])
+
+
 if __name__ == '__main__':
     # テスト実行時のログ出力
     print("🧪 実データ利用PreparedDataテスト開始")
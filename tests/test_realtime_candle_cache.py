@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+リアルタイム監視の非同期コア（CandleCache・LatencyTracker）のテストケース
+
+2回目以降の取得が最新足以降だけの差分取得になること、同じ(銘柄, 時間足)の同時要求が
+1回の取得にまとめられること、取引所ごとの同時取得数が制限されること、
+足確定からアラートまでの遅延が銘柄ごとに記録されることを確認する
+"""
+
+import unittest
+import asyncio
+import os
+import sys
+import pandas as pd
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+# プロジェクトルートをパスに追加
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# BaseTestを継承してテスト環境の安全性を確保
+try:
+    from tests_organized.base_test import BaseTest
+    USE_BASE_TEST = True
+except ImportError:
+    USE_BASE_TEST = False
+    print("⚠️ BaseTestが利用できません。標準のunittestを使用します。")
+
+from real_time_system.utils.candle_cache import CandleCache, latest_candle_close
+from real_time_system.utils.scheduler_utils import LatencyTracker
+
+BASE_TIME = datetime(2024, 6, 1, tzinfo=timezone.utc)
+
+
+class _FakeExchange:
+    """1時間足を返す疑似取引所（形成中の足は取得時刻に応じて終値が変わる）"""
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.calls = []
+        self.in_flight = {}
+        self.max_in_flight = {}
+
+    async def fetch(self, exchange, symbol, timeframe, start_time, end_time):
+        self.calls.append((exchange, symbol, timeframe, start_time, end_time))
+        self.in_flight[exchange] = self.in_flight.get(exchange, 0) + 1
+        self.max_in_flight[exchange] = max(self.max_in_flight.get(exchange, 0), self.in_flight[exchange])
+        try:
+            await asyncio.sleep(self.latency)
+        finally:
+            self.in_flight[exchange] -= 1
+
+        first = pd.Timestamp(start_time).ceil('h')
+        timestamps = pd.date_range(first, pd.Timestamp(end_time), freq='h')
+        return pd.DataFrame({
+            'timestamp': timestamps,
+            'close': [t.timestamp() / 3600 + (end_time - t).total_seconds() / 1e6 for t in timestamps],
+        })
+
+
+class TestRealtimeCandleCache(BaseTest if USE_BASE_TEST else unittest.TestCase):
+    """非同期監視コアのキャッシュ・遅延記録のテスト"""
+
+    def setUp(self):
+        """テスト前準備"""
+        if USE_BASE_TEST:
+            super().setUp()
+        self.now = BASE_TIME
+        self.exchange = _FakeExchange()
+        self.cache = CandleCache(fetch_func=self.exchange.fetch, lookback_days=10, clock=lambda: self.now)
+
+    def test_incremental_refresh(self):
+        """2回目以降は最新足から現在までだけを取得し、形成中だった足を置き換えて期間を保つ"""
+        first = asyncio.run(self.cache.get('HYPE', '1h', 'hyperliquid'))
+        self.assertEqual(self.exchange.calls[0][3], BASE_TIME - timedelta(days=10))
+        self.assertEqual(len(first), 10 * 24 + 1)
+        forming_close = first['close'].iloc[-1]
+
+        self.now = BASE_TIME + timedelta(hours=3, minutes=20)
+        second = asyncio.run(self.cache.get('HYPE', '1h', 'hyperliquid'))
+        self.assertEqual(self.exchange.calls[1][3], BASE_TIME)
+        self.assertEqual(second['timestamp'].iloc[-1], pd.Timestamp(BASE_TIME + timedelta(hours=3)))
+        self.assertEqual(second['timestamp'].iloc[0], pd.Timestamp(self.now - timedelta(days=10)).ceil('h'))
+        self.assertTrue(second['timestamp'].is_unique and second['timestamp'].is_monotonic_increasing)
+        self.assertEqual(len(second), 10 * 24)
+
+        # 形成中だった足は新しい取得結果で置き換えられ、確定済みの足は保持される
+        refreshed = second.set_index('timestamp')['close']
+        self.assertNotEqual(refreshed[pd.Timestamp(BASE_TIME)], forming_close)
+        self.assertEqual(refreshed[pd.Timestamp(BASE_TIME - timedelta(hours=1))],
+                         first.set_index('timestamp')['close'][pd.Timestamp(BASE_TIME - timedelta(hours=1))])
+
+        status = self.cache.get_status()
+        self.assertEqual(status['stats']['full_fetches'], 1)
+        self.assertEqual(status['stats']['incremental_fetches'], 1)
+        self.assertEqual(status['entries']['hyperliquid:HYPE:1h']['last_fetch_rows'], 4)
+
+        # 期間より古いキャッシュ・invalidate後は全期間を取得し直す
+        self.now = BASE_TIME + timedelta(days=30)
+        asyncio.run(self.cache.get('HYPE', '1h', 'hyperliquid'))
+        self.cache.invalidate('HYPE')
+        asyncio.run(self.cache.get('HYPE', '1h', 'hyperliquid'))
+        self.assertEqual(self.cache.get_status()['stats']['full_fetches'], 3)
+
+    def test_concurrent_requests_deduplicated(self):
+        """同じ(銘柄, 時間足)の同時要求は1回の取得を共有する"""
+        self.exchange.latency = 0.05
+
+        async def run():
+            return await asyncio.gather(
+                *[self.cache.get('SOL', '1h', 'gateio') for _ in range(5)],
+                self.cache.get('SOL', '15m', 'gateio'),
+                self.cache.get('WIF', '1h', 'gateio')
+            )
+
+        frames = asyncio.run(run())
+        self.assertEqual(len(self.exchange.calls), 3)
+        self.assertTrue(all(frame is frames[0] for frame in frames[:5]))
+        self.assertEqual(self.cache.stats['deduplicated'], 4)
+
+        # 完了後の要求は新しい取得になる
+        asyncio.run(self.cache.get('SOL', '1h', 'gateio'))
+        self.assertEqual(len(self.exchange.calls), 4)
+
+    def test_per_exchange_concurrency(self):
+        """取引所ごとの同時取得数は設定値を超えず、取引所間では独立している"""
+        self.exchange.latency = 0.02
+        cache = CandleCache(fetch_func=self.exchange.fetch, lookback_days=1, clock=lambda: self.now,
+                            exchange_limits={'hyperliquid': 2, 'gateio': 3})
+
+        async def run():
+            await asyncio.gather(*[cache.get(f"S{i}", '1h', exchange)
+                                   for i in range(8) for exchange in ('hyperliquid', 'gateio')])
+
+        asyncio.run(run())
+        self.assertEqual(self.exchange.max_in_flight, {'hyperliquid': 2, 'gateio': 3})
+
+    def test_candle_close_to_alert_latency(self):
+        """確定足の終了時刻を求め、アラート送信時に銘柄ごとの遅延を記録する"""
+        data = pd.DataFrame({'timestamp': pd.to_datetime(['2024-06-01 10:00', '2024-06-01 11:00'], utc=True)})
+        self.assertEqual(latest_candle_close(data, '1h', datetime(2024, 6, 1, 12, 0, 5, tzinfo=timezone.utc)),
+                         datetime(2024, 6, 1, 12, tzinfo=timezone.utc))
+        # 最新足が形成中なら、その開始時刻が直前の足の終了時刻
+        self.assertEqual(latest_candle_close(data, '1h', datetime(2024, 6, 1, 11, 30, tzinfo=timezone.utc)),
+                         datetime(2024, 6, 1, 11, tzinfo=timezone.utc))
+        self.assertIsNone(latest_candle_close(data.iloc[:0], '1h', BASE_TIME))
+
+        from real_time_system.monitor import RealTimeMonitor
+        monitor = SimpleNamespace(
+            watchlist={'symbols': {'HYPE': {}}},
+            config={'alerts': {'leverage_threshold': 5.0, 'confidence_threshold': 60.0}},
+            alert_manager=MagicMock(), logger=MagicMock(), latency_tracker=LatencyTracker()
+        )
+        monitor.alert_manager.send_alert.return_value = True
+        candle_close_time = datetime.now(timezone.utc) - timedelta(seconds=30)
+        results = [
+            {'leverage': 8.0, 'confidence': 75.0, 'strategy': 'Balanced', 'timeframe': '1h',
+             'candle_close_time': candle_close_time},
+            {'leverage': 2.0, 'confidence': 75.0, 'strategy': 'Balanced', 'timeframe': '15m',
+             'candle_close_time': candle_close_time},
+        ]
+        RealTimeMonitor._process_analysis_results(monitor, {'symbol': 'HYPE', 'results': results})
+
+        stats = monitor.latency_tracker.get_stats()
+        self.assertEqual(list(stats), ['HYPE'])
+        self.assertEqual(stats['HYPE']['count'], 1)
+        self.assertGreaterEqual(stats['HYPE']['last_seconds'], 30)
+        self.assertLess(stats['HYPE']['last_seconds'], 60)
+
+        tracker = LatencyTracker(max_samples=3)
+        for seconds in (5, 1, 3, 2):
+            tracker.record('SOL', seconds)
+        self.assertEqual(tracker.get_stats()['SOL'],
+                         {'count': 3, 'last_seconds': 2.0, 'mean_seconds': 2.0, 'p95_seconds': 3.0, 'max_seconds': 3.0})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+共有メモリ市場データ受け渡し（shared_market_data）のテストケース
+
+親プロセスで公開したOHLCVを子プロセスがコピーせずに参照できること、期間を満たさない場合は
+API取得にフォールバックすること、generate_batch_analysis が同じ銘柄・時間足を1回だけ取得することを確認する
+"""
+
+import unittest
+import os
+import sys
+import tempfile
+import pandas as pd
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import timedelta
+from multiprocessing import shared_memory
+from unittest.mock import patch
+
+# プロジェクトルートをパスに追加
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# BaseTestを継承してテスト環境の安全性を確保
+try:
+    from tests_organized.base_test import BaseTest
+    USE_BASE_TEST = True
+except ImportError:
+    USE_BASE_TEST = False
+    print("⚠️ BaseTestが利用できません。標準のunittestを使用します。")
+
+from shared_market_data import (
+    SharedMarketDataPublisher, install_shared_descriptors, get_shared_ohlcv,
+    get_worker_metrics, reset_worker_state
+)
+
+
+def _make_ohlcv(periods=500, seed=3):
+    rng = np.random.default_rng(seed)
+    closes = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, periods)))
+    return pd.DataFrame({
+        'timestamp': pd.date_range('2024-01-01', periods=periods, freq='1h', tz='UTC'),
+        'open': closes,
+        'high': closes * 1.01,
+        'low': closes * 0.99,
+        'close': closes,
+        'volume': rng.uniform(1000, 5000, periods),
+    })
+
+
+def _child_close_sum(descriptors, start, end):
+    """子プロセス: 共有データにアタッチして終値の合計とメトリクスを返す"""
+    install_shared_descriptors(descriptors)
+    df = get_shared_ohlcv('hyperliquid', 'SOL', '1h', start, end)
+    return float(df['close'].sum()), len(df), get_worker_metrics()
+
+
+class TestSharedMarketData(BaseTest if USE_BASE_TEST else unittest.TestCase):
+    """共有メモリ市場データのテスト"""
+
+    def setUp(self):
+        """テスト前準備"""
+        if USE_BASE_TEST:
+            super().setUp()
+        reset_worker_state()
+        self.df = _make_ohlcv()
+        self.start = self.df['timestamp'].iloc[0]
+        self.end = self.df['timestamp'].iloc[-1]
+        self.publisher = SharedMarketDataPublisher()
+
+    def tearDown(self):
+        """テスト後クリーンアップ"""
+        reset_worker_state()
+        self.publisher.close()
+        if USE_BASE_TEST:
+            super().tearDown()
+
+    def _publish(self, df=None):
+        return self.publisher.publish('hyperliquid', 'SOL', '1h', self.df if df is None else df,
+                                      self.start, self.end)
+
+    def test_round_trip_zero_copy(self):
+        """公開したデータと同じ値が読み取り専用のビューとして返る"""
+        install_shared_descriptors([self._publish()])
+        first = get_shared_ohlcv('hyperliquid', 'SOL', '1h', self.start, self.end)
+        second = get_shared_ohlcv('hyperliquid', 'SOL', '1h', self.start, self.end)
+
+        pd.testing.assert_frame_equal(first, self.df)
+        self.assertTrue(np.shares_memory(first['timestamp'].array.asi8, second['timestamp'].array.asi8))
+        for column in ('open', 'close', 'volume'):
+            self.assertTrue(np.shares_memory(first[column].to_numpy(), second[column].to_numpy()), column)
+        with self.assertRaises(ValueError):
+            first['close'].to_numpy()[0] = 0.0
+
+        metrics = get_worker_metrics()
+        self.assertEqual((metrics['attach_count'], metrics['hits'], metrics['misses']), (1, 2, 0))
+
+    def test_window_and_fallback(self):
+        """要求期間で切り出し、期間外・未登録の組み合わせはNone"""
+        install_shared_descriptors([self._publish(self.df.iloc[::-1])])
+        start, end = self.df['timestamp'].iloc[100], self.df['timestamp'].iloc[199]
+        sliced = get_shared_ohlcv('hyperliquid', 'SOL', '1h', start.to_pydatetime(), end.to_pydatetime())
+        pd.testing.assert_frame_equal(sliced, self.df.iloc[100:200].reset_index(drop=True))
+
+        # 終了側は1足分の遅れまで許容
+        self.assertIsNotNone(get_shared_ohlcv('hyperliquid', 'SOL', '1h', start, self.end + timedelta(minutes=30)))
+        self.assertIsNone(get_shared_ohlcv('hyperliquid', 'SOL', '1h', start, self.end + timedelta(hours=2)))
+        self.assertIsNone(get_shared_ohlcv('hyperliquid', 'SOL', '1h', self.start - timedelta(hours=1), end))
+        self.assertIsNone(get_shared_ohlcv('gateio', 'SOL', '1h', start, end))
+        self.assertIsNone(get_shared_ohlcv('hyperliquid', 'SOL', '15m', start, end))
+        self.assertEqual(get_worker_metrics()['misses'], 4)
+
+    def test_up_to_date_window_covers_later_requests(self):
+        """最新まで取得したデータは、公開後に開始したタスクの現在までの要求を公開時点までのデータで満たす"""
+        descriptor = self.publisher.publish('hyperliquid', 'SOL', '1h', self.df, self.start, self.end, up_to_date=True)
+        install_shared_descriptors([descriptor])
+        later = get_shared_ohlcv('hyperliquid', 'SOL', '1h', self.start + timedelta(hours=5),
+                                 self.end + timedelta(hours=5))
+        pd.testing.assert_frame_equal(later, self.df.iloc[5:].reset_index(drop=True))
+        # 開始側は取得済み期間を満たす必要がある
+        self.assertIsNone(get_shared_ohlcv('hyperliquid', 'SOL', '1h', self.start - timedelta(hours=1), self.end))
+
+    def test_child_process_attach(self):
+        """子プロセスは記述子だけを受け取り、同じワーカーでは1回だけアタッチする"""
+        descriptors = [self._publish()]
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            results = [executor.submit(_child_close_sum, descriptors, self.start, self.end).result(timeout=60)
+                       for _ in range(2)]
+
+        for close_sum, rows, metrics in results:
+            self.assertAlmostEqual(close_sum, float(self.df['close'].sum()), places=6)
+            self.assertEqual(rows, len(self.df))
+            self.assertNotEqual(metrics['pid'], os.getpid())
+            self.assertGreater(metrics['rss_bytes'], 0)
+        self.assertEqual([metrics['attach_count'] for _, _, metrics in results], [1, 1])
+        self.assertEqual(results[1][2]['hits'], 2)
+
+    def test_close_unlinks(self):
+        """close() で共有メモリが解放される"""
+        descriptor = self._publish()
+        self.assertIsNone(self.publisher.publish('hyperliquid', 'ETH', '1h', self.df.iloc[:0], self.start, self.end))
+        self.assertEqual(self.publisher.get_stats()['blocks'], 1)
+        self.publisher.close()
+        with self.assertRaises(FileNotFoundError):
+            shared_memory.SharedMemory(name=descriptor.shm_name)
+
+        # 解放済みのブロックはAPI取得にフォールバック
+        install_shared_descriptors([descriptor])
+        self.assertIsNone(get_shared_ohlcv('hyperliquid', 'SOL', '1h', self.start, self.end))
+
+    def test_batch_analysis_loads_once(self):
+        """generate_batch_analysis は複数戦略で使う銘柄・時間足を1回だけ取得して子に渡す"""
+        from scalable_analysis_system import ScalableAnalysisSystem
+
+        fetched = []
+        seen = []
+        df = self.df
+
+        class _FakeAPIClient:
+            def __init__(self, exchange_type=None):
+                self.exchange_type = exchange_type
+
+            async def get_ohlcv_data(self, symbol, timeframe, start_time, end_time):
+                fetched.append((self.exchange_type, symbol, timeframe))
+                return df
+
+        def fake_single_analysis(system, symbol, timeframe, config, execution_id=None):
+            # 子プロセスは公開より後の現在時刻までを要求する
+            start_time, end_time = system._analysis_data_window(timeframe)
+            df = get_shared_ohlcv('hyperliquid', symbol, timeframe, start_time, end_time + timedelta(hours=3))
+            seen.append((symbol, timeframe, config, df is not None))
+            return True, {}
+
+        configs = [{'symbol': 'SOL', 'timeframe': '1h', 'strategy': name}
+                   for name in ('Conservative_ML', 'Aggressive_ML', 'Balanced')]
+        configs.append({'symbol': 'SOL', 'timeframe': '15m', 'strategy': 'Balanced'})
+
+        with tempfile.TemporaryDirectory() as tmp, \
+                patch.dict(os.environ, {'EXCHANGE_TYPE': 'hyperliquid', 'SHARED_STAGE_GRAPH_ENABLED': 'false'}), \
+                patch('hyperliquid_api_client.MultiExchangeAPIClient', _FakeAPIClient), \
+                patch('scalable_analysis_system.ProcessPoolExecutor', ThreadPoolExecutor), \
+                patch.object(ScalableAnalysisSystem, '_setup_child_process_logging'), \
+                patch.object(ScalableAnalysisSystem, '_get_exchange_from_config', return_value='hyperliquid'), \
+                patch.object(ScalableAnalysisSystem, '_analysis_data_window',
+                             return_value=(self.start.to_pydatetime(), self.end.to_pydatetime())), \
+                patch.object(ScalableAnalysisSystem, '_generate_single_analysis', fake_single_analysis):
+            system = ScalableAnalysisSystem(base_dir=tmp)
+            system.generate_batch_analysis(configs, max_workers=2)
+
+        self.assertEqual(fetched, [('hyperliquid', 'SOL', '1h')])
+        self.assertEqual(sorted(seen), sorted([('SOL', '1h', c['strategy'], True) for c in configs[:3]] +
+                                              [('SOL', '15m', 'Balanced', False)]))
+
+
+if __name__ == '__main__':
+    unittest.main()
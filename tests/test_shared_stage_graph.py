@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+戦略非依存ステージの共有（group_shared_stage_configs / _generate_real_analysis_group）のテストケース
+
+戦略だけが異なる設定が1つのグループタスクにまとまること、グループタスクでは分析を1回だけ実行して
+戦略ごとに保存・通知すること、単一戦略の分析がグループ分析と同じ経路で動くことを確認する
+"""
+
+import unittest
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import numpy as np
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+# プロジェクトルートをパスに追加
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# BaseTestを継承してテスト環境の安全性を確保
+try:
+    from tests_organized.base_test import BaseTest
+    USE_BASE_TEST = True
+except ImportError:
+    USE_BASE_TEST = False
+    print("⚠️ BaseTestが利用できません。標準のunittestを使用します。")
+
+from batch_task_scheduler import group_shared_stage_configs, config_strategies, TaskCostModel
+from interfaces import SupportResistanceLevel, BTCCorrelationRisk, LeverageRecommendation
+
+STRATEGIES = ['Conservative_ML', 'Aggressive_ML', 'Balanced']
+
+# 戦略ごとに異なるエントリー条件（戦略ごとの判定が混ざらないことを確認する）
+ENTRY_CONDITIONS = {
+    'Conservative_ML': {'min_leverage': 4.0, 'min_confidence': 0.5, 'min_risk_reward': 1.0},
+    'Aggressive_ML': {'min_leverage': 2.0, 'min_confidence': 0.5, 'min_risk_reward': 1.0},
+    'Balanced': {'min_leverage': 3.0, 'min_confidence': 0.5, 'min_risk_reward': 1.0},
+}
+
+
+class _FakeExchangeClient:
+    """固定のOHLCVデータを返すMultiExchangeAPIClientの代替"""
+
+    data = None
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def get_ohlcv_dataframe(self, symbol, timeframe, start_time, end_time):
+        data = self.data
+        return data[(data['timestamp'] >= start_time) & (data['timestamp'] <= end_time)].reset_index(drop=True)
+
+    async def get_ohlcv_data(self, symbol, timeframe, start_time, end_time):
+        return self.get_ohlcv_dataframe(symbol, timeframe, start_time, end_time)
+
+
+class _FixedSupportResistanceAnalyzer:
+    """固定レベルを返すテスト用サポレジアナライザー"""
+
+    def find_levels(self, data, **kwargs):
+        now = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        return [SupportResistanceLevel(price=price, strength=0.8, touch_count=4, level_type=level_type,
+                                       first_touch=now, last_touch=now, volume_at_level=1000.0,
+                                       distance_from_current=0.0)
+                for price, level_type in ((90.0, 'support'), (95.0, 'support'),
+                                          (106.0, 'resistance'), (110.0, 'resistance'))]
+
+
+class _FixedBTCCorrelationAnalyzer:
+    """固定のBTC相関リスクを返すテスト用アナライザー"""
+
+    def predict_altcoin_impact(self, symbol, btc_drop_pct):
+        return BTCCorrelationRisk(symbol=symbol, btc_drop_scenario=btc_drop_pct,
+                                  predicted_altcoin_drop={5: -3.0, 15: -4.0, 60: -5.0, 240: -6.0},
+                                  correlation_strength=0.6, risk_level='LOW',
+                                  liquidation_risk={5: 0.01, 15: 0.02, 60: 0.03, 240: 0.04})
+
+
+class _PriceDependentLeverageEngine:
+    """評価時点の価格に応じてレバレッジが変化するテスト用判定エンジン"""
+
+    def calculate_safe_leverage(self, symbol, support_levels, resistance_levels,
+                                breakout_predictions, btc_correlation_risk, market_context):
+        price = market_context.current_price
+        return LeverageRecommendation(recommended_leverage=max(1.0, price - 97.0), max_safe_leverage=10.0,
+                                      risk_reward_ratio=1.5, stop_loss_price=price * 0.97,
+                                      take_profit_price=price * 1.05, confidence_level=0.6,
+                                      reasoning=[], market_conditions=market_context)
+
+
+def _install_test_plugins(bot):
+    """取引所APIや設定ファイルに依存しないプラグイン（デフォルトプラグインの代わり）"""
+    from adapters.existing_adapters import ExistingMLPredictorAdapter
+    from engines.leverage_decision_engine import SimpleMarketContextAnalyzer
+    bot.support_resistance_analyzer = _FixedSupportResistanceAnalyzer()
+    bot.breakout_predictor = ExistingMLPredictorAdapter()
+    bot.btc_correlation_analyzer = _FixedBTCCorrelationAnalyzer()
+    bot.market_context_analyzer = SimpleMarketContextAnalyzer()
+    bot.leverage_decision_engine = _PriceDependentLeverageEngine()
+
+
+class TestSharedStageGraph(BaseTest if USE_BASE_TEST else unittest.TestCase):
+    """戦略非依存ステージの共有のテスト"""
+
+    def setUp(self):
+        """テスト前準備"""
+        if USE_BASE_TEST:
+            super().setUp()
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        """テスト後クリーンアップ"""
+        self.tmp.cleanup()
+        if USE_BASE_TEST:
+            super().tearDown()
+
+    def test_group_configs(self):
+        """同じ銘柄・時間足・期間の設定だけをまとめ、それ以外はそのまま残す"""
+        configs = [
+            {'symbol': 'SOL', 'timeframe': '1h', 'strategy': 'Conservative_ML'},
+            {'symbol': 'SOL', 'timeframe': '15m', 'strategy': 'Balanced'},
+            {'symbol': 'SOL', 'timeframe': '1h', 'config': 'Aggressive_ML'},
+            {'symbol': 'ETH', 'timeframe': '1h', 'strategy': 'Balanced'},
+            {'symbol': 'SOL', 'timeframe': '1h', 'strategy': 'Balanced', 'period_days': 30},
+            {'symbol': 'SOL', 'timeframe': '1h', 'strategy': 'Balanced'},
+            {'symbol': 'SOL', 'timeframe': '1h', 'strategy': 'Conservative_ML'},
+            {'symbol': 'SOL', 'timeframe': '1h'},
+            'invalid',
+        ]
+        planned = group_shared_stage_configs(configs)
+
+        self.assertEqual(planned[0], {'symbol': 'SOL', 'timeframe': '1h',
+                                      'strategy': 'Conservative_ML+Aggressive_ML+Balanced',
+                                      'strategies': ['Conservative_ML', 'Aggressive_ML', 'Balanced']})
+        # 単独の設定・期間の異なる設定・重複する戦略・不正な設定はそのまま
+        self.assertEqual(planned[1:], [configs[1], configs[3], configs[4], configs[6], configs[7], configs[8]])
+        # 元の設定は変更しない
+        self.assertNotIn('strategies', configs[0])
+        self.assertEqual(group_shared_stage_configs([configs[1]]), [configs[1]])
+
+    def test_batch_analysis_runs_group_once(self):
+        """グループタスクは分析を1回だけ実行し、戦略ごとのトレードを戦略ごとに保存する"""
+        from scalable_analysis_system import ScalableAnalysisSystem
+
+        configs = [{'symbol': 'SOL', 'timeframe': '1h', 'strategy': name}
+                   for name in ('Conservative_ML', 'Aggressive_ML', 'Balanced')]
+        configs.append({'symbol': 'SOL', 'timeframe': '15m', 'strategy': 'Balanced'})
+        analyses = []
+        completed = []
+        singles = []
+
+        def fake_group_analysis(system, symbol, timeframe, strategies, custom_period_days=None, execution_id=None):
+            analyses.append((symbol, timeframe, list(strategies)))
+            return {strategy: [{'strategy': strategy}] for strategy in strategies}
+
+        def fake_complete(system, symbol, timeframe, config, execution_id, trades_data, start_time):
+            completed.append((timeframe, config, trades_data))
+            return True, {}
+
+        def fake_single_analysis(system, symbol, timeframe, config, execution_id=None):
+            singles.append((timeframe, config))
+            return True, {}
+
+        with patch.dict(os.environ, {'SHARED_MARKET_DATA_ENABLED': 'false', 'SHARED_STAGE_GRAPH_ENABLED': 'true'}), \
+                patch('scalable_analysis_system.ProcessPoolExecutor', ThreadPoolExecutor), \
+                patch.object(ScalableAnalysisSystem, '_setup_child_process_logging'), \
+                patch.object(ScalableAnalysisSystem, '_start_single_analysis'), \
+                patch.object(ScalableAnalysisSystem, '_generate_real_analysis_group', fake_group_analysis), \
+                patch.object(ScalableAnalysisSystem, '_complete_single_analysis', fake_complete), \
+                patch.object(ScalableAnalysisSystem, '_generate_single_analysis', fake_single_analysis):
+            system = ScalableAnalysisSystem(base_dir=self.tmp.name)
+            self.assertEqual(system.generate_batch_analysis(configs, max_workers=2), 4)
+
+            self.assertEqual(analyses, [('SOL', '1h', ['Conservative_ML', 'Aggressive_ML', 'Balanced'])])
+            self.assertEqual(sorted(completed), sorted(
+                ('1h', name, [{'strategy': name}]) for name in ('Conservative_ML', 'Aggressive_ML', 'Balanced')))
+            self.assertEqual(singles, [('15m', 'Balanced')])
+
+            # 無効化すると従来通り設定ごとに実行
+            analyses.clear()
+            singles.clear()
+            with patch.dict(os.environ, {'SHARED_STAGE_GRAPH_ENABLED': 'false'}):
+                self.assertEqual(system.generate_batch_analysis(configs, max_workers=2), 4)
+            self.assertEqual(analyses, [])
+            self.assertEqual(sorted(singles), sorted((c['timeframe'], c['strategy']) for c in configs))
+
+    def test_group_cost_is_sum_of_strategy_costs(self):
+        """グループタスクの推定時間は戦略ごとの推定時間の合計、実績は戦略ごとに等分して反映する"""
+        group = group_shared_stage_configs([{'symbol': 'SOL', 'timeframe': '1h', 'strategy': name}
+                                            for name in STRATEGIES])[0]
+        self.assertEqual(config_strategies(group), STRATEGIES)
+        self.assertEqual(config_strategies({'symbol': 'SOL', 'timeframe': '1h', 'config': 'Balanced'}), ['Balanced'])
+        self.assertEqual(config_strategies('invalid'), [])
+
+        model = TaskCostModel()
+        model.record('1h', 'Conservative_ML', 100, 10.0)
+        model.record('1h', 'Aggressive_ML', 100, 20.0)
+        model.seconds_per_bar['1h|Balanced'] = 0.3
+        self.assertAlmostEqual(model.estimate_group('1h', config_strategies(group), 100), 10.0 + 20.0 + 30.0)
+        # 'A+B+C' のラベルはコストのキーにしない
+        self.assertNotIn('1h|' + group['strategy'], model.seconds_per_bar)
+        self.assertAlmostEqual(model.estimate_group('1h', [], 100), model.estimate('1h', None, 100))
+
+        model = TaskCostModel()
+        model.record_group('1h', STRATEGIES, 100, 60.0)
+        self.assertEqual(sorted(model.seconds_per_bar), sorted(['1h'] + [f'1h|{name}' for name in STRATEGIES]))
+        self.assertAlmostEqual(model.estimate_group('1h', STRATEGIES, 100), 60.0)
+
+    def test_group_analysis_matches_per_strategy_analysis(self):
+        """グループ分析（共有ステージ）と戦略ごとの分析のトレードが一致する（モックなしの分析経路）"""
+        from scalable_analysis_system import ScalableAnalysisSystem
+        from engines.high_leverage_bot_orchestrator import HighLeverageBotOrchestrator
+
+        periods = 24 * 20
+        end = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+        rng = np.random.default_rng(11)
+        close = 100 + 6 * np.sin(np.arange(periods) / 12.0) + rng.normal(0, 0.3, periods)
+        opens = np.concatenate([[close[0]], close[:-1]])
+        _FakeExchangeClient.data = pd.DataFrame({
+            'timestamp': pd.date_range(end=end, periods=periods, freq='h'),
+            'open': opens,
+            'high': np.maximum(opens, close) + rng.uniform(0.1, 0.6, periods),
+            'low': np.minimum(opens, close) - rng.uniform(0.1, 0.6, periods),
+            'close': close,
+            'volume': rng.uniform(1000, 5000, periods)
+        })
+
+        def entry_conditions(*args, **kwargs):
+            strategy = kwargs.get('strategy', args[-1] if args else None)
+            return dict(ENTRY_CONDITIONS[strategy])
+
+        with patch('hyperliquid_api_client.MultiExchangeAPIClient', _FakeExchangeClient), \
+                patch.object(HighLeverageBotOrchestrator, '_initialize_default_plugins', _install_test_plugins), \
+                patch('config.unified_config_manager.UnifiedConfigManager.get_entry_conditions',
+                      side_effect=entry_conditions), \
+                patch.dict(os.environ, {'SHARED_MARKET_DATA_ENABLED': 'false'}), \
+                contextlib.redirect_stdout(io.StringIO()):
+            system = ScalableAnalysisSystem(base_dir=self.tmp.name)
+            grouped = system._generate_real_analysis_group('TEST', '1h', STRATEGIES, custom_period_days=5)
+            separate = {name: system._generate_real_analysis('TEST', '1h', name, custom_period_days=5)
+                        for name in STRATEGIES}
+
+        self.assertEqual(list(grouped), STRATEGIES)
+        for name in STRATEGIES:
+            self.assertTrue(separate[name], name)
+            self.assertEqual(pd.DataFrame(grouped[name]).to_dict('records'),
+                             pd.DataFrame(separate[name]).to_dict('records'), name)
+        # 戦略ごとのエントリー条件で判定される
+        self.assertGreater(len(grouped['Aggressive_ML']), len(grouped['Conservative_ML']))
+        self.assertTrue(all(trade['leverage'] >= 4.0 for trade in grouped['Conservative_ML']))
+
+    def test_group_failure_marks_every_strategy(self):
+        """共有ステージの失敗は全戦略の失敗として記録する"""
+        from scalable_analysis_system import ScalableAnalysisSystem
+
+        failed = []
+
+        def fake_fail(system, symbol, timeframe, config, execution_id, error, start_time):
+            failed.append((config, str(error)))
+            return False, None
+
+        with patch.object(ScalableAnalysisSystem, '_start_single_analysis'), \
+                patch.object(ScalableAnalysisSystem, '_generate_real_analysis_group',
+                             side_effect=Exception('データ取得失敗')), \
+                patch.object(ScalableAnalysisSystem, '_fail_single_analysis', fake_fail):
+            system = ScalableAnalysisSystem(base_dir=self.tmp.name)
+            results = system._generate_group_analysis('SOL', '1h', ['Balanced', 'Aggressive_ML'])
+
+        self.assertEqual(results, {'Balanced': (False, None), 'Aggressive_ML': (False, None)})
+        self.assertEqual(failed, [('Balanced', 'データ取得失敗'), ('Aggressive_ML', 'データ取得失敗')])
+
+    def test_single_analysis_uses_group_path(self):
+        """単一戦略の分析は1戦略のグループ分析として実行する"""
+        from scalable_analysis_system import ScalableAnalysisSystem
+
+        with patch.object(ScalableAnalysisSystem, '_generate_real_analysis_group',
+                          return_value={'Balanced': [{'strategy': 'Balanced'}]}) as group:
+            system = ScalableAnalysisSystem(base_dir=self.tmp.name)
+            trades = system._generate_real_analysis('SOL', '1h', 'Balanced', execution_id='exec-1')
+
+        self.assertEqual(trades, [{'strategy': 'Balanced'}])
+        group.assert_called_once_with('SOL', '1h', ['Balanced'], custom_period_days=None, execution_id='exec-1')
+
+        # 戦略ごとのTP/SL計算器は戦略名で選ぶ
+        from engines.stop_loss_take_profit_calculators import (
+            ConservativeSLTPCalculator, AggressiveSLTPCalculator, TraditionalSLTPCalculator, DefaultSLTPCalculator
+        )
+        self.assertIsInstance(system._create_sltp_calculator('Conservative_ML'), ConservativeSLTPCalculator)
+        self.assertIsInstance(system._create_sltp_calculator('Aggressive_Traditional'), TraditionalSLTPCalculator)
+        self.assertIsInstance(system._create_sltp_calculator('Aggressive_ML'), AggressiveSLTPCalculator)
+        self.assertIsInstance(system._create_sltp_calculator('Balanced'), DefaultSLTPCalculator)
+
+
+if __name__ == '__main__':
+    unittest.main()
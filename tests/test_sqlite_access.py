@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+SQLite共通アクセス層（sqlite_access）のテストケース
+
+接続の再利用とWAL設定、遅延書き込みの集約・順序・失敗の切り離し、プロセス終了時の反映、
+ExecutionLogDatabase のステップ追加と競合ベンチマークを確認する
+"""
+
+import unittest
+import os
+import sys
+import sqlite3
+import tempfile
+import multiprocessing
+from unittest.mock import patch
+
+# プロジェクトルートをパスに追加
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# BaseTestを継承してテスト環境の安全性を確保
+try:
+    from tests_organized.base_test import BaseTest
+    USE_BASE_TEST = True
+except ImportError:
+    USE_BASE_TEST = False
+    print("⚠️ BaseTestが利用できません。標準のunittestを使用します。")
+
+from sqlite_access import (
+    db_connection, execute_write, enqueue_write, flush_pending_writes, checkpoint,
+    get_access_stats, run_contention_benchmark
+)
+
+
+def _child_enqueue_and_exit(db_path):
+    """子プロセス: 書き込みをキューに積んだまま正常終了する"""
+    for i in range(5):
+        execute_write(db_path, "INSERT INTO items (name, value) VALUES (?, ?)", (f"child_{i}", i))
+
+
+class TestSQLiteAccess(BaseTest if USE_BASE_TEST else unittest.TestCase):
+    """SQLite共通アクセス層のテスト"""
+
+    def setUp(self):
+        """テスト前準備"""
+        if USE_BASE_TEST:
+            super().setUp()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp.name, 'access.db')
+        # 反映間隔を長くしてバックグラウンドスレッドの反映とテストの操作が競合しないようにする
+        self.env = patch.dict(os.environ, {'SQLITE_WRITE_BEHIND_INTERVAL': '60'})
+        self.env.start()
+        with db_connection(self.db_path) as conn:
+            conn.execute("CREATE TABLE items (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT, value INTEGER)")
+
+    def tearDown(self):
+        """テスト後クリーンアップ"""
+        flush_pending_writes()
+        self.env.stop()
+        self.tmp.cleanup()
+        if USE_BASE_TEST:
+            super().tearDown()
+
+    def _raw_rows(self):
+        """プールを通さない別接続で読む（他プロセスの読み込みと同じ見え方）"""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return conn.execute("SELECT name, value FROM items ORDER BY id").fetchall()
+        finally:
+            conn.close()
+
+    def test_connection_reuse_and_wal(self):
+        """接続を再利用し、WAL・busy_timeoutを設定、row_factoryは取得ごとに初期化する"""
+        before = get_access_stats()['pool']
+        with db_connection(self.db_path) as conn:
+            conn.row_factory = sqlite3.Row
+            self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], 'wal')
+            self.assertEqual(conn.execute("PRAGMA busy_timeout").fetchone()[0], 30000)
+            first = id(conn)
+        with db_connection(self.db_path) as conn:
+            self.assertEqual(id(conn), first)
+            self.assertIsNone(conn.row_factory)
+            # 入れ子で使うと別の接続
+            with db_connection(self.db_path) as inner:
+                self.assertNotEqual(id(inner), first)
+        after = get_access_stats()['pool']
+        self.assertGreaterEqual(after['reused'] - before['reused'], 1)
+
+        # 例外時はロールバック
+        with self.assertRaises(RuntimeError):
+            with db_connection(self.db_path) as conn:
+                conn.execute("INSERT INTO items (name, value) VALUES ('rolled_back', 0)")
+                raise RuntimeError("中断")
+        self.assertEqual(self._raw_rows(), [])
+
+        # DBファイルが作り直された場合は新しい接続を使う
+        os.remove(self.db_path)
+        with db_connection(self.db_path) as conn:
+            self.assertEqual(conn.execute("SELECT name FROM sqlite_master WHERE type='table'").fetchall(), [])
+
+    def test_write_behind_coalesce_and_order(self):
+        """同じキーの更新は最後の1件に集約し、db_connection() の前に反映される"""
+        execute_write(self.db_path, "INSERT INTO items (name, value) VALUES (?, ?)", ('task', 0))
+        for value in range(1, 6):
+            execute_write(self.db_path, "UPDATE items SET value = ? WHERE name = ?", (value, 'task'),
+                          key=('value', 'task'))
+        # 別接続からはまだ見えない
+        self.assertEqual(self._raw_rows(), [])
+        coalesced = get_access_stats()['write_behind']['coalesced']
+
+        with db_connection(self.db_path) as conn:
+            self.assertEqual(conn.execute("SELECT name, value FROM items").fetchall(), [('task', 5)])
+        self.assertEqual(self._raw_rows(), [('task', 5)])
+        self.assertGreaterEqual(coalesced, 4)
+
+    def test_failed_operation_is_isolated(self):
+        """失敗した操作だけを取り消し、同じバッチの他の操作は反映する"""
+        execute_write(self.db_path, "INSERT INTO items (name, value) VALUES (?, ?)", ('before', 1))
+        execute_write(self.db_path, "INSERT INTO missing_table (name) VALUES (?)", ('x',))
+        enqueue_write(self.db_path, lambda conn: conn.execute("INSERT INTO items (name, value) VALUES ('after', 2)"))
+        with self.assertLogs('sqlite_access', level='ERROR'):
+            self.assertEqual(flush_pending_writes(self.db_path), 2)
+        self.assertEqual(self._raw_rows(), [('before', 1), ('after', 2)])
+
+    def test_locked_batch_retried_in_order(self):
+        """ロックで反映できなかったバッチは元の順序のまま、反映中に積まれた操作より先に再試行する"""
+        import sqlite_access
+        path = sqlite_access._normalize_path(self.db_path)
+        with db_connection(self.db_path) as conn:
+            conn.execute("PRAGMA busy_timeout = 0")
+
+        execute_write(self.db_path, "INSERT INTO items (name, value) VALUES (?, ?)", ('a', 0))
+        execute_write(self.db_path, "UPDATE items SET value = ? WHERE name = ?", (1, 'a'), key=('value', 'a'))
+        execute_write(self.db_path, "INSERT INTO items (name, value) VALUES (?, ?)", ('b', 0))
+        with sqlite_access._write_queue.lock:
+            batch = sqlite_access._write_queue.pending.pop(path)
+        # 反映中に積まれた操作（同じキーの新しい更新を含む）
+        execute_write(self.db_path, "UPDATE items SET value = ? WHERE name = ?", (2, 'a'), key=('value', 'a'))
+        execute_write(self.db_path, "INSERT INTO items (name, value) VALUES (?, ?)", ('c', 0))
+
+        locker = sqlite3.connect(self.db_path)
+        try:
+            locker.execute("BEGIN IMMEDIATE")
+            with self.assertLogs('sqlite_access', level='WARNING'):
+                self.assertEqual(sqlite_access._write_queue._write_batch(path, batch), 0)
+        finally:
+            locker.rollback()
+            locker.close()
+
+        self.assertEqual(flush_pending_writes(self.db_path), 4)
+        self.assertEqual(self._raw_rows(), [('a', 2), ('b', 0), ('c', 0)])
+
+    def test_write_behind_disabled(self):
+        """SQLITE_WRITE_BEHIND_ENABLED=false では即時に書き込み、更新行数を返す"""
+        with patch.dict(os.environ, {'SQLITE_WRITE_BEHIND_ENABLED': 'false'}):
+            self.assertEqual(execute_write(self.db_path, "INSERT INTO items (name, value) VALUES ('now', 1)"), 1)
+        self.assertEqual(self._raw_rows(), [('now', 1)])
+
+    def test_flush_on_process_exit(self):
+        """子プロセスが未反映の書き込みを残して終了しても反映される"""
+        process = multiprocessing.get_context('fork').Process(target=_child_enqueue_and_exit, args=(self.db_path,))
+        process.start()
+        process.join(60)
+        self.assertEqual(process.exitcode, 0)
+        self.assertEqual(self._raw_rows(), [(f"child_{i}", i) for i in range(5)])
+
+        # チェックポイント後はDBファイル単体に全件が含まれる
+        checkpoint(self.db_path)
+        self.assertEqual(os.path.getsize(self.db_path + '-wal') if os.path.exists(self.db_path + '-wal') else 0, 0)
+
+    def test_execution_steps_batched(self):
+        """ExecutionLogDatabase のステップ追加は遅延書き込みで、完了タスクも同じトランザクションで更新"""
+        from execution_log_database import ExecutionLogDatabase, ExecutionType, ExecutionStatus
+
+        db = ExecutionLogDatabase(os.path.join(self.tmp.name, 'execution_logs.db'))
+        execution_id = db.create_execution(ExecutionType.SYMBOL_ADDITION, symbol='SOL')
+        db.update_execution_status(execution_id, ExecutionStatus.RUNNING, total_tasks=4)
+        for step in ('data_fetch', 'backtest', 'data_fetch'):
+            db.add_execution_step(execution_id, step, 'SUCCESS')
+        db.add_execution_step(execution_id, 'ml_training', 'FAILED', error_message='失敗')
+
+        execution = db.get_execution(execution_id)
+        self.assertEqual([step['step_name'] for step in execution['steps']],
+                         ['data_fetch', 'backtest', 'data_fetch', 'ml_training'])
+        self.assertEqual(execution['completed_tasks'], '["data_fetch", "backtest"]')
+        self.assertEqual(execution['progress_percentage'], 50.0)
+
+    def test_contention_benchmark(self):
+        """競合ベンチマーク: 書き込み・読み込みともロックエラーなしで全ステップが書き込まれる"""
+        result = run_contention_benchmark(writers=2, readers=1, updates_per_writer=20, mode='pooled', rows=50)
+        self.assertEqual((result['write_errors'], result['read_errors']), (0, 0))
+        self.assertEqual(result['steps_written'], 40)
+        self.assertGreater(result['reads'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
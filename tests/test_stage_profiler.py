@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+ステージプロファイラー（stage_profiler）のテストケース
+
+ヒストグラムのパーセンタイル精度、AnalysisResult からの集計とプロセス横断の合算、
+cProfile の間引き計測とレポート出力を確認する
+"""
+
+import unittest
+import os
+import sys
+import pstats
+import tempfile
+import multiprocessing
+import numpy as np
+from unittest.mock import patch
+
+# プロジェクトルートをパスに追加
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# BaseTestを継承してテスト環境の安全性を確保
+try:
+    from tests_organized.base_test import BaseTest
+    USE_BASE_TEST = True
+except ImportError:
+    USE_BASE_TEST = False
+    print("⚠️ BaseTestが利用できません。標準のunittestを使用します。")
+
+from stage_profiler import (
+    LatencyHistogram, flush_stage_profiles, load_stage_profile, format_stage_report,
+    profile_stage_call, run_overhead_benchmark
+)
+from sqlite_access import flush_pending_writes
+from engines.analysis_result import AnalysisResult, AnalysisStage, StageResult
+
+
+def _record_stages(execution_id, count, execution_time_ms):
+    """分析1回分と同じようにステージ結果を記録"""
+    for _ in range(count):
+        result = AnalysisResult(symbol='SOL', timeframe='1h', strategy='Balanced', execution_id=execution_id)
+        result.add_stage_result(StageResult(stage=AnalysisStage.DATA_FETCH, success=True,
+                                            execution_time_ms=execution_time_ms, data_processed=100,
+                                            bytes_processed=4000))
+        result.add_stage_result(StageResult(stage=AnalysisStage.LEVERAGE_DECISION, success=False,
+                                            execution_time_ms=execution_time_ms * 2, data_processed=100))
+
+
+def _worker_record_and_flush(execution_id, execution_time_ms):
+    """ワーカープロセス: 記録してタスク終了時と同じように書き込む"""
+    _record_stages(execution_id, 10, execution_time_ms)
+    flush_stage_profiles()
+
+
+def _traced_stage_work(size):
+    return sum(i * i for i in range(size))
+
+
+class TestStageProfiler(BaseTest if USE_BASE_TEST else unittest.TestCase):
+    """ステージプロファイラーのテスト"""
+
+    def setUp(self):
+        """テスト前準備"""
+        if USE_BASE_TEST:
+            super().setUp()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.env = patch.dict(os.environ, {
+            'STAGE_PROFILER_ENABLED': 'true',
+            'STAGE_PROFILE_DB': os.path.join(self.tmp.name, 'execution_logs.db'),
+            'STAGE_PROFILER_CAPTURE_DIR': os.path.join(self.tmp.name, 'stage_profiles'),
+        })
+        self.env.start()
+        # 先に実行されたテストの集計を一時DBへ書き出して空にする
+        flush_stage_profiles()
+
+    def tearDown(self):
+        """テスト後クリーンアップ"""
+        flush_stage_profiles()
+        flush_pending_writes(os.environ['STAGE_PROFILE_DB'])
+        self.env.stop()
+        self.tmp.cleanup()
+        if USE_BASE_TEST:
+            super().tearDown()
+
+    def test_histogram_percentiles(self):
+        """バケット件数からのパーセンタイルが実測値と約9%以内で一致し、合算しても同じ"""
+        rng = np.random.default_rng(0)
+        values = rng.lognormal(mean=1.0, sigma=1.2, size=5000)
+        first, second, whole = LatencyHistogram(), LatencyHistogram(), LatencyHistogram()
+        for i, value in enumerate(values):
+            (first if i % 2 else second).add(value)
+            whole.add(value)
+        first.merge(second)
+
+        for q in (50, 95, 99):
+            expected = np.percentile(values, q)
+            self.assertAlmostEqual(first.percentile(q) / expected, 1.0, delta=0.09)
+            self.assertEqual(first.percentile(q), whole.percentile(q))
+        self.assertEqual(first.count, 5000)
+        self.assertAlmostEqual(first.total_ms, values.sum())
+        self.assertIsNone(LatencyHistogram().percentile(50))
+
+    def test_aggregates_across_processes(self):
+        """全プロセスの集計を execution_id 単位で合算する"""
+        execution_id = 'exec_profile_test'
+        _record_stages(execution_id, 5, 1.0)
+        _record_stages('exec_other', 3, 1.0)
+        self.assertEqual(flush_stage_profiles(), 4)
+
+        context = multiprocessing.get_context('fork')
+        workers = [context.Process(target=_worker_record_and_flush, args=(execution_id, ms)) for ms in (2.0, 4.0)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join(60)
+            self.assertEqual(worker.exitcode, 0)
+
+        profile = load_stage_profile(execution_id)
+        self.assertEqual(profile['processes'], 3)
+        self.assertEqual(list(profile['stages']), ['data_fetch', 'leverage_decision'])
+        fetch = profile['stages']['data_fetch']
+        self.assertEqual((fetch['calls'], fetch['failures']), (25, 0))
+        self.assertEqual((fetch['rows_processed'], fetch['bytes_processed']), (2500, 100000))
+        self.assertAlmostEqual(fetch['total_ms'], 5 * 1.0 + 10 * 2.0 + 10 * 4.0)
+        self.assertEqual((fetch['min_ms'], fetch['max_ms']), (1.0, 4.0))
+        self.assertLessEqual(fetch['p50_ms'], fetch['p95_ms'])
+        self.assertEqual(profile['stages']['leverage_decision']['failures'], 25)
+
+        report = format_stage_report(profile)
+        self.assertIn('data_fetch', report)
+        self.assertIn('3プロセス', report)
+        self.assertEqual(load_stage_profile('exec_missing')['stages'], {})
+
+    def test_disabled(self):
+        """STAGE_PROFILER_ENABLED=false では集計しない"""
+        with patch.dict(os.environ, {'STAGE_PROFILER_ENABLED': 'false'}):
+            _record_stages('exec_disabled', 3, 1.0)
+        self.assertEqual(flush_stage_profiles(), 0)
+
+    def test_no_execution_id_not_recorded(self):
+        """実行IDのない呼び出し（単発のCLI・テストなど）は集計もcProfile計測もしない"""
+        with patch.dict(os.environ, {'STAGE_PROFILER_CAPTURE_STAGE': 'support_resistance_analysis',
+                                     'STAGE_PROFILER_CAPTURE_INTERVAL': '1'}):
+            os.environ.pop('CURRENT_EXECUTION_ID', None)
+            _record_stages(None, 3, 1.0)
+            self.assertEqual(profile_stage_call(AnalysisStage.SUPPORT_RESISTANCE, None, _traced_stage_work, 10),
+                             _traced_stage_work(10))
+        self.assertEqual(flush_stage_profiles(), 0)
+        self.assertFalse(os.path.exists(os.environ['STAGE_PROFILER_CAPTURE_DIR']))
+
+    def test_sampled_cprofile_capture(self):
+        """指定ステージだけを間引いて cProfile 計測し、.prof に保存する"""
+        execution_id = 'exec_capture_test'
+        with patch.dict(os.environ, {'STAGE_PROFILER_CAPTURE_STAGE': 'support_resistance_analysis',
+                                     'STAGE_PROFILER_CAPTURE_INTERVAL': '2'}):
+            for _ in range(4):
+                self.assertEqual(profile_stage_call(AnalysisStage.SUPPORT_RESISTANCE, execution_id,
+                                                    _traced_stage_work, 100), _traced_stage_work(100))
+            # 対象外のステージは計測しない。execution_id をキーワード引数で渡す関数もそのまま呼べる
+            profile_stage_call(AnalysisStage.ML_PREDICTION, execution_id,
+                               lambda execution_id=None: execution_id, execution_id='kw')
+        flush_stage_profiles()
+
+        profile = load_stage_profile(execution_id)
+        self.assertEqual(len(profile['captures']), 1)
+        self.assertIn('support_resistance_analysis_', os.path.basename(profile['captures'][0]))
+        stats = pstats.Stats(profile['captures'][0])
+        traced = [func for func in stats.stats if func[2] == '_traced_stage_work']
+        self.assertEqual(len(traced), 1)
+        # 4回中2回だけ計測
+        self.assertEqual(stats.stats[traced[0]][1], 2)
+
+    def test_overhead_benchmark(self):
+        """オーバーヘッド計測が集計とcProfile計測を行う"""
+        result = run_overhead_benchmark(calls=50, work_size=2000)
+        self.assertGreater(result['captured_calls'], 0)
+        self.assertGreater(result['p95_ms'], 0)
+        self.assertIn('overhead_pct', result)
+
+
+if __name__ == '__main__':
+    unittest.main()
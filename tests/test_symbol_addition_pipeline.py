@@ -242,12 +242,8 @@ class TestScalableAnalysisSystem(unittest.TestCase):
     def setUp(self):
         self.temp_dir = tempfile.mkdtemp(prefix="test_analysis_system_")
         
-        # テスト用分析システムを初期化
-        self.analysis_system = ScalableAnalysisSystem()
-        # テスト用ディレクトリを設定
-        self.analysis_system.base_dir = self.temp_dir
-        self.analysis_system.compressed_dir = os.path.join(self.temp_dir, "compressed")
-        os.makedirs(self.analysis_system.compressed_dir, exist_ok=True)
+        # テスト用ディレクトリで分析システムを初期化（トレードアーカイブ・DBも一時ディレクトリに作成）
+        self.analysis_system = ScalableAnalysisSystem(base_dir=self.temp_dir)
     
     def tearDown(self):
         shutil.rmtree(self.temp_dir, ignore_errors=True)
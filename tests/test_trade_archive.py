@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+カラム型トレードアーカイブ（trade_archive）のテストケース
+
+書き込んだトレードが元の形式で読み戻せること、列の射影・述語プッシュダウンとパーティションのスキップ、
+銘柄単位の一括読み込み、既存 pkl.gz の移行と ScalableAnalysisSystem からの読み込みを確認する
+"""
+
+import unittest
+import os
+import sys
+import gzip
+import pickle
+import sqlite3
+import tempfile
+import numpy as np
+import pandas as pd
+
+# プロジェクトルートをパスに追加
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# BaseTestを継承してテスト環境の安全性を確保
+try:
+    from tests_organized.base_test import BaseTest
+    USE_BASE_TEST = True
+except ImportError:
+    USE_BASE_TEST = False
+    print("⚠️ BaseTestが利用できません。標準のunittestを使用します。")
+
+from trade_archive import TradeArchive, migrate_pickles
+
+
+def _make_trades(count=6, day=1, leverage_start=1.0):
+    """分析結果と同じ形式のトレード（JST文字列の時刻、建値決済は is_success=None）"""
+    trades = []
+    for i in range(count):
+        success = [True, False, None][i % 3]
+        trades.append({
+            'entry_time': f"2025-03-{day + i:02d} 09:00:00 JST",
+            'exit_time': f"2025-03-{day + i:02d} 12:00:00 JST",
+            'entry_price': 100.0 + i,
+            'exit_price': 101.0 + i,
+            'leverage': leverage_start + i,
+            'pnl_pct': 0.01 * (i - 2),
+            'confidence': 0.5,
+            'is_success': success,
+            'trade_type': 'profit' if success else 'loss',
+            'strategy': 'Balanced',
+            'price_validation_level': None if i % 2 else 'normal',
+        })
+    return trades
+
+
+class TestTradeArchive(BaseTest if USE_BASE_TEST else unittest.TestCase):
+    """カラム型トレードアーカイブのテスト"""
+
+    def setUp(self):
+        """テスト前準備"""
+        if USE_BASE_TEST:
+            super().setUp()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.archive = TradeArchive(os.path.join(self.tmp.name, 'trade_archive'))
+
+    def tearDown(self):
+        """テスト後クリーンアップ"""
+        self.tmp.cleanup()
+        if USE_BASE_TEST:
+            super().tearDown()
+
+    def test_round_trip(self):
+        """dictのリスト・DataFrameとも書き込み時と同じ形式・値で読み戻せる"""
+        trades = _make_trades()
+        partition = self.archive.write('SOL', '1h', 'Balanced', trades)
+        self.assertEqual(self.archive.read_trades(partition), trades)
+
+        df = pd.DataFrame(trades)
+        partition = self.archive.write('SOL', '15m', 'Balanced', df)
+        pd.testing.assert_frame_equal(self.archive.read_trades(partition), df)
+
+        # 空のトレードも書き込める
+        partition = self.archive.write('SOL', '5m', 'Balanced', [])
+        self.assertEqual(self.archive.read_trades(partition), [])
+
+    def test_projection_and_predicates(self):
+        """指定列のみ型付き配列で返し、時刻・成否・レバレッジ帯で絞り込む"""
+        self.archive.write('SOL', '1h', 'Balanced', _make_trades())
+
+        arrays = self.archive.read('SOL', '1h', 'Balanced', columns=['leverage', 'is_success'])
+        self.assertEqual(list(arrays), ['leverage', 'is_success'])
+        np.testing.assert_array_equal(arrays['leverage'], [1, 2, 3, 4, 5, 6])
+        np.testing.assert_array_equal(arrays['is_success'], [1, 0, np.nan, 1, 0, np.nan])
+
+        # JSTの 3/2 09:00 〜 3/4 09:00（UTCでは前日0時）
+        arrays = self.archive.read('SOL', '1h', 'Balanced', columns=['entry_price'],
+                                   start_time='2025-03-02 00:00:00', end_time='2025-03-04 00:00:00')
+        np.testing.assert_array_equal(arrays['entry_price'], [101.0, 102.0, 103.0])
+
+        arrays = self.archive.read('SOL', '1h', 'Balanced', columns=['leverage'], is_success=True)
+        np.testing.assert_array_equal(arrays['leverage'], [1.0, 4.0])
+
+        arrays = self.archive.read('SOL', '1h', 'Balanced', columns=['leverage'],
+                                   leverage_buckets=[(0, 2), (5, None)])
+        np.testing.assert_array_equal(arrays['leverage'], [1.0, 5.0, 6.0])
+
+        df = self.archive.read_dataframe('SOL', '1h', 'Balanced', columns=['is_success', 'price_validation_level'],
+                                         is_success=False)
+        self.assertEqual(df['is_success'].tolist(), [False, False])
+        self.assertEqual(df['price_validation_level'].isna().tolist(), [True, False])
+        self.assertEqual(df['price_validation_level'].iloc[1], 'normal')
+
+    def test_read_symbol_skips_partitions(self):
+        """銘柄の全パーティションを連結し、統計で条件外のパーティションは列を読まない"""
+        self.archive.write('SOL', '1h', 'Balanced', _make_trades(day=1, leverage_start=1.0))
+        self.archive.write('SOL', '15m', 'Aggressive_ML', _make_trades(day=20, leverage_start=10.0))
+        self.archive.write('ETH', '1h', 'Balanced', _make_trades())
+
+        arrays = self.archive.read_symbol('SOL', columns=['leverage', 'timeframe', 'config'])
+        self.assertEqual(len(arrays['leverage']), 12)
+        self.assertEqual(sorted(set(zip(arrays['timeframe'].tolist(), arrays['config'].tolist()))),
+                         [('15m', 'Aggressive_ML'), ('1h', 'Balanced')])
+
+        before = self.archive.get_stats()
+        arrays = self.archive.read_symbol('SOL', columns=['leverage'], leverage_buckets=[(10, 20)])
+        np.testing.assert_array_equal(arrays['leverage'], [10, 11, 12, 13, 14, 15])
+        after = self.archive.get_stats()
+        self.assertEqual(after['partitions_skipped'] - before['partitions_skipped'], 1)
+        self.assertEqual(after['partitions_read'] - before['partitions_read'], 1)
+
+        arrays = self.archive.read_symbol('SOL', columns=['leverage'], start_time='2026-01-01')
+        self.assertEqual(len(arrays['leverage']), 0)
+        self.assertEqual(len(self.archive.read_symbol('SOL', timeframes=['15m'])['leverage']), 6)
+
+    def test_migration_and_system_loading(self):
+        """既存 pkl.gz を移行し、移行前後とも ScalableAnalysisSystem から同じトレードを読み込める"""
+        from scalable_analysis_system import ScalableAnalysisSystem
+
+        system = ScalableAnalysisSystem(base_dir=self.tmp.name)
+        legacy = _make_trades()
+        legacy_path = os.path.join(system.compressed_dir, 'SOL_1h_Balanced.pkl.gz')
+        with gzip.open(legacy_path, 'wb') as f:
+            pickle.dump(legacy, f)
+        # 新規保存はアーカイブのパーティション
+        new_path = system._save_compressed_data('SOL_15m_Aggressive_ML', _make_trades(day=20, leverage_start=10.0))
+        self.assertTrue(TradeArchive.is_partition(new_path))
+
+        with sqlite3.connect(system.db_path) as conn:
+            for timeframe, config, path in (('1h', 'Balanced', legacy_path), ('15m', 'Aggressive_ML', new_path)):
+                conn.execute(
+                    "INSERT INTO analyses (symbol, timeframe, config, compressed_path, status, sharpe_ratio) "
+                    "VALUES (?, ?, ?, ?, ?, ?)", ('SOL', timeframe, config, path, 'completed', 0.1))
+
+        # 移行前: pkl.gz とパーティションが混在していても一括で読める
+        arrays = system.load_symbol_trade_arrays('SOL', columns=['leverage', 'timeframe'], is_success=True)
+        self.assertEqual(sorted(zip(arrays['timeframe'].tolist(), arrays['leverage'].tolist())),
+                         [('15m', 10.0), ('15m', 13.0), ('1h', 1.0), ('1h', 4.0)])
+
+        summary = migrate_pickles(system.db_path, system.trade_archive, delete_source=True)
+        self.assertEqual(summary, {'migrated': 1, 'skipped': 1, 'errors': 0})
+        self.assertFalse(os.path.exists(legacy_path))
+        with sqlite3.connect(system.db_path) as conn:
+            (path,) = conn.execute("SELECT compressed_path FROM analyses WHERE timeframe='1h'").fetchone()
+        self.assertTrue(TradeArchive.is_partition(path))
+
+        self.assertEqual(system.load_compressed_trades('SOL', '1h', 'Balanced'), legacy)
+        migrated = system.load_symbol_trade_arrays('SOL', columns=['leverage', 'timeframe'], is_success=True)
+        self.assertEqual(sorted(zip(migrated['timeframe'].tolist(), migrated['leverage'].tolist())),
+                         sorted(zip(arrays['timeframe'].tolist(), arrays['leverage'].tolist())))
+
+        # 低パフォーマンス分析のクリーンアップでパーティションも削除される
+        system.cleanup_low_performers(min_sharpe=0.5)
+        self.assertEqual(system.trade_archive.partitions('SOL'), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
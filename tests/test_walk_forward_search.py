@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+WalkForwardEngine の successive halving パラメータ探索のテストケース
+
+グリッド探索と同じ結果構造に探索トレースが付くこと、各段で候補が絞り込まれて学習回数が大きく減ること、
+最終段の評価がグリッド探索の同じ候補の評価と一致することを確認する
+"""
+
+import unittest
+import os
+import sys
+import logging
+import numpy as np
+import pandas as pd
+
+# プロジェクトルートをパスに追加
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# BaseTestを継承してテスト環境の安全性を確保
+try:
+    from tests_organized.base_test import BaseTest
+    USE_BASE_TEST = True
+except ImportError:
+    USE_BASE_TEST = False
+    print("⚠️ BaseTestが利用できません。標準のunittestを使用します。")
+
+from walk_forward_engine import WalkForwardEngine
+
+FEATURES = ['a', 'b', 'c']
+PARAM_GRID = {
+    'n_estimators': [30, 60, 90],
+    'max_depth': [2, 4, 6],
+    'learning_rate': [0.03, 0.1, 0.3],
+    'n_jobs': [1]
+}
+
+
+def _make_data(n=900):
+    rng = np.random.default_rng(7)
+    data = pd.DataFrame(rng.normal(size=(n, 3)), columns=FEATURES)
+    data['target'] = data['a'] * 0.5 + data['b'].rolling(5, min_periods=1).mean() + rng.normal(size=n) * 0.3
+    return data
+
+
+class TestWalkForwardSearch(BaseTest if USE_BASE_TEST else unittest.TestCase):
+    """successive halving パラメータ探索のテスト"""
+
+    def setUp(self):
+        """テスト前準備"""
+        if USE_BASE_TEST:
+            super().setUp()
+        logging.disable(logging.INFO)
+        self.engine = WalkForwardEngine(n_splits=3, search_workers=2)
+        self.data = _make_data()
+
+    def tearDown(self):
+        """テスト後クリーンアップ"""
+        logging.disable(logging.NOTSET)
+        if USE_BASE_TEST:
+            super().tearDown()
+
+    def test_successive_halving_prunes_candidates(self):
+        """各段で候補を1/3に絞り、最終段だけ全フォールド・全ラウンドで評価する"""
+        X, y = self.data[FEATURES], self.data['target']
+        grid = self.engine.optimize_parameters(X, y, PARAM_GRID, search='grid')
+        halving = self.engine.optimize_parameters(X, y, PARAM_GRID, search='successive_halving')
+
+        self.assertLessEqual({'best_params', 'best_score', 'optimization_results', 'search_trace'}, set(grid))
+        self.assertEqual(set(halving), set(grid))
+        self.assertEqual(grid['n_fits'], 27 * 3)
+
+        trace = halving['search_trace']
+        self.assertEqual([rung['n_candidates'] for rung in trace], [27, 9, 3, 1])
+        self.assertEqual([rung['n_folds'] for rung in trace], [1, 1, 1, 3])
+        self.assertEqual(trace[-1]['resource_fraction'], 1.0)
+        self.assertEqual(trace[0]['evaluations'][0]['n_estimators'],
+                         int(np.ceil(trace[0]['evaluations'][0]['params']['n_estimators'] / 27)))
+        self.assertLess(halving['n_fits'], grid['n_fits'])
+        self.assertLess(halving['n_rounds'], grid['n_rounds'] / 5)
+
+        # 最終段の評価は同じ候補のグリッド評価と一致する
+        self.assertEqual(len(halving['optimization_results']), 1)
+        grid_scores = {tuple(sorted(r['params'].items())): r['score'] for r in grid['optimization_results']}
+        self.assertAlmostEqual(halving['best_score'], grid_scores[tuple(sorted(halving['best_params'].items()))])
+        self.assertIn('fold_scores', halving['optimization_results'][0]['cv_results'])
+
+    def test_cached_folds_match_cross_validation(self):
+        """準備済みフォールドを使った交差検証は毎回分割する場合と同じ結果になる"""
+        X, y = self.data[FEATURES], self.data['target']
+        params = {'n_estimators': 20, 'n_jobs': 1}
+        folds = self.engine._build_cv_folds(X, y)
+        cached = self.engine.time_series_cross_validation(X, y, params, folds=folds)
+        fresh = self.engine.time_series_cross_validation(X, y, params)
+        self.assertEqual(cached['mean_mse'], fresh['mean_mse'])
+        self.assertEqual(cached['n_folds'], 3)
+
+    def test_engine_default_search_and_validation(self):
+        """エンジンの param_search がウィンドウ内の最適化に使われ、不正な指定はエラーになる"""
+        engine = WalkForwardEngine(window_size=600, step_size=300, min_train_size=300, validation_size=100,
+                                   n_splits=3, param_search='successive_halving', search_workers=1)
+        results = engine.run_walk_forward_analysis(self.data, FEATURES, 'target', {'n_jobs': 1}, {},
+                                                   optimize_params=True, param_grid=PARAM_GRID)
+        optimizations = [r['optimization'] for r in results['window_results']]
+        self.assertTrue(optimizations)
+        self.assertTrue(all(o['search'] == 'successive_halving' for o in optimizations))
+
+        X, y = self.data[FEATURES], self.data['target']
+        with self.assertRaises(ValueError):
+            self.engine.optimize_parameters(X, y, PARAM_GRID, search='random')
+        with self.assertRaises(ValueError):
+            self.engine.optimize_parameters(X, y, PARAM_GRID, search='successive_halving', reduction_factor=1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -38,6 +38,10 @@ class BaseTest(unittest.TestCase):
         print(f"   📁 テスト用ディレクトリ: {self.test_dir}")
         print(f"   ⏰ 開始時刻: {self.test_start_time.strftime('%H:%M:%S')}")
         
+        # ステージプロファイラーが本番の execution_logs.db に書き込まないよう無効化
+        self._previous_stage_profiler_enabled = os.environ.get('STAGE_PROFILER_ENABLED')
+        os.environ['STAGE_PROFILER_ENABLED'] = 'false'
+        
         # 標準的なテスト用DBパスを設定
         self.setup_test_databases()
         
@@ -50,6 +54,12 @@ class BaseTest(unittest.TestCase):
             # テスト固有のクリーンアップ
             self.custom_teardown()
             
+            # ステージプロファイラーの設定を戻す
+            if self._previous_stage_profiler_enabled is None:
+                os.environ.pop('STAGE_PROFILER_ENABLED', None)
+            else:
+                os.environ['STAGE_PROFILER_ENABLED'] = self._previous_stage_profiler_enabled
+            
             # テスト用ディレクトリの削除
             if hasattr(self, 'test_dir') and os.path.exists(self.test_dir):
                 shutil.rmtree(self.test_dir)
@@ -0,0 +1,737 @@
+#!/usr/bin/env python3
+"""
+カラム型トレードアーカイブ
+
+compressed/{analysis_id}.pkl.gz（gzip + pickle）の代わりに、(銘柄, 時間足, 戦略) ごとのパーティションに
+トレードをカラム別の型付きバイナリとして保存する。
+
+- 列の射影: 必要な列のファイルだけを np.memmap で読む（ファイル全体の展開・unpickleが不要）
+- 述語プッシュダウン: エントリー時刻の範囲・is_success・レバレッジ帯で絞り込み。
+  パーティションごとの統計（meta.json）で条件に合わないパーティションは列ファイルを開かずにスキップ
+- 一括読み込み: read_symbol() で銘柄の全パーティションを1つの配列セットに連結
+- 既存pickleの移行: migrate_pickles() / `python trade_archive.py migrate`
+- 読み込みベンチマーク: `python trade_archive.py benchmark`
+
+パーティション構成:
+    {base_dir}/{symbol}/{timeframe}/{config}/
+        {列名}.bin        (カラム別の固定長配列、文字列は固定長Unicode)
+        {列名}.valid.bin  (欠損がある文字列列のみ、有効フラグ)
+        meta.json         (スキーマ・行数・パーティション統計)
+        .lock             (書き込みロック)
+
+Usage:
+    archive = TradeArchive('large_scale_analysis/trade_archive')
+    archive.write('SOL', '1h', 'Conservative_ML', trades)
+    arrays = archive.read_symbol('SOL', columns=['leverage', 'pnl_pct'], is_success=True)
+"""
+
+import os
+import json
+import fcntl
+import gzip
+import pickle
+import shutil
+import time
+import logging
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_VERSION = 1
+
+# エントリー時刻（UTCミリ秒）の内部列。時刻範囲の絞り込みに使う
+ENTRY_TS_COLUMN = '__entry_ts'
+NAT_MS = np.iinfo(np.int64).min
+
+# 分析結果のトレード時刻は 'YYYY-mm-dd HH:MM:SS JST' 形式
+JST_SUFFIX = ' JST'
+
+
+# === 型変換 ===
+
+def _is_missing(value) -> bool:
+    return value is None or (isinstance(value, float) and np.isnan(value))
+
+
+def _entry_time_ms(values) -> np.ndarray:
+    """entry_time 列（JST文字列・datetime）をUTCミリ秒に変換（解釈できない値はNAT_MS）"""
+    series = pd.Series(values, dtype=object)
+    result = np.full(len(series), NAT_MS, dtype=np.int64)
+    if series.empty:
+        return result
+
+    is_jst = series.map(lambda v: isinstance(v, str) and v.endswith(JST_SUFFIX))
+    if is_jst.any():
+        parsed = pd.to_datetime(series[is_jst].str[:-len(JST_SUFFIX)], errors='coerce')
+        parsed = parsed.dt.tz_localize('Asia/Tokyo').dt.tz_convert('UTC')
+        valid = parsed.notna().to_numpy()
+        result[np.flatnonzero(is_jst.to_numpy())[valid]] = parsed[valid].dt.as_unit('ms').astype('int64').to_numpy()
+    others = ~is_jst
+    if others.any():
+        parsed = pd.to_datetime(series[others], errors='coerce', utc=True, format='mixed')
+        valid = parsed.notna().to_numpy()
+        result[np.flatnonzero(others.to_numpy())[valid]] = parsed[valid].dt.as_unit('ms').astype('int64').to_numpy()
+    return result
+
+
+def _to_ms(value) -> int:
+    """datetime / Timestamp / 文字列 / ミリ秒整数をUTCミリ秒に変換"""
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    if isinstance(value, str) and value.endswith(JST_SUFFIX):
+        return int(_entry_time_ms([value])[0])
+    timestamp = pd.Timestamp(value)
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.tz_localize('UTC')
+    return int(timestamp.value // 1_000_000)
+
+
+def encode_trades(trades) -> Tuple[List[Dict], Dict[str, np.ndarray]]:
+    """
+    トレード（dictのリスト / DataFrame）をスキーマと格納用の列配列に変換
+
+    Returns:
+        (schema, storage): schemaは列ごとの {name, logical, dtype}、storageは列名→配列
+        （文字列列に欠損がある場合は '{name}.valid' も含む）
+    """
+    if trades is None:
+        df = pd.DataFrame()
+    elif isinstance(trades, pd.DataFrame):
+        df = trades
+    else:
+        df = pd.DataFrame(list(trades))
+
+    schema = []
+    storage = {}
+    for name in df.columns:
+        name = str(name)
+        column = df[name]
+        if pd.api.types.is_bool_dtype(column):
+            logical, values = 'bool', column.to_numpy(dtype=bool)
+        elif pd.api.types.is_datetime64_any_dtype(column):
+            utc = pd.to_datetime(column, utc=True)
+            logical, values = 'datetime', utc.dt.as_unit('ns').astype('int64').to_numpy()
+        elif pd.api.types.is_integer_dtype(column):
+            logical, values = 'int', column.to_numpy(dtype=np.int64)
+        elif pd.api.types.is_float_dtype(column):
+            logical, values = 'float', column.to_numpy(dtype=np.float64)
+        else:
+            objects = column.to_numpy(dtype=object)
+            present = [v for v in objects if not _is_missing(v)]
+            if present and all(isinstance(v, (bool, np.bool_)) for v in present):
+                logical = 'nullable_bool'
+                values = np.array([-1 if _is_missing(v) else int(bool(v)) for v in objects], dtype=np.int8)
+            elif all(isinstance(v, (int, float, np.integer, np.floating)) and not isinstance(v, bool)
+                     for v in present):
+                # 全て欠損の列も数値（NaN）として扱う
+                logical = 'float'
+                values = np.array([np.nan if _is_missing(v) else float(v) for v in objects], dtype=np.float64)
+            else:
+                logical = 'string'
+                valid = np.array([not _is_missing(v) for v in objects], dtype=bool)
+                texts = ['' if _is_missing(v) else str(v) for v in objects]
+                width = max([1] + [len(t) for t in texts])
+                values = np.array(texts, dtype=f'<U{width}')
+                if not valid.all():
+                    storage[f'{name}.valid'] = valid
+        schema.append({'name': name, 'logical': logical, 'dtype': values.dtype.str})
+        storage[name] = values
+
+    if 'entry_time' in storage:
+        storage[ENTRY_TS_COLUMN] = _entry_time_ms(df['entry_time'].to_numpy(dtype=object))
+    else:
+        storage[ENTRY_TS_COLUMN] = np.full(len(df), NAT_MS, dtype=np.int64)
+    return schema, storage
+
+
+def _decode_array(entry: Dict, values: np.ndarray) -> np.ndarray:
+    """格納配列を読み出し用の型付き配列に変換（nullable_bool は 1.0/0.0/NaN の float64）"""
+    logical = entry['logical']
+    if logical == 'nullable_bool':
+        decoded = values.astype(np.float64)
+        decoded[values < 0] = np.nan
+        return decoded
+    if logical == 'datetime':
+        return np.asarray(values).view('datetime64[ns]')
+    return values
+
+
+def _missing_array(rows: int, dtype) -> np.ndarray:
+    """パーティションに存在しない列の埋め値"""
+    if dtype is not None and np.dtype(dtype).kind == 'U':
+        return np.full(rows, '', dtype=dtype)
+    if dtype is not None and np.dtype(dtype).kind == 'M':
+        return np.full(rows, np.datetime64('NaT'), dtype=dtype)
+    return np.full(rows, np.nan, dtype=np.float64)
+
+
+def _partition_stats(storage: Dict[str, np.ndarray], schema: List[Dict]) -> Dict:
+    """パーティションの統計（述語プッシュダウン用）"""
+    logicals = {entry['name']: entry['logical'] for entry in schema}
+    stats = {}
+    entry_ts = storage[ENTRY_TS_COLUMN]
+    known = entry_ts[entry_ts != NAT_MS]
+    stats['entry_ts_min'] = int(known.min()) if len(known) else None
+    stats['entry_ts_max'] = int(known.max()) if len(known) else None
+    stats['has_unknown_entry_time'] = bool(len(known) < len(entry_ts))
+
+    if 'leverage' in storage and logicals.get('leverage') in ('float', 'int'):
+        leverage = storage['leverage'].astype(np.float64)
+        leverage = leverage[~np.isnan(leverage)]
+        stats['leverage_min'] = float(leverage.min()) if len(leverage) else None
+        stats['leverage_max'] = float(leverage.max()) if len(leverage) else None
+
+    if 'is_success' in storage and logicals.get('is_success') in ('bool', 'nullable_bool'):
+        codes = storage['is_success'].astype(np.int8)
+        stats['success_count'] = int((codes == 1).sum())
+        stats['failure_count'] = int((codes == 0).sum())
+    return stats
+
+
+# === 絞り込み ===
+
+class TradeFilter:
+    """
+    トレードの絞り込み条件
+
+    Args:
+        start_time / end_time: エントリー時刻の範囲（両端を含む）
+        is_success: True / False で成功・失敗のみ（None は絞り込まない）
+        leverage_buckets: レバレッジ帯 [(下限, 上限), ...]（下限 <= レバレッジ < 上限、上限Noneは上限なし）
+    """
+
+    def __init__(self, start_time=None, end_time=None, is_success: Optional[bool] = None,
+                 leverage_buckets: Optional[Sequence[Tuple[float, Optional[float]]]] = None):
+        self.start_ms = None if start_time is None else _to_ms(start_time)
+        self.end_ms = None if end_time is None else _to_ms(end_time)
+        self.is_success = is_success
+        self.leverage_buckets = [(float(lo), np.inf if hi is None else float(hi))
+                                 for lo, hi in (leverage_buckets or [])]
+
+    @property
+    def active(self) -> bool:
+        return (self.start_ms is not None or self.end_ms is not None or self.is_success is not None
+                or bool(self.leverage_buckets))
+
+    def columns(self) -> List[str]:
+        """条件の評価に必要な格納列"""
+        needed = []
+        if self.start_ms is not None or self.end_ms is not None:
+            needed.append(ENTRY_TS_COLUMN)
+        if self.is_success is not None:
+            needed.append('is_success')
+        if self.leverage_buckets:
+            needed.append('leverage')
+        return needed
+
+    def may_match(self, meta: Dict) -> bool:
+        """パーティション統計から条件に合う行が存在しうるか"""
+        stats = meta.get('stats', {})
+        if meta.get('rows', 0) == 0:
+            return False
+        if self.start_ms is not None or self.end_ms is not None:
+            if stats.get('entry_ts_min') is None:
+                return False
+            if self.start_ms is not None and stats['entry_ts_max'] < self.start_ms:
+                return False
+            if self.end_ms is not None and stats['entry_ts_min'] > self.end_ms:
+                return False
+        if self.is_success is not None:
+            if 'success_count' not in stats:
+                return False
+            if stats['success_count' if self.is_success else 'failure_count'] == 0:
+                return False
+        if self.leverage_buckets:
+            lo, hi = stats.get('leverage_min'), stats.get('leverage_max')
+            if lo is None:
+                return False
+            if not any(b_lo <= hi and lo < b_hi for b_lo, b_hi in self.leverage_buckets):
+                return False
+        return True
+
+    def mask(self, rows: int, storage: Dict[str, np.ndarray], logicals: Dict[str, str]) -> Optional[np.ndarray]:
+        """行ごとの一致フラグ（条件なしはNone）"""
+        if not self.active:
+            return None
+        mask = np.ones(rows, dtype=bool)
+        if self.start_ms is not None or self.end_ms is not None:
+            entry_ts = storage[ENTRY_TS_COLUMN]
+            mask &= entry_ts != NAT_MS
+            if self.start_ms is not None:
+                mask &= entry_ts >= self.start_ms
+            if self.end_ms is not None:
+                mask &= entry_ts <= self.end_ms
+        if self.is_success is not None:
+            if logicals.get('is_success') not in ('bool', 'nullable_bool'):
+                return np.zeros(rows, dtype=bool)
+            mask &= storage['is_success'].astype(np.int8) == int(self.is_success)
+        if self.leverage_buckets:
+            if logicals.get('leverage') not in ('float', 'int'):
+                return np.zeros(rows, dtype=bool)
+            leverage = storage['leverage'].astype(np.float64)
+            in_bucket = np.zeros(rows, dtype=bool)
+            for lo, hi in self.leverage_buckets:
+                in_bucket |= (leverage >= lo) & (leverage < hi)
+            mask &= in_bucket
+        return mask
+
+
+def select_columns(schema: List[Dict], storage: Dict[str, np.ndarray], rows: int,
+                   columns: Optional[Sequence[str]], trade_filter: TradeFilter) -> Dict[str, np.ndarray]:
+    """格納配列から射影・絞り込みした読み出し用の配列を作る"""
+    logicals = {entry['name']: entry['logical'] for entry in schema}
+    entries = {entry['name']: entry for entry in schema}
+    names = [entry['name'] for entry in schema] if columns is None else list(columns)
+
+    mask = trade_filter.mask(rows, storage, logicals)
+    selected_rows = rows if mask is None else int(mask.sum())
+    result = {}
+    for name in names:
+        if name not in entries:
+            result[name] = _missing_array(selected_rows, None)
+            continue
+        values = storage[name] if mask is None else storage[name][mask]
+        result[name] = _decode_array(entries[name], values)
+    return result
+
+
+# === アーカイブ本体 ===
+
+class TradeArchive:
+    """(銘柄, 時間足, 戦略) でパーティション分割したカラム型トレードアーカイブ"""
+
+    def __init__(self, base_dir):
+        self.base_dir = Path(base_dir)
+        self.stats = {'partitions_read': 0, 'partitions_skipped': 0, 'rows_read': 0, 'writes': 0}
+
+    # --- パス・ロック ---
+
+    @staticmethod
+    def _safe_name(name: str) -> str:
+        return str(name).replace('/', '_').replace(':', '_').replace(os.sep, '_')
+
+    def partition_dir(self, symbol: str, timeframe: str, config: str) -> Path:
+        return self.base_dir / self._safe_name(symbol) / self._safe_name(timeframe) / self._safe_name(config)
+
+    @contextmanager
+    def _lock(self, partition: Path, exclusive: bool):
+        partition.mkdir(parents=True, exist_ok=True)
+        with open(partition / '.lock', 'a+') as lock_file:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    @staticmethod
+    def is_partition(path) -> bool:
+        """パスがアーカイブのパーティションか"""
+        return path is not None and (Path(path) / 'meta.json').exists()
+
+    @staticmethod
+    def _read_meta(partition: Path) -> Dict:
+        with open(partition / 'meta.json', 'r') as f:
+            return json.load(f)
+
+    # --- 書き込み ---
+
+    def write(self, symbol: str, timeframe: str, config: str, trades) -> str:
+        """パーティションを書き込み（既存のパーティションは置き換え）、パーティションのパスを返す"""
+        schema, storage = encode_trades(trades)
+        rows = len(storage[ENTRY_TS_COLUMN])
+        partition = self.partition_dir(symbol, timeframe, config)
+
+        with self._lock(partition, exclusive=True):
+            for name, values in storage.items():
+                tmp_path = partition / f'{name}.bin.tmp'
+                with open(tmp_path, 'wb') as f:
+                    f.write(np.ascontiguousarray(values).tobytes())
+                os.replace(tmp_path, partition / f'{name}.bin')
+
+            # 置き換え前のパーティションにしかない列ファイルを削除
+            keep = {f'{name}.bin' for name in storage}
+            for path in partition.glob('*.bin'):
+                if path.name not in keep:
+                    path.unlink()
+
+            meta = {
+                'version': ARCHIVE_VERSION,
+                'symbol': symbol, 'timeframe': timeframe, 'config': config,
+                'rows': rows,
+                # 読み込み時に元の形式（dictのリスト / DataFrame）で返すため
+                'container': 'dataframe' if isinstance(trades, pd.DataFrame) else 'records',
+                'schema': schema,
+                'valid_columns': sorted(name[:-len('.valid')] for name in storage if name.endswith('.valid')),
+                'stats': _partition_stats(storage, schema),
+                'written_at': time.time(),
+            }
+            tmp_path = partition / 'meta.json.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump(meta, f)
+            os.replace(tmp_path, partition / 'meta.json')
+
+        self.stats['writes'] += 1
+        return str(partition)
+
+    def delete(self, symbol: str, timeframe: str, config: str):
+        shutil.rmtree(self.partition_dir(symbol, timeframe, config), ignore_errors=True)
+
+    # --- 読み込み ---
+
+    def _map_partition(self, partition: Path, meta: Dict, names: Iterable[str]) -> Dict[str, np.ndarray]:
+        """必要な列だけをmemmapで読み込み"""
+        dtypes = {entry['name']: entry['dtype'] for entry in meta['schema']}
+        dtypes[ENTRY_TS_COLUMN] = '<i8'
+        rows = meta['rows']
+        storage = {}
+        for name in names:
+            if name in storage or name not in dtypes:
+                continue
+            if rows == 0:
+                storage[name] = np.empty(0, dtype=dtypes[name])
+            else:
+                storage[name] = np.memmap(partition / f'{name}.bin', dtype=dtypes[name], mode='r', shape=(rows,))
+        return storage
+
+    def _read_partition(self, partition: Path, columns: Optional[Sequence[str]],
+                        trade_filter: TradeFilter) -> Tuple[Dict, Dict[str, np.ndarray]]:
+        """パーティションを読み込み（統計で条件に合わない場合は列ファイルを開かずに0行を返す）"""
+        with self._lock(partition, exclusive=False):
+            meta = self._read_meta(partition)
+            names = [entry['name'] for entry in meta['schema']] if columns is None else list(columns)
+            if trade_filter.active and not trade_filter.may_match(meta):
+                self.stats['partitions_skipped'] += 1
+                empty = {entry['name']: np.empty(0, dtype=entry['dtype']) for entry in meta['schema']}
+                return meta, select_columns(meta['schema'], empty, 0, columns, TradeFilter())
+            storage = self._map_partition(partition, meta, names + trade_filter.columns())
+
+        arrays = select_columns(meta['schema'], storage, meta['rows'], columns, trade_filter)
+        self.stats['partitions_read'] += 1
+        self.stats['rows_read'] += _row_count(arrays)
+        return meta, arrays
+
+    def read(self, symbol: str, timeframe: str, config: str, columns: Optional[Sequence[str]] = None,
+             **filters) -> Optional[Dict[str, np.ndarray]]:
+        """1パーティションを列配列で読み込み（存在しない場合はNone）"""
+        return self.read_path(self.partition_dir(symbol, timeframe, config), columns, **filters)
+
+    def read_path(self, partition, columns: Optional[Sequence[str]] = None,
+                  **filters) -> Optional[Dict[str, np.ndarray]]:
+        """パーティションのパスを指定して読み込み"""
+        partition = Path(partition)
+        if not self.is_partition(partition):
+            return None
+        return self._read_partition(partition, columns, TradeFilter(**filters))[1]
+
+    def read_dataframe(self, symbol: str, timeframe: str, config: str,
+                       columns: Optional[Sequence[str]] = None, **filters) -> Optional[pd.DataFrame]:
+        """1パーティションを従来のpickleと同じ形のDataFrameで読み込み"""
+        return self.read_path_dataframe(self.partition_dir(symbol, timeframe, config), columns, **filters)
+
+    def read_path_dataframe(self, partition, columns: Optional[Sequence[str]] = None,
+                            **filters) -> Optional[pd.DataFrame]:
+        """パーティションのパスを指定してDataFrameで読み込み（欠損・None・型を復元）"""
+        partition = Path(partition)
+        if not self.is_partition(partition):
+            return None
+        trade_filter = TradeFilter(**filters)
+        with self._lock(partition, exclusive=False):
+            meta = self._read_meta(partition)
+            names = [entry['name'] for entry in meta['schema']] if columns is None else list(columns)
+            valid_names = [f'{name}.valid' for name in meta.get('valid_columns', []) if name in names]
+            dtypes = {entry['name']: entry['dtype'] for entry in meta['schema']}
+            dtypes.update({name: '|b1' for name in valid_names})
+            storage = self._map_partition(partition, meta, names + trade_filter.columns())
+            for name in valid_names:
+                storage[name] = (np.memmap(partition / f'{name}.bin', dtype='|b1', mode='r', shape=(meta['rows'],))
+                                 if meta['rows'] else np.empty(0, dtype=bool))
+
+        mask = trade_filter.mask(meta['rows'], storage, {e['name']: e['logical'] for e in meta['schema']})
+        data = {}
+        for entry in meta['schema']:
+            name = entry['name']
+            if name not in names:
+                continue
+            values = storage[name] if mask is None else storage[name][mask]
+            logical = entry['logical']
+            if logical == 'nullable_bool':
+                data[name] = pd.Series([None if v < 0 else bool(v) for v in values], dtype=object)
+            elif logical == 'datetime':
+                data[name] = pd.to_datetime(np.asarray(values), unit='ns', utc=True)
+            elif logical == 'string':
+                texts = np.asarray(values).astype(object)
+                if f'{name}.valid' in storage:
+                    valid = storage[f'{name}.valid'] if mask is None else storage[f'{name}.valid'][mask]
+                    texts[~np.asarray(valid)] = None
+                data[name] = pd.Series(texts)
+            else:
+                data[name] = np.array(values)
+        self.stats['partitions_read'] += 1
+        return pd.DataFrame(data, columns=[name for name in names if name in data])
+
+    def read_trades(self, partition):
+        """パーティションを書き込み時と同じ形式（dictのリスト / DataFrame）で読み込み"""
+        df = self.read_path_dataframe(partition)
+        if df is None:
+            return None
+        with self._lock(Path(partition), exclusive=False):
+            container = self._read_meta(Path(partition)).get('container', 'records')
+        if container == 'dataframe':
+            return df
+        # 数値列の欠損（NaN）は元のdictと同じくNoneに戻す
+        return [{name: None if _is_missing(value) else value for name, value in record.items()}
+                for record in df.to_dict('records')]
+
+    def partitions(self, symbol: Optional[str] = None) -> List[Path]:
+        """パーティション一覧（銘柄指定可）"""
+        root = self.base_dir / self._safe_name(symbol) if symbol is not None else self.base_dir
+        pattern = '*/*/meta.json' if symbol is not None else '*/*/*/meta.json'
+        return sorted(path.parent for path in root.glob(pattern))
+
+    def read_batch(self, partitions: Iterable, columns: Optional[Sequence[str]] = None,
+                   **filters) -> Dict[str, np.ndarray]:
+        """
+        複数パーティションを読み込み、1つの配列セットに連結
+
+        'timeframe' / 'config' 列（トレードデータに同名の列がない場合）にパーティションの値を付与する。
+        """
+        trade_filter = TradeFilter(**filters)
+        parts = []
+        for partition in partitions:
+            partition = Path(partition)
+            if self.is_partition(partition):
+                parts.append(self._read_partition(partition, columns, trade_filter))
+        return concatenate_parts(parts, columns)
+
+    def read_sources(self, sources: Iterable[Tuple[str, str, str]], columns: Optional[Sequence[str]] = None,
+                     **filters) -> Dict[str, np.ndarray]:
+        """
+        (時間足, 戦略, パス) の一覧を読み込んで1つの配列セットに連結
+
+        パスはパーティション、または移行前の pkl.gz（メモリ上で同じ形式に変換して同じ条件で絞り込む）。
+        """
+        trade_filter = TradeFilter(**filters)
+        parts = []
+        for timeframe, config, path in sources:
+            if not path:
+                continue
+            if self.is_partition(path):
+                parts.append(self._read_partition(Path(path), columns, trade_filter))
+            elif os.path.isfile(path):
+                try:
+                    trades = load_pickled_trades(path)
+                except Exception as e:
+                    logger.warning(f"⚠️ トレードデータ読み込みエラー {path}: {e}")
+                    continue
+                schema, storage = encode_trades(trades)
+                rows = len(storage[ENTRY_TS_COLUMN])
+                meta = {'timeframe': timeframe, 'config': config, 'rows': rows, 'schema': schema}
+                parts.append((meta, select_columns(schema, storage, rows, columns, trade_filter)))
+        return concatenate_parts(parts, columns)
+
+    def read_symbol(self, symbol: str, columns: Optional[Sequence[str]] = None,
+                    timeframes: Optional[Sequence[str]] = None, configs: Optional[Sequence[str]] = None,
+                    **filters) -> Dict[str, np.ndarray]:
+        """銘柄の全パーティション（時間足・戦略で限定可）を1つの配列セットで読み込み"""
+        partitions = self.partitions(symbol)
+        if timeframes is not None:
+            allowed = {self._safe_name(tf) for tf in timeframes}
+            partitions = [p for p in partitions if p.parent.name in allowed]
+        if configs is not None:
+            allowed = {self._safe_name(c) for c in configs}
+            partitions = [p for p in partitions if p.name in allowed]
+        return self.read_batch(partitions, columns, **filters)
+
+    def get_stats(self) -> Dict[str, int]:
+        """読み書き統計を取得"""
+        return dict(self.stats)
+
+
+def _row_count(arrays: Dict[str, np.ndarray]) -> int:
+    return len(next(iter(arrays.values()))) if arrays else 0
+
+
+def concatenate_parts(parts: List[Tuple[Dict, Dict[str, np.ndarray]]],
+                      columns: Optional[Sequence[str]] = None) -> Dict[str, np.ndarray]:
+    """
+    (meta, 配列) のリストを列ごとに連結（列がないパーティションは欠損値で埋める）
+
+    'timeframe' / 'config' 列はトレードデータに同名の列がなければパーティションの値で付与する。
+    """
+    names = list(columns) if columns is not None else []
+    if columns is None:
+        for meta, _ in parts:
+            names.extend(entry['name'] for entry in meta['schema'] if entry['name'] not in names)
+    present = {entry['name'] for meta, _ in parts for entry in meta['schema']}
+    rows_per_part = [_row_count(arrays) for _, arrays in parts]
+
+    result = {}
+    for name in names:
+        if name in ('timeframe', 'config') and name not in present:
+            labels = [str(meta.get(name, '')) for meta, _ in parts]
+            result[name] = np.repeat(np.array(labels, dtype=str), rows_per_part) if parts else np.empty(0, dtype='<U1')
+            continue
+        # パーティション側の型（文字列・datetime）に合わせて欠損値を埋める
+        dtype = next((arrays[name].dtype for meta, arrays in parts
+                      if any(entry['name'] == name for entry in meta['schema'])), None)
+        pieces = [np.asarray(arrays[name]) if any(entry['name'] == name for entry in meta['schema'])
+                  else _missing_array(rows, dtype)
+                  for (meta, arrays), rows in zip(parts, rows_per_part)]
+        try:
+            result[name] = np.concatenate(pieces) if pieces else _missing_array(0, dtype)
+        except (TypeError, ValueError):
+            # パーティション間で型が異なる列はobject配列で連結
+            result[name] = np.concatenate([piece.astype(object) for piece in pieces])
+
+    if columns is None:
+        for label in ('timeframe', 'config'):
+            if label not in result:
+                result[label] = np.repeat(np.array([str(meta.get(label, '')) for meta, _ in parts] or [''],
+                                                   dtype=str), rows_per_part or [0])
+    return result
+
+
+# === 既存pickleの移行 ===
+
+def load_pickled_trades(path):
+    """従来の compressed/*.pkl.gz を読み込み"""
+    with gzip.open(path, 'rb') as f:
+        return pickle.load(f)
+
+
+def migrate_pickles(db_path, archive: TradeArchive, delete_source: bool = False) -> Dict[str, int]:
+    """
+    analyses テーブルが参照する pkl.gz をアーカイブに移行し、compressed_path をパーティションに書き換え
+
+    Returns:
+        {'migrated': 件数, 'skipped': 件数, 'errors': 件数}
+    """
+    import sqlite3
+
+    summary = {'migrated': 0, 'skipped': 0, 'errors': 0}
+    with sqlite3.connect(str(db_path)) as conn:
+        rows = conn.execute(
+            "SELECT id, symbol, timeframe, config, compressed_path FROM analyses WHERE compressed_path IS NOT NULL"
+        ).fetchall()
+        for analysis_id, symbol, timeframe, config, compressed_path in rows:
+            if not compressed_path or not str(compressed_path).endswith('.pkl.gz') or not os.path.exists(compressed_path):
+                summary['skipped'] += 1
+                continue
+            try:
+                trades = load_pickled_trades(compressed_path)
+                partition = archive.write(symbol, timeframe, config, trades)
+                conn.execute("UPDATE analyses SET compressed_path=? WHERE id=?", (partition, analysis_id))
+                conn.commit()
+                if delete_source:
+                    os.remove(compressed_path)
+                summary['migrated'] += 1
+            except Exception as e:
+                logger.error(f"移行エラー {symbol} {timeframe} {config}: {e}")
+                summary['errors'] += 1
+    return summary
+
+
+# === ベンチマーク ===
+
+def _synthetic_trades(count: int, seed: int) -> List[Dict]:
+    rng = np.random.default_rng(seed)
+    start = pd.Timestamp('2025-01-01 00:00:00')
+    trades = []
+    for i in range(count):
+        entry = start + pd.Timedelta(minutes=int(i * 15))
+        success = bool(rng.random() < 0.55)
+        trades.append({
+            'entry_time': entry.strftime('%Y-%m-%d %H:%M:%S') + JST_SUFFIX,
+            'exit_time': (entry + pd.Timedelta(hours=2)).strftime('%Y-%m-%d %H:%M:%S') + JST_SUFFIX,
+            'entry_price': float(100 + rng.normal(0, 5)),
+            'exit_price': float(100 + rng.normal(0, 5)),
+            'take_profit_price': float(105 + rng.normal(0, 1)),
+            'stop_loss_price': float(95 + rng.normal(0, 1)),
+            'leverage': float(rng.uniform(1, 20)),
+            'pnl_pct': float(rng.normal(0.01, 0.05)),
+            'confidence': float(rng.uniform(0.3, 0.9)),
+            'is_success': success,
+            'trade_type': 'profit' if success else 'loss',
+            'strategy': 'Balanced',
+        })
+    return trades
+
+
+def run_read_benchmark(trades_per_partition: int = 2000, timeframes=('1m', '5m', '15m', '1h'),
+                       configs=('Conservative_ML', 'Aggressive_ML', 'Balanced'), repeat: int = 3) -> Dict:
+    """銘柄1つ分の全パーティション読み込み: pickle（展開・dict化）と アーカイブ（射影+一括）の比較"""
+    import tempfile
+
+    columns = ['entry_time', 'entry_price', 'exit_price', 'leverage', 'pnl_pct', 'is_success']
+    with tempfile.TemporaryDirectory() as tmp:
+        archive = TradeArchive(os.path.join(tmp, 'archive'))
+        pickle_paths = []
+        for i, (tf, config) in enumerate((tf, c) for tf in timeframes for c in configs):
+            trades = _synthetic_trades(trades_per_partition, seed=i)
+            path = os.path.join(tmp, f"BENCH_{tf}_{config}.pkl.gz")
+            with gzip.open(path, 'wb') as f:
+                pickle.dump(trades, f)
+            pickle_paths.append(path)
+            archive.write('BENCH', tf, config, trades)
+        total_rows = trades_per_partition * len(pickle_paths)
+
+        def pickle_read():
+            records = []
+            for path in pickle_paths:
+                records.extend(pd.DataFrame(load_pickled_trades(path)).to_dict('records'))
+            return len(records)
+
+        def archive_read():
+            arrays = archive.read_symbol('BENCH', columns=columns)
+            return len(arrays['leverage'])
+
+        results = {}
+        for label, func in (('pickle', pickle_read), ('archive', archive_read)):
+            best = None
+            for _ in range(repeat):
+                started = time.perf_counter()
+                assert func() == total_rows
+                elapsed = time.perf_counter() - started
+                best = elapsed if best is None else min(best, elapsed)
+            results[label] = {'seconds': best, 'rows_per_second': total_rows / best}
+        results['rows'] = total_rows
+        results['partitions'] = len(pickle_paths)
+        results['speedup'] = results['pickle']['seconds'] / results['archive']['seconds']
+        return results
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='カラム型トレードアーカイブ')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    migrate_parser = subparsers.add_parser('migrate', help='既存の pkl.gz をアーカイブに移行')
+    migrate_parser.add_argument('--base-dir', default='large_scale_analysis', help='分析ディレクトリ（analysis.db の場所）')
+    migrate_parser.add_argument('--delete-source', action='store_true', help='移行後に pkl.gz を削除')
+
+    bench_parser = subparsers.add_parser('benchmark', help='読み込みスループットのベンチマーク')
+    bench_parser.add_argument('--trades', type=int, default=2000, help='パーティションあたりのトレード数')
+
+    args = parser.parse_args()
+    if args.command == 'migrate':
+        base_dir = Path(args.base_dir)
+        summary = migrate_pickles(base_dir / 'analysis.db', TradeArchive(base_dir / 'trade_archive'),
+                                  delete_source=args.delete_source)
+        print(f"✅ 移行完了: {summary['migrated']}件, スキップ{summary['skipped']}件, エラー{summary['errors']}件")
+    else:
+        results = run_read_benchmark(trades_per_partition=args.trades)
+        print(f"📊 銘柄1つ分の読み込み ({results['partitions']}パーティション, {results['rows']}トレード)")
+        for label in ('pickle', 'archive'):
+            print(f"   {label:8s}: {results[label]['seconds'] * 1000:8.1f}ms "
+                  f"({results[label]['rows_per_second']:,.0f} 行/秒)")
+        print(f"   ⚡ {results['speedup']:.1f}倍")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,7 @@ import numpy as np
 import os
 import json
 import pickle
+import time
 from datetime import datetime, timedelta
 from typing import Dict, List, Tuple, Optional, Any, Callable
 from sklearn.model_selection import TimeSeriesSplit
@@ -16,7 +17,7 @@ from sklearn.ensemble import RandomForestRegressor
 from sklearn.metrics import mean_squared_error, mean_absolute_error
 import lightgbm as lgb
 import warnings
-from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait, FIRST_COMPLETED
 from multiprocessing import cpu_count
 import logging
 
@@ -24,6 +25,17 @@ warnings.filterwarnings('ignore')
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+
+def _process_window_in_worker(settings: Dict[str, Any], window_data: pd.DataFrame, split: Dict[str, Any],
+                              *args, **kwargs) -> Dict[str, Any]:
+    """
+    Process one walk-forward window in a worker process
+
+    Only the window's rows are sent to the worker, so memory per in-flight window stays bounded.
+    """
+    return WalkForwardEngine(**settings)._process_window(window_data, split, *args, **kwargs)
+
+
 class WalkForwardEngine:
     """
     Implements walk-forward analysis for time series backtesting
@@ -35,7 +47,9 @@ class WalkForwardEngine:
                  min_train_size: int = 500,
                  max_train_size: Optional[int] = None,
                  n_splits: int = 5,
-                 validation_size: int = 200):
+                 validation_size: int = 200,
+                 param_search: str = 'grid',
+                 search_workers: Optional[int] = None):
         """
         Initialize walk-forward engine
         
@@ -46,6 +60,8 @@ class WalkForwardEngine:
             max_train_size: Maximum training samples (None = no limit)
             n_splits: Number of time series cross-validation splits
             validation_size: Size of validation set in each window
+            param_search: Parameter search mode ('grid' or 'successive_halving')
+            search_workers: Threads evaluating parameter candidates (default: CPU count)
         """
         self.window_size = window_size
         self.step_size = step_size
@@ -53,6 +69,8 @@ class WalkForwardEngine:
         self.max_train_size = max_train_size
         self.n_splits = n_splits
         self.validation_size = validation_size
+        self.param_search = param_search
+        self.search_workers = search_workers
         
         # Results storage
         self.results = []
@@ -133,7 +151,8 @@ class WalkForwardEngine:
     def time_series_cross_validation(self, 
                                    X: pd.DataFrame, 
                                    y: pd.Series,
-                                   model_params: Dict[str, Any]) -> Dict[str, Any]:
+                                   model_params: Dict[str, Any],
+                                   folds: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
         """
         Perform time series cross-validation within training period
         
@@ -141,22 +160,42 @@ class WalkForwardEngine:
             X: Feature matrix
             y: Target variable
             model_params: Model parameters
+            folds: Prepared folds from _build_cv_folds (built from X and y when omitted)
             
         Returns:
             Cross-validation results
         """
-        tscv = TimeSeriesSplit(n_splits=self.n_splits)
+        if folds is None:
+            folds = self._build_cv_folds(X, y)
         
         cv_scores = []
         feature_importance_scores = []
         
+        for fold in folds:
+            try:
+                score, importance = self._score_fold(fold, model_params)
+                cv_scores.append(score)
+                if importance is not None:
+                    feature_importance_scores.append(importance)
+                
+            except Exception as e:
+                logger.warning(f"CV fold {fold['fold']} failed: {e}")
+                continue
+        
+        return self._summarize_cv_scores(cv_scores, feature_importance_scores)
+    
+    def _build_cv_folds(self, X: pd.DataFrame, y: pd.Series) -> List[Dict[str, Any]]:
+        """
+        Split and scale the time series CV folds once so every parameter candidate reuses them
+        """
+        tscv = TimeSeriesSplit(n_splits=self.n_splits)
+        
+        folds = []
         for fold, (train_idx, val_idx) in enumerate(tscv.split(X)):
             try:
                 # Split data
                 X_train_fold = X.iloc[train_idx]
                 X_val_fold = X.iloc[val_idx]
-                y_train_fold = y.iloc[train_idx]
-                y_val_fold = y.iloc[val_idx]
                 
                 # Scale features
                 scaler = StandardScaler()
@@ -171,43 +210,68 @@ class WalkForwardEngine:
                     index=X_val_fold.index
                 )
                 
-                # Train model
-                model = self._create_model(model_params)
-                model.fit(X_train_scaled, y_train_fold)
-                
-                # Predict
-                y_pred = model.predict(X_val_scaled)
-                
-                # Calculate metrics
-                mse = mean_squared_error(y_val_fold, y_pred)
-                mae = mean_absolute_error(y_val_fold, y_pred)
-                
-                # Handle correlation calculation safely
-                try:
-                    corr = np.corrcoef(y_val_fold, y_pred)[0, 1]
-                    if np.isnan(corr):
-                        corr = 0.0
-                except:
-                    corr = 0.0
-                
-                cv_scores.append({
+                folds.append({
                     'fold': fold,
-                    'mse': mse,
-                    'mae': mae,
-                    'correlation': corr,
-                    'n_train': len(X_train_fold),
-                    'n_val': len(X_val_fold)
+                    'X_train': X_train_scaled,
+                    'y_train': y.iloc[train_idx],
+                    'X_val': X_val_scaled,
+                    'y_val': y.iloc[val_idx]
                 })
                 
-                # Feature importance
-                if hasattr(model, 'feature_importances_'):
-                    importance = pd.Series(model.feature_importances_, index=X_train_fold.columns)
-                    feature_importance_scores.append(importance)
-                
             except Exception as e:
                 logger.warning(f"CV fold {fold} failed: {e}")
                 continue
         
+        return folds
+    
+    def _score_fold(self,
+                    fold: Dict[str, Any],
+                    model_params: Dict[str, Any]) -> Tuple[Dict[str, Any], Optional[pd.Series]]:
+        """
+        Train on one prepared CV fold and score it on the fold's validation rows
+        """
+        # Train model
+        model = self._create_model(model_params)
+        model.fit(fold['X_train'], fold['y_train'])
+        
+        # Predict
+        y_val_fold = fold['y_val']
+        y_pred = model.predict(fold['X_val'])
+        
+        # Calculate metrics
+        mse = mean_squared_error(y_val_fold, y_pred)
+        mae = mean_absolute_error(y_val_fold, y_pred)
+        
+        # Handle correlation calculation safely
+        try:
+            corr = np.corrcoef(y_val_fold, y_pred)[0, 1]
+            if np.isnan(corr):
+                corr = 0.0
+        except:
+            corr = 0.0
+        
+        score = {
+            'fold': fold['fold'],
+            'mse': mse,
+            'mae': mae,
+            'correlation': corr,
+            'n_train': len(fold['X_train']),
+            'n_val': len(fold['X_val'])
+        }
+        
+        # Feature importance
+        importance = None
+        if hasattr(model, 'feature_importances_'):
+            importance = pd.Series(model.feature_importances_, index=fold['X_train'].columns)
+        
+        return score, importance
+    
+    def _summarize_cv_scores(self,
+                             cv_scores: List[Dict[str, Any]],
+                             feature_importance_scores: List[pd.Series]) -> Dict[str, Any]:
+        """
+        Aggregate per-fold scores into cross-validation results
+        """
         if not cv_scores:
             return {'error': 'All CV folds failed'}
         
@@ -245,6 +309,7 @@ class WalkForwardEngine:
                 subsample=params.get('subsample', 0.8),
                 colsample_bytree=params.get('colsample_bytree', 0.8),
                 random_state=params.get('random_state', 42),
+                n_jobs=params.get('n_jobs'),
                 verbosity=-1,
                 force_col_wise=True
             )
@@ -255,7 +320,7 @@ class WalkForwardEngine:
                 min_samples_split=params.get('min_samples_split', 5),
                 min_samples_leaf=params.get('min_samples_leaf', 2),
                 random_state=params.get('random_state', 42),
-                n_jobs=-1
+                n_jobs=params.get('n_jobs', -1)
             )
         else:
             raise ValueError(f"Unknown model type: {model_type}")
@@ -263,7 +328,9 @@ class WalkForwardEngine:
     def optimize_parameters(self, 
                           X_train: pd.DataFrame,
                           y_train: pd.Series,
-                          param_grid: Dict[str, List[Any]]) -> Dict[str, Any]:
+                          param_grid: Dict[str, List[Any]],
+                          search: Optional[str] = None,
+                          reduction_factor: int = 3) -> Dict[str, Any]:
         """
         Optimize model parameters using time series cross-validation
         
@@ -271,11 +338,20 @@ class WalkForwardEngine:
             X_train: Training features
             y_train: Training target
             param_grid: Parameter grid to search
+            search: 'grid' (every combination on every fold) or 'successive_halving'
+                    (default: the engine's param_search)
+            reduction_factor: Fraction of candidates kept per successive-halving rung (1/reduction_factor)
             
         Returns:
-            Best parameters and optimization results
+            Best parameters and optimization results, plus a search trace per rung
         """
-        logger.info("Starting parameter optimization")
+        search = search or self.param_search
+        if search not in ('grid', 'successive_halving'):
+            raise ValueError(f"Unknown parameter search: {search}")
+        if reduction_factor < 2:
+            raise ValueError("reduction_factor must be at least 2")
+        
+        logger.info(f"Starting parameter optimization ({search})")
         
         # Generate parameter combinations
         import itertools
@@ -290,27 +366,62 @@ class WalkForwardEngine:
         
         logger.info(f"Testing {len(param_combinations)} parameter combinations")
         
+        # Fold matrices don't depend on the parameters, so split and scale them once
+        folds = self._build_cv_folds(X_train, y_train)
+        if not folds:
+            logger.error("No valid CV folds for parameter optimization")
+            return {'error': 'Parameter optimization failed'}
+        
+        if search == 'grid':
+            optimization_results, search_trace = self._grid_search(folds, param_combinations)
+        else:
+            optimization_results, search_trace = self._successive_halving_search(
+                folds, param_combinations, reduction_factor
+            )
+        
         best_score = float('inf')
         best_params = None
+        for result in optimization_results:
+            if result['score'] < best_score:
+                best_score = result['score']
+                best_params = result['params']
+        
+        if best_params is None:
+            logger.error("No valid parameter combinations found")
+            return {'error': 'Parameter optimization failed'}
+        
+        logger.info(f"Best parameters found: {best_params}")
+        logger.info(f"Best score: {best_score}")
+        
+        return {
+            'best_params': best_params,
+            'best_score': best_score,
+            'optimization_results': optimization_results,
+            'search': search,
+            'search_trace': search_trace,
+            'n_fits': sum(rung['n_fits'] for rung in search_trace),
+            'n_rounds': sum(rung['n_rounds'] for rung in search_trace)
+        }
+    
+    def _grid_search(self,
+                     folds: List[Dict[str, Any]],
+                     param_combinations: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Cross-validate every parameter combination on every fold
+        """
         optimization_results = []
         
         for i, params in enumerate(param_combinations):
             try:
-                cv_results = self.time_series_cross_validation(X_train, y_train, params)
+                cv_results = self.time_series_cross_validation(None, None, params, folds=folds)
                 
                 if 'error' not in cv_results:
-                    score = cv_results['mean_mse']
-                    
                     optimization_results.append({
                         'params': params,
-                        'score': score,
+                        'score': cv_results['mean_mse'],
                         'cv_results': cv_results
                     })
                     
-                    if score < best_score:
-                        best_score = score
-                        best_params = params
-                    
                     if i % 10 == 0:
                         logger.info(f"Optimization progress: {i}/{len(param_combinations)}")
                 
@@ -318,18 +429,100 @@ class WalkForwardEngine:
                 logger.warning(f"Parameter combination {i} failed: {e}")
                 continue
         
-        if best_params is None:
-            logger.error("No valid parameter combinations found")
-            return {'error': 'Parameter optimization failed'}
+        search_trace = [{
+            'rung': 0,
+            'resource_fraction': 1.0,
+            'n_folds': len(folds),
+            'n_candidates': len(param_combinations),
+            'n_kept': len(optimization_results),
+            'n_fits': len(param_combinations) * len(folds),
+            'n_rounds': sum(params.get('n_estimators', 100) for params in param_combinations) * len(folds),
+            'evaluations': [{'params': r['params'], 'score': r['score']} for r in optimization_results]
+        }]
+        
+        return optimization_results, search_trace
+    
+    def _successive_halving_search(self,
+                                   folds: List[Dict[str, Any]],
+                                   param_combinations: List[Dict[str, Any]],
+                                   reduction_factor: int) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Successive halving over CV folds and boosting rounds
         
-        logger.info(f"Best parameters found: {best_params}")
-        logger.info(f"Best score: {best_score}")
+        Every candidate starts on a small budget (the most recent folds and a fraction of its
+        n_estimators). Each rung keeps the best 1/reduction_factor candidates and multiplies the
+        budget by reduction_factor, so only the final rung trains on every fold with full rounds.
+        Candidates of a rung are evaluated in parallel threads on the shared fold matrices.
+        """
+        n_rungs = 1
+        while reduction_factor ** n_rungs <= len(param_combinations):
+            n_rungs += 1
         
-        return {
-            'best_params': best_params,
-            'best_score': best_score,
-            'optimization_results': optimization_results
-        }
+        n_threads = max(1, min(self.search_workers or cpu_count(), len(param_combinations)))
+        survivors = list(range(len(param_combinations)))
+        search_trace = []
+        optimization_results = []
+        
+        with ThreadPoolExecutor(max_workers=n_threads) as executor:
+            for rung in range(n_rungs):
+                fraction = float(reduction_factor) ** (rung - n_rungs + 1)
+                final = rung == n_rungs - 1
+                rung_folds = folds[-max(1, int(np.ceil(len(folds) * fraction))):]
+                
+                rung_params = {}
+                for i in survivors:
+                    params = dict(param_combinations[i])
+                    params['n_estimators'] = max(1, int(np.ceil(params.get('n_estimators', 100) * fraction)))
+                    if n_threads > 1:
+                        params.setdefault('n_jobs', max(1, cpu_count() // n_threads))
+                    rung_params[i] = params
+                
+                futures = {
+                    i: executor.submit(self.time_series_cross_validation, None, None, rung_params[i], rung_folds)
+                    for i in survivors
+                }
+                
+                scores = {}
+                for i, future in futures.items():
+                    try:
+                        cv_results = future.result()
+                    except Exception as e:
+                        logger.warning(f"Parameter combination {i} failed: {e}")
+                        continue
+                    if 'error' in cv_results:
+                        continue
+                    scores[i] = cv_results['mean_mse']
+                    if final:
+                        optimization_results.append({
+                            'params': param_combinations[i],
+                            'score': cv_results['mean_mse'],
+                            'cv_results': cv_results
+                        })
+                
+                ranked = sorted(scores, key=lambda i: (scores[i], i))
+                survivors = ranked[:max(1, len(survivors) // reduction_factor)]
+                
+                search_trace.append({
+                    'rung': rung,
+                    'resource_fraction': fraction,
+                    'n_folds': len(rung_folds),
+                    'n_candidates': len(futures),
+                    'n_kept': len(ranked) if final else len(survivors),
+                    'n_fits': len(futures) * len(rung_folds),
+                    'n_rounds': sum(rung_params[i]['n_estimators'] for i in futures) * len(rung_folds),
+                    'evaluations': [
+                        {'params': param_combinations[i], 'n_estimators': rung_params[i]['n_estimators'],
+                         'score': scores[i]}
+                        for i in ranked
+                    ]
+                })
+                logger.info(f"Successive halving rung {rung}: {len(futures)} candidates on "
+                            f"{len(rung_folds)} folds, best score {scores[ranked[0]] if ranked else None}")
+                
+                if not survivors:
+                    break
+        
+        return optimization_results, search_trace
     
     def run_walk_forward_analysis(self, 
                                 data: pd.DataFrame,
@@ -338,7 +531,10 @@ class WalkForwardEngine:
                                 model_params: Dict[str, Any],
                                 strategy_config: Dict[str, Any],
                                 optimize_params: bool = False,
-                                param_grid: Optional[Dict[str, List[Any]]] = None) -> Dict[str, Any]:
+                                param_grid: Optional[Dict[str, List[Any]]] = None,
+                                parallel: bool = False,
+                                max_workers: Optional[int] = None,
+                                warm_start: bool = False) -> Dict[str, Any]:
         """
         Run complete walk-forward analysis
         
@@ -350,6 +546,10 @@ class WalkForwardEngine:
             strategy_config: Strategy configuration
             optimize_params: Whether to optimize parameters
             param_grid: Parameter grid for optimization
+            parallel: Process independent windows in worker processes
+            max_workers: Number of worker processes for parallel mode (default: CPU count)
+            warm_start: Continue boosting from the previous window's model on the newly added
+                        training rows instead of retraining (LightGBM only, windows run in order)
             
         Returns:
             Walk-forward analysis results
@@ -376,34 +576,43 @@ class WalkForwardEngine:
         all_actuals = []
         all_dates = []
         
-        for split in splits:
-            try:
-                window_result = self._process_window(
-                    data, split, feature_columns, target_column,
-                    model_params, strategy_config, optimize_params, param_grid
-                )
-                
-                if 'error' not in window_result:
-                    results['window_results'].append(window_result)
-                    
-                    # Collect predictions
-                    if 'predictions' in window_result:
-                        all_predictions.extend(window_result['predictions'])
-                        all_actuals.extend(window_result['actuals'])
-                        all_dates.extend(window_result['dates'])
-                    
-                    # Track feature importance evolution
-                    if 'feature_importance' in window_result:
-                        results['feature_importance_evolution'].append({
-                            'window_id': split['window_id'],
-                            'importance': window_result['feature_importance']
-                        })
+        window_args = (feature_columns, target_column, model_params, strategy_config, optimize_params, param_grid)
+        started = time.perf_counter()
+        if warm_start:
+            if parallel:
+                logger.warning("Warm start needs the previous window's model; running windows sequentially")
+            mode = 'warm_start'
+            window_outcomes = self._run_windows_warm_start(data, splits, *window_args)
+        elif parallel:
+            mode = 'parallel'
+            max_workers = max(1, min(max_workers or cpu_count(), len(splits)))
+            window_outcomes = self._run_windows_parallel(data, splits, max_workers, *window_args)
+        else:
+            mode = 'sequential'
+            window_outcomes = self._run_windows_sequential(data, splits, *window_args)
+        
+        for split, window_result in window_outcomes:
+            if isinstance(window_result, Exception):
+                logger.error(f"Window {split['window_id']} failed: {window_result}")
+                continue
+            
+            if 'error' not in window_result:
+                results['window_results'].append(window_result)
                 
-                logger.info(f"Completed window {split['window_id']}")
+                # Collect predictions
+                if 'predictions' in window_result:
+                    all_predictions.extend(window_result['predictions'])
+                    all_actuals.extend(window_result['actuals'])
+                    all_dates.extend(window_result['dates'])
                 
-            except Exception as e:
-                logger.error(f"Window {split['window_id']} failed: {e}")
-                continue
+                # Track feature importance evolution
+                if 'feature_importance' in window_result:
+                    results['feature_importance_evolution'].append({
+                        'window_id': split['window_id'],
+                        'importance': window_result['feature_importance']
+                    })
+            
+            logger.info(f"Completed window {split['window_id']}")
         
         # Aggregate results
         results['predictions'] = pd.DataFrame({
@@ -423,11 +632,191 @@ class WalkForwardEngine:
             results['window_results']
         )
         
+        # Execution timings (per-window timings are in each window result's 'timing')
+        timings = [r['timing'] for r in results['window_results'] if 'timing' in r]
+        results['execution'] = {
+            'mode': mode,
+            'max_workers': max_workers if mode == 'parallel' else 1,
+            'wall_seconds': time.perf_counter() - started,
+            'window_seconds': sum(t['total_seconds'] for t in timings),
+            'train_seconds': sum(t['train_seconds'] for t in timings),
+            'warm_started_windows': sum(1 for t in timings if t['training'] == 'warm_start')
+        }
+        
         self.results = results
         
-        logger.info("Walk-forward analysis completed")
+        logger.info(f"Walk-forward analysis completed ({mode}, {results['execution']['wall_seconds']:.2f}s)")
         return results
     
+    def _run_windows_sequential(self, data: pd.DataFrame, splits: List[Dict[str, Any]],
+                                *window_args) -> List[Tuple[Dict[str, Any], Any]]:
+        """
+        Process windows one by one, returning (split, window result or exception) in split order
+        """
+        outcomes = []
+        for split in splits:
+            try:
+                outcomes.append((split, self._process_window(data, split, *window_args)))
+            except Exception as e:
+                outcomes.append((split, e))
+        return outcomes
+    
+    def _run_windows_warm_start(self, data: pd.DataFrame, splits: List[Dict[str, Any]],
+                                *window_args) -> List[Tuple[Dict[str, Any], Any]]:
+        """
+        Process windows in order, continuing each model from the previous successful window
+        """
+        outcomes = []
+        previous = None
+        for split in splits:
+            try:
+                window_result = self._process_window(data, split, *window_args, warm_start_state=previous)
+            except Exception as e:
+                outcomes.append((split, e))
+                continue
+            outcomes.append((split, window_result))
+            if 'error' not in window_result:
+                previous = {
+                    'model': window_result['model'],
+                    'scaler': window_result['scaler'],
+                    'train_end': split['train'][1]
+                }
+        return outcomes
+    
+    def _run_windows_parallel(self, data: pd.DataFrame, splits: List[Dict[str, Any]], max_workers: int,
+                              feature_columns: List[str], target_column: str, model_params: Dict[str, Any],
+                              *window_args) -> List[Tuple[Dict[str, Any], Any]]:
+        """
+        Process independent windows in worker processes
+        
+        At most max_workers windows are in flight at once and each worker only receives its
+        window's rows, so memory stays bounded regardless of the number of windows.
+        """
+        columns = list(dict.fromkeys(list(feature_columns) + [target_column]))
+        if 'timestamp' in data.columns and not isinstance(data.index, pd.DatetimeIndex):
+            columns.append('timestamp')
+        
+        # Share the cores between workers so parallel fits don't oversubscribe the CPU
+        worker_params = dict(model_params)
+        worker_params.setdefault('n_jobs', max(1, cpu_count() // max_workers))
+        settings = self._engine_settings(max_workers)
+        
+        outcomes = {}
+        pending = {}
+        remaining = iter(splits)
+        
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            def submit_next() -> bool:
+                split = next(remaining, None)
+                if split is None:
+                    return False
+                offset = split['window_start']
+                window_data = data.iloc[offset:split['window_end']][columns]
+                local_split = dict(split, **{
+                    key: (split[key][0] - offset, split[key][1] - offset)
+                    for key in ('train', 'validation', 'test')
+                })
+                future = executor.submit(_process_window_in_worker, settings, window_data, local_split,
+                                         feature_columns, target_column, worker_params, *window_args,
+                                         position_offset=offset)
+                pending[future] = split
+                return True
+            
+            for _ in range(max_workers):
+                if not submit_next():
+                    break
+            
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    split = pending.pop(future)
+                    try:
+                        outcomes[split['window_id']] = future.result()
+                    except Exception as e:
+                        outcomes[split['window_id']] = e
+                    submit_next()
+        
+        return [(split, outcomes[split['window_id']]) for split in splits]
+    
+    def _engine_settings(self, max_workers: int) -> Dict[str, Any]:
+        """
+        Constructor arguments for recreating this engine in a worker process
+        """
+        return {
+            'window_size': self.window_size,
+            'step_size': self.step_size,
+            'min_train_size': self.min_train_size,
+            'max_train_size': self.max_train_size,
+            'n_splits': self.n_splits,
+            'validation_size': self.validation_size,
+            'param_search': self.param_search,
+            # Share the cores between windows so each worker's parameter search doesn't oversubscribe the CPU
+            'search_workers': self.search_workers or max(1, cpu_count() // max_workers)
+        }
+    
+    def compare_execution_modes(self,
+                                data: pd.DataFrame,
+                                feature_columns: List[str],
+                                target_column: str,
+                                model_params: Dict[str, Any],
+                                strategy_config: Dict[str, Any],
+                                modes: Tuple[str, ...] = ('sequential', 'parallel', 'warm_start'),
+                                max_workers: Optional[int] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Run the same analysis in several execution modes and compare them with sequential retraining
+        
+        Args:
+            modes: Execution modes to run ('sequential', 'parallel', 'warm_start')
+            max_workers: Number of worker processes for parallel mode
+            
+        Returns:
+            Per-mode timings and test metrics. Non-sequential modes also report the speedup,
+            the MSE/correlation delta and the largest prediction difference against sequential.
+        """
+        unknown = [mode for mode in modes if mode not in ('sequential', 'parallel', 'warm_start')]
+        if unknown:
+            raise ValueError(f"Unknown execution modes: {unknown}")
+        
+        runs = {}
+        for mode in ['sequential'] + [mode for mode in modes if mode != 'sequential']:
+            runs[mode] = self.run_walk_forward_analysis(
+                data, feature_columns, target_column, model_params, strategy_config,
+                parallel=(mode == 'parallel'), max_workers=max_workers, warm_start=(mode == 'warm_start')
+            )
+        
+        baseline = runs['sequential']
+        comparison = {}
+        for mode, results in runs.items():
+            if 'error' in results:
+                comparison[mode] = {'error': results['error']}
+                continue
+            
+            summary = results.get('performance_summary', {})
+            entry = dict(results['execution'])
+            entry['n_windows'] = len(results['window_results'])
+            entry['mse'] = summary.get('mse')
+            entry['correlation'] = summary.get('correlation')
+            entry['window_timings'] = [
+                dict(r['timing'], window_id=r['window_id']) for r in results['window_results'] if 'timing' in r
+            ]
+            
+            if mode != 'sequential' and 'error' not in baseline:
+                base_summary = baseline.get('performance_summary', {})
+                base_execution = baseline['execution']
+                entry['speedup'] = (base_execution['wall_seconds'] / entry['wall_seconds']
+                                    if entry['wall_seconds'] > 0 else None)
+                if entry['mse'] is not None and base_summary.get('mse') is not None:
+                    entry['mse_delta'] = entry['mse'] - base_summary['mse']
+                    entry['correlation_delta'] = entry['correlation'] - base_summary['correlation']
+                predicted = results['predictions']['predicted'].to_numpy()
+                base_predicted = baseline['predictions']['predicted'].to_numpy()
+                if len(predicted) == len(base_predicted):
+                    entry['max_prediction_diff'] = (float(np.max(np.abs(predicted - base_predicted)))
+                                                    if len(predicted) else 0.0)
+            comparison[mode] = entry
+        
+        return comparison
+    
     def _process_window(self, 
                        data: pd.DataFrame,
                        split: Dict[str, Any],
@@ -436,10 +825,19 @@ class WalkForwardEngine:
                        model_params: Dict[str, Any],
                        strategy_config: Dict[str, Any],
                        optimize_params: bool,
-                       param_grid: Optional[Dict[str, List[Any]]]) -> Dict[str, Any]:
+                       param_grid: Optional[Dict[str, List[Any]]],
+                       warm_start_state: Optional[Dict[str, Any]] = None,
+                       position_offset: int = 0) -> Dict[str, Any]:
         """
         Process a single walk-forward window
+        
+        Args:
+            warm_start_state: Previous window's model, scaler and train end; when usable, the model
+                              is continued on the rows added since then instead of retrained
+            position_offset: Position of data's first row in the full dataset (parallel mode)
         """
+        window_started = time.perf_counter()
+        
         # Extract data for this window
         train_start, train_end = split['train']
         val_start, val_end = split['validation']
@@ -455,9 +853,9 @@ class WalkForwardEngine:
         y_test = data.iloc[test_start:test_end][target_column]
         
         # Clean data
-        X_train = X_train.fillna(method='ffill').fillna(0)
-        X_val = X_val.fillna(method='ffill').fillna(0)
-        X_test = X_test.fillna(method='ffill').fillna(0)
+        X_train = X_train.ffill().fillna(0)
+        X_val = X_val.ffill().fillna(0)
+        X_test = X_test.ffill().fillna(0)
         
         y_train = y_train.fillna(0)
         y_val = y_val.fillna(0)
@@ -473,23 +871,42 @@ class WalkForwardEngine:
             'n_test': len(X_test)
         }
         
-        # Parameter optimization
-        if optimize_params and param_grid:
+        new_rows = self._warm_start_rows(model_params, warm_start_state, train_start, train_end)
+        
+        # Parameter optimization (a warm-started model keeps the parameters it was started with)
+        if optimize_params and param_grid and not new_rows:
             optimization = self.optimize_parameters(X_train, y_train, param_grid)
             if 'error' not in optimization:
                 model_params = optimization['best_params']
                 window_result['optimization'] = optimization
         
         # Train model
-        scaler = StandardScaler()
-        X_train_scaled = pd.DataFrame(
-            scaler.fit_transform(X_train),
-            columns=X_train.columns,
-            index=X_train.index
-        )
-        
-        model = self._create_model(model_params)
-        model.fit(X_train_scaled, y_train)
+        train_started = time.perf_counter()
+        if new_rows:
+            # Keep the scaler the chain started with so the existing trees see the same feature scale
+            scaler = warm_start_state['scaler']
+            X_new_scaled = pd.DataFrame(
+                scaler.transform(X_train.iloc[-new_rows:]),
+                columns=X_train.columns,
+                index=X_train.index[-new_rows:]
+            )
+            warm_params = dict(model_params, n_estimators=model_params.get(
+                'warm_start_n_estimators', max(1, model_params.get('n_estimators', 100) // 4)))
+            model = self._create_model(warm_params)
+            model.fit(X_new_scaled, y_train.iloc[-new_rows:], init_model=warm_start_state['model'].booster_)
+            training = 'warm_start'
+        else:
+            scaler = StandardScaler()
+            X_train_scaled = pd.DataFrame(
+                scaler.fit_transform(X_train),
+                columns=X_train.columns,
+                index=X_train.index
+            )
+            
+            model = self._create_model(model_params)
+            model.fit(X_train_scaled, y_train)
+            training = 'full'
+        train_seconds = time.perf_counter() - train_started
         
         # Validate model
         X_val_scaled = pd.DataFrame(
@@ -524,7 +941,7 @@ class WalkForwardEngine:
         elif 'timestamp' in data.columns:
             window_result['dates'] = data.iloc[test_start:test_end]['timestamp'].tolist()
         else:
-            window_result['dates'] = list(range(test_start, test_end))
+            window_result['dates'] = list(range(position_offset + test_start, position_offset + test_end))
         
         # Feature importance
         if hasattr(model, 'feature_importances_'):
@@ -543,8 +960,33 @@ class WalkForwardEngine:
         window_result['model'] = model
         window_result['scaler'] = scaler
         
+        window_result['timing'] = {
+            'training': training,
+            'train_rows': new_rows or len(X_train),
+            'train_seconds': train_seconds,
+            'total_seconds': time.perf_counter() - window_started
+        }
+        
         return window_result
     
+    def _warm_start_rows(self,
+                         model_params: Dict[str, Any],
+                         warm_start_state: Optional[Dict[str, Any]],
+                         train_start: int,
+                         train_end: int) -> int:
+        """
+        Number of newly added training rows to continue the previous model on (0 = retrain from scratch)
+        
+        Only boosting models can be continued, and only when the previous training period
+        overlaps this one (otherwise there is nothing to carry over).
+        """
+        if warm_start_state is None or model_params.get('type', 'lightgbm') != 'lightgbm':
+            return 0
+        previous_end = warm_start_state['train_end']
+        if not train_start <= previous_end < train_end:
+            return 0
+        return train_end - previous_end
+    
     def _calculate_overall_performance(self, 
                                      predictions: List[float],
                                      actuals: List[float]) -> Dict[str, float]:
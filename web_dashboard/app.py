@@ -6,6 +6,7 @@ Web Dashboard for Long Trader Real-Time Monitoring System.
 import sys
 import os
 import json
+import sqlite3
 import threading
 from datetime import datetime, timezone
 from pathlib import Path
@@ -37,6 +38,7 @@ except ImportError:
 from real_time_system.monitor import RealTimeMonitor
 from real_time_system.utils.colored_log import get_colored_logger
 from scalable_analysis_system import ScalableAnalysisSystem
+from sqlite_access import db_connection
 from analysis_progress import AnalysisProgress
 from file_based_progress_tracker import file_progress_tracker as progress_tracker
 
@@ -462,13 +464,12 @@ class WebDashboard:
             """Get symbols status with detailed progress information."""
             try:
                 from execution_log_database import ExecutionLogDatabase
-                import sqlite3
                 from datetime import datetime, timedelta
                 
                 db = ExecutionLogDatabase()
                 
                 # Get all recent executions
-                with sqlite3.connect(db.db_path) as conn:
+                with db_connection(db.db_path) as conn:
                     cursor = conn.execute('''
                         SELECT execution_id, status, symbol, progress_percentage, 
                                current_operation, errors, timestamp_start, timestamp_end
@@ -570,12 +571,11 @@ class WebDashboard:
             """Clean up zombie processes (running for more than 12 hours)."""
             try:
                 from execution_log_database import ExecutionLogDatabase
-                import sqlite3
                 import json
                 
                 db = ExecutionLogDatabase()
                 
-                with sqlite3.connect(db.db_path) as conn:
+                with db_connection(db.db_path) as conn:
                     # Find zombie processes
                     cursor = conn.execute('''
                         SELECT execution_id, symbol
@@ -630,12 +630,11 @@ class WebDashboard:
                     return jsonify({'error': '実行IDが指定されていません'}), 400
                 
                 from execution_log_database import ExecutionLogDatabase
-                import sqlite3
                 import json
                 
                 db = ExecutionLogDatabase()
                 
-                with sqlite3.connect(db.db_path) as conn:
+                with db_connection(db.db_path) as conn:
                     # Check if execution exists and is running
                     cursor = conn.execute('''
                         SELECT symbol, status
@@ -882,7 +881,7 @@ class WebDashboard:
                     try:
                         analysis_db_path = Path(__file__).parent.parent / 'large_scale_analysis' / 'analysis.db'
                         if analysis_db_path.exists():
-                            with sqlite3.connect(analysis_db_path) as analysis_conn:
+                            with db_connection(analysis_db_path) as analysis_conn:
                                 deleted_count = 0
                                 
                                 # execution_idカラムが存在するかチェック
@@ -1160,8 +1159,7 @@ class WebDashboard:
                     ORDER BY pattern_count DESC, avg_sharpe DESC
                 """
                 
-                import sqlite3
-                with sqlite3.connect(system.db_path) as conn:
+                with db_connection(system.db_path) as conn:
                     cursor = conn.cursor()
                     cursor.execute(query)
                     results = cursor.fetchall()
@@ -1280,8 +1278,7 @@ class WebDashboard:
                     ORDER BY completed_patterns DESC, avg_sharpe DESC
                 """
                 
-                import sqlite3
-                with sqlite3.connect(system.db_path) as conn:
+                with db_connection(system.db_path) as conn:
                     cursor = conn.cursor()
                     cursor.execute(query)
                     results = cursor.fetchall()
@@ -1455,6 +1452,7 @@ class WebDashboard:
             try:
                 from scalable_analysis_system import ScalableAnalysisSystem
                 import numpy as np
+                import pandas as pd
                 
                 system = ScalableAnalysisSystem(CORRECT_ANALYSIS_DB_DIR)
                 
@@ -1464,31 +1462,34 @@ class WebDashboard:
                 if not results_df:
                     return jsonify({'error': f'No data found for symbol {symbol}'}), 404
                 
-                # Collect all trades from all timeframes and configs
-                all_trades = []
-                for row in results_df:
-                    trades_df = system.load_compressed_trades(row['symbol'], row['timeframe'], row['config'])
-                    if trades_df is not None and not (hasattr(trades_df, 'empty') and trades_df.empty):
-                        if hasattr(trades_df, 'to_dict'):
-                            trades = trades_df.to_dict('records')
-                        else:
-                            trades = trades_df if isinstance(trades_df, list) else []
-                        all_trades.extend(trades)
+                # Load only the needed columns of all trades (all timeframes and configs) as arrays
+                trades = system.load_symbol_trade_arrays(
+                    symbol, columns=['entry_time', 'entry_price', 'exit_price', 'leverage', 'pnl_pct',
+                                     'is_success', 'is_win'])
+                total_trades = len(trades['leverage'])
                 
-                if not all_trades:
+                if total_trades == 0:
                     return jsonify({'error': f'No trade data found for symbol {symbol}'}), 404
                 
+                def as_float(values):
+                    numbers = pd.to_numeric(pd.Series(values), errors='coerce').to_numpy(dtype=float)
+                    return np.nan_to_num(numbers, nan=0.0)
+                
                 # Basic statistics
-                total_trades = len(all_trades)
-                win_count = sum(1 for t in all_trades if t.get('is_success', t.get('is_win', False)))
+                is_success = pd.to_numeric(pd.Series(trades['is_success']), errors='coerce').to_numpy(dtype=float)
+                is_win = pd.to_numeric(pd.Series(trades['is_win']), errors='coerce').to_numpy(dtype=float)
+                wins = np.where(np.isnan(is_success), is_win == 1, is_success == 1)
+                win_count = int(wins.sum())
                 win_rate = win_count / total_trades if total_trades > 0 else 0
                 
-                leverages = [float(t.get('leverage', 0)) for t in all_trades]
-                entry_prices = [float(t.get('entry_price', 0)) for t in all_trades if t.get('entry_price')]
-                pnl_pcts = [float(t.get('pnl_pct', 0)) for t in all_trades]
+                leverages = as_float(trades['leverage'])
+                raw_entry_prices = as_float(trades['entry_price'])
+                entry_prices = raw_entry_prices[raw_entry_prices != 0]
+                exit_prices = as_float(trades['exit_price'])
+                pnl_pcts = as_float(trades['pnl_pct'])
                 
-                total_return = sum(pnl_pcts)
-                avg_leverage = np.mean(leverages) if leverages else 0
+                total_return = float(pnl_pcts.sum())
+                avg_leverage = float(np.mean(leverages)) if len(leverages) else 0
                 
                 basic_stats = {
                     'total_trades': total_trades,
@@ -1502,8 +1503,8 @@ class WebDashboard:
                 normal_checks = []
                 
                 # 1. Check leverage diversity
-                leverage_unique = len(set(leverages)) if leverages else 0
-                leverage_std = np.std(leverages) if leverages else 0
+                leverage_unique = len(np.unique(leverages))
+                leverage_std = float(np.std(leverages)) if len(leverages) else 0
                 
                 if leverage_unique == 1 and total_trades > 10:
                     anomalies.append({
@@ -1524,8 +1525,8 @@ class WebDashboard:
                     })
                 
                 # 2. Check entry price diversity
-                entry_price_unique = len(set(entry_prices)) if entry_prices else 0
-                entry_price_diversity_ratio = entry_price_unique / len(entry_prices) if entry_prices else 0
+                entry_price_unique = len(np.unique(entry_prices))
+                entry_price_diversity_ratio = entry_price_unique / len(entry_prices) if len(entry_prices) else 0
                 
                 if entry_price_unique == 1 and len(entry_prices) > 10:
                     anomalies.append({
@@ -1565,8 +1566,8 @@ class WebDashboard:
                     })
                 
                 # 4. Check PnL distribution
-                pnl_std = np.std(pnl_pcts) if pnl_pcts else 0
-                pnl_mean = np.mean(pnl_pcts) if pnl_pcts else 0
+                pnl_std = float(np.std(pnl_pcts)) if len(pnl_pcts) else 0
+                pnl_mean = float(np.mean(pnl_pcts)) if len(pnl_pcts) else 0
                 
                 if pnl_std < 0.001 and total_trades > 10:
                     anomalies.append({
@@ -1581,7 +1582,7 @@ class WebDashboard:
                     })
                 
                 # 5. Check entry time duplication
-                entry_times = [t.get('entry_time', 'N/A') for t in all_trades]
+                entry_times = ['N/A' if not isinstance(t, str) or t == '' else t for t in trades['entry_time'].tolist()]
                 entry_time_unique = len(set(entry_times))
                 entry_time_duplicates = len(entry_times) - entry_time_unique
                 
@@ -1607,36 +1608,39 @@ class WebDashboard:
                 leverage_stats = {
                     'unique_count': leverage_unique,
                     'std': leverage_std,
-                    'min': min(leverages) if leverages else 0,
-                    'max': max(leverages) if leverages else 0
+                    'min': float(leverages.min()) if len(leverages) else 0,
+                    'max': float(leverages.max()) if len(leverages) else 0
                 }
                 
                 entry_price_stats = {
                     'unique_count': entry_price_unique,
                     'total': len(entry_prices),
                     'diversity_ratio': entry_price_diversity_ratio,
-                    'min': min(entry_prices) if entry_prices else 0,
-                    'max': max(entry_prices) if entry_prices else 0
+                    'min': float(entry_prices.min()) if len(entry_prices) else 0,
+                    'max': float(entry_prices.max()) if len(entry_prices) else 0
                 }
                 
                 pnl_stats = {
                     'mean': pnl_mean,
                     'std': pnl_std,
-                    'min': min(pnl_pcts) if pnl_pcts else 0,
-                    'max': max(pnl_pcts) if pnl_pcts else 0
+                    'min': float(pnl_pcts.min()) if len(pnl_pcts) else 0,
+                    'max': float(pnl_pcts.max()) if len(pnl_pcts) else 0
                 }
                 
                 # Sample trades (all trades)
-                sample_trades = []
-                for i, trade in enumerate(all_trades):
-                    sample_trades.append({
-                        'entry_time': trade.get('entry_time', 'N/A'),
-                        'entry_price': float(trade.get('entry_price', 0)),
-                        'exit_price': float(trade.get('exit_price', 0)),
-                        'leverage': float(trade.get('leverage', 0)),
-                        'pnl_pct': float(trade.get('pnl_pct', 0)),
-                        'is_success': bool(trade.get('is_success', trade.get('is_win', False)))
-                    })
+                sample_trades = [
+                    {
+                        'entry_time': entry_time,
+                        'entry_price': entry_price,
+                        'exit_price': exit_price,
+                        'leverage': leverage,
+                        'pnl_pct': pnl_pct,
+                        'is_success': is_win
+                    }
+                    for entry_time, entry_price, exit_price, leverage, pnl_pct, is_win in zip(
+                        entry_times, raw_entry_prices.tolist(), exit_prices.tolist(), leverages.tolist(),
+                        pnl_pcts.tolist(), wins.tolist())
+                ]
                 
                 return jsonify({
                     'symbol': symbol,
@@ -1845,9 +1849,8 @@ class WebDashboard:
                 if execution_mode == 'default':
                     # デフォルト戦略ID取得
                     from pathlib import Path
-                    import sqlite3
                     analysis_db_path = Path(__file__).parent.parent / "large_scale_analysis" / "analysis.db"
-                    with sqlite3.connect(analysis_db_path) as conn:
+                    with db_connection(analysis_db_path) as conn:
                         cursor = conn.execute("SELECT id FROM strategy_configurations WHERE is_default=1 AND is_active=1")
                         selected_strategy_ids = [row[0] for row in cursor.fetchall()]
                     self.logger.info(f"デフォルト戦略選択: {len(selected_strategy_ids)}個")
@@ -1861,9 +1864,8 @@ class WebDashboard:
                     self.logger.warning("戦略選択の問題、デフォルト戦略にフォールバック")
                     execution_mode = 'default'
                     from pathlib import Path
-                    import sqlite3
                     analysis_db_path = Path(__file__).parent.parent / "large_scale_analysis" / "analysis.db"
-                    with sqlite3.connect(analysis_db_path) as conn:
+                    with db_connection(analysis_db_path) as conn:
                         cursor = conn.execute("SELECT id FROM strategy_configurations WHERE is_default=1 AND is_active=1")
                         selected_strategy_ids = [row[0] for row in cursor.fetchall()]
                 
@@ -2238,7 +2240,7 @@ class WebDashboard:
                 # Get execution steps from database manually
                 try:
                     import sqlite3
-                    with sqlite3.connect(exec_db.db_path) as conn:
+                    with db_connection(exec_db.db_path) as conn:
                         conn.row_factory = sqlite3.Row
                         cursor = conn.cursor()
                         cursor.execute("""
@@ -2263,6 +2265,22 @@ class WebDashboard:
                 self.logger.error(f"Error getting execution detail for {execution_id}: {e}")
                 return jsonify({'error': str(e)}), 500
 
+        @self.app.route('/api/execution/<execution_id>/stage-profile')
+        def api_execution_stage_profile(execution_id):
+            """ステージ別レイテンシ（p50/p95/p99・呼び出し数・処理量）を全ワーカー分合算して取得"""
+            try:
+                from stage_profiler import load_stage_profile
+                
+                profile = load_stage_profile(execution_id)
+                if not profile['stages']:
+                    return jsonify({'error': f'Stage profile for {execution_id} not found'}), 404
+                
+                return jsonify(profile)
+                
+            except Exception as e:
+                self.logger.error(f"Error getting stage profile for {execution_id}: {e}")
+                return jsonify({'error': str(e)}), 500
+
         @self.app.route('/api/executions')
         def api_executions_list():
             """Get list of recent executions."""
@@ -2504,7 +2522,6 @@ class WebDashboard:
             """銘柄の全分析データを削除"""
             try:
                 # 実行中チェック - 実際にプロセスが動いているかを確認
-                import sqlite3
                 import os
                 import subprocess
                 
@@ -2635,7 +2652,7 @@ class WebDashboard:
             # 1. analysis.db から削除（CASCADE）
             analysis_db_path = '../large_scale_analysis/analysis.db'  # ルートディレクトリのDBを参照
             if os.path.exists(analysis_db_path):
-                with sqlite3.connect(analysis_db_path) as conn:
+                with db_connection(analysis_db_path) as conn:
                     cursor = conn.cursor()
                     
                     # 関連テーブルのデータも削除（テーブルが存在する場合のみ）
@@ -2662,7 +2679,7 @@ class WebDashboard:
             # 2. alert_history.db から削除
             alert_db_path = '../alert_history_system/data/alert_history.db'  # ルートディレクトリのDBを参照
             if os.path.exists(alert_db_path):
-                with sqlite3.connect(alert_db_path) as conn:
+                with db_connection(alert_db_path) as conn:
                     cursor = conn.cursor()
                     
                     cursor.execute("DELETE FROM performance_summary WHERE symbol=?", (symbol,))
@@ -2679,7 +2696,7 @@ class WebDashboard:
             # 3. execution_logs.db のステータス更新
             exec_db_path = '../execution_logs.db'  # ルートディレクトリのDBを参照
             if os.path.exists(exec_db_path):
-                with sqlite3.connect(exec_db_path) as conn:
+                with db_connection(exec_db_path) as conn:
                     cursor = conn.cursor()
                     
                     # 完了済み実行を DATA_DELETED に更新
@@ -2720,7 +2737,7 @@ class WebDashboard:
             # 5. 削除操作をログに記録
             try:
                 if os.path.exists(exec_db_path):
-                    with sqlite3.connect(exec_db_path) as conn:
+                    with db_connection(exec_db_path) as conn:
                         cursor = conn.cursor()
                         cursor.execute("""
                             INSERT INTO execution_logs 
@@ -2942,13 +2959,12 @@ class WebDashboard:
         def api_strategy_configurations():
             """戦略設定一覧取得"""
             try:
-                import sqlite3
                 from pathlib import Path
                 import json
                 
                 analysis_db_path = Path(__file__).parent.parent / "large_scale_analysis" / "analysis.db"
                 
-                with sqlite3.connect(analysis_db_path) as conn:
+                with db_connection(analysis_db_path) as conn:
                     cursor = conn.execute("""
                         SELECT id, name, base_strategy, timeframe, parameters, description, 
                                is_default, is_active, created_by